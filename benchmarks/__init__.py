@@ -0,0 +1,7 @@
+"""Performance benchmarks for the ingest, streaming, indicator, scanner, backtest, order book heatmap, storage, rendering and startup paths.
+
+Run the suite with ``python -m benchmarks`` from the repository root; see
+``python -m benchmarks --help`` for filtering, quick mode and baseline
+comparison.  Results are written as JSON and compared against
+``benchmarks/baseline.json``, flagging regressions beyond a threshold.
+"""
@@ -0,0 +1,61 @@
+"""Command line entry point: ``python -m benchmarks``."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+from . import (  # noqa: F401 - registration
+    bench_backtest,
+    bench_heatmap,
+    bench_indicators,
+    bench_ingest,
+    bench_render,
+    bench_scanner,
+    bench_startup,
+    bench_storage,
+    bench_streams,
+)
+from .runner import BENCHMARKS, DEFAULT_THRESHOLD, compare, load, run, save
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "baseline.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("groups", nargs="*", choices=[[]] + sorted(BENCHMARKS), metavar="GROUP",
+                        help=f"benchmark groups to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs, skips the 1M candle runs")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown flagged as a regression (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.groups or None, quick=args.quick)
+    save(args.output, results, quick=args.quick)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        save(args.baseline, results, quick=args.quick)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} - nothing to compare")
+        return 0
+
+    comparisons = compare(results, load(args.baseline), args.threshold)
+    regressions = [c for c in comparisons if c.regressed]
+    for c in comparisons:
+        flag = "REGRESSION" if c.regressed else "ok"
+        print(f"{c.name:<46} {c.change:+8.1%} vs baseline  {flag}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
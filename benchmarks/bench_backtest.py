@@ -0,0 +1,41 @@
+"""Backtest and parameter sweep throughput over a year of 1m candles."""
+
+from __future__ import annotations
+
+import time
+from typing import List
+
+from crypto_analyzer.backtest.engine import Backtester, History, combinations, run_combos
+
+from .generators import random_walk_candles
+from .runner import Result, benchmark
+
+#: SMA pairs of the sweep: 10 fast x 20 slow periods
+GRID = {"fast": range(5, 25, 2), "slow": range(30, 230, 10)}
+
+
+@benchmark("backtest")
+def backtest(quick: bool) -> List[Result]:
+    """Milliseconds per SMA-cross combination in-process, and combinations per second of a pool sweep.
+
+    ``per_combo`` includes the indicator series (shared between combinations
+    as in a sweep).  ``sweep_pool`` sweeps the same grid with every core;
+    10k combinations take ``10_000 / value`` seconds.
+    """
+    n = 100_000 if quick else 525_600  # a year of 1m candles
+    candles = random_walk_candles(n)
+    combos = combinations("sma_cross", GRID)
+    results = []
+
+    history = History(candles)
+    start = time.perf_counter()
+    run_combos(history, "sma_cross", combos, 0.0015)
+    results.append(Result(f"backtest.per_combo.{n}", (time.perf_counter() - start) / len(combos) * 1e3, "ms"))
+
+    with Backtester(workers=0) as backtester:
+        backtester.start()
+        start = time.perf_counter()
+        backtester.sweep(candles, "sma_cross", GRID)
+        results.append(Result(f"backtest.sweep_pool.{n}", len(combos) / (time.perf_counter() - start),
+                              "combos/s", lower_is_better=False))
+    return results
@@ -0,0 +1,76 @@
+"""Order book heatmap cost on a full-depth book streamed at 10 Hz."""
+
+from __future__ import annotations
+
+import time
+from typing import List
+
+from crypto_analyzer.config import config
+from crypto_analyzer.models.depth_heatmap import DepthHeatmap
+from crypto_analyzer.models.order_book import OrderBookSync
+
+from .generators import depth_events, order_book_snapshot
+from .runner import Result, benchmark, qt_app
+
+
+@benchmark("heatmap")
+def heatmap(quick: bool) -> List[Result]:
+    """CPU share of the heatmap for a 1000 + 1000 level book with 100 ms diff events.
+
+    Each event changes 100 levels per side.  ``ingest_overhead`` is the time
+    the book listener adds to applying the diffs; ``refresh`` and ``paint``
+    run once per event, as the render scheduler would at 10 Hz.
+    ``cpu_percent`` is their sum per second of market data.
+    """
+    qt_app()
+    from PyQt6.QtGui import QImage
+    from crypto_analyzer.views.orderbook_heatmap import OrderBookHeatmap
+
+    seconds = 30 if quick else 120
+    n = seconds * 10
+    # 1 bps buckets around 30 000 are 3.0 wide: a 1.0 tick puts ~3 levels in each
+    snapshot = order_book_snapshot(levels=1_000, tick=1.0)
+    events = depth_events(n, levels_per_event=100, depth=1_000, tick=1.0)
+
+    def apply(listener) -> float:
+        book = OrderBookSync("BTCUSDT", lambda _symbol: snapshot, run_async=lambda fn: fn())
+        book.set_listener(listener)
+        start = time.perf_counter()
+        for event in events:
+            book.on_event(event)
+        return time.perf_counter() - start
+
+    plain_s = min(apply(None) for _ in range(3))
+    depth = DepthHeatmap(
+        config.orderbook.heatmap_bucket_bps,
+        config.orderbook.heatmap_buckets,
+        config.orderbook.heatmap_memory_mb * 2**20,
+        config.orderbook.heatmap_sample_ms,
+    )
+    listener_s = min(apply(depth) for _ in range(3))
+    overhead_s = max(0.0, listener_s - plain_s)
+
+    # Replay the stream once more, refreshing and painting after every event
+    view = OrderBookHeatmap(depth)
+    view.scheduler.unregister("heatmap")
+    view.resize(100, 700)
+    image = QImage(100, 700, QImage.Format.Format_RGB32)
+    depth.clear()
+    book = OrderBookSync("BTCUSDT", lambda _symbol: snapshot, run_async=lambda fn: fn())
+    book.set_listener(depth)
+    refresh_s = paint_s = 0.0
+    for event in events:
+        book.on_event(event)
+        start = time.perf_counter()
+        view.refresh()
+        middle = time.perf_counter()
+        view.render(image)
+        paint_s += time.perf_counter() - middle
+        refresh_s += middle - start
+
+    return [
+        Result("heatmap.ingest_overhead", overhead_s / n * 1e6, "us/event"),
+        Result("heatmap.refresh", refresh_s / n * 1e6, "us"),
+        Result("heatmap.paint", paint_s / n * 1e6, "us"),
+        Result("heatmap.cpu_percent", (overhead_s + refresh_s + paint_s) / seconds * 100, "%"),
+    ]
@@ -0,0 +1,140 @@
+"""Indicator throughput on synthetic history."""
+
+from __future__ import annotations
+
+from typing import List
+
+import pandas as pd
+
+from crypto_analyzer.controllers.indicator_controller import IndicatorController
+from crypto_analyzer.controllers.render_scheduler import RenderScheduler
+from crypto_analyzer.indicators import vectorized
+from crypto_analyzer.indicators.cache import IndicatorCache
+from crypto_analyzer.models.app_state import AppState, MarketFrame
+from crypto_analyzer.models.candle_store import Candles, CandleStore
+
+from .generators import random_walk_candles
+from .runner import Result, benchmark, qt_app, timeit
+
+INDICATORS = {
+    "sma_fast": {"enabled": True, "period": 9},
+    "sma_slow": {"enabled": True, "period": 21},
+    "bollinger_bands": {"enabled": True, "period": 20, "std_dev": 2},
+    "keltner_channels": {"enabled": True, "period": 20, "atr_mult": 2},
+}
+ALL_INDICATORS = {name: {"enabled": True} for name in vectorized.SPECS}
+
+
+def _pandas_reference(df: pd.DataFrame) -> None:
+    """The same indicators as ad-hoc pandas chains (the previous implementation)."""
+    close = df["close"]
+    close.rolling(window=9).mean()
+    close.rolling(window=21).mean()
+    rolling = close.rolling(window=20)
+    rolling.mean()
+    rolling.std()
+    close.ewm(span=20, adjust=False).mean()
+    tr = pd.concat(
+        [df["high"] - df["low"], (df["high"] - close.shift()).abs(), (df["low"] - close.shift()).abs()], axis=1
+    ).max(axis=1)
+    tr.rolling(window=20).mean()
+
+
+def _vectorized(candles: Candles, indicators) -> None:
+    for name, cfg in indicators.items():
+        vectorized.compute(name, candles, cfg)
+
+
+@benchmark("indicators")
+def indicators(quick: bool) -> List[Result]:
+    """Full-history computation for 1k/100k/1M candles and the per-frame update.
+
+    ``vectorized_full`` computes the same four indicators as the pandas
+    reference; ``vectorized_all`` every indicator of the library.
+    ``extend_one`` adds one candle to cached SMA, Bollinger and Keltner
+    series; it does not grow with the period.
+    ``controller_per_frame*`` extend the cached series by one candle (the
+    chart then reads the same entries); ``cache_hit_all`` is a recalculation
+    with nothing new, e.g. after toggling an indicator.
+    """
+    results: List[Result] = []
+    sizes = [1_000, 100_000] if quick else [1_000, 100_000, 1_000_000]
+    for n in sizes:
+        candles = random_walk_candles(n)
+        repeat = 3 if n < 1_000_000 else 1
+        df = pd.DataFrame({"high": candles.high, "low": candles.low, "close": candles.close})
+        reference = timeit(lambda: _pandas_reference(df), repeat=repeat)
+        vector = timeit(lambda: _vectorized(candles, INDICATORS), repeat=repeat)
+        library = timeit(lambda: _vectorized(candles, ALL_INDICATORS), repeat=repeat)
+        results += [
+            Result(f"indicators.pandas_full.{n}", n / reference, "candles/s", lower_is_better=False),
+            Result(f"indicators.vectorized_full.{n}", n / vector, "candles/s", lower_is_better=False),
+            Result(f"indicators.vectorized_all.{n}", n / library, "candles/s", lower_is_better=False),
+        ]
+
+    # One new candle into the cached series: constant time whatever the window
+    history = random_walk_candles(12_000)
+    for period in (20, 2_000):
+        results.append(Result(f"indicators.extend_one.{period}", _extend_one(history, period) * 1e6, "us"))
+
+    # Steady state: one new candle, then IndicatorController.recalculate
+    qt_app()
+    state = AppState()
+    history = random_walk_candles(state.max_history_size + 4_000)
+    frames = [
+        MarketFrame(int(ts), state.current_symbol, o, h, l, c, v, state.current_interval)
+        for ts, o, h, l, c, v in zip(*history)
+    ]
+    live = iter(frames[state.max_history_size:])
+    everything = {name: {"enabled": True} for name in state.active_indicators}
+    for label, enabled in (("controller_per_frame", INDICATORS), ("controller_per_frame_all", everything)):
+        controller = _controller(state, frames[:state.max_history_size], enabled)
+
+        def step() -> None:
+            state.update_market_data(next(live))
+            controller.recalculate()
+
+        per_frame = timeit(step, repeat=5, number=200)
+        results.append(Result(f"indicators.{label}", per_frame * 1e6, "us"))
+
+    # Nothing changed (indicator toggled, symbol switched back): cache hits only
+    hit = timeit(controller.recalculate, repeat=5, number=200)
+    RenderScheduler().unregister("indicators")
+    results.append(Result("indicators.cache_hit_all", hit * 1e6, "us"))
+    return results
+
+
+def _extend_one(history: Candles, period: int) -> float:
+    """Seconds to extend SMA, Bollinger Bands and Keltner Channels of ``period`` by one candle."""
+    configs = {
+        "sma": {"period": period},
+        "bollinger_bands": {"period": period, "std_dev": 2},
+        "keltner_channels": {"period": period, "atr_mult": 2},
+    }
+    store = CandleStore(history.rows)
+    store.replace(Candles(*(col[:history.rows - 2_000] for col in history)))
+    cache = IndicatorCache()
+    for name, cfg in configs.items():
+        cache.series("BTCUSDT", "1m", name, cfg, store)
+    rows = iter(range(history.rows - 2_000, history.rows))
+
+    def step() -> None:
+        i = next(rows)
+        store.append(int(history.timestamp[i]), *(float(col[i]) for col in history[1:]))
+        for name, cfg in configs.items():
+            cache.series("BTCUSDT", "1m", name, cfg, store)
+
+    return timeit(step, repeat=5, number=200)
+
+
+def _controller(state: AppState, frames: List[MarketFrame], indicators) -> IndicatorController:
+    """Controller with ``indicators`` enabled on a history of ``frames`` and an empty cache."""
+    state.replace_history(Candles.empty())
+    for name in state.active_indicators:
+        cfg = indicators.get(name)
+        state.update_indicator(name, cfg is not None, **{k: v for k, v in (cfg or {}).items() if k != "enabled"})
+    controller = IndicatorController(state, RenderScheduler(), IndicatorCache())
+    for frame in frames:
+        state.update_market_data(frame)
+    controller.recalculate()
+    return controller
@@ -0,0 +1,156 @@
+"""Socket message to AppState latency and throughput."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from crypto_analyzer.config import config
+from crypto_analyzer.controllers.data_controller import DataController
+from crypto_analyzer.models.app_state import AppState, MarketFrame
+from crypto_analyzer.models.candle_store import Candles
+from crypto_analyzer.models.order_book import BookSide, OrderBookSync
+from crypto_analyzer.models.replay import MarketRecorder, ReplayClient
+from crypto_analyzer.models.subscriptions import kline_stream
+
+from .generators import depth_events, kline_messages, order_book_snapshot, random_walk_candles
+from .runner import Result, benchmark, override, percentiles, qt_app, timeit
+
+
+def _wait(app, done, timeout: float = 5.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("ingest pipeline did not deliver in time")
+        app.processEvents()
+
+
+@benchmark("ingest")
+def ingest(quick: bool) -> List[Result]:
+    """Frames through the real ``DataController`` socket callback path.
+
+    Latency is measured from ``_on_stream_message`` on the calling thread to
+    ``AppState.dataUpdated`` on the GUI thread, one frame at a time.
+    """
+    app = qt_app()
+    n_latency = 200 if quick else 1_000
+    n_bulk = 5_000 if quick else 50_000
+    messages = list(kline_messages(random_walk_candles(n_latency + n_bulk)))
+    stream = kline_stream(messages[0]["k"]["s"], messages[0]["k"]["i"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recording = os.path.join(tmp, "empty.rec.gz")
+        MarketRecorder(recording).close()
+        with override(config.database, "db_path", os.path.join(tmp, "bench.db")):
+            controller = DataController(client=ReplayClient(recording))
+            try:
+                received: List[float] = []
+                controller.app_state.dataUpdated.connect(lambda _frame: received.append(time.perf_counter()))
+
+                samples = []
+                for msg in messages[:n_latency]:
+                    count = len(received)
+                    start = time.perf_counter()
+                    controller._on_stream_message(stream, msg)
+                    _wait(app, lambda: len(received) > count)
+                    samples.append(received[-1] - start)
+
+                # Bursts stay below the queue bound, so nothing is dropped
+                burst = controller._ingest._queue.maxsize // 2
+                start = time.perf_counter()
+                for first in range(n_latency, len(messages), burst):
+                    for msg in messages[first:first + burst]:
+                        controller._on_stream_message(stream, msg)
+                    controller._ingest.flush(timeout=60)
+                    app.processEvents()
+                dropped = controller.ingest_stats().dropped
+                _wait(app, lambda: len(received) >= len(messages) - dropped, timeout=60)
+                elapsed = time.perf_counter() - start
+            finally:
+                controller.shutdown()
+
+    return percentiles(samples, "ingest.kline_latency") + [
+        Result("ingest.kline_throughput", n_bulk / elapsed, "frames/s", lower_is_better=False),
+        Result("ingest.kline_dropped", float(dropped), "frames"),
+    ]
+
+
+@benchmark("candle_history")
+def candle_history(quick: bool) -> List[Result]:
+    """``AppState.update_market_data`` (``_update_candle_history``) per frame."""
+    qt_app()
+    state = AppState()
+    n = 20_000 if quick else 200_000
+    candles = random_walk_candles(n)
+    frames = [
+        MarketFrame(int(ts), state.current_symbol, o, h, l, c, v, state.current_interval)
+        for ts, o, h, l, c, v in zip(*candles)
+    ]
+    revisions = [MarketFrame(f.timestamp, f.symbol, f.open_price, f.high_price, f.low_price,
+                             f.close_price * 1.0001, f.volume, f.interval) for f in frames]
+
+    def append() -> None:
+        state.replace_history(Candles.empty())
+        for frame in frames:
+            state.update_market_data(frame)
+
+    def revise() -> None:
+        for frame in revisions:
+            state.update_market_data(frame)
+
+    append_s = timeit(append, repeat=3)
+    revise_s = timeit(revise, repeat=3)
+    return [
+        Result("candle_history.append", append_s / n * 1e6, "us/frame"),
+        Result("candle_history.revise_last", revise_s / n * 1e6, "us/frame"),
+    ]
+
+
+@benchmark("orderbook")
+def orderbook(quick: bool) -> List[Result]:
+    """Diff-depth events applied by ``OrderBookSync``, top-of-book snapshots and deep-book churn.
+
+    ``deep_churn`` adds and removes levels at random depths of a 5000 level
+    side (Binance's deepest snapshot), away from the top of the book.
+    """
+    n = 5_000 if quick else 50_000
+    snapshot = order_book_snapshot(levels=1_000)
+    events = depth_events(n, depth=1_000)
+
+    def apply() -> None:
+        book = OrderBookSync("BTCUSDT", lambda _symbol: snapshot, run_async=lambda fn: fn())
+        for event in events:
+            book.on_event(event)
+
+    def top() -> None:
+        book.snapshot(config.orderbook.top_levels)
+
+    apply_s = timeit(apply, repeat=3)
+    book = OrderBookSync("BTCUSDT", lambda _symbol: snapshot, run_async=lambda fn: fn())
+    for event in events:
+        book.on_event(event)
+    top_s = timeit(top, repeat=5, number=1_000)
+
+    depth = 5_000
+    rng = np.random.default_rng(0)
+    churn = (rng.integers(0, depth, n) * 2.0 + rng.integers(0, 2, n)).tolist()
+
+    side = BookSide(is_bid=True)
+    for price in range(depth):
+        side.set(price * 2.0, 1.0)
+
+    def deep_churn() -> None:
+        # Alternating sets and removals keep the side near ``depth`` levels
+        for i, price in enumerate(churn):
+            side.set(price, 0.0 if i % 2 else 1.0)
+
+    churn_s = timeit(deep_churn, repeat=3)
+    return [
+        Result("orderbook.diff_throughput", n / apply_s, "events/s", lower_is_better=False),
+        Result("orderbook.top_snapshot", top_s * 1e6, "us"),
+        Result("orderbook.deep_churn", churn_s / n * 1e6, "us/update"),
+    ]
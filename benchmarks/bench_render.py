@@ -0,0 +1,72 @@
+"""Chart render time on the offscreen Agg canvas."""
+
+from __future__ import annotations
+
+from typing import List
+
+from crypto_analyzer.config import config
+from crypto_analyzer.models.app_state import AppState, MarketFrame
+from crypto_analyzer.models.candle_store import Candles
+
+from .generators import random_walk_candles
+from .runner import Result, benchmark, override, qt_app, timeit
+
+
+@benchmark("render")
+def render(quick: bool) -> List[Result]:
+    """``ChartView.plot`` (incremental and mplfinance) and ``update_chart``.
+
+    Every timed call flushes the Qt event queue, so the canvas draw that
+    ``draw_idle`` schedules is part of the measurement.
+    """
+    qt_app()
+    from crypto_analyzer.views.chart_view import ChartView
+
+    state = AppState()
+    n = 300 if quick else state.max_history_size
+    history = random_walk_candles(n + 500)
+    state.replace_history(Candles.empty())
+    for ts, o, h, l, c, v in zip(*(col[:n] for col in history)):
+        state.update_market_data(MarketFrame(int(ts), state.current_symbol, o, h, l, c, v, state.current_interval))
+    state.update_indicator("sma_fast", True)
+    state.update_indicator("bollinger_bands", True)
+
+    view = ChartView()
+    view.resize(1200, 700)
+    view.scheduler.unregister("chart")
+    live = iter(zip(*(col[n:] for col in history)))
+
+    def plot() -> None:
+        view.plot()
+        view.canvas.flush_events()
+
+    def push(ts, o, h, l, c, v) -> None:
+        state.update_market_data(MarketFrame(int(ts), state.current_symbol, o, h, l, c, v, state.current_interval))
+        view.update_chart()
+        view.canvas.flush_events()
+
+    def revise() -> None:
+        last = state.candles.view()
+        ts, o, h, l = (col[-1] for col in last[:4])
+        push(ts, o, h, l, (h + l) / 2.0, float(last.volume[-1]) + 1.0)
+
+    def append() -> None:
+        push(*next(live))
+
+    with override(config.chart, "incremental_rendering", True):
+        full = timeit(plot, repeat=5)
+        plot()
+        revised = timeit(revise, repeat=5, number=20)
+        appended = timeit(append, repeat=5, number=20)
+    with override(config.chart, "incremental_rendering", False):
+        mplfinance = timeit(plot, repeat=3)
+
+    for name in ("sma_fast", "bollinger_bands"):
+        state.update_indicator(name, False)
+    view.deleteLater()
+    return [
+        Result("render.full_plot", full * 1000, "ms"),
+        Result("render.update_last_candle", revised * 1000, "ms"),
+        Result("render.append_candle", appended * 1000, "ms"),
+        Result("render.mplfinance_plot", mplfinance * 1000, "ms"),
+    ]
@@ -0,0 +1,51 @@
+"""Market scanner throughput over stored candles."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from typing import List
+
+from crypto_analyzer.models.candle_repository import CandleRepository
+from crypto_analyzer.models.database import Database
+from crypto_analyzer.scanner import conditions
+from crypto_analyzer.scanner.engine import Scanner
+
+from .generators import random_walk_candles
+from .runner import Result, benchmark
+
+
+@benchmark("scanner")
+def scanner(quick: bool) -> List[Result]:
+    """Seconds for a full scan (load from SQLite + every condition) of N symbols × 1000 candles.
+
+    ``scan_pool`` uses a process pool with every core (started beforehand,
+    as the scanner view does when it is first shown); ``scan_serial`` runs
+    in-process.
+    """
+    n_symbols = 50 if quick else 300
+    n_candles = 1_000
+    pairs = [(f"SYM{i}USDT", "1m") for i in range(n_symbols)]
+    scan_conditions = [(name, {}) for name in conditions.CONDITIONS]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "scan.db"))
+        repository = CandleRepository(db)
+        repository.ensure_schema()
+        for i, (symbol, interval) in enumerate(pairs):
+            repository.upsert(symbol, interval, random_walk_candles(n_candles, seed=i))
+
+        for name, workers in (("scan_pool", 0), ("scan_serial", 1)):
+            scanner = Scanner(repository.latest, workers)
+            try:
+                scanner.start()
+                scanner.scan(pairs, scan_conditions, n_candles)  # warm-up: imports in the workers
+                start = time.perf_counter()
+                scanner.scan(pairs, scan_conditions, n_candles)
+                results.append(Result(f"scanner.{name}.{n_symbols}", time.perf_counter() - start, "s"))
+            finally:
+                scanner.close()
+        db.close()
+    return results
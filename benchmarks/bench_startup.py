@@ -0,0 +1,92 @@
+"""Cold start: imports and time until the window shows a populated chart.
+
+Each run starts ``python -m crypto_analyzer.main`` in a fresh interpreter with an offscreen Qt platform, a database holding a previous
+session's candles and an empty replay recording instead of Binance, so no
+network is involved.  ``python -m benchmarks.bench_startup`` prints the
+startup timeline and the slowest imports (measured under ``-X importtime``,
+which itself slows the imports down).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from crypto_analyzer.models.candle_repository import CandleRepository
+from crypto_analyzer.models.database import Database
+from crypto_analyzer.models.replay import MarketRecorder
+from crypto_analyzer.startup_profile import ImportTime, StartupProfile, import_report, parse_importtime
+
+from .generators import random_walk_candles
+from .runner import Result, benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cold_start(workdir: str, importtime: bool = False) -> Tuple[dict, List[ImportTime], float]:
+    """Start the application once; returns its timeline, imports and wall time (ms)."""
+    data = os.path.join(workdir, "data")
+    if not os.path.exists(data):
+        os.makedirs(data)
+        db = Database(os.path.join(data, "crypto_analyzer.db"))
+        repository = CandleRepository(db)
+        repository.ensure_schema()
+        repository.upsert("BTCUSDT", "1m", random_walk_candles(500))
+        db.close()
+        MarketRecorder(os.path.join(workdir, "empty.rec.gz")).close()
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])),
+        "QT_QPA_PLATFORM": "offscreen",
+        "CRYPTO_ANALYZER_PROFILE_STARTUP": "exit",
+        "CRYPTO_ANALYZER_REPLAY": os.path.join(workdir, "empty.rec.gz"),
+        "CRYPTO_ANALYZER_FAST_START": "1",
+    }
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *(["-X", "importtime"] if importtime else []), "-m", "crypto_analyzer.main"],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=120,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"Startup run failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    return json.loads(lines[-1]), parse_importtime(proc.stderr), wall_ms
+
+
+@benchmark("startup")
+def startup(quick: bool) -> List[Result]:
+    """Median over cold starts of the import, window and first populated paint times."""
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(1 if quick else 3):
+            timeline, _, wall_ms = cold_start(tmp)
+            runs.append({**timeline, "process": wall_ms})
+    return [
+        Result(f"startup.{stage}_ms", statistics.median(run[stage] for run in runs), "ms")
+        for stage in ("imports", "window", "first_paint", "process")
+    ]
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline, _, wall_ms = cold_start(tmp)
+        _, imports, _ = cold_start(tmp, importtime=True)
+    profile = StartupProfile(start=0.0)
+    profile.marks = list(timeline.items())
+    print(profile.report())
+    print(f"{'process (wall)':<24}{wall_ms:>10.1f}\n")
+    print(import_report(imports, top=20))
+    print()
+    print(import_report(imports, top=20, prefix="crypto_analyzer"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""SQLite write throughput for single-row and batched inserts."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from typing import List
+
+from crypto_analyzer.models.candle_repository import CandleRepository
+from crypto_analyzer.models.database import Database, DatabaseWriter
+
+from .generators import random_walk_candles
+from .runner import Result, benchmark
+
+
+@benchmark("storage")
+def storage(quick: bool) -> List[Result]:
+    """Rows per second via ``Database.insert``, ``CandleRepository.upsert`` and ``DatabaseWriter``."""
+    n_single = 500 if quick else 5_000
+    n_batch = 20_000 if quick else 200_000
+    candles = random_walk_candles(n_batch)
+    rows = list(CandleRepository.to_rows("BTCUSDT", "1m", candles))
+    columns = ("symbol", "interval", "timestamp", "open", "high", "low", "close", "volume")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "single.db"))
+        repository = CandleRepository(db)
+        repository.ensure_schema()
+        start = time.perf_counter()
+        for row in rows[:n_single]:
+            db.insert(CandleRepository.TABLE, dict(zip(columns, row)), replace=True)
+        results.append(Result("storage.insert_single", n_single / (time.perf_counter() - start),
+                              "rows/s", lower_is_better=False))
+        db.close()
+
+        db = Database(os.path.join(tmp, "batch.db"))
+        repository = CandleRepository(db)
+        repository.ensure_schema()
+        start = time.perf_counter()
+        repository.upsert("BTCUSDT", "1m", candles)
+        results.append(Result("storage.upsert_batched", n_batch / (time.perf_counter() - start),
+                              "rows/s", lower_is_better=False))
+        db.close()
+
+        path = os.path.join(tmp, "writer.db")
+        db = Database(path)
+        CandleRepository(db).ensure_schema()
+        db.close()
+        with DatabaseWriter(path) as writer:
+            start = time.perf_counter()
+            for row in rows:
+                writer.submit(CandleRepository.UPSERT_SQL, row)
+            writer.flush()
+            results.append(Result("storage.writer_per_row", n_batch / (time.perf_counter() - start),
+                                  "rows/s", lower_is_better=False))
+    return results
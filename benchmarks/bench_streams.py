@@ -0,0 +1,63 @@
+"""asyncio stream core: decoded updates per second over a local WebSocket."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import List
+
+from crypto_analyzer.models.async_streams import AsyncStreamClient
+
+from .generators import kline_messages, random_walk_candles
+from .runner import Result, benchmark
+
+N_STREAMS = 50
+
+
+async def _stream(n_messages: int) -> tuple:
+    """Push ``n_messages`` closed klines spread over :data:`N_STREAMS` streams; returns (seconds, batches)."""
+    from websockets.asyncio.server import serve
+
+    streams = [f"sym{i}usdt@kline_1m" for i in range(N_STREAMS)]
+    payloads = [
+        json.dumps({"stream": streams[i % N_STREAMS], "data": msg})
+        for i, msg in enumerate(kline_messages(random_walk_candles(n_messages)))
+    ]
+    subscribed = asyncio.Event()
+
+    async def handler(ws):
+        async for raw in ws:
+            msg = json.loads(raw)
+            await ws.send(json.dumps({"result": None, "id": msg["id"]}))
+            subscribed.set()
+            await subscribed.wait()
+            for payload in payloads:
+                await ws.send(payload)
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        client = AsyncStreamClient(f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/stream")
+        received = batches = 0
+        updates = client.updates(closed_only=True)
+        start = time.perf_counter()
+        await client.subscribe(streams)
+        async for batch in updates:
+            received += len(batch.klines)
+            batches += 1
+            if received >= n_messages:
+                break
+        elapsed = time.perf_counter() - start
+        await updates.aclose()
+        await client.close()
+    return elapsed, batches
+
+
+@benchmark("streams")
+def streams(quick: bool) -> List[Result]:
+    """Kline messages from socket to typed :class:`StreamBatch` on one event loop."""
+    n_messages = 20_000 if quick else 200_000
+    elapsed, batches = asyncio.run(_stream(n_messages))
+    return [
+        Result("streams.kline_throughput", n_messages / elapsed, "msgs/s", lower_is_better=False),
+        Result("streams.batch_size", n_messages / batches, "updates", lower_is_better=False),
+    ]
@@ -0,0 +1,95 @@
+"""Synthetic market data for benchmarks."""
+
+from __future__ import annotations
+
+from typing import Iterator, List
+
+import numpy as np
+
+from crypto_analyzer.models.candle_store import Candles
+
+START_MS = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+MINUTE_MS = 60_000
+
+
+def random_walk_candles(n: int, seed: int = 0, start: int = START_MS, step: int = MINUTE_MS) -> Candles:
+    """Return ``n`` consistent OHLCV candles following a geometric random walk."""
+    rng = np.random.default_rng(seed)
+    close = 30_000.0 * np.exp(np.cumsum(rng.normal(0.0, 0.001, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0.0, 0.0005, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.gamma(2.0, 5.0, n)
+    timestamp = start + step * np.arange(n, dtype=np.int64)
+    return Candles(timestamp, open_, high, low, close, volume)
+
+
+def kline_messages(candles: Candles, symbol: str = "BTCUSDT", interval: str = "1m") -> Iterator[dict]:
+    """Yield closed-candle WebSocket kline payloads for ``candles``."""
+    for ts, open_, high, low, close, volume in zip(*candles):
+        yield {
+            "e": "kline",
+            "E": int(ts) + MINUTE_MS,
+            "s": symbol,
+            "k": {
+                "t": int(ts),
+                "T": int(ts) + MINUTE_MS - 1,
+                "s": symbol,
+                "i": interval,
+                "o": f"{open_:.2f}",
+                "h": f"{high:.2f}",
+                "l": f"{low:.2f}",
+                "c": f"{close:.2f}",
+                "v": f"{volume:.4f}",
+                "x": True,
+            },
+        }
+
+
+def order_book_snapshot(levels: int = 1000, mid: float = 30_000.0, tick: float = 0.01, last_update_id: int = 1) -> dict:
+    """REST ``/api/v3/depth`` style snapshot with ``levels`` levels per side."""
+    offsets = np.arange(1, levels + 1) * tick
+    return {
+        "lastUpdateId": last_update_id,
+        "bids": [[f"{mid - off:.2f}", "1.00000000"] for off in offsets],
+        "asks": [[f"{mid + off:.2f}", "1.00000000"] for off in offsets],
+    }
+
+
+def depth_events(
+    n: int,
+    levels_per_event: int = 10,
+    depth: int = 1000,
+    mid: float = 30_000.0,
+    tick: float = 0.01,
+    first_update_id: int = 2,
+    seed: int = 0,
+    symbol: str = "BTCUSDT",
+) -> List[dict]:
+    """Diff-depth events continuing a :func:`order_book_snapshot`.
+
+    Each event touches ``levels_per_event`` random levels per side, about a
+    tenth of them removals, with consecutive update IDs.
+    """
+    rng = np.random.default_rng(seed)
+    events = []
+    update_id = first_update_id
+    for i in range(n):
+        sides = []
+        for sign in (-1, 1):
+            offsets = rng.integers(1, depth + 1, levels_per_event) * tick
+            qty = rng.gamma(2.0, 0.5, levels_per_event)
+            qty[rng.random(levels_per_event) < 0.1] = 0.0
+            sides.append([[f"{mid + sign * off:.2f}", f"{q:.8f}"] for off, q in zip(offsets, qty)])
+        events.append({
+            "e": "depthUpdate",
+            "E": START_MS + i * 100,
+            "s": symbol,
+            "U": update_id,
+            "u": update_id,
+            "b": sides[0],
+            "a": sides[1],
+        })
+        update_id += 1
+    return events
@@ -0,0 +1,155 @@
+"""Benchmark registry, timing helpers and baseline comparison."""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+#: Allowed slowdown before a result counts as a regression (0.25 = 25 %).
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Result:
+    """One measured quantity."""
+
+    name: str
+    value: float
+    unit: str
+    lower_is_better: bool = True
+
+
+@dataclass
+class Comparison:
+    name: str
+    value: float
+    baseline: float
+    change: float  # relative slowdown, positive = worse
+    regressed: bool
+
+
+#: group name -> fn(quick) returning its results
+BENCHMARKS: Dict[str, Callable[[bool], Iterable[Result]]] = {}
+
+
+def benchmark(group: str):
+    """Register ``fn(quick)`` as the benchmark group ``group``."""
+    def decorator(fn: Callable[[bool], Iterable[Result]]):
+        BENCHMARKS[group] = fn
+        return fn
+    return decorator
+
+
+_app = None
+
+
+def qt_app():
+    """Return the Qt application, creating an offscreen one if needed.
+
+    The application is kept alive for the whole run: Qt objects such as the
+    ``AppState`` singleton do not survive it.
+    """
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+@contextmanager
+def override(obj: Any, attr: str, value: Any):
+    """Temporarily set ``obj.attr`` (e.g. a config field)."""
+    previous = getattr(obj, attr)
+    setattr(obj, attr, value)
+    try:
+        yield
+    finally:
+        setattr(obj, attr, previous)
+
+
+def timeit(fn: Callable[[], object], repeat: int = 5, number: int = 1) -> float:
+    """Median wall time of ``number`` calls of ``fn``, in seconds per call."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return statistics.median(times)
+
+
+def percentiles(samples_s: List[float], prefix: str) -> List[Result]:
+    """p50/p99 of latency samples (seconds) as millisecond results."""
+    ms = np.asarray(samples_s) * 1000.0
+    return [
+        Result(f"{prefix}.p50", float(np.percentile(ms, 50)), "ms"),
+        Result(f"{prefix}.p99", float(np.percentile(ms, 99)), "ms"),
+    ]
+
+
+def run(groups: Optional[Iterable[str]] = None, quick: bool = False, log: Callable[[str], None] = print) -> List[Result]:
+    """Run the selected benchmark groups (all by default)."""
+    results: List[Result] = []
+    for group in groups or list(BENCHMARKS):
+        log(f"[{group}]")
+        for result in BENCHMARKS[group](quick):
+            log(f"  {result.name:<44} {result.value:>14.4f} {result.unit}")
+            results.append(result)
+    return results
+
+
+def to_json(results: List[Result], quick: bool = False) -> dict:
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "quick": quick,
+        },
+        "results": {result.name: asdict(result) for result in results},
+    }
+
+
+def save(path: str, results: List[Result], quick: bool = False) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(to_json(results, quick), fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def load(path: str) -> List[Result]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return [Result(**entry) for entry in data["results"].values()]
+
+
+def compare(results: List[Result], baseline: List[Result], threshold: float = DEFAULT_THRESHOLD) -> List[Comparison]:
+    """Compare ``results`` with ``baseline``; results missing from it are skipped.
+
+    ``change`` is the relative slowdown: for throughput results the ratio
+    is inverted so that ``0.3`` always means "30 % worse".
+    """
+    reference = {result.name: result for result in baseline}
+    comparisons = []
+    for result in results:
+        base = reference.get(result.name)
+        if base is None or base.value <= 0 or result.value <= 0:
+            continue
+        if result.lower_is_better:
+            change = result.value / base.value - 1.0
+        else:
+            change = base.value / result.value - 1.0
+        comparisons.append(Comparison(result.name, result.value, base.value, change, change > threshold))
+    return comparisons
@@ -0,0 +1 @@
+"""Vectorized strategy backtests and parameter sweeps over stored candles."""
@@ -0,0 +1,119 @@
+"""Command line backtests: ``python -m crypto_analyzer.backtest``.
+
+Example - every SMA pair with fast 5..100 and slow 20..300 (step 5) over the
+stored 1m candles of 2025::
+
+    python -m crypto_analyzer.backtest BTCUSDT 1m sma_cross fast=5:100 slow=20:300:5 --start 2025-01-01 --end 2026-01-01
+
+A parameter takes one value, a comma separated list or an inclusive
+``start:stop[:step]`` range.  Fees, slippage and the pool size default to
+``config.backtest``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import config
+from ..models.candle_repository import CandleRepository
+from ..models.database import Database
+from .engine import Backtester, BacktestResult, combinations
+from .strategies import STRATEGIES
+
+
+def parse_values(text: str, default: Any) -> List[Any]:
+    """Values of one ``name=...`` argument, converted to the type of ``default``."""
+    kind = type(default)
+    convert = (lambda value: bool(int(value))) if kind is bool else kind
+    if ":" in text:
+        parts = [float(part) for part in text.split(":")]
+        start, stop, step = (parts + [1.0])[:3]
+        return [convert(value) for value in np.arange(start, stop + step / 2, step).round(10)]
+    return [convert(value) for value in text.split(",")]
+
+
+def parse_grid(strategy: str, arguments: Sequence[str]) -> Dict[str, List[Any]]:
+    defaults = STRATEGIES[strategy].defaults
+    grid = {}
+    for argument in arguments:
+        name, _, values = argument.partition("=")
+        if name not in defaults or not values:
+            raise ValueError(f"Expected one of {', '.join(f'{key}=...' for key in defaults)}, got {argument!r}")
+        grid[name] = parse_values(values, defaults[name])
+    return grid
+
+
+def _timestamp(text: Optional[str]) -> Optional[int]:
+    if text is None:
+        return None
+    return int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _format(result: BacktestResult) -> str:
+    params = " ".join(f"{key}={value}" for key, value in result.params.items())
+    return (f"{result.total_return:+9.2%} {result.max_drawdown:8.2%} {result.sharpe:7.2f} "
+            f"{result.trades:7d} {result.win_rate:6.1%} {result.exposure:6.1%}  {params}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m crypto_analyzer.backtest", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("symbol")
+    parser.add_argument("interval")
+    parser.add_argument("strategy", choices=sorted(STRATEGIES))
+    parser.add_argument("params", nargs="*", metavar="NAME=VALUES", help="parameter values to sweep")
+    parser.add_argument("--start", help="first candle, ISO date/time in UTC")
+    parser.add_argument("--end", help="last candle, ISO date/time in UTC")
+    parser.add_argument("--fee", type=float, default=config.backtest.fee, help="per side (default: %(default)s)")
+    parser.add_argument("--slippage", type=float, default=config.backtest.slippage,
+                        help="per side (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=config.backtest.workers,
+                        help="processes, 0 = every core (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=20, help="results to print (default: %(default)s)")
+    parser.add_argument("--db", default=config.database.db_path, help="database (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        grid = parse_grid(args.strategy, args.params)
+    except ValueError as exc:
+        parser.error(str(exc))
+    total = len(combinations(args.strategy, grid))
+
+    db = Database(args.db)
+    try:
+        repository = CandleRepository(db)
+        repository.ensure_schema()
+        candles = repository.get_range(args.symbol.upper(), args.interval, _timestamp(args.start), _timestamp(args.end))
+    finally:
+        db.close()
+    if not candles.rows:
+        print(f"No stored {args.interval} candles of {args.symbol.upper()} in that range", file=sys.stderr)
+        return 1
+    print(f"{total} combinations over {candles.rows} candles", file=sys.stderr)
+
+    done = 0
+    start = time.perf_counter()
+
+    def progress(chunk: List[BacktestResult]) -> None:
+        nonlocal done
+        done += len(chunk)
+        best = max(chunk, key=lambda result: result.total_return)
+        print(f"{done}/{total} ({time.perf_counter() - start:.1f} s)  best of chunk: {_format(best)}",
+              file=sys.stderr)
+
+    with Backtester(args.fee, args.slippage, args.workers, config.backtest.cache_mb) as backtester:
+        results = backtester.sweep(candles, args.strategy, grid, progress)
+    print(f"{'return':>9} {'max DD':>8} {'sharpe':>7} {'trades':>7} {'wins':>6} {'expo':>6}  parameters")
+    for result in results[:args.top]:
+        print(_format(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""Vectorized backtests and parameter sweeps on a process pool.
+
+A backtest runs a strategy's position series (see
+:mod:`crypto_analyzer.backtest.strategies`) over one candle history.
+Positions change at candle closes and are charged ``fee + slippage`` per
+side, as a fraction of the traded value.
+
+Accounting works on log returns over whole arrays:
+
+* The long and short log return of every candle are computed once per
+  history.  A backtest combines them with the held position and adds the
+  trading costs at the few candles where the position changes.  One
+  cumulative sum gives the equity curve, its running maximum gives the
+  drawdown, and a dot product gives the variance for the Sharpe ratio.
+* Trades are the runs between position changes, so per-trade returns
+  (for the win rate) are differences of the equity curve at those changes.
+  They cost O(trades), not O(candles).
+
+Sweeps share the history with the worker processes the way the scanner
+does.  The candles go into one :class:`~crypto_analyzer.scanner.engine.CandleBlock`
+and tasks carry only the block name and the parameter combinations.
+Every worker keeps the history's log returns and an LRU of indicator series
+across tasks.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from ..models.candle_store import Candles
+from ..scanner.engine import CandleBlock
+from . import strategies as _strategies
+
+logger = logging.getLogger(__name__)
+
+YEAR_MS = 365 * 86_400_000
+
+
+class BacktestResult(NamedTuple):
+    params: Dict[str, Any]
+    total_return: float  # 0.1 = +10 %
+    max_drawdown: float  # largest fall from a peak of the equity curve, 0.2 = -20 %
+    sharpe: float  # annualised, from per-candle log returns
+    trades: int
+    win_rate: float  # share of trades with a positive net return (NaN without trades)
+    exposure: float  # share of candles with an open position
+
+
+class History:
+    """Candle history prepared for many backtests.
+
+    Holds the per-candle log returns of a long and of a short position and
+    the memoized indicator series (at most ``cache_bytes`` of them).
+    """
+
+    def __init__(self, candles: Candles, cache_bytes: int = 128 * 2**20) -> None:
+        self.candles = candles
+        self.indicators = _strategies.Indicators(candles, cache_bytes)
+        n = candles.rows
+        ratio = candles.close[1:] / candles.close[:-1]
+        up, down = np.zeros(n), np.zeros(n)
+        np.log(ratio, out=up[1:])
+        # A short loses everything when the price doubles within one candle
+        np.log(np.maximum(2.0 - ratio, 1e-12), out=down[1:])
+        # With held position h in {-1, 0, 1}: log return = |h| * mean + h * half
+        self._mean = (up + down) / 2.0
+        self._half = (up - down) / 2.0
+        steps = np.diff(candles.timestamp)
+        self.periods_per_year = YEAR_MS / float(np.median(steps)) if len(steps) else 0.0
+        # Scratch arrays reused by every backtest (fresh large arrays cost page faults)
+        self._held, self._bar, self._equity, self._peak = (np.empty(n) for _ in range(4))
+
+    def simulate(self, position: np.ndarray, cost: float) -> tuple:
+        """``(total_return, max_drawdown, sharpe, trades, win_rate, exposure)`` of ``position``.
+
+        ``position[i]`` is held from the close of candle ``i`` to the close
+        of candle ``i + 1``; ``cost`` is charged per side on every change.
+        """
+        n = len(position)
+        if n < 2:
+            return 0.0, 0.0, 0.0, 0, math.nan, 0.0
+        held, bar, equity, peak = self._held, self._bar, self._equity, self._peak
+        held[0] = 0.0
+        held[1:] = position[:-1]
+        np.abs(held, out=bar)
+        bar *= self._mean
+        np.multiply(held, self._half, out=peak)
+        bar += peak
+
+        changes = np.flatnonzero(position[1:] != position[:-1]) + 1
+        if position[0]:
+            changes = np.r_[0, changes]
+        side = math.log1p(-cost)
+        before = np.where(changes > 0, position[changes - 1], 0.0)
+        after = position[changes]
+        bar[changes] += side * (np.abs(before) + np.abs(after))
+
+        np.cumsum(bar, out=equity)
+        np.maximum.accumulate(equity, out=peak)
+        np.maximum(peak, 0.0, out=peak)  # the starting capital is the first peak
+        peak -= equity
+        drawdown = float(peak.max())
+        mean = equity[-1] / n
+        variance = float(bar @ bar) / n - mean * mean
+        sharpe = mean / math.sqrt(variance) * math.sqrt(self.periods_per_year) if variance > 1e-24 else 0.0
+
+        # A trade opens at a change to a non-zero position and runs until the next change
+        opened = np.flatnonzero(after != 0)
+        closes = opened + 1
+        closed = closes < len(changes)
+        following = np.minimum(closes, len(changes) - 1)
+        start = changes[opened]
+        end = np.where(closed, changes[following], n - 1)
+        next_entry = np.where(closed, np.abs(after[following]), 0.0)
+        trade = equity[end] - equity[start] + side * (np.abs(after[opened]) - next_entry)
+        win_rate = float((trade > 0).mean()) if len(trade) else math.nan
+
+        return (
+            float(math.expm1(equity[-1])),
+            float(-math.expm1(-drawdown)),
+            float(sharpe),
+            len(opened),
+            win_rate,
+            float((end - start).sum()) / n,
+        )
+
+    def backtest(self, strategy: str, cfg: Dict[str, Any], cost: float) -> BacktestResult:
+        position = _strategies.positions(strategy, self.indicators, cfg)
+        return BacktestResult(dict(cfg), *self.simulate(position, cost))
+
+
+def combinations(strategy: str, grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every valid parameter combination of ``grid`` (parameter -> values to try).
+
+    Parameters missing from ``grid`` keep their defaults.  The last
+    parameter varies fastest.
+    """
+    spec = _strategies.STRATEGIES[strategy]
+    unknown = set(grid) - set(spec.defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters of {strategy}: {', '.join(sorted(unknown))}")
+    combos = []
+    for values in itertools.product(*grid.values()):
+        cfg = {**spec.defaults, **dict(zip(grid, values))}
+        if spec.valid(**cfg):
+            combos.append(cfg)
+    return combos
+
+
+def run_combos(history: History, strategy: str, combos: Sequence[Dict[str, Any]], cost: float) -> List[BacktestResult]:
+    """Backtest every combination in ``combos`` (also run by the workers).
+
+    Combinations sharing the later parameters (e.g. the slow SMA) run next
+    to each other, so each indicator series is computed about once.
+    """
+    ordered = sorted(combos, key=lambda cfg: tuple(reversed(list(cfg.values()))))
+    return [history.backtest(strategy, cfg, cost) for cfg in ordered]
+
+
+#: History of the block the worker process is attached to (one sweep at a time)
+_attached: Optional[CandleBlock] = None
+_history: Optional[History] = None
+
+
+def _run_chunk(name: str, strategy: str, combos: Sequence[Dict[str, Any]], cost: float,
+               cache_bytes: int) -> List[BacktestResult]:
+    global _attached, _history
+    if _attached is None or _attached.name != name:
+        _history = None
+        if _attached is not None:
+            _attached.close()
+        _attached = CandleBlock.attach(name)
+        _history = History(_attached.candles(0), cache_bytes)
+    return run_combos(_history, strategy, combos, cost)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+# ----------------------------------------------------------------------
+# Backtester
+# ----------------------------------------------------------------------
+class Backtester:
+    """Backtests strategies and sweeps their parameters.
+
+    Parameters
+    ----------
+    fee, slippage:
+        Charged per side on every position change, as fractions of the
+        traded value (``0.001`` = 0.1 %).
+    workers:
+        Size of the process pool for sweeps; ``0`` uses every core and ``1``
+        runs in the calling process.  The pool is started on first use (or
+        by :meth:`start`) and kept until :meth:`close`.
+    cache_mb:
+        Indicator series kept per process.
+    """
+
+    #: Combinations below which a sweep stays in-process
+    MIN_PARALLEL = 8
+
+    def __init__(self, fee: float = 0.001, slippage: float = 0.0005, workers: int = 0, cache_mb: int = 128) -> None:
+        self.cost = fee + slippage
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_bytes = cache_mb * 2**20
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """Start the worker processes now instead of on the first sweep."""
+        if self.workers > 1 and self._pool is None:
+            # Spawned, not forked: the GUI process has Qt and network threads
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            for future in [self._pool.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "Backtester":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def run(self, candles: Candles, strategy: str, cfg: Optional[Dict[str, Any]] = None) -> BacktestResult:
+        """Backtest one configuration of ``strategy`` in the calling process."""
+        cfg = {**_strategies.STRATEGIES[strategy].defaults, **(cfg or {})}
+        return History(candles, self.cache_bytes).backtest(strategy, cfg, self.cost)
+
+    def sweep(
+        self,
+        candles: Candles,
+        strategy: str,
+        grid: Dict[str, Sequence[Any]],
+        on_results: Optional[Callable[[List[BacktestResult]], None]] = None,
+    ) -> List[BacktestResult]:
+        """Backtest every combination of ``grid`` (see :func:`combinations`).
+
+        ``on_results`` receives the results of every finished chunk as soon
+        as it is done.  Returns all results, best total return first.
+        """
+        combos = combinations(strategy, grid)
+        results: List[BacktestResult] = []
+        for chunk in self._evaluate(candles, strategy, combos):
+            results += chunk
+            if on_results is not None and chunk:
+                on_results(chunk)
+        return sorted(results, key=lambda result: result.total_return, reverse=True)
+
+    def _evaluate(self, candles: Candles, strategy: str, combos: List[Dict[str, Any]]) -> Iterator[List[BacktestResult]]:
+        if self.workers <= 1 or len(combos) < self.MIN_PARALLEL:
+            history = History(candles, self.cache_bytes)
+            # Still in chunks, so progress is reported during long sweeps
+            for chunk in np.array_split(np.arange(len(combos)), max(1, min(len(combos), 16))):
+                yield run_combos(history, strategy, [combos[i] for i in chunk], self.cost)
+            return
+        self.start()
+        block = CandleBlock.create([candles])
+        try:
+            # Contiguous chunks share the first parameter's values, and with
+            # them most of their indicator series
+            chunks = np.array_split(np.arange(len(combos)), self.workers * 4)
+            futures: List[Future] = [
+                self._pool.submit(_run_chunk, block.name, strategy, [combos[i] for i in chunk], self.cost,
+                                  self.cache_bytes)
+                for chunk in chunks if len(chunk)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            block.close()
@@ -0,0 +1,143 @@
+"""Trading strategies built from the vectorized indicators.
+
+A strategy turns the candles of one symbol and interval into a *position*
+series: ``1`` long, ``-1`` short and ``0`` flat, decided at the close of
+every candle.  Signals are computed over whole arrays; stateful rules
+("hold until the close returns to the middle band") are expressed as
+entry/exit events that are forward-filled with NumPy, not looped over.
+
+Strategies take their indicator series from :class:`Indicators`, which
+memoizes them: a parameter sweep evaluates the same SMA or band many times
+with different partners.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from ..indicators import vectorized
+from ..models.candle_store import Candles
+
+
+class Indicators:
+    """Indicator series of one candle history, memoized in LRU order.
+
+    ``indicators("sma", period=9)`` returns the same series as
+    ``vectorized.compute("sma", candles, {"period": 9})``; at most
+    ``max_bytes`` of series are kept.
+    """
+
+    def __init__(self, candles: Candles, max_bytes: int) -> None:
+        self.candles = candles
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._series: "OrderedDict[Tuple, vectorized.Series]" = OrderedDict()
+
+    def __call__(self, name: str, **params: Any) -> vectorized.Series:
+        key = (name, *sorted(params.items()))
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+            return series
+        series = vectorized.compute(name, self.candles, params)
+        self._series[key] = series
+        self.bytes += sum(values.nbytes for values in series.values())
+        while self.bytes > self.max_bytes and len(self._series) > 1:
+            _key, evicted = self._series.popitem(last=False)
+            self.bytes -= sum(values.nbytes for values in evicted.values())
+        return series
+
+
+def _hold(enter: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+    """``1`` from every ``enter`` until the next ``exit_``, else ``0`` (entries win ties)."""
+    events = np.flatnonzero(enter | exit_)
+    state = np.zeros(len(enter))
+    if not len(events):
+        return state
+    # Index of the latest event at or before every row, then that event's state
+    latest = np.zeros(len(enter), dtype=np.intp)
+    latest[events] = events
+    np.maximum.accumulate(latest, out=latest)
+    held = enter[latest].astype(float)
+    held[:events[0]] = 0.0
+    return held
+
+
+def sma_cross(indicators: Indicators, fast: int = 9, slow: int = 21, short: bool = False) -> np.ndarray:
+    """Long while the fast SMA is above the slow one; short (or flat) below it."""
+    fast_sma = indicators("sma", period=fast)["value"]
+    slow_sma = indicators("sma", period=slow)["value"]
+    with np.errstate(invalid="ignore"):
+        position = (fast_sma > slow_sma).astype(float)
+        if short:
+            position -= fast_sma < slow_sma
+    return position
+
+
+def bollinger_reversion(
+    indicators: Indicators, period: int = 20, std_dev: float = 2.0, short: bool = False
+) -> np.ndarray:
+    """Long after a close below the lower band until a close above the middle band.
+
+    With ``short``, also short after a close above the upper band until a
+    close below the middle band.
+    """
+    bands = indicators("bollinger_bands", period=period, std_dev=std_dev)
+    close = indicators.candles.close
+    with np.errstate(invalid="ignore"):
+        position = _hold(close < bands["lower"], close > bands["middle"])
+        if short:
+            position -= _hold(close > bands["upper"], close < bands["middle"])
+    return position
+
+
+def keltner_breakout(
+    indicators: Indicators, period: int = 20, atr_mult: float = 2.0, short: bool = False
+) -> np.ndarray:
+    """Long after a close above the upper channel until a close below the middle line.
+
+    With ``short``, also short after a close below the lower channel until
+    a close above the middle line.
+    """
+    channels = indicators("keltner_channels", period=period, atr_mult=atr_mult)
+    close = indicators.candles.close
+    with np.errstate(invalid="ignore"):
+        position = _hold(close > channels["upper"], close < channels["middle"])
+        if short:
+            position -= _hold(close < channels["lower"], close > channels["middle"])
+    return position
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+class StrategySpec(NamedTuple):
+    positions: Callable[..., np.ndarray]
+    defaults: Dict[str, Any]  # parameters and their defaults
+    valid: Callable[..., bool]  # rejects meaningless parameter combinations in sweeps
+
+
+STRATEGIES: Dict[str, StrategySpec] = {
+    "sma_cross": StrategySpec(
+        sma_cross, {"fast": 9, "slow": 21, "short": False}, lambda fast, slow, short: 0 < fast < slow
+    ),
+    "bollinger_reversion": StrategySpec(
+        bollinger_reversion,
+        {"period": 20, "std_dev": 2.0, "short": False},
+        lambda period, std_dev, short: period > 1 and std_dev > 0,
+    ),
+    "keltner_breakout": StrategySpec(
+        keltner_breakout,
+        {"period": 20, "atr_mult": 2.0, "short": False},
+        lambda period, atr_mult, short: period > 0 and atr_mult > 0,
+    ),
+}
+
+
+def positions(name: str, indicators: Indicators, cfg: Dict[str, Any]) -> np.ndarray:
+    """Position series of strategy ``name`` configured by ``cfg``."""
+    spec = STRATEGIES[name]
+    return spec.positions(indicators, **vectorized.params(spec, cfg))
@@ -27,7 +27,9 @@ class ChartConfig:
     default_symbol: str = "BTCUSDT"
     default_interval: str = "1m"
     max_candles: int = 1000
-    update_interval: int = 1000  # ms
+    update_interval: int = 100  # ms - minimalny odstęp między klatkami (przerysowaniami)
+    incremental_rendering: bool = True  # trwałe artysty + blitting ostatniej świecy
+    indicator_cache_mb: int = 64  # limit pamięci wspólnego cache serii wskaźników (LRU)
     
     # Kolory dla motywów
     colors_light: Dict[str, str] = None
@@ -52,6 +54,85 @@ class ChartConfig:
                 'text': '#FFFFFF'
             }
 
+@dataclass
+class OrderBookConfig:
+    """Konfiguracja lokalnego order booka"""
+    snapshot_limit: int = 1000  # liczba poziomów w snapshocie REST
+    update_speed_ms: int = 100  # częstotliwość strumienia diff-depth
+    top_levels: int = 20  # poziomy przekazywane do widoków
+    heatmap_bucket_bps: float = 1.0  # szerokość przedziału cen heat-mapy (punkty bazowe ceny)
+    heatmap_buckets: int = 400  # liczba przedziałów cen (siatka przesuwana za ceną)
+    heatmap_memory_mb: int = 16  # limit pamięci historii heat-mapy (macierz czas x przedział)
+    heatmap_sample_ms: int = 100  # odstęp próbek heat-mapy (czas zdarzeń)
+    heatmap_window_s: int = 300  # okres widoczny na heat-mapie
+
+@dataclass
+class WatchlistConfig:
+    """Symbole utrzymywane na żywo (wszystkie interwały) niezależnie od wykresu"""
+    symbols: list = None  # domyślnie tylko bieżący symbol
+    max_streams_per_socket: int = 200  # strumienie na jedno połączenie combined
+
+    def __post_init__(self):
+        if self.symbols is None:
+            self.symbols = []
+
+@dataclass
+class ScannerConfig:
+    """Skaner rynku: warunki wskaźników na zapisanych świecach wielu par"""
+    symbols: list = None  # domyślnie popularne pary i lista obserwowanych
+    intervals: list = None  # domyślnie 1m, 15m i 1h
+    candles: int = 1000  # ostatnie świece każdej pary
+    workers: int = 0  # procesy puli; 0 = liczba rdzeni, 1 = bez puli
+    conditions: dict = None  # nazwa warunku -> parametry; domyślnie wszystkie z domyślnymi parametrami
+
+    def __post_init__(self):
+        if self.intervals is None:
+            self.intervals = ['1m', '15m', '1h']
+        if self.conditions is None:
+            self.conditions = {
+                'sma_cross': {'fast': 9, 'slow': 21, 'within': 3},
+                'bollinger_breakout': {'period': 20, 'std_dev': 2},
+                'keltner_squeeze': {'period': 20, 'std_dev': 2, 'atr_mult': 1.5},
+                'rsi_extreme': {'period': 14, 'oversold': 30, 'overbought': 70},
+            }
+
+@dataclass
+class BacktestConfig:
+    """Backtesty strategii na zapisanych świecach"""
+    fee: float = 0.001  # prowizja za stronę transakcji (0.1%)
+    slippage: float = 0.0005  # poślizg za stronę transakcji, jako ułamek ceny
+    workers: int = 0  # procesy puli dla przeglądu parametrów; 0 = liczba rdzeni, 1 = bez puli
+    cache_mb: int = 128  # limit pamięci serii wskaźników w każdym procesie
+
+@dataclass
+class ConnectionConfig:
+    """Nadzór połączeń WebSocket"""
+    stale_after_s: float = 10.0  # cisza dłuższa niż to = połączenie martwe
+    check_interval_s: float = 1.0  # częstotliwość sprawdzania połączeń
+    reconnect_backoff_s: float = 1.0  # pierwsze opóźnienie, podwajane przy kolejnych próbach
+    max_backoff_s: float = 60.0
+    stream_engine: str = "threaded"  # "asyncio" = wszystkie strumienie na jednej pętli asyncio (websockets)
+
+@dataclass
+class ReplayConfig:
+    """Nagrywanie i odtwarzanie danych rynkowych (praca bez sieci)"""
+    record_path: str = ""  # plik nagrania surowych wiadomości; pusty = bez nagrywania
+    replay_path: str = ""  # odtwarzane nagranie zamiast Binance; pusty = dane na żywo
+    speed: float = 1.0  # 1 = tempo rzeczywiste, N = N razy szybciej, 0 = maksymalnie szybko
+
+@dataclass
+class MetricsConfig:
+    """Instrumentacja gorącej ścieżki (domyślnie wyłączona - zerowy koszt)"""
+    enabled: bool = False  # zbieranie od startu; panel wydajności włącza je sam
+    export_path: str = ""  # okresowy zrzut: *.prom/*.txt = Prometheus, inne = JSON
+    export_interval_s: float = 10.0
+
+@dataclass
+class StartupConfig:
+    """Szybki start: wykres z bazy od razu, sieć dopiero po pierwszym odmalowaniu okna"""
+    fast_start: bool = True  # False = historia i strumienie ładowane przed pokazaniem okna
+    profile: str = ""  # "1" = raport startu w logu, "exit" = raport JSON na stdout i wyjście
+
 class AppConfig:
     """Główna konfiguracja aplikacji"""
     
@@ -62,6 +143,26 @@ class AppConfig:
         )
         self.database = DatabaseConfig()
         self.chart = ChartConfig()
+        self.orderbook = OrderBookConfig()
+        self.watchlist = WatchlistConfig()
+        self.scanner = ScannerConfig()
+        self.backtest = BacktestConfig()
+        self.connection = ConnectionConfig(
+            stream_engine=os.getenv('CRYPTO_ANALYZER_STREAMS', 'threaded'),
+        )
+        self.metrics = MetricsConfig(
+            enabled=os.getenv('CRYPTO_ANALYZER_METRICS', '') not in ('', '0'),
+            export_path=os.getenv('CRYPTO_ANALYZER_METRICS_EXPORT', ''),
+        )
+        self.replay = ReplayConfig(
+            record_path=os.getenv('CRYPTO_ANALYZER_RECORD', ''),
+            replay_path=os.getenv('CRYPTO_ANALYZER_REPLAY', ''),
+            speed=float(os.getenv('CRYPTO_ANALYZER_REPLAY_SPEED', '1')),
+        )
+        self.startup = StartupConfig(
+            fast_start=os.getenv('CRYPTO_ANALYZER_FAST_START', '1') != '0',
+            profile=os.getenv('CRYPTO_ANALYZER_PROFILE_STARTUP', ''),
+        )
         
     def get_available_intervals(self) -> list:
         """Zwraca dostępne interwały dla Binance"""
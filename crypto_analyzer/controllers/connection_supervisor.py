@@ -0,0 +1,181 @@
+"""Staleness detection and reconnects for combined WebSocket streams."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, Set
+
+from ..models.subscriptions import SubscriptionManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SupervisorStats:
+    """Counters describing reconnect activity."""
+
+    checks: int = 0
+    stale: int = 0  # sockets found silent or failed
+    reconnects: int = 0
+    failures: int = 0  # reconnect attempts that raised
+
+
+class ConnectionSupervisor:
+    """Replaces combined sockets that stopped delivering messages.
+
+    Binance pushes a kline update every couple of seconds and depth diffs
+    far more often, so a socket silent for ``stale_after`` seconds (or one
+    the client reported an error for) is treated as dead, even if the
+    library still thinks it is connected.  Dead sockets are reopened through
+    :meth:`SubscriptionManager.reconnect` with exponential backoff plus
+    jitter; a socket is only considered recovered once the replacement has
+    delivered a message.
+
+    ``on_status(connected)`` is called on the supervisor thread whenever the
+    overall state changes: ``False`` as soon as any socket goes stale,
+    ``True`` once every socket is delivering again.  Candles missed while
+    disconnected are not handled here - the data layer sees the gap in the
+    1m sequence and backfills it.
+    """
+
+    def __init__(
+        self,
+        subscriptions: SubscriptionManager,
+        on_status: Callable[[bool], None],
+        stale_after: float = 10.0,
+        check_every: float = 1.0,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        self.subscriptions = subscriptions
+        self.on_status = on_status
+        self.stale_after = stale_after
+        self.check_every = check_every
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._jitter = jitter
+        self._recovering: Set[str] = set()
+        self._attempts: Dict[str, int] = {}
+        self._next_try: Dict[str, float] = {}
+        self._connected = True
+        self._stats = SupervisorStats()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start watching; the streams are assumed to be connected."""
+        if self._thread is None:
+            self._reset()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ConnectionSupervisor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self._reset()
+
+    @property
+    def connected(self) -> bool:
+        with self._lock:
+            return self._connected
+
+    def stats(self) -> SupervisorStats:
+        with self._lock:
+            return replace(self._stats)
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+    def check(self) -> bool:
+        """Inspect every socket once, reconnecting dead ones; returns the state."""
+        now = self._clock()
+        sockets = self.subscriptions.health()
+        with self._lock:
+            self._stats.checks += 1
+            names = {socket.name for socket in sockets}
+            # Sockets released in the meantime need no recovery
+            for name in self._recovering - names:
+                self._forget(name)
+
+        for socket in sockets:
+            stale = socket.failed or socket.idle_s >= self.stale_after
+            if not stale:
+                if socket.received:
+                    with self._lock:
+                        if socket.name in self._recovering:
+                            logger.info("Stream socket %s recovered", socket.name)
+                        self._forget(socket.name)
+                continue
+            with self._lock:
+                if socket.name not in self._recovering:
+                    self._recovering.add(socket.name)
+                    self._stats.stale += 1
+                    logger.warning("Stream socket %s silent for %.1fs", socket.name, socket.idle_s)
+                if now < self._next_try.get(socket.name, 0.0):
+                    continue
+            self._reconnect(socket.name, now)
+
+        with self._lock:
+            connected = not self._recovering
+            changed = connected != self._connected
+            self._connected = connected
+        if changed:
+            self.on_status(connected)
+        return connected
+
+    def _reconnect(self, name: str, now: float) -> None:
+        with self._lock:
+            attempt = self._attempts.get(name, 0)
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        delay *= 0.5 + 0.5 * self._jitter()
+        try:
+            new = self.subscriptions.reconnect(name)
+        except Exception as exc:
+            logger.warning("Reconnect of %s failed (attempt %d): %s", name, attempt + 1, exc)
+            with self._lock:
+                self._stats.failures += 1
+                self._attempts[name] = attempt + 1
+                self._next_try[name] = now + delay
+            return
+
+        with self._lock:
+            self._stats.reconnects += 1
+            self._forget(name)
+            if new:
+                # Recovered only once the new socket delivers something
+                self._recovering.add(new)
+                self._attempts[new] = attempt + 1
+                self._next_try[new] = now + delay
+
+    def _forget(self, name: str) -> None:
+        self._recovering.discard(name)
+        self._attempts.pop(name, None)
+        self._next_try.pop(name, None)
+
+    def _reset(self) -> None:
+        with self._lock:
+            self._recovering.clear()
+            self._attempts.clear()
+            self._next_try.clear()
+            self._connected = True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_every):
+            try:
+                self.check()
+            except Exception as exc:  # pragma: no cover - logowanie błędów
+                logger.error("Connection check failed: %s", exc)
@@ -8,47 +8,133 @@ from __future__ import annotations
 
 import logging
 import threading
-from typing import List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Tuple
 
 from ..models.binance_client import BinanceClient
-from ..models.database import Database
+from ..models.database import Database, DatabaseWriter
+from ..models.depth_heatmap import DepthHeatmap
 from ..models.app_state import AppState, MarketFrame
+from ..models.async_streams import BINANCE_STREAM_URL, TESTNET_STREAM_URL, StreamBatch, StreamThread
+from ..models.candle_repository import CandleRepository
+from ..models.candle_store import Candles
+from ..models.history_cache import HistoryCache
+from ..models.intervals import bucket_start
+from ..models.order_book import OrderBookSnapshot, OrderBookSync
+from ..models.replay import MarketRecorder, ReplayClient, snapshot_stream
+from ..models.resampler import (
+    BASE_INTERVAL,
+    TimeframeAggregator,
+    align_history,
+    parent_chain,
+    partial_rows,
+    sort_intervals,
+)
+from ..models.subscriptions import SubscriptionManager, depth_stream, kline_stream
 from ..config import config
+from ..metrics import metrics
+from .connection_supervisor import ConnectionSupervisor
+from .ingest import IngestBatch, IngestBridge, IngestPipeline, IngestStats
 
 logger = logging.getLogger(__name__)
 
+#: Znacznik w ``_held``: symbol czeka na historię ładowaną w tle
+_LOADING = -1
+
 
 class DataController:
-    """Obsługuje komunikację z API Binance."""
+    """Obsługuje komunikację z API Binance.
+
+    ``client`` to źródło danych z interfejsem :class:`BinanceClient` - domyślnie
+    Binance na żywo albo :class:`ReplayClient`, gdy ustawiono
+    ``config.replay.replay_path``.  ``recorder`` zapisuje surowe wiadomości
+    strumieni (domyślnie do ``config.replay.record_path``, jeśli ustawiono).
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, client=None, recorder: Optional[MarketRecorder] = None) -> None:
         self.app_state = AppState()
-        self.client = BinanceClient(
-            api_key=config.binance.api_key,
-            api_secret=config.binance.api_secret,
-            testnet=config.binance.testnet,
-        )
+        if client is None:
+            client = self._default_client()
+        self.client = client
+        if recorder is None and config.replay.record_path:
+            recorder = MarketRecorder(config.replay.record_path)
+        self.recorder = recorder
 
         self.db = Database(config.database.db_path)
-        self.db.create_table(
-            """
-            CREATE TABLE IF NOT EXISTS klines (
-                timestamp INTEGER PRIMARY KEY,
-                symbol TEXT,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume REAL,
-                interval TEXT
-            )
-            """
-        )
+        # Świece kluczowane (symbol, interval, timestamp)
+        self.repository = CandleRepository(self.db)
+        self.repository.ensure_schema()
+        self.history = HistoryCache(self.repository, self.client, now=self.client.now)
+        # Zapis w tle - wątek WebSocket nigdy nie czeka na dysk
+        self.writer = DatabaseWriter(config.database.db_path)
+        self.writer.start()
 
-        self._kline_socket: Optional[str] = None
-        self._depth_socket: Optional[str] = None
-        self._last_orderbook: dict = {}
+        # Strumienie wszystkich obserwowanych par na połączeniach combined;
+        # zmiana subskrypcji nie restartuje managera WebSocket
+        self.subscriptions = self._make_subscriptions()
+        self._watched: Dict[str, int] = {}
+        # Martwe połączenia (cisza/błąd) otwierane ponownie z backoffem
+        self.supervisor = ConnectionSupervisor(
+            self.subscriptions,
+            self._on_connection_status,
+            stale_after=config.connection.stale_after_s,
+            check_every=config.connection.check_interval_s,
+            backoff=config.connection.reconnect_backoff_s,
+            max_backoff=config.connection.max_backoff_s,
+        )
+        # Wszystkie interwały liczone lokalnie ze strumienia 1m (wątek ingest)
+        self._intervals = sort_intervals(config.get_available_intervals())
+        self._aggregator = TimeframeAggregator(self._intervals)
+        # Ostatni snapshot order booka per symbol (wątek GUI)
+        self._latest_books: Dict[str, OrderBookSnapshot] = {}
+        # Lokalne order booki (snapshot REST + strumień różnicowy) per symbol;
+        # używane wyłącznie przez wątek ingest
+        self._books: Dict[str, OrderBookSync] = {}
+        # Heat-mapa płynności bieżącego symbolu, aktualizowana zmianami
+        # poziomów jego order booka (wątek ingest); widok tylko ją odczytuje
+        self.depth_heatmap = DepthHeatmap(
+            bucket_bps=config.orderbook.heatmap_bucket_bps,
+            buckets=config.orderbook.heatmap_buckets,
+            max_bytes=config.orderbook.heatmap_memory_mb * 2**20,
+            sample_ms=config.orderbook.heatmap_sample_ms,
+        )
+        self._heatmap_symbol = self.app_state.current_symbol.upper()
+        # Świece 1m wstrzymane do czasu uzupełnienia luki przez REST:
+        # symbol -> (pierwsza brakująca świeca, ramki); wątek ingest
+        self._held: Dict[str, Tuple[int, List[MarketFrame]]] = {}
+        self._backfill = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Backfill")
+        # Historia interwałów spoza bieżącego ładowana w tle, po jednym
+        # symbolu naraz (nie opóźnia startu ani wykresu)
+        self._preloader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Preload")
+        # Start w tle (połączenia + REST); do jego zakończenia stan strumieni
+        # (_watched, subskrypcje) należy do wątku startowego, a zmiany
+        # zlecone w tym czasie z GUI czekają w kolejce (_deferred)
+        self._startup = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Startup")
+        self._starting: Optional[Future] = None
+        self._deferred: List[Callable[[], None]] = []
+        # Wątek WebSocket tylko kolejkuje surowe wiadomości, dekodowanie odbywa
+        # się w wątku ingest, a AppState zmieniany jest tylko w wątku GUI
+        self._bridge = IngestBridge(self._apply_batch)
+        self._ingest = IngestPipeline(
+            {
+                "kline": self._decode_kline,
+                "depth": self._decode_depth,
+                "seed": self._decode_seed,
+                "backfill": self._decode_backfill,
+                "status": self._decode_status,
+                "history": self._decode_history,
+                "extend": self._decode_extend,
+                "started": self._decode_started,
+                "updates": self._decode_updates,
+            },
+            self._bridge.post,
+        )
+        self._ingest.start()
         self._lock = threading.Lock()
+        metrics.gauge("ingest.queue_depth", lambda: self._ingest.stats().queue_depth)
+        metrics.gauge("ingest.dropped", lambda: self._ingest.stats().dropped)
+        metrics.gauge("ingest.merged_batches", lambda: self._bridge.stats().merged)
 
         self.symbol = self.app_state.current_symbol
         self.interval = self.app_state.current_interval
@@ -56,125 +142,572 @@ class DataController:
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
-    def start_streaming(self) -> None:
-        """Uruchamia strumienie danych."""
-        self.stop_streaming()
+    def start_streaming(self, background: bool = False) -> None:
+        """Uruchamia strumienie bieżącego symbolu i listy obserwowanych.
 
-        try:
-            self._load_initial_data()
-        except Exception as exc:  # pragma: no cover - logowanie błędów
-            logger.error("Nie udało się pobrać danych początkowych: %s", exc)
-            self.app_state.emit_error(str(exc))
+        Z ``background=True`` połączenia i zapytania REST wykonywane są w
+        wątku startowym, a historia trafia do AppState przez potok ingest -
+        wątek GUI nie czeka na sieć (patrz :meth:`show_cached`).
+        """
+        if self._defer(lambda: self.start_streaming(background)):
             return
+        self.stop_streaming()
+        if background:
+            self._starting = starting = self._startup.submit(self._start, True)
+            # Koniec startu ogłaszany za historią, w tej samej kolejce ingest
+            starting.add_done_callback(lambda _future: self._ingest.submit("started", starting, block=True))
+        else:
+            self._start(False)
 
-        self._kline_socket = self.client.start_kline_socket(
-            symbol=self.symbol.lower(),
-            interval=self.interval,
-            callback=self._handle_kline,
-        )
-        self._depth_socket = self.client.start_depth_socket(
-            symbol=self.symbol.lower(),
-            callback=self._handle_depth,
-        )
+    def show_cached(self) -> bool:
+        """Rysuje wykres bieżącej pary z danych poprzedniej sesji (bez sieci).
 
-        self.app_state.set_connection_status(True)
+        Zwraca ``True``, jeśli baza zawierała świece tej pary.
+        """
+        cached = self.history.cached(self.symbol.upper(), self.interval, limit=500)
+        if cached.rows:
+            self.app_state.replace_history(cached)
+        return bool(cached.rows)
 
-    def stop_streaming(self) -> None:
-        """Zatrzymuje wszystkie aktywne strumienie."""
-        try:
-            self.client.stop()
-        except Exception as exc:  # pragma: no cover - logowanie błędów
-            logger.warning("Błąd podczas zatrzymywania strumienia: %s", exc)
+    def wait_started(self, timeout: Optional[float] = None) -> None:
+        """Czeka na zakończenie startu w tle (jeśli trwa) i wykonuje odłożone zmiany.
+
+        Blokuje - nie do użycia w wątku GUI poza zamykaniem aplikacji;
+        zwykle koniec startu ogłasza potok ingest (:meth:`_finish_start`).
+        """
+        starting = self._starting
+        if starting is not None:
+            try:
+                starting.result(timeout)
+            except Exception as exc:  # pragma: no cover - logowanie błędów
+                logger.error("Start strumieni nie powiódł się: %s", exc)
+            self._finish_start(starting)
 
+    def stop_streaming(self) -> None:
+        """Zatrzymuje wszystkie aktywne strumienie (po zakończeniu trwającego startu)."""
+        if self._defer(self.stop_streaming):
+            return
+        self._stop_streams()
         self.app_state.set_connection_status(False)
 
+    def watch(self, symbol: str, load: bool = True) -> None:
+        """Dodaje odwołanie do symbolu; pierwsze otwiera jego strumienie.
+
+        Obserwowany symbol ma w pamięci historię wszystkich interwałów,
+        aktualizowaną ze strumienia 1m.
+        """
+        if self._defer(lambda: self.watch(symbol, load)):
+            return
+        self._watch(symbol, load)
+
+    def _watch(self, symbol: str, load: bool) -> None:
+        symbol = symbol.upper()
+        self._watched[symbol] = self._watched.get(symbol, 0) + 1
+        if self._watched[symbol] == 1:
+            self.subscriptions.subscribe(self._streams(symbol))
+            if load:
+                self._load_symbol(symbol)
+
+    def unwatch(self, symbol: str) -> None:
+        """Usuwa odwołanie do symbolu; ostatnie zamyka strumienie i bufory świec."""
+        if self._defer(lambda: self.unwatch(symbol)):
+            return
+        symbol = symbol.upper()
+        count = self._watched.get(symbol, 0)
+        if count > 1:
+            self._watched[symbol] = count - 1
+            return
+        if self._watched.pop(symbol, None) is not None:
+            self.subscriptions.unsubscribe(self._streams(symbol))
+            self._ingest.call(lambda: self._forget_symbol(symbol))
+            for interval in self._intervals:
+                self.app_state.drop_store(symbol, interval)
+
+    @property
+    def watched(self) -> List[str]:
+        """Aktualnie obserwowane symbole (w trakcie startu - dodane do tej pory)."""
+        return list(self._watched)
+
+    def shutdown(self) -> None:
+        """Zatrzymuje strumienie i zapisuje zaległe dane do bazy."""
+        # Start w tle korzysta z bazy - czekamy na niego, pomijając odłożone zmiany
+        self._deferred.clear()
+        self.wait_started()
+        self.stop_streaming()
+        self._startup.shutdown(wait=False)
+        # Ładowanie w tle korzysta z bazy - czekamy na bieżące zadanie
+        self._preloader.shutdown(wait=True, cancel_futures=True)
+        self._backfill.shutdown(wait=False, cancel_futures=True)
+        for name in ("ingest.queue_depth", "ingest.dropped", "ingest.merged_batches"):
+            metrics.remove_gauge(name)
+        self._ingest.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.writer.close()
+        self.db.close()
+
+    def ingest_stats(self) -> IngestStats:
+        """Zwraca liczniki potoku ingest (kolejka, dekodowanie, dostarczenie)."""
+        delivery = self._bridge.stats()
+        return replace(
+            self._ingest.stats(),
+            delivered=delivery.delivered,
+            merged=delivery.merged,
+            last_latency_ms=delivery.last_latency_ms,
+            max_latency_ms=delivery.max_latency_ms,
+        )
+
     def change_symbol_interval(self, symbol: str, interval: str) -> None:
-        """Zmienia symbol/interwał i restartuje strumienie."""
+        """Zmienia symbol/interwał bez restartu pozostałych strumieni.
+
+        Zmiana interwału i przełączenie na obserwowany symbol to tylko zmiana
+        widoku danych w pamięci - bez zapytań REST i ponownego połączenia.
+        W trakcie startu w tle zmiana czeka w kolejce na jego zakończenie.
+        """
+        if self._defer(lambda: self.change_symbol_interval(symbol, interval)):
+            return
         with self._lock:
+            previous = self.symbol.upper()
+            changed = (symbol.upper(), interval) != (previous, self.interval)
             self.symbol = symbol
             self.interval = interval
-        self.start_streaming()
+        self._ingest.call(lambda: self._follow_heatmap(symbol.upper()))
+
+        if not self._watched:
+            self.app_state.set_symbol_interval(symbol, interval)
+            self.start_streaming()
+            return
+        if not changed:
+            return
+
+        self.app_state.set_symbol_interval(symbol, interval)
+        watched = symbol.upper() in self._watched
+        self.watch(symbol, load=False)
+        try:
+            if not watched:
+                self._load_initial_data()
+            elif not self.app_state.candles:
+                # Interwał jeszcze niezaładowany w tle - dane z bazy do czasu
+                # dostarczenia historii przez ładowanie w tle
+                self.show_cached()
+                self._preload([symbol.upper()])
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.error("Nie udało się pobrać danych: %s", exc)
+            self.app_state.emit_error(str(exc))
+        self.unwatch(previous)
+
+        book = self._latest_books.get(symbol.upper())
+        if book is not None:
+            self.app_state.update_orderbook(book)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _load_initial_data(self) -> None:
-        """Pobiera historię świec przez REST i aktualizuje AppState."""
-        klines = self.client.get_klines(
-            symbol=self.symbol.upper(),
-            interval=self.interval,
-            limit=500,
-        )
+    def _defer(self, action: Callable[[], None]) -> bool:
+        """Odkłada ``action`` do końca startu w tle, jeśli trwa (wątek GUI).
 
-        for kline in klines:
-            frame = self._kline_to_market_frame(kline)
-            self.app_state.update_market_data(frame)
-            self._save_frame(frame)
+        Zwraca ``True``, jeśli akcja została odłożona - wykona ją
+        :meth:`_finish_start`, po dostarczeniu historii ze startu.
+        """
+        if self._starting is None:
+            return False
+        self._deferred.append(action)
+        return True
+
+    def _finish_start(self, starting: Future) -> None:
+        """Kończy start w tle i wykonuje zmiany odłożone w jego trakcie (wątek GUI)."""
+        if starting is not self._starting:
+            return  # już zakończony przez wait_started
+        self._starting = None
+        deferred, self._deferred = self._deferred, []
+        for action in deferred:
+            action()
+
+    def _start(self, background: bool) -> None:
+        """Otwiera strumienie i ładuje historię (wątek GUI lub startowy)."""
+        # Subskrypcja przed ładowaniem - świece zamknięte w trakcie ładowania
+        # czekają w agregatorze na jego inicjalizację, a przy starcie w tle
+        # wstrzymywane są do czasu dostarczenia historii
+        current = self.symbol.upper()
+        symbols = [current, *(symbol.upper() for symbol in config.watchlist.symbols)]
+        if background:
+            for symbol in dict.fromkeys(symbols):
+                self._ingest.call(lambda symbol=symbol: self._held.setdefault(symbol, (_LOADING, [])))
+        for symbol in symbols:
+            self._watch(symbol, load=False)
+
+        others = [s for s in self._watched if s != current]
+        try:
+            if background:
+                self._load_symbols([current, *others], background=True)
+            else:
+                self._load_initial_data(others=others)
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.error("Nie udało się pobrać danych początkowych: %s", exc)
+            # Sygnał z wątku startowego trafia do GUI przez kolejkę zdarzeń Qt
+            self.app_state.emit_error(str(exc))
+            if background:
+                self._stop_streams()
+            else:
+                self.stop_streaming()
+            return
 
-    def _kline_to_market_frame(self, kline: List) -> MarketFrame:
-        """Konwertuje kline na strukturę MarketFrame."""
-        return MarketFrame(
-            timestamp=int(kline[0]),
-            symbol=self.symbol.upper(),
-            open_price=float(kline[1]),
-            high_price=float(kline[2]),
-            low_price=float(kline[3]),
-            close_price=float(kline[4]),
-            volume=float(kline[5]),
-            interval=self.interval,
-            bids=self._last_orderbook.get("bids", []),
-            asks=self._last_orderbook.get("asks", []),
+        if background:
+            self._ingest.submit("status", {"connected": True}, block=True)
+        else:
+            self.app_state.set_connection_status(True)
+        self.supervisor.start()
+
+    def _stop_streams(self) -> None:
+        """Zamyka strumienie i czyści ich stan (bez zmiany AppState)."""
+        self.supervisor.stop()
+        self.subscriptions.close()
+        for symbol in self._watched:
+            self._ingest.call(lambda symbol=symbol: self._forget_symbol(symbol))
+        self._watched.clear()
+        self._ingest.call(self._books.clear)
+        try:
+            self.client.stop()
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.warning("Błąd podczas zatrzymywania strumienia: %s", exc)
+
+    def _load_initial_data(self, others: List[str] = ()) -> None:
+        """Ładuje historię świec - najpierw z bazy, potem brakujące przez REST.
+
+        ``others`` to dodatkowe symbole ładowane w tej samej puli zapytań.
+        """
+        # Wykres rysowany od razu z danych zapisanych w poprzedniej sesji
+        self.show_cached()
+        self._load_symbols([self.symbol.upper(), *others])
+
+    def _load_symbol(self, symbol: str) -> None:
+        """Ładuje historię symbolu i inicjalizuje agregator."""
+        self._load_symbols([symbol])
+
+    def _load_symbols(self, symbols: List[str], background: bool = False) -> None:
+        """Ładuje historię symboli i inicjalizuje agregator.
+
+        Od razu ładowane są tylko interwały potrzebne bieżącemu wykresowi:
+        bieżący interwał i łańcuch interwałów, z których odtwarzana jest
+        jego ostatnia (niezamknięta) świeca, aż do 1m.  Pozostałe ładowane są
+        później w tle (:meth:`_preload`).  REST pobiera tylko luki,
+        równolegle dla wszystkich par i w granicach limitu wagi Binance;
+        historia bieżącej pary trafia do AppState jednym sygnałem
+        historyReplaced, a do bazy jedną transakcją.  Z ``background=True``
+        (wątek startowy) historia przekazywana jest przez potok ingest.
+        """
+        intervals = parent_chain(self.interval, self._intervals)
+        cut = bucket_start(self.history.now(), BASE_INTERVAL)
+        histories = self.history.get_many(
+            [(symbol, interval) for symbol in symbols for interval in intervals], limit=500
         )
+        for symbol in symbols:
+            aligned = align_history({i: histories[(symbol, i)] for i in intervals}, cut)
+            seed = {
+                "symbol": symbol,
+                "last_base": cut - 60_000,
+                "partials": partial_rows(aligned, cut),
+                "intervals": intervals,
+            }
+            if background:
+                self._ingest.submit("history", {**seed, "histories": aligned}, block=True)
+                continue
+            for interval, candles in aligned.items():
+                self.app_state.replace_history(candles, symbol, interval)
+            self._ingest.submit("seed", seed, block=True)
+        self._preload(symbols)
 
-    def _save_frame(self, frame: MarketFrame) -> None:
-        """Zapisuje ramkę rynku w bazie danych."""
+    def _preload(self, symbols: List[str]) -> None:
+        """Zleca załadowanie w tle pozostałych interwałów symboli."""
+        for symbol in symbols:
+            try:
+                self._preloader.submit(self._load_remaining, symbol)
+            except RuntimeError:  # pragma: no cover - zamykanie aplikacji
+                return
+
+    def _load_remaining(self, symbol: str) -> None:
+        """Pobiera historię wszystkich interwałów symbolu (wątek ładowania w tle).
+
+        Interwały załadowane wcześniej mają świeże ostatnie świece w
+        :class:`HistoryCache`, więc REST pobiera tylko brakujące.
+        """
         try:
-            self.db.insert(
-                "klines",
-                {
-                    "timestamp": frame.timestamp,
-                    "symbol": frame.symbol,
-                    "open": frame.open_price,
-                    "high": frame.high_price,
-                    "low": frame.low_price,
-                    "close": frame.close_price,
-                    "volume": frame.volume,
-                    "interval": frame.interval,
-                },
-                replace=True,
-            )
+            cut = bucket_start(self.history.now(), BASE_INTERVAL)
+            histories = self.history.get_many([(symbol, interval) for interval in self._intervals], limit=500)
         except Exception as exc:  # pragma: no cover - logowanie błędów
-            logger.warning("Błąd zapisu do bazy danych: %s", exc)
+            logger.warning("Nie udało się załadować interwałów %s w tle: %s", symbol, exc)
+            return
+        msg = {"symbol": symbol, "cut": cut, "histories": {i: histories[(symbol, i)] for i in self._intervals}}
+        self._ingest.submit("extend", msg, block=True)
+
+    def _streams(self, symbol: str) -> List[str]:
+        # Wyższe interwały liczone są lokalnie - wystarczy strumień 1m
+        return [kline_stream(symbol, BASE_INTERVAL), depth_stream(symbol, config.orderbook.update_speed_ms)]
+
+    def _save_frame(self, frame: MarketFrame) -> None:
+        """Kolejkuje zapis ramki rynku do bazy danych."""
+        queued = self.writer.submit(
+            CandleRepository.UPSERT_SQL,
+            (
+                frame.symbol,
+                frame.interval,
+                frame.timestamp,
+                frame.open_price,
+                frame.high_price,
+                frame.low_price,
+                frame.close_price,
+                frame.volume,
+            ),
+            block=False,
+        )
+        if not queued:
+            logger.warning("Kolejka zapisu pełna - pominięto świecę %s", frame.timestamp)
+
+    def _make_subscriptions(self):
+        """Manager subskrypcji wybrany przez ``config.connection.stream_engine``.
+
+        Rdzeń asyncio łączy się z Binance bezpośrednio, więc nie obsługuje
+        odtwarzania ani nagrywania - wtedy używany jest zawsze klient.
+        """
+        if config.connection.stream_engine == "asyncio" and self.recorder is None and not config.replay.replay_path:
+            url = TESTNET_STREAM_URL if config.binance.testnet else BINANCE_STREAM_URL
+            return StreamThread(
+                self._on_stream_batch,
+                url,
+                config.watchlist.max_streams_per_socket,
+                closed_only=True,
+                backoff=config.connection.reconnect_backoff_s,
+                max_backoff=config.connection.max_backoff_s,
+            )
+        return SubscriptionManager(self.client, self._on_stream_message, config.watchlist.max_streams_per_socket)
+
+    def _on_stream_batch(self, updates: StreamBatch) -> None:
+        """Przyjmuje paczkę aktualizacji z rdzenia asyncio (wątek pętli zdarzeń)."""
+        if metrics.enabled:
+            metrics.inc("messages.kline", len(updates.klines))
+            metrics.inc("messages.depth", len(updates.depth))
+        self._ingest.submit("updates", updates)
+
+    @metrics.timed("socket.message")
+    def _on_stream_message(self, stream: str, data: dict) -> None:
+        """Rozdziela wiadomości strumieni combined (wątek gniazda)."""
+        if self.recorder is not None:
+            self.recorder.record(stream, data)
+        if "@kline_" in stream:
+            self._ingest.submit("kline", data)
+            if metrics.enabled:
+                metrics.inc("messages.kline")
+        elif "@depth" in stream:
+            self._ingest.submit("depth", data)
+            if metrics.enabled:
+                metrics.inc("messages.depth")
+
+    def _on_connection_status(self, connected: bool) -> None:
+        """Przekazuje zmianę stanu połączenia do wątku GUI (wątek nadzorcy)."""
+        self._ingest.submit("status", {"connected": connected}, block=True)
+
+    def _decode_status(self, msg: dict, batch: IngestBatch) -> None:
+        batch.connected = msg["connected"]
+
+    def _decode_kline(self, msg: dict, batch: IngestBatch) -> None:
+        """Dekoduje wiadomość kline do ramki rynku (wątek ingest)."""
+        kline = msg.get("k")
+        if not kline or not kline.get("x"):
+            return  # interesują nas tylko zakończone świece
+        frame = MarketFrame(
+            timestamp=int(kline["t"]),
+            symbol=kline["s"],
+            open_price=float(kline["o"]),
+            high_price=float(kline["h"]),
+            low_price=float(kline["l"]),
+            close_price=float(kline["c"]),
+            volume=float(kline["v"]),
+            interval=kline["i"],
+        )
+        self._add_closed(frame, batch)
+
+    def _decode_updates(self, updates: StreamBatch, batch: IngestBatch) -> None:
+        """Dekoduje paczkę typowanych aktualizacji z rdzenia asyncio (wątek ingest)."""
+        for kline in updates.klines:
+            if kline.closed:
+                self._add_closed(kline.to_frame(), batch)
+        for depth in updates.depth:
+            self._decode_depth(depth.as_event(), batch)
+
+    def _add_closed(self, frame: MarketFrame, batch: IngestBatch, backfilled: bool = False) -> None:
+        """Przyjmuje zamkniętą świecę ze strumienia (wątek ingest).
 
-    def _handle_kline(self, msg: dict) -> None:
-        """Obsługuje wiadomości kline z WebSocket."""
+        Zamknięta świeca 1m późniejsza niż następna oczekiwana oznacza lukę
+        (np. po ponownym połączeniu).  Symbol jest wtedy wstrzymywany, brakujące
+        świece - i tylko one - pobierane są przez REST, a wstrzymane
+        ramki odtwarzane po nich, więc kolejność świec się nie zmienia.
+        """
+        symbol = frame.symbol
+        held = self._held.get(symbol)
+        if held is not None:
+            held[1].append(frame)
+            return
+
+        if frame.interval == BASE_INTERVAL and not backfilled:
+            last = self._aggregator.last_base(symbol)
+            if last is not None and frame.timestamp > last + 60_000:
+                start, end = last + 60_000, frame.timestamp - 60_000
+                logger.info("Luka w świecach %s: %d..%d - uzupełnianie przez REST", symbol, start, end)
+                self._held[symbol] = (start, [frame])
+                self._backfill.submit(self._fetch_gap, symbol, start, end)
+                return
+        self._add_base(frame, batch)
+
+    def _add_base(self, frame: MarketFrame, batch: IngestBatch) -> None:
+        batch.add_frame(frame)
+        self._save_frame(frame)
+        if frame.interval == BASE_INTERVAL:
+            self._add_derived(self._aggregator.add(frame), batch)
+
+    def _fetch_gap(self, symbol: str, start: int, end: int) -> None:
+        """Pobiera brakujące świece 1m ``[start, end]`` przez REST (wątek w tle)."""
         try:
-            kline = msg.get("k")
-            if not kline or not kline.get("x"):
-                return  # interesują nas tylko zakończone świece
+            candles = self.history.fetch_range(symbol, BASE_INTERVAL, start, end)
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.warning("Nie udało się uzupełnić luki %s: %s", symbol, exc)
+            candles = Candles.empty()
+        self._ingest.submit("backfill", {"symbol": symbol, "start": start, "candles": candles}, block=True)
 
+    def _decode_backfill(self, msg: dict, batch: IngestBatch) -> None:
+        """Wstawia uzupełnione świece, a po nich wstrzymane wiadomości (wątek ingest)."""
+        symbol = msg["symbol"]
+        held = self._held.get(symbol)
+        if held is None or held[0] != msg["start"]:
+            return  # symbol przestał być obserwowany w międzyczasie
+        del self._held[symbol]
+        for ts, open_, high, low, close, volume in zip(*msg["candles"]):
             frame = MarketFrame(
-                timestamp=int(kline["t"]),
-                symbol=kline["s"],
-                open_price=float(kline["o"]),
-                high_price=float(kline["h"]),
-                low_price=float(kline["l"]),
-                close_price=float(kline["c"]),
-                volume=float(kline["v"]),
-                interval=kline["i"],
-                bids=self._last_orderbook.get("bids", []),
-                asks=self._last_orderbook.get("asks", []),
+                int(ts), symbol, float(open_), float(high), float(low), float(close), float(volume), BASE_INTERVAL
             )
-            self.app_state.update_market_data(frame)
+            self._add_base(frame, batch)
+        # Luka, której REST nie uzupełnił, zostaje - bez ponownego wstrzymania
+        for frame in held[1]:
+            self._add_closed(frame, batch, backfilled=True)
+
+    def _forget_symbol(self, symbol: str) -> None:
+        """Usuwa stan strumienia symbolu (wątek ingest)."""
+        self._aggregator.drop(symbol)
+        self._held.pop(symbol, None)
+
+    def _decode_seed(self, msg: dict, batch: IngestBatch) -> None:
+        """Inicjalizuje agregator symbolu po załadowaniu historii (wątek ingest)."""
+        frames = self._aggregator.seed(msg["symbol"], msg["last_base"], msg["partials"], msg.get("intervals"))
+        self._add_derived(frames, batch)
+
+    def _decode_extend(self, msg: dict, batch: IngestBatch) -> None:
+        """Dołącza interwały załadowane w tle do historii i agregatora (wątek ingest).
+
+        Ostatnie świece są odtwarzane z 1m zamkniętych przed ostatnią świecą
+        przetworzoną przez agregator (lub przed momentem pobrania, jeśli
+        strumień jest dalej) - agregator dokłada do nich świece od tego
+        momentu, więc nic nie jest liczone podwójnie.
+        """
+        symbol = msg["symbol"]
+        last = self._aggregator.last_base(symbol)
+        if last is None:
+            return  # symbol przestał być obserwowany w międzyczasie
+        active = set(self._aggregator.active(symbol))
+        added = [i for i in msg["histories"] if i != BASE_INTERVAL and i not in active]
+        if not added:
+            return
+        cut = min(msg["cut"], last + 60_000)
+        aligned = align_history(msg["histories"], cut)
+        for interval in added:
+            batch.set_history(symbol, interval, aligned[interval])
+        self._add_derived(self._aggregator.extend(symbol, cut, partial_rows(aligned, cut), added), batch)
+
+    def _decode_started(self, starting: Future, batch: IngestBatch) -> None:
+        batch.started = starting
+
+    def _decode_history(self, msg: dict, batch: IngestBatch) -> None:
+        """Przekazuje historię załadowaną w tle i inicjalizuje agregator (wątek ingest).
+
+        Świece wstrzymane na czas ładowania odtwarzane są po historii.
+        """
+        symbol = msg["symbol"]
+        for interval, candles in msg["histories"].items():
+            batch.set_history(symbol, interval, candles)
+        self._decode_seed(msg, batch)
+        held = self._held.get(symbol)
+        if held is not None and held[0] == _LOADING:
+            del self._held[symbol]
+            for frame in held[1]:
+                self._add_closed(frame, batch)
+
+    def _add_derived(self, frames: List[MarketFrame], batch: IngestBatch) -> None:
+        for frame in frames:
+            batch.add_frame(frame)
             self._save_frame(frame)
-        except Exception as exc:  # pragma: no cover - logowanie błędów
-            logger.error("Błąd przetwarzania kline: %s", exc)
 
-    def _handle_depth(self, msg: dict) -> None:
-        """Obsługuje aktualizacje order book."""
-        try:
-            bids = [(float(p), float(q)) for p, q in msg.get("b", [])]
-            asks = [(float(p), float(q)) for p, q in msg.get("a", [])]
-            self._last_orderbook = {"bids": bids, "asks": asks}
-        except Exception as exc:  # pragma: no cover - logowanie błędów
-            logger.error("Błąd przetwarzania order book: %s", exc)
+    def _decode_depth(self, msg: dict, batch: IngestBatch) -> None:
+        """Aplikuje różnicową aktualizację do lokalnego order booka (wątek ingest)."""
+        symbol = msg.get("s", self.symbol).upper()
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = OrderBookSync(symbol, self._fetch_order_book)
+            if symbol == self._heatmap_symbol:
+                book.set_listener(self.depth_heatmap)
+        if book.on_event(msg):
+            # Order book publikowany niezależnie od świec
+            batch.set_orderbook(book.snapshot(config.orderbook.top_levels, int(msg.get("E", 0))))
+
+    def _follow_heatmap(self, symbol: str) -> None:
+        """Przełącza heat-mapę na order book symbolu (wątek ingest)."""
+        if symbol == self._heatmap_symbol:
+            return
+        previous = self._books.get(self._heatmap_symbol)
+        if previous is not None:
+            previous.set_listener(None)
+        self._heatmap_symbol = symbol
+        self.depth_heatmap.clear()
+        book = self._books.get(symbol)
+        if book is not None:
+            book.set_listener(self.depth_heatmap)
+
+    @metrics.timed("gui.apply_batch")
+    def _apply_batch(self, batch: IngestBatch) -> None:
+        """Przekazuje zdekodowane dane do AppState (wątek GUI).
+
+        Ramki trafiają do buforów swoich par (AppState pomija pary, które
+        nie są już obserwowane); order book publikowany jest tylko dla
+        bieżącego symbolu, pozostałe czekają na przełączenie.  Historie
+        załadowane w tle podmieniane są przed ramkami, a zmiany odłożone do
+        końca startu wykonywane na końcu.
+        """
+        for (symbol, interval), candles in batch.histories.items():
+            self.app_state.replace_history(candles, symbol, interval)
+        for frame in batch.frames.values():
+            self.app_state.update_market_data(frame)
+        current = self.app_state.current_symbol.upper()
+        for symbol, snapshot in batch.orderbooks.items():
+            self._latest_books[symbol] = snapshot
+            if symbol == current:
+                self.app_state.update_orderbook(snapshot)
+        if batch.connected is not None:
+            self.app_state.set_connection_status(batch.connected)
+        if batch.started is not None:
+            self._finish_start(batch.started)
+
+    def _fetch_order_book(self, symbol: str) -> dict:
+        """Pobiera snapshot order book przez REST (wątek w tle)."""
+        snapshot = self.client.get_order_book(symbol=symbol, limit=config.orderbook.snapshot_limit)
+        if self.recorder is not None:
+            # Odtwarzanie synchronizuje order book z nagranym snapshotem
+            self.recorder.record(snapshot_stream(symbol), snapshot)
+        return snapshot
+
+    @staticmethod
+    def _default_client():
+        if config.replay.replay_path:
+            logger.info("Odtwarzanie nagrania %s", config.replay.replay_path)
+            return ReplayClient(config.replay.replay_path, speed=config.replay.speed or None)
+        return BinanceClient(
+            api_key=config.binance.api_key,
+            api_secret=config.binance.api_secret,
+            testnet=config.binance.testnet,
+        )
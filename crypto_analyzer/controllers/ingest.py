@@ -0,0 +1,324 @@
+"""Ingest pipeline moving WebSocket decoding off the socket and GUI threads.
+
+Socket callbacks only put raw messages on a bounded queue.  A worker thread
+decodes them into typed :class:`IngestBatch` objects, and an
+:class:`IngestBridge` hands the batches to the GUI thread through a queued
+signal connection, so all :class:`AppState` mutation happens on the GUI
+thread.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from ..metrics import metrics
+from ..models.app_state import MarketFrame
+from ..models.candle_store import Candles
+from ..models.order_book import OrderBookSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestBatch:
+    """Decoded market data waiting to be applied on the GUI thread.
+
+    Frames are keyed by ``(symbol, interval, timestamp)`` and order books by
+    symbol, so merging batches keeps only the newest revision of each.
+    ``histories`` holds whole candle histories loaded in the background,
+    applied before the frames.  ``connected`` carries a connection state
+    change, if any, and ``started`` the background start that has finished.
+    """
+
+    frames: Dict[Tuple[str, str, int], MarketFrame] = field(default_factory=dict)
+    orderbooks: Dict[str, OrderBookSnapshot] = field(default_factory=dict)
+    histories: Dict[Tuple[str, str], Candles] = field(default_factory=dict)
+    connected: Optional[bool] = None
+    started: Optional[Future] = None
+    messages: int = 0
+    received_at: float = 0.0  # time.monotonic() of the oldest message
+
+    def __bool__(self) -> bool:
+        return (
+            bool(self.frames or self.orderbooks or self.histories)
+            or self.connected is not None
+            or self.started is not None
+        )
+
+    def add_frame(self, frame: MarketFrame) -> None:
+        self.frames[(frame.symbol, frame.interval, frame.timestamp)] = frame
+
+    def set_orderbook(self, snapshot: OrderBookSnapshot) -> None:
+        self.orderbooks[snapshot.symbol] = snapshot
+
+    def set_history(self, symbol: str, interval: str, candles: Candles) -> None:
+        self.histories[(symbol, interval)] = candles
+
+    def merge(self, other: "IngestBatch") -> None:
+        """Fold a newer batch into this one."""
+        if other.histories:
+            # A newer history supersedes the frames decoded before it
+            self.frames = {key: frame for key, frame in self.frames.items() if key[:2] not in other.histories}
+            self.histories.update(other.histories)
+        self.frames.update(other.frames)
+        self.orderbooks.update(other.orderbooks)
+        if other.connected is not None:
+            self.connected = other.connected
+        if other.started is not None:
+            self.started = other.started
+        self.messages += other.messages
+        if not self.received_at:
+            self.received_at = other.received_at
+
+
+@dataclass
+class IngestStats:
+    """Counters describing the state of the ingest pipeline."""
+
+    received: int = 0
+    dropped: int = 0
+    decoded: int = 0
+    errors: int = 0
+    batches: int = 0
+    delivered: int = 0
+    merged: int = 0  # batches folded into one the GUI had not picked up yet
+    queue_depth: int = 0
+    last_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+
+#: Decodes one raw message into the batch being built (worker thread).
+Handler = Callable[[dict, IngestBatch], None]
+
+
+class IngestBridge(QObject):
+    """Delivers batches from the worker to ``apply`` on the GUI thread.
+
+    At most one delivery is queued in the Qt event loop at any time: while
+    the GUI has not picked up the pending batch, newer batches are merged
+    into it.  A slow redraw therefore delays updates by at most one frame
+    instead of building up a backlog, and the worker never waits for it.
+    Must be created on the GUI thread.
+    """
+
+    batchReady = pyqtSignal()
+
+    def __init__(self, apply: Callable[[IngestBatch], None]) -> None:
+        super().__init__()
+        self._apply = apply
+        self._pending: Optional[IngestBatch] = None
+        self._lock = threading.Lock()
+        self._stats = IngestStats()
+        self.batchReady.connect(self.drain, Qt.ConnectionType.QueuedConnection)
+
+    def post(self, batch: IngestBatch) -> None:
+        """Hand a batch over (any thread)."""
+        with self._lock:
+            if self._pending is None:
+                self._pending = batch
+                notify = True
+            else:
+                self._pending.merge(batch)
+                self._stats.merged += 1
+                notify = False
+        if notify:
+            self.batchReady.emit()
+
+    def drain(self) -> None:
+        """Apply the pending batch (GUI thread)."""
+        with self._lock:
+            batch, self._pending = self._pending, None
+            if not batch:
+                return
+            latency_ms = (time.monotonic() - batch.received_at) * 1000.0
+            self._stats.delivered += 1
+            self._stats.last_latency_ms = latency_ms
+            self._stats.max_latency_ms = max(self._stats.max_latency_ms, latency_ms)
+        if metrics.enabled:
+            # From the oldest message in the batch reaching the socket to the GUI thread
+            metrics.observe("ingest.latency", latency_ms / 1000.0)
+            metrics.inc("ingest.batches")
+        self._apply(batch)
+
+    def stats(self) -> IngestStats:
+        """Return a snapshot of the delivery counters."""
+        with self._lock:
+            return replace(self._stats)
+
+
+class IngestPipeline:
+    """Bounded queue of raw socket messages drained by a decoding thread.
+
+    :meth:`submit` is the only call made on the socket thread; it never
+    blocks, and when the queue is full the message is dropped and counted
+    (a dropped depth diff is detected as a sequence gap and resynced).  The
+    worker decodes up to ``max_batch`` queued messages with the registered
+    handlers and passes the resulting batch to ``deliver``.
+
+    Control calls (:meth:`call`, :meth:`flush`, :meth:`close`) go on a
+    separate unbounded deque, so the GUI thread never waits for room in a
+    full message queue.  Every message and call takes a sequence number and
+    the worker runs a call once the messages submitted before it are done.
+    """
+
+    _STOP = object()
+    _WAKE = object()
+
+    def __init__(
+        self,
+        handlers: Dict[str, Handler],
+        deliver: Callable[[IngestBatch], None],
+        max_queue: int = 10_000,
+        max_batch: int = 1_000,
+    ) -> None:
+        self.handlers = handlers
+        self.deliver = deliver
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._calls: deque = deque()
+        self._seq = itertools.count()
+        self._stats = IngestStats()
+        self._stats_lock = threading.Lock()
+        self._overflowing = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="IngestWorker", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Decode everything still queued and stop the worker thread."""
+        if self._thread is not None:
+            self._control(self._STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Producer API
+    # ------------------------------------------------------------------
+    def submit(self, kind: str, msg: dict, block: bool = False) -> bool:
+        """Queue a raw message (socket thread).  Returns ``False`` if dropped.
+
+        ``block=True`` is meant for control messages that must not be lost;
+        it is never used from the socket thread.
+        """
+        try:
+            self._queue.put((kind, msg, time.monotonic(), next(self._seq)), block=block)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats.dropped += 1
+                warn = not self._overflowing
+                self._overflowing = True
+            if warn:
+                logger.warning("Ingest queue full - dropping %s messages", kind)
+            return False
+        with self._stats_lock:
+            self._stats.received += 1
+            self._overflowing = False
+        return True
+
+    def call(self, fn: Callable[[], Any]) -> None:
+        """Run ``fn`` on the worker thread, in order with queued messages.
+
+        Never blocks, even when the message queue is full.
+        """
+        self._control(fn)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been decoded and delivered."""
+        done = threading.Event()
+        self._control(done.set)
+        return done.wait(timeout)
+
+    def stats(self) -> IngestStats:
+        """Return a snapshot of the pipeline counters."""
+        with self._stats_lock:
+            snapshot = replace(self._stats)
+        snapshot.queue_depth = self._queue.qsize()
+        return snapshot
+
+    def _control(self, item: Any) -> None:
+        self._calls.append((next(self._seq), item))
+        try:
+            self._queue.put_nowait(self._WAKE)
+        except queue.Full:
+            pass  # a full queue wakes the worker anyway
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.max_batch:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            batch = IngestBatch()
+            for item in items:
+                if item is self._WAKE:
+                    continue
+                kind, msg, received_at, seq = item
+                if self._calls and self._calls[0][0] < seq:
+                    # Control calls: deliver what was decoded before them first
+                    batch = self._deliver(batch)
+                    if not self._run_calls(seq):
+                        return
+                self._decode(batch, kind, msg, received_at)
+            self._deliver(batch)
+            # Nothing left in the queue can predate the pending calls
+            if self._queue.empty() and not self._run_calls():
+                return
+
+    def _run_calls(self, before: Optional[int] = None) -> bool:
+        """Run control calls older than ``before``; ``False`` means stop."""
+        while self._calls and (before is None or self._calls[0][0] < before):
+            _, fn = self._calls.popleft()
+            if fn is self._STOP:
+                return False
+            fn()
+        return True
+
+    def _decode(self, batch: IngestBatch, kind: str, msg: dict, received_at: float) -> None:
+        handler = self.handlers.get(kind)
+        if handler is None:
+            return
+        try:
+            handler(msg, batch)
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.error("Failed to decode %s message: %s", kind, exc)
+            with self._stats_lock:
+                self._stats.errors += 1
+            return
+        if not batch.messages:
+            batch.received_at = received_at
+        batch.messages += 1
+        with self._stats_lock:
+            self._stats.decoded += 1
+
+    def _deliver(self, batch: IngestBatch) -> IngestBatch:
+        if batch:
+            with self._stats_lock:
+                self._stats.batches += 1
+            try:
+                self.deliver(batch)
+            except Exception as exc:  # pragma: no cover - logowanie błędów
+                logger.error("Failed to deliver ingest batch: %s", exc)
+            return IngestBatch()
+        return batch
@@ -0,0 +1,124 @@
+"""Frame-rate capped scheduler coalescing redraw and recompute requests."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QTimer
+
+from ..config import config
+from ..metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FrameStats:
+    """Per-task counters kept by :class:`RenderScheduler`."""
+
+    requested: int = 0
+    rendered: int = 0
+    coalesced: int = 0  # requests merged into an already pending frame
+    skipped_hidden: int = 0
+    last_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+@dataclass
+class _Task:
+    callback: Callable[[], None]
+    is_visible: Optional[Callable[[], bool]]
+    dirty: bool = False
+    stats: FrameStats = field(default_factory=FrameStats)
+
+
+class RenderScheduler(QObject):
+    """Singleton marking views dirty and running them at most once per frame.
+
+    Signal handlers call :meth:`mark_dirty` instead of redrawing.  The first
+    request after an idle period is served on the next event loop pass,
+    later ones are held back until ``frame_ms`` has elapsed since the last
+    frame, so any burst collapses into one callback per task per frame.
+    Tasks whose ``is_visible`` predicate returns ``False`` stay dirty and
+    are not run until they are requested again while visible.
+    """
+
+    _instance: Optional['RenderScheduler'] = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, frame_ms: Optional[int] = None):
+        if self.__dict__.get('_initialized', False):
+            return
+
+        super().__init__()
+        self._initialized = True
+        self.frame_ms = frame_ms if frame_ms is not None else config.chart.update_interval
+        self._tasks: Dict[str, _Task] = {}
+        self._last_frame = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        # Requests merged into a pending frame are frames that were never drawn
+        metrics.gauge("render.coalesced", lambda: sum(t.stats.coalesced for t in list(self._tasks.values())))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def register(self, key: str, callback: Callable[[], None], is_visible: Optional[Callable[[], bool]] = None) -> None:
+        """Register ``callback`` to run when ``key`` is marked dirty."""
+        self._tasks[key] = _Task(callback, is_visible)
+
+    def unregister(self, key: str) -> None:
+        self._tasks.pop(key, None)
+
+    def mark_dirty(self, key: str) -> None:
+        """Request that task ``key`` runs in the next frame."""
+        task = self._tasks.get(key)
+        if task is None:
+            return
+        task.stats.requested += 1
+        if task.dirty:
+            task.stats.coalesced += 1
+        task.dirty = True
+        if not self._timer.isActive():
+            elapsed_ms = (time.monotonic() - self._last_frame) * 1000.0
+            self._timer.start(max(0, int(self.frame_ms - elapsed_ms)))
+
+    def flush(self) -> None:
+        """Run every dirty, visible task now."""
+        self._timer.stop()
+        self._last_frame = time.monotonic()
+        for key, task in list(self._tasks.items()):
+            if not task.dirty:
+                continue
+            if task.is_visible is not None and not task.is_visible():
+                task.stats.skipped_hidden += 1
+                continue
+            task.dirty = False
+            started = time.perf_counter()
+            try:
+                task.callback()
+            except Exception as exc:  # pragma: no cover - logowanie błędów
+                logger.error("Render task %s failed: %s", key, exc)
+            elapsed = time.perf_counter() - started
+            if metrics.enabled:
+                metrics.observe(f"frame.{key}", elapsed)
+            elapsed_ms = elapsed * 1000.0
+            task.stats.rendered += 1
+            task.stats.last_ms = elapsed_ms
+            task.stats.max_ms = max(task.stats.max_ms, elapsed_ms)
+
+    def stats(self) -> Dict[str, FrameStats]:
+        """Return a snapshot of per-task frame counters."""
+        return {key: replace(task.stats) for key, task in self._tasks.items()}
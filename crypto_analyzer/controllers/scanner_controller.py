@@ -0,0 +1,107 @@
+"""Controller running market scans in the background."""
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..config import config
+from ..models.candle_repository import CandleRepository
+from ..models.database import Database
+from ..scanner.engine import Scanner
+
+logger = logging.getLogger(__name__)
+
+
+class ScannerController(QObject):
+    """Runs :class:`~crypto_analyzer.scanner.engine.Scanner` off the GUI thread.
+
+    Scans use the candles stored in the database, read through a separate
+    connection (WAL lets it read while the data controller writes), and are
+    evaluated on the scanner's process pool.  Matches are emitted chunk by
+    chunk through :attr:`resultsFound` and all together through
+    :attr:`scanFinished`; signals emitted from the scan thread are queued to
+    the GUI thread by Qt.
+    """
+
+    scanStarted = pyqtSignal()
+    resultsFound = pyqtSignal(list)  # ScanResult of one finished chunk
+    scanFinished = pyqtSignal(list, float)  # every ScanResult, seconds taken
+    scanFailed = pyqtSignal(str)
+
+    def __init__(self, scanner: Scanner | None = None) -> None:
+        super().__init__()
+        # Created in the scan thread on first use, together with its connection
+        self._scanner = scanner
+        self._db: Optional[Database] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Scanner")
+        self._running: Optional[Future] = None
+
+    @staticmethod
+    def pairs() -> List[Tuple[str, str]]:
+        """(symbol, interval) pairs to scan, from ``config.scanner``."""
+        symbols = config.scanner.symbols or [*config.get_popular_symbols(), *config.watchlist.symbols]
+        unique = dict.fromkeys(symbol.upper() for symbol in symbols)
+        return [(symbol, interval) for symbol in unique for interval in config.scanner.intervals]
+
+    @property
+    def running(self) -> bool:
+        return self._running is not None and not self._running.done()
+
+    def prepare(self) -> None:
+        """Start the worker processes in the background, ahead of the first scan."""
+        self._executor.submit(self._prepare)
+
+    def scan(self) -> bool:
+        """Start a scan; ``False`` if one is already running."""
+        if self.running:
+            return False
+        self.scanStarted.emit()
+        self._running = self._executor.submit(self._scan)
+        return True
+
+    def shutdown(self) -> None:
+        """Stop the worker processes once a running scan has finished."""
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Scan thread
+    # ------------------------------------------------------------------
+    def _get_scanner(self) -> Scanner:
+        if self._scanner is None:
+            self._db = Database(config.database.db_path)
+            repository = CandleRepository(self._db)
+            repository.ensure_schema()
+            self._scanner = Scanner(repository.latest, config.scanner.workers)
+        return self._scanner
+
+    def _prepare(self) -> None:
+        try:
+            self._get_scanner().start()
+        except Exception:  # pragma: no cover - logowanie błędów
+            logger.exception("Starting the scanner failed")
+
+    def _scan(self) -> None:
+        start = time.perf_counter()
+        try:
+            results = self._get_scanner().scan(
+                self.pairs(),
+                list(config.scanner.conditions.items()),
+                config.scanner.candles,
+                self.resultsFound.emit,
+            )
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.exception("Scan failed")
+            self.scanFailed.emit(str(exc))
+            return
+        self.scanFinished.emit(results, time.perf_counter() - start)
+
+    def _close(self) -> None:
+        if self._scanner is not None:
+            self._scanner.close()
+        if self._db is not None:
+            self._db.close()
@@ -0,0 +1,191 @@
+"""Shared cache of full indicator series.
+
+The chart draws indicator series and the indicator controller shows their
+last values, both for the same candles.  :data:`indicator_cache` computes
+each series once for both of them:
+
+* Entries are keyed by symbol, interval, indicator kind and parameters,
+  and remember the :attr:`CandleStore.history_version` and
+  :attr:`CandleStore.version` they were computed for.  ``sma_fast`` and
+  ``sma_slow`` with the same period share one entry.
+* An unchanged store is a hit.  After appends or a revised last candle
+  (same history version) the cached series is extended with
+  :func:`vectorized.extend` from its last row, in place: series live in
+  buffers with room to grow (doubled when full) and rows evicted from the
+  front of the ring buffer are skipped.  A rewritten history (replace,
+  resize) is recomputed.
+* The least recently used entries are evicted once the series together
+  take more than ``max_bytes``.
+
+Because every entry names its store's pair, switching symbol or interval
+can never return another pair's series, and switching back to a pair whose
+candles did not change since costs nothing.
+
+Returned arrays are read-only views shared by all callers.  Like
+:meth:`CandleStore.view` they must not be kept across later updates: an
+extension may revise their last value.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from ..config import config
+from ..metrics import metrics
+from ..models.candle_store import Candles, CandleStore
+from . import vectorized
+from .vectorized import Series
+
+
+class _Entry:
+    """Series of one indicator in buffers with room to grow at the end."""
+
+    def __init__(self, series: Series, store: CandleStore) -> None:
+        self.buffers = {key: np.require(values, requirements=("O", "W")) for key, values in series.items()}
+        self.offset = 0
+        self.rows = len(store)
+        self._sync(store)
+
+    def _sync(self, store: CandleStore) -> None:
+        self.history_version = store.history_version
+        self.version = store.version
+        self.last_timestamp = store.last_timestamp
+        self.nbytes = sum(buffer.nbytes for buffer in self.buffers.values())
+        self.series: Series = {}
+        for key, buffer in self.buffers.items():
+            view = buffer[self.offset:self.offset + self.rows]
+            view.flags.writeable = False
+            self.series[key] = view
+
+    def last(self, back: int) -> Dict[str, float]:
+        """Values of the row ``back`` rows before the last cached one."""
+        row = self.offset + self.rows - 1 - back
+        return {key: float(buffer[row]) for key, buffer in self.buffers.items()}
+
+    def write(self, store: CandleStore, evicted: int, start: int, new: Series) -> None:
+        """Drop ``evicted`` rows from the front and put ``new`` at row ``start`` onwards."""
+        offset = self.offset + evicted
+        rows = start + len(next(iter(new.values())))
+        capacity = len(next(iter(self.buffers.values())))
+        if offset + rows > capacity:
+            # Move the kept rows to the front of buffers twice as long as needed
+            grown = {}
+            for key, buffer in self.buffers.items():
+                grown[key] = np.empty(2 * rows)
+                grown[key][:start] = buffer[offset:offset + start]
+            self.buffers = grown
+            offset = 0
+        for key, values in new.items():
+            self.buffers[key][offset + start:offset + rows] = values
+        self.offset = offset
+        self.rows = rows
+        self._sync(store)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    extends: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class IndicatorCache:
+    """LRU cache of indicator series with a memory cap (see module docstring)."""
+
+    def __init__(self, max_bytes: int = 64 * 2**20) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # Columns of the last store read, shared by the lookups of one frame
+        self._view: Tuple[Optional[CandleStore], int, Optional[Candles]] = (None, 0, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+        self._view = (None, 0, None)
+
+    def _candles(self, store: CandleStore) -> Candles:
+        cached, version, candles = self._view
+        if cached is not store or version != store.version:
+            candles = store.view()
+            self._view = (store, store.version, candles)
+        return candles
+
+    @staticmethod
+    def key(symbol: str, interval: str, name: str, cfg: Dict[str, Any]) -> Optional[Tuple]:
+        """Cache key of indicator ``name`` configured by ``cfg`` (``None`` for unknown names)."""
+        kind = vectorized.kind_of(name)
+        if kind is None:
+            return None
+        params = vectorized.params(vectorized.SPECS[kind], cfg)
+        return symbol.upper(), interval, kind, tuple(sorted(params.items()))
+
+    def series(
+        self, symbol: str, interval: str, name: str, cfg: Dict[str, Any], store: CandleStore
+    ) -> Optional[Series]:
+        """Series of indicator ``name`` over the candles of ``store`` (the pair's buffer).
+
+        The arrays are valid until the next lookup of the same indicator
+        after ``store`` changed: extending may revise their last value.
+        """
+        key = self.key(symbol, interval, name, cfg)
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and entry.history_version == store.history_version:
+            self._entries.move_to_end(key)
+            if entry.version == store.version:
+                self.stats.hits += 1
+                return entry.series
+            nbytes = entry.nbytes
+            if self._extend(name, cfg, entry, store):
+                self.stats.extends += 1
+                self._account(entry.nbytes - nbytes)
+                return entry.series
+
+        self.stats.misses += 1
+        entry = _Entry(vectorized.compute(name, self._candles(store), cfg), store)
+        old = self._entries.pop(key, None)
+        self._entries[key] = entry
+        self._account(entry.nbytes - (old.nbytes if old is not None else 0))
+        return entry.series
+
+    def _extend(self, name: str, cfg: Dict[str, Any], entry: _Entry, store: CandleStore) -> bool:
+        """Extend ``entry`` to the current candles; ``False`` when they no longer contain its last row."""
+        if entry.last_timestamp is None:
+            return False
+        candles = self._candles(store)
+        timestamps = candles.timestamp
+        # The last cached row may have been revised since, so it is recomputed too
+        start = int(np.searchsorted(timestamps, entry.last_timestamp))
+        if start >= len(timestamps) or timestamps[start] != entry.last_timestamp:
+            return False
+        last = entry.last(1) if start else {}
+        new = vectorized.extend(name, last, candles, start, cfg)
+        entry.write(store, entry.rows - 1 - start, start, new)
+        return True
+
+    def _account(self, delta: int) -> None:
+        """Add ``delta`` bytes and evict the least recently used entries over the cap (never the newest)."""
+        self.nbytes += delta
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _key, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.stats.evictions += 1
+
+
+#: Cache shared by the chart and the indicator controller
+indicator_cache = IndicatorCache(config.chart.indicator_cache_mb * 2**20)
+metrics.gauge("indicators.cache_bytes", lambda: indicator_cache.nbytes)
+metrics.gauge("indicators.cache_hits", lambda: indicator_cache.stats.hits)
+metrics.gauge("indicators.cache_extends", lambda: indicator_cache.stats.extends)
+metrics.gauge("indicators.cache_misses", lambda: indicator_cache.stats.misses)
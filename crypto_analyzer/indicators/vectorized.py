@@ -0,0 +1,612 @@
+"""Vectorized technical indicators over NumPy candle arrays.
+
+Every function takes whole price/volume arrays and returns full series of
+the same length, with ``NaN`` where the indicator is not defined yet.  The
+chart plots these series and the indicator panel shows their last values.
+Nothing loops over rows in Python:
+
+* Rolling sums come from cumulative sums computed block by block.  Each
+  block is centred on its own mean, so the running totals stay small and
+  the variance formula does not lose precision on large prices.
+* Recursive averages (EMA, Wilder's RMA) use the closed form
+  ``y[j] = d**(j+1) * (y[-1] + a * cumsum(x[i] * d**-(i+1)))``.  It is
+  evaluated in blocks short enough that ``d**-j`` cannot overflow.
+* Rolling extremes combine shifted copies over power-of-two windows.
+
+EMAs follow pandas ``ewm(span=..., adjust=False)``.  RSI and ATR use
+Wilder's smoothing, seeded with the simple average of the first window.
+Standard deviations are sample standard deviations (``ddof=1``).
+
+Series can also be *extended*: given the last computed row of a history,
+:func:`extend` computes only the rows after it.  Recursive indicators
+continue from the previous value.  SMA, Bollinger Bands and the true-range
+average of Keltner Channels slide their window in constant time per row:
+the mean (and the sum of squared deviations) of the previous row is
+updated with the value entering the window and the one leaving it.  Every
+``RESYNC``-th row is computed from its window instead, so rounding errors
+cannot accumulate.  Other windowed indicators recompute their last window.
+Keys starting with an underscore hold the running state this needs (e.g.
+the fast and slow EMAs behind MACD).  They are not indicator values and
+:func:`latest` skips them.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..models.candle_store import Candles
+
+Series = Dict[str, np.ndarray]
+
+#: Rows per block of the blocked cumulative sums.
+BLOCK = 4096
+
+#: Largest exponent used by the closed-form EMA (``exp(600)`` is far below the float limit).
+_MAX_EXPONENT = 600.0
+
+#: Rows whose index is a multiple of this are recomputed from their window when sliding.
+RESYNC = 256
+
+
+def _nan(n: int) -> np.ndarray:
+    return np.full(n, np.nan)
+
+
+def _blocks(x: np.ndarray, period: int) -> Iterator[Tuple[int, int, float, np.ndarray]]:
+    """Yield ``(start, end, ref, x[start - period + 1:end] - ref)`` covering window ends ``period - 1 ..``."""
+    for start in range(period - 1, len(x), BLOCK):
+        end = min(len(x), start + BLOCK)
+        segment = x[start - period + 1:end]
+        ref = float(segment.mean())
+        yield start, end, ref, segment - ref
+
+
+def _padded_cumsum(x: np.ndarray) -> np.ndarray:
+    out = np.empty(len(x) + 1)
+    out[0] = 0.0
+    np.cumsum(x, out=out[1:])
+    return out
+
+
+def _first_valid(x: np.ndarray) -> int:
+    """Index of the first non-NaN value (``len(x)`` if there is none)."""
+    valid = ~np.isnan(x)
+    return int(valid.argmax()) if valid.any() else len(x)
+
+
+def _on_valid(fn: Callable[[np.ndarray], np.ndarray], x: np.ndarray) -> np.ndarray:
+    """Apply ``fn`` to the part of ``x`` after its leading NaNs."""
+    first = _first_valid(x)
+    out = _nan(len(x))
+    if first < len(x):
+        out[first:] = fn(x[first:])
+    return out
+
+
+# ----------------------------------------------------------------------
+# Building blocks
+# ----------------------------------------------------------------------
+def rolling_mean(x: np.ndarray, period: int) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    out = _nan(len(x))
+    for start, end, ref, d in _blocks(x, period):
+        c = _padded_cumsum(d)
+        out[start:end] = ref + (c[period:] - c[:-period]) / period
+    return out
+
+
+def rolling_var(x: np.ndarray, period: int) -> np.ndarray:
+    """Rolling sample variance (``ddof=1``)."""
+    x = np.asarray(x, dtype=float)
+    out = _nan(len(x))
+    if period < 2:
+        return out
+    for start, end, _ref, d in _blocks(x, period):
+        c1 = _padded_cumsum(d)
+        c2 = _padded_cumsum(d * d)
+        s1 = c1[period:] - c1[:-period]
+        s2 = c2[period:] - c2[:-period]
+        out[start:end] = np.maximum((s2 - s1 * s1 / period) / (period - 1), 0.0)
+    return out
+
+
+def rolling_std(x: np.ndarray, period: int) -> np.ndarray:
+    """Rolling sample standard deviation (``ddof=1``)."""
+    return np.sqrt(rolling_var(x, period))
+
+
+def slide(
+    entering: np.ndarray,
+    leaving: np.ndarray,
+    first: int,
+    window: Callable[[int], np.ndarray],
+    period: int,
+    mean: float,
+    m2: Optional[float] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Rolling means (and sums of squared deviations) continued from the previous row.
+
+    ``entering[i]`` and ``leaving[i]`` are the values entering and leaving
+    the ``period`` window at row ``first + i``; ``mean`` and ``m2`` are the
+    values of row ``first - 1``.  Each row costs ``O(1)``; rows at multiples
+    of :data:`RESYNC` are computed from their whole ``window(row)`` instead.
+    ``m2`` is left out (``None``) when not given.
+    """
+    n = len(entering)
+    means = np.empty(n)
+    m2s = np.empty(n) if m2 is not None else None
+    for i in range(n):
+        if (first + i) % RESYNC == 0:
+            values = window(first + i)
+            new_mean = float(values.mean())
+            if m2 is not None:
+                m2 = float(np.square(values - new_mean).sum())
+        else:
+            new, old = float(entering[i]), float(leaving[i])
+            new_mean = mean + (new - old) / period
+            if m2 is not None:
+                m2 = max(m2 + (new - old) * (new - new_mean + old - mean), 0.0)
+        mean = means[i] = new_mean
+        if m2s is not None:
+            m2s[i] = m2
+    return means, m2s
+
+
+def _slide_column(
+    x: np.ndarray, start: int, period: int, mean: float, m2: Optional[float] = None
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """:func:`slide` over rows ``start ..`` of ``x`` (``start >= period``)."""
+    return slide(
+        x[start:], x[start - period:len(x) - period], start, lambda row: x[row - period + 1:row + 1], period, mean, m2
+    )
+
+
+def _rolling_extreme(x: np.ndarray, period: int, op: np.ufunc) -> np.ndarray:
+    """Rolling ``op`` (maximum/minimum) in ``O(n log period)``.
+
+    Extremes over windows of 1, 2, 4, ... rows are built by combining
+    shifted copies, and each ``period`` window is covered by two overlapping
+    power-of-two windows.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    out = _nan(n)
+    if n < period:
+        return out
+    width = 1
+    ext = x
+    while width * 2 <= period:
+        ext = op(ext[:-width], ext[width:])  # ext[i] = op(x[i:i + 2 * width])
+        width *= 2
+    count = n - period + 1
+    out[period - 1:] = op(ext[:count], ext[period - width:period - width + count])
+    return out
+
+
+def rolling_max(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extreme(x, period, np.maximum)
+
+
+def rolling_min(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extreme(x, period, np.minimum)
+
+
+def ewm(x: np.ndarray, alpha: float, initial: Optional[float] = None) -> np.ndarray:
+    """``y[i] = alpha * x[i] + (1 - alpha) * y[i - 1]`` with ``y[-1] = initial`` (default ``x[0]``)."""
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    out = np.empty(n)
+    if not n:
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+    prev = float(x[0]) if initial is None else float(initial)
+    block = max(1, min(n, int(_MAX_EXPONENT / -math.log(decay))))
+    steps = np.arange(1, block + 1, dtype=float)
+    grow = decay ** -steps  # d**-(i+1)
+    shrink = decay ** steps  # d**(j+1)
+    for start in range(0, n, block):
+        chunk = x[start:start + block]
+        m = len(chunk)
+        acc = np.cumsum(chunk * grow[:m])
+        acc *= alpha
+        acc += prev
+        acc *= shrink[:m]
+        out[start:start + m] = acc
+        prev = float(acc[-1])
+    return out
+
+
+def wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's moving average (RMA), seeded with the mean of the first ``period`` values."""
+    x = np.asarray(x, dtype=float)
+    out = _nan(len(x))
+    if len(x) < period:
+        return out
+    seed = float(x[:period].mean())
+    out[period - 1] = seed
+    out[period:] = ewm(x[period:], 1.0 / period, initial=seed)
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    tr = np.asarray(high, dtype=float) - low
+    if len(tr) > 1:
+        prev = close[:-1]
+        np.maximum(tr[1:], np.abs(high[1:] - prev), out=tr[1:])
+        np.maximum(tr[1:], np.abs(low[1:] - prev), out=tr[1:])
+    return tr
+
+
+def _true_range_of(high: np.ndarray, low: np.ndarray, close: np.ndarray, first: int, last: int) -> np.ndarray:
+    """True range of rows ``first .. last - 1`` (``first >= 1``), each against its previous close."""
+    high, low, prev = high[first:last], low[first:last], close[first - 1:last - 1]
+    tr = np.asarray(high, dtype=float) - low
+    np.maximum(tr, np.abs(high - prev), out=tr)
+    np.maximum(tr, np.abs(low - prev), out=tr)
+    return tr
+
+
+# ----------------------------------------------------------------------
+# Indicators
+# ----------------------------------------------------------------------
+def sma(close: np.ndarray, period: int = 14) -> Series:
+    return {"value": rolling_mean(close, period)}
+
+
+def ema(close: np.ndarray, period: int = 14) -> Series:
+    return {"value": ewm(close, 2.0 / (period + 1.0))}
+
+
+def wma(close: np.ndarray, period: int = 14) -> Series:
+    """Linearly weighted moving average (weights 1..period, newest heaviest)."""
+    close = np.asarray(close, dtype=float)
+    out = _nan(len(close))
+    norm = period * (period + 1) / 2.0
+    for start, end, ref, d in _blocks(close, period):
+        s = _padded_cumsum(d)  # s[k + 1] = d[0] + ... + d[k]
+        t = _padded_cumsum(s)  # t[k + 1] = s[0] + ... + s[k]
+        # sum_j (period - j) * d[k - j] = period * s[k + 1] - (t[k + 1] - t[k + 1 - period])
+        k1 = np.arange(period, len(d) + 1)
+        out[start:end] = ref + (period * s[k1] - (t[k1] - t[k1 - period])) / norm
+    return {"value": out}
+
+
+def bollinger_bands(close: np.ndarray, period: int = 20, std_dev: float = 2.0) -> Series:
+    middle = rolling_mean(close, period)
+    var = rolling_var(close, period)
+    width = std_dev * np.sqrt(var)
+    return {"upper": middle + width, "middle": middle, "lower": middle - width, "_m2": var * (period - 1)}
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> Series:
+    """Average True Range with Wilder's smoothing."""
+    return {"value": wilder(true_range(high, low, close), period)}
+
+
+def keltner_channels(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 20, atr_mult: float = 2.0
+) -> Series:
+    """EMA of the close +/- ``atr_mult`` times the simple average of the true range."""
+    middle = ewm(close, 2.0 / (period + 1.0))
+    average = rolling_mean(true_range(high, low, close), period)
+    width = atr_mult * average
+    return {"upper": middle + width, "middle": middle, "lower": middle - width, "_tr": average}
+
+
+def _rsi_value(gain: np.ndarray, loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100.0 - 100.0 / (1.0 + gain / loss)
+    value[(loss == 0.0) & (gain > 0.0)] = 100.0
+    value[(loss == 0.0) & (gain == 0.0)] = 50.0
+    return value
+
+
+def rsi(close: np.ndarray, period: int = 14) -> Series:
+    close = np.asarray(close, dtype=float)
+    gain = _nan(len(close))
+    loss = _nan(len(close))
+    if len(close) > period:
+        delta = np.diff(close)
+        gain[1:] = wilder(np.maximum(delta, 0.0), period)
+        loss[1:] = wilder(np.maximum(-delta, 0.0), period)
+    return {"value": _rsi_value(gain, loss), "_gain": gain, "_loss": loss}
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Series:
+    fast_ema = ewm(close, 2.0 / (fast + 1.0))
+    slow_ema = ewm(close, 2.0 / (slow + 1.0))
+    line = fast_ema - slow_ema
+    signal_line = ewm(line, 2.0 / (signal + 1.0)) if len(line) else line
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line, "_fast": fast_ema, "_slow": slow_ema}
+
+
+def vwap(
+    timestamp: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    anchor_ms: int = 86_400_000,
+) -> Series:
+    """Volume weighted typical price, restarting every ``anchor_ms`` (UTC days by default, 0 = never)."""
+    return _vwap(timestamp, high, low, close, volume, anchor_ms)
+
+
+def _vwap(
+    timestamp: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    anchor_ms: int,
+    carry: Optional[Tuple[float, float, int]] = None,
+) -> Series:
+    """VWAP continuing ``carry``: the session sums and timestamp of the row before ``timestamp[0]``."""
+    typical = (np.asarray(high, dtype=float) + low + close) / 3.0
+    pv = _padded_cumsum(typical * volume)
+    vol = _padded_cumsum(np.asarray(volume, dtype=float))
+    n = len(typical)
+    first = np.zeros(n, dtype=np.int64)
+    if anchor_ms and n:
+        session = np.asarray(timestamp) // anchor_ms
+        starts = np.r_[True, session[1:] != session[:-1]]
+        first = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    end = np.arange(1, n + 1)
+    session_pv = pv[end] - pv[first]
+    session_vol = vol[end] - vol[first]
+    if carry is not None and n:
+        carry_pv, carry_vol, carry_timestamp = carry
+        if not anchor_ms or carry_timestamp // anchor_ms == timestamp[0] // anchor_ms:
+            same = first == 0
+            session_pv[same] += carry_pv
+            session_vol[same] += carry_vol
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = session_pv / session_vol
+    return {"value": np.where(np.isfinite(value), value, typical), "_pv": session_pv, "_vol": session_vol}
+
+
+def stochastic(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, k_period: int = 14, d_period: int = 3
+) -> Series:
+    """%K = position of the close in the ``k_period`` high-low range (50 for a flat range), %D = its SMA."""
+    highest = rolling_max(high, k_period)
+    lowest = rolling_min(low, k_period)
+    span = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(span > 0, 100.0 * (close - lowest) / span, 50.0)
+    k[np.isnan(span)] = np.nan
+    return {"k": k, "d": _on_valid(lambda valid: rolling_mean(valid, d_period), k)}
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> Series:
+    """On-balance volume, starting at 0."""
+    out = np.zeros(len(close))
+    if len(close) > 1:
+        np.cumsum(np.sign(np.diff(close)) * volume[1:], out=out[1:])
+    return {"value": out}
+
+
+# ----------------------------------------------------------------------
+# Extension
+#
+# An extender takes ``last`` (the value of every series at row
+# ``start - 1``), the full input columns and ``start``, and returns the
+# series for rows ``start ..`` only.
+# ----------------------------------------------------------------------
+Last = Dict[str, float]
+
+
+def _rows_from(series: Series, start: int) -> Series:
+    return {key: values[start:] for key, values in series.items()}
+
+
+def _windowed(fn: Callable[..., Series], lookback: Callable[..., int]) -> Callable[..., Series]:
+    """Extender of an indicator whose rows depend on the ``lookback(**params)`` rows before them only."""
+
+    def extend(last: Last, inputs: Tuple[np.ndarray, ...], start: int, **kwargs) -> Series:
+        lo = max(0, start - lookback(**kwargs))
+        return _rows_from(fn(*(col[lo:] for col in inputs), **kwargs), start - lo)
+
+    return extend
+
+
+def _slides(start: int, rows: int, period: int) -> bool:
+    """Whether rows ``start ..`` are extended by sliding: the previous row has
+    a full window and there are fewer new rows than the window (beyond that a
+    vectorized recompute is cheaper)."""
+    return start >= period and rows - start <= period
+
+
+def _extend_sma(last: Last, inputs: Tuple[np.ndarray, ...], start: int, period: int) -> Series:
+    (close,) = inputs
+    if not _slides(start, len(close), period) or math.isnan(last["value"]):
+        return _rows_from(sma(close[max(0, start - period + 1):], period), min(start, period - 1))
+    means, _ = _slide_column(close, start, period, last["value"])
+    return {"value": means}
+
+
+def _extend_bollinger(
+    last: Last, inputs: Tuple[np.ndarray, ...], start: int, period: int, std_dev: float
+) -> Series:
+    (close,) = inputs
+    if period < 2 or not _slides(start, len(close), period) or math.isnan(last["_m2"]):
+        lo = max(0, start - period + 1)
+        return _rows_from(bollinger_bands(close[lo:], period, std_dev), start - lo)
+    middle, m2 = _slide_column(close, start, period, last["middle"], last["_m2"])
+    width = std_dev * np.sqrt(m2 / (period - 1))
+    return {"upper": middle + width, "middle": middle, "lower": middle - width, "_m2": m2}
+
+
+def _extend_ema(last: Last, inputs: Tuple[np.ndarray, ...], start: int, period: int) -> Series:
+    (close,) = inputs
+    if not start:
+        return ema(close, period)
+    return {"value": ewm(close[start:], 2.0 / (period + 1.0), initial=last["value"])}
+
+
+def _extend_keltner(last: Last, inputs: Tuple[np.ndarray, ...], start: int, period: int, atr_mult: float) -> Series:
+    high, low, close = inputs
+    if not start:
+        return keltner_channels(high, low, close, period, atr_mult)
+    middle = ewm(close[start:], 2.0 / (period + 1.0), initial=last["middle"])
+    n = len(close)
+    if _slides(start, n, period + 1) and not math.isnan(last["_tr"]):
+        # True ranges of the rows entering and leaving the window only
+        average, _ = slide(
+            _true_range_of(high, low, close, start, n),
+            _true_range_of(high, low, close, start - period, n - period),
+            start,
+            lambda row: _true_range_of(high, low, close, row - period + 1, row + 1),
+            period,
+            last["_tr"],
+        )
+    else:
+        # One row more than the window: the first true range needs the previous close
+        lo = max(0, start - period)
+        average = rolling_mean(true_range(high[lo:], low[lo:], close[lo:]), period)[start - lo:]
+    width = atr_mult * average
+    return {"upper": middle + width, "middle": middle, "lower": middle - width, "_tr": average}
+
+
+def _extend_atr(last: Last, inputs: Tuple[np.ndarray, ...], start: int, period: int) -> Series:
+    high, low, close = inputs
+    if start < period:  # the seed window is not complete yet
+        return _rows_from(atr(high, low, close, period), start)
+    tr = true_range(high[start - 1:], low[start - 1:], close[start - 1:])[1:]
+    return {"value": ewm(tr, 1.0 / period, initial=last["value"])}
+
+
+def _extend_rsi(last: Last, inputs: Tuple[np.ndarray, ...], start: int, period: int) -> Series:
+    (close,) = inputs
+    if start <= period:
+        return _rows_from(rsi(close, period), start)
+    delta = np.diff(close[start - 1:])
+    gain = ewm(np.maximum(delta, 0.0), 1.0 / period, initial=last["_gain"])
+    loss = ewm(np.maximum(-delta, 0.0), 1.0 / period, initial=last["_loss"])
+    return {"value": _rsi_value(gain, loss), "_gain": gain, "_loss": loss}
+
+
+def _extend_macd(
+    last: Last, inputs: Tuple[np.ndarray, ...], start: int, fast: int, slow: int, signal: int
+) -> Series:
+    (close,) = inputs
+    if not start:
+        return macd(close, fast, slow, signal)
+    fast_ema = ewm(close[start:], 2.0 / (fast + 1.0), initial=last["_fast"])
+    slow_ema = ewm(close[start:], 2.0 / (slow + 1.0), initial=last["_slow"])
+    line = fast_ema - slow_ema
+    signal_line = ewm(line, 2.0 / (signal + 1.0), initial=last["signal"])
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line, "_fast": fast_ema, "_slow": slow_ema}
+
+
+def _extend_vwap(last: Last, inputs: Tuple[np.ndarray, ...], start: int, anchor_ms: int) -> Series:
+    if not start:
+        return vwap(*inputs, anchor_ms)
+    carry = (last["_pv"], last["_vol"], int(inputs[0][start - 1]))
+    return _vwap(*(col[start:] for col in inputs), anchor_ms, carry)
+
+
+def _extend_obv(last: Last, inputs: Tuple[np.ndarray, ...], start: int) -> Series:
+    close, volume = inputs
+    if not start:
+        return obv(close, volume)
+    steps = np.sign(np.diff(close[start - 1:])) * volume[start:]
+    return {"value": last["value"] + np.cumsum(steps)}
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+class IndicatorSpec(NamedTuple):
+    compute: Callable[..., Series]
+    inputs: Tuple[str, ...]  # Candles fields passed positionally
+    defaults: Dict[str, Any]  # parameters and their defaults
+    overlay: bool  # drawn over the price (same scale), otherwise a separate oscillator
+    extend: Callable[..., Series]  # computes rows ``start ..`` (see "Extension")
+
+
+SPECS: Dict[str, IndicatorSpec] = {
+    "sma": IndicatorSpec(sma, ("close",), {"period": 14}, True, _extend_sma),
+    "ema": IndicatorSpec(ema, ("close",), {"period": 14}, True, _extend_ema),
+    "wma": IndicatorSpec(wma, ("close",), {"period": 14}, True, _windowed(wma, lambda period: period - 1)),
+    "bollinger_bands": IndicatorSpec(
+        bollinger_bands,
+        ("close",),
+        {"period": 20, "std_dev": 2.0},
+        True,
+        _extend_bollinger,
+    ),
+    "keltner_channels": IndicatorSpec(
+        keltner_channels, ("high", "low", "close"), {"period": 20, "atr_mult": 2.0}, True, _extend_keltner
+    ),
+    "vwap": IndicatorSpec(
+        vwap, ("timestamp", "high", "low", "close", "volume"), {"anchor_ms": 86_400_000}, True, _extend_vwap
+    ),
+    "rsi": IndicatorSpec(rsi, ("close",), {"period": 14}, False, _extend_rsi),
+    "macd": IndicatorSpec(macd, ("close",), {"fast": 12, "slow": 26, "signal": 9}, False, _extend_macd),
+    "atr": IndicatorSpec(atr, ("high", "low", "close"), {"period": 14}, False, _extend_atr),
+    "stochastic": IndicatorSpec(
+        stochastic,
+        ("high", "low", "close"),
+        {"k_period": 14, "d_period": 3},
+        False,
+        _windowed(stochastic, lambda k_period, d_period: k_period + d_period - 2),
+    ),
+    "obv": IndicatorSpec(obv, ("close", "volume"), {}, False, _extend_obv),
+}
+
+
+def kind_of(name: str) -> Optional[str]:
+    """Registry key of indicator ``name``; ``sma_fast`` and the like resolve to ``sma``."""
+    if name in SPECS:
+        return name
+    prefix = name.split("_", 1)[0]
+    return prefix if prefix in SPECS else None
+
+
+def spec_for(name: str) -> Optional[IndicatorSpec]:
+    kind = kind_of(name)
+    return None if kind is None else SPECS[kind]
+
+
+def params(spec: IndicatorSpec, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """The spec's parameters taken from ``cfg`` (other keys, e.g. ``enabled``, are ignored)."""
+    return {key: type(default)(cfg.get(key, default)) for key, default in spec.defaults.items()}
+
+
+def compute(name: str, candles: Candles, cfg: Dict[str, Any]) -> Optional[Series]:
+    """Full series of indicator ``name`` configured by ``cfg`` (``None`` for unknown names)."""
+    spec = spec_for(name)
+    if spec is None:
+        return None
+    return spec.compute(*(getattr(candles, field) for field in spec.inputs), **params(spec, cfg))
+
+
+def extend(name: str, last: Last, candles: Candles, start: int, cfg: Dict[str, Any]) -> Optional[Series]:
+    """Rows ``start ..`` of indicator ``name`` over ``candles``.
+
+    ``last`` holds the value of every series (including the underscore
+    state) at row ``start - 1``; it is ignored when ``start`` is 0.
+    """
+    spec = spec_for(name)
+    if spec is None:
+        return None
+    return spec.extend(last, tuple(getattr(candles, field) for field in spec.inputs), start, **params(spec, cfg))
+
+
+def latest(series: Series) -> Optional[Dict[str, float]]:
+    """Last value of every series, or ``None`` while any of them is undefined."""
+    last = {}
+    for key, values in series.items():
+        if key.startswith("_"):
+            continue
+        if not len(values) or math.isnan(values[-1]):
+            return None
+        last[key] = float(values[-1])
+    return last
@@ -2,6 +2,11 @@
 Punkt wejścia aplikacji
 """
 
+import time
+
+# Początek pomiaru startu (raport CRYPTO_ANALYZER_PROFILE_STARTUP)
+_STARTED = time.perf_counter()
+
 import sys
 import logging
 from pathlib import Path
@@ -41,12 +46,20 @@ def main():
     setup_logging()
     create_data_directory()
 
-    # Importy lokalne wymagające PyQt6
-    from PyQt6.QtWidgets import QApplication
     # Używamy bezwzględnych importów, aby skrypt można było uruchomić
     # również bez kontekstu pakietu (np. `python crypto_analyzer/main.py`).
+    from crypto_analyzer.config import config
+    from crypto_analyzer.startup_profile import StartupProfile
+
+    profile = StartupProfile(start=_STARTED) if config.startup.profile else None
+
+    # Importy lokalne wymagające PyQt6 (pandas, mplfinance i python-binance
+    # ładowane są dopiero przy pierwszym użyciu)
+    from PyQt6.QtWidgets import QApplication
     from crypto_analyzer.models.app_state import AppState
     from crypto_analyzer.views.main_window import MainWindow
+    if profile:
+        profile.mark("imports")
 
     # Utworzenie aplikacji Qt
     app = QApplication(sys.argv)
@@ -58,10 +71,34 @@ def main():
 
     # Utworzenie głównego okna
     main_window = MainWindow()
+    if profile:
+        profile.mark("window")
     main_window.show()
-    
+    if profile:
+        profile.mark("show")
+        watch_startup(profile, main_window, exit_after=config.startup.profile == "exit")
+
     # Uruchomienie pętli zdarzeń
     sys.exit(app.exec())
 
+
+def watch_startup(profile, main_window, exit_after: bool = False):
+    """Zapisuje moment pierwszego odmalowania wykresu z danymi i raportuje start.
+
+    Z ``exit_after`` raport w formacie JSON trafia na stdout, a aplikacja
+    jest zamykana (pomiar startu w benchmarkach).
+    """
+    chart_view = main_window.chart_view
+
+    def first_paint():
+        profile.mark("first_paint")
+        if exit_after:
+            print(profile.to_json(), flush=True)
+            main_window.close()
+        else:
+            logging.getLogger(__name__).info("Profil startu:\n%s", profile.report())
+
+    profile.on_first_paint(chart_view.canvas, lambda: chart_view.full_redraws > 0, first_paint)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,278 @@
+"""Lightweight hot-path instrumentation.
+
+Stages record their latency into fixed-bucket histograms, counters track
+totals and recent rates, and gauges are read on demand.  Everything goes
+through the module level :data:`metrics` instance, which is disabled by
+default: instrumented code checks :attr:`Metrics.enabled` before reading
+the clock, so a disabled registry costs one attribute lookup per call.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+#: Histogram bucket upper bounds in seconds (10 µs .. 1 s).
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+_PREFIX = "crypto_analyzer"
+
+
+class Histogram:
+    """Latency histogram with fixed buckets (thread-safe)."""
+
+    def __init__(self, bounds=BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile by interpolating inside its bucket."""
+        with self._lock:
+            counts, count, peak = list(self.counts), self.count, self.max
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket in enumerate(counts):
+            if bucket and seen + bucket >= rank:
+                low = self.bounds[index - 1] if index else 0.0
+                high = self.bounds[index] if index < len(self.bounds) else peak
+                return min(peak, low + (high - low) * (rank - seen) / bucket)
+            seen += bucket
+        return peak
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            count, total, peak = self.count, self.sum, self.max
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000.0 if count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000.0,
+            "p99_ms": self.quantile(0.99) * 1000.0,
+            "max_ms": peak * 1000.0,
+        }
+
+
+class Counter:
+    """Monotonic counter that also keeps per-second counts for a rate."""
+
+    WINDOW_S = 5
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.total = 0
+        self._clock = clock
+        self._seconds: deque = deque(maxlen=self.WINDOW_S + 1)  # [second, count]
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1) -> None:
+        second = int(self._clock())
+        with self._lock:
+            self.total += n
+            if self._seconds and self._seconds[-1][0] == second:
+                self._seconds[-1][1] += n
+            else:
+                self._seconds.append([second, n])
+
+    def rate(self) -> float:
+        """Average per second over the last :attr:`WINDOW_S` complete seconds."""
+        now = int(self._clock())
+        with self._lock:
+            recent = sum(n for second, n in self._seconds if now - self.WINDOW_S <= second < now)
+        return recent / self.WINDOW_S
+
+
+class Metrics:
+    """Registry of stage histograms, counters and gauges."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    def inc(self, name: str, n: int = 1) -> None:
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter())
+        counter.inc(n)
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Register (or replace) a gauge read when metrics are collected."""
+        with self._lock:
+            self._gauges[name] = read
+
+    def remove_gauge(self, name: str) -> None:
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def timed(self, stage: str):
+        """Decorator recording the wall time of each call as ``stage``."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        """Current values as plain data (milliseconds, totals, per-second rates)."""
+        with self._lock:
+            stages = dict(self._stages)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        return {
+            "timestamp": time.time(),
+            "enabled": self.enabled,
+            "stages": {name: hist.summary() for name, hist in sorted(stages.items())},
+            "counters": {
+                name: {"total": counter.total, "rate": counter.rate()}
+                for name, counter in sorted(counters.items())
+            },
+            "gauges": {name: self._read(name, read) for name, read in sorted(gauges.items())},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        with self._lock:
+            stages = dict(self._stages)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        lines: List[str] = []
+        if stages:
+            name = f"{_PREFIX}_stage_seconds"
+            lines += [f"# HELP {name} Hot-path stage latency.", f"# TYPE {name} histogram"]
+            for stage, hist in sorted(stages.items()):
+                with hist._lock:
+                    counts, count, total = list(hist.counts), hist.count, hist.sum
+                cumulative = 0
+                for bound, bucket in zip(hist.bounds + (float("inf"),), counts):
+                    cumulative += bucket
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {total!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+        for counter_name, counter in sorted(counters.items()):
+            name = f"{_PREFIX}_{_sanitize(counter_name)}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {counter.total}"]
+        for gauge_name, read in sorted(gauges.items()):
+            name = f"{_PREFIX}_{_sanitize(gauge_name)}"
+            lines += [f"# TYPE {name} gauge", f"{name} {self._read(gauge_name, read)!r}"]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _read(name: str, read: Callable[[], float]) -> float:
+        try:
+            return float(read())
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.debug("Gauge %s failed: %s", name, exc)
+            return float("nan")
+
+
+def _sanitize(name: str) -> str:
+    return "".join(ch if ch.isalnum() else "_" for ch in name)
+
+
+class MetricsExporter:
+    """Periodically writes the registry to ``path`` on a background thread.
+
+    Files ending in ``.prom`` or ``.txt`` get the Prometheus text format
+    (suitable for node_exporter's textfile collector), anything else JSON.
+    The file is replaced atomically, so readers never see a partial dump.
+    """
+
+    def __init__(self, registry: Metrics, path: str, interval: float = 10.0) -> None:
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.prometheus = path.endswith((".prom", ".txt"))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="MetricsExporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread after writing a final dump."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def write(self) -> None:
+        text = self.registry.to_prometheus() if self.prometheus else self.registry.to_json()
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        os.replace(tmp, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._write_logged()
+        self._write_logged()
+
+    def _write_logged(self) -> None:
+        try:
+            self.write()
+        except OSError as exc:  # pragma: no cover - logowanie błędów
+            logger.warning("Metrics export to %s failed: %s", self.path, exc)
+
+
+#: Registry used by the application (disabled until the overlay or an export needs it)
+metrics = Metrics()
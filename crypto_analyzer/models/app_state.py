@@ -3,13 +3,21 @@ Singleton do zarządzania stanem aplikacji
 """
 
 import threading
-from typing import Optional, Dict, Any
-from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass
 from PyQt6.QtCore import QObject, pyqtSignal
 
-@dataclass
+from ..metrics import metrics
+from .candle_store import CandleStore, Candles
+from .order_book import OrderBookSnapshot
+
+@dataclass(frozen=True, slots=True)
 class MarketFrame:
-    """Struktura danych reprezentująca ramkę rynkową"""
+    """Struktura danych reprezentująca ramkę rynkową (jedna świeca).
+
+    Stan order booka nie jest częścią ramki - przesyłany jest osobno jako
+    :class:`OrderBookSnapshot` sygnałem ``orderbookUpdated``.
+    """
     timestamp: int
     symbol: str
     open_price: float
@@ -18,10 +26,6 @@ class MarketFrame:
     close_price: float
     volume: float
     interval: str
-    
-    # Order book data
-    bids: list = field(default_factory=list)  # [(price, quantity), ...]
-    asks: list = field(default_factory=list)  # [(price, quantity), ...]
 
 class AppState(QObject):
     """
@@ -30,6 +34,8 @@ class AppState(QObject):
     
     # Sygnały Qt
     dataUpdated = pyqtSignal(MarketFrame)
+    historyReplaced = pyqtSignal()  # Cała historia świec została podmieniona
+    orderbookUpdated = pyqtSignal(object)  # OrderBookSnapshot
     connectionStatusChanged = pyqtSignal(bool)  # True = connected, False = disconnected
     errorOccurred = pyqtSignal(str)  # Komunikat błędu
     themeChanged = pyqtSignal(str)  # 'light' lub 'dark'
@@ -62,19 +68,76 @@ class AppState(QObject):
         self.active_indicators: Dict[str, Dict[str, Any]] = {
             'sma_fast': {'enabled': False, 'period': 9},
             'sma_slow': {'enabled': False, 'period': 21},
+            'ema': {'enabled': False, 'period': 50},
+            'wma': {'enabled': False, 'period': 20},
+            'vwap': {'enabled': False, 'anchor_ms': 86_400_000},
             'bollinger_bands': {'enabled': False, 'period': 20, 'std_dev': 2},
-            'keltner_channels': {'enabled': False, 'period': 20, 'atr_mult': 2}
+            'keltner_channels': {'enabled': False, 'period': 20, 'atr_mult': 2},
+            'rsi': {'enabled': False, 'period': 14},
+            'macd': {'enabled': False, 'fast': 12, 'slow': 26, 'signal': 9},
+            'atr': {'enabled': False, 'period': 14},
+            'stochastic': {'enabled': False, 'k_period': 14, 'd_period': 3},
+            'obv': {'enabled': False},
         }
         
         # Ostatnie dane rynkowe
         self.latest_market_frame: Optional[MarketFrame] = None
+        self.latest_orderbook: Optional[OrderBookSnapshot] = None
         
-        # Historia świec (cache)
-        self.candle_history: list = []
-        self.max_history_size: int = 1000
+        # Historia świec per (symbol, interwał) obserwowanej pary;
+        # ``candles`` wskazuje bufor bieżącej pary
+        self._history_size = 1000
+        self._stores: Dict[Tuple[str, str], CandleStore] = {}
+        self.candles: CandleStore = self.store(self.current_symbol, self.current_interval, create=True)
+
+    @property
+    def max_history_size(self) -> int:
+        """Maksymalna liczba przechowywanych świec"""
+        return self._history_size
+
+    @max_history_size.setter
+    def max_history_size(self, size: int):
+        self._history_size = size
+        for store in self._stores.values():
+            store.resize(size)
+
+    @staticmethod
+    def _key(symbol: str, interval: str) -> Tuple[str, str]:
+        return symbol.upper(), interval
+
+    def store(self, symbol: str, interval: str, create: bool = False) -> Optional[CandleStore]:
+        """Zwraca bufor świec pary (symbol, interwał), opcjonalnie go tworząc"""
+        key = self._key(symbol, interval)
+        store = self._stores.get(key)
+        if store is None and create:
+            store = self._stores[key] = CandleStore(self._history_size)
+        return store
+
+    def drop_store(self, symbol: str, interval: str):
+        """Usuwa bufor pary, która przestała być obserwowana (poza bieżącą)"""
+        key = self._key(symbol, interval)
+        if key != self._key(self.current_symbol, self.current_interval):
+            self._stores.pop(key, None)
+
+    @property
+    def candle_history(self) -> list:
+        """Historia świec jako lista słowników (widok zgodności wstecznej)"""
+        return self.candles.to_records()
     
+    @metrics.timed("app_state.update_market_data")
     def update_market_data(self, market_frame: MarketFrame):
-        """Aktualizuje dane rynkowe i emituje sygnał"""
+        """Aktualizuje dane rynkowe i emituje sygnał.
+
+        Ramki innych obserwowanych par trafiają tylko do ich buforów (bez
+        sygnału); ramki par bez bufora są pomijane.
+        """
+        if (market_frame.symbol.upper() != self.current_symbol.upper()
+                or market_frame.interval != self.current_interval):
+            store = self._stores.get(self._key(market_frame.symbol, market_frame.interval))
+            if store is not None:
+                self._upsert(store, market_frame)
+            return
+
         self.latest_market_frame = market_frame
         
         # Aktualizuj historię świec
@@ -83,39 +146,79 @@ class AppState(QObject):
         # Emituj sygnał
         self.dataUpdated.emit(market_frame)
     
+    def update_orderbook(self, snapshot: OrderBookSnapshot):
+        """Aktualizuje stan order booka i emituje sygnał.
+
+        Snapshoty starsze niż bieżący (ta sama wersja lub niższa dla tego
+        samego symbolu) są pomijane.
+        """
+        current = self.latest_orderbook
+        if (current is not None and current.symbol == snapshot.symbol
+                and snapshot.version <= current.version):
+            return
+        self.latest_orderbook = snapshot
+        self.orderbookUpdated.emit(snapshot)
+    
     def _update_candle_history(self, market_frame: MarketFrame):
         """Aktualizuje historię świec"""
-        # Sprawdź czy to nowa świeca czy aktualizacja istniejącej
-        if (self.candle_history and 
-            self.candle_history[-1]['timestamp'] == market_frame.timestamp):
-            # Aktualizuj ostatnią świecę
-            self.candle_history[-1] = self._market_frame_to_dict(market_frame)
-        else:
-            # Dodaj nową świecę
-            self.candle_history.append(self._market_frame_to_dict(market_frame))
-            
-            # Usuń stare świece jeśli przekroczono limit
-            if len(self.candle_history) > self.max_history_size:
-                self.candle_history.pop(0)
+        self._upsert(self.candles, market_frame)
+
+    @staticmethod
+    def _upsert(store: CandleStore, market_frame: MarketFrame):
+        # Aktualizacja ostatniej świecy lub dopisanie nowej (z usunięciem
+        # najstarszej po przekroczeniu limitu) - wszystko w O(1)
+        store.upsert(
+            market_frame.timestamp,
+            market_frame.open_price,
+            market_frame.high_price,
+            market_frame.low_price,
+            market_frame.close_price,
+            market_frame.volume,
+        )
     
-    def _market_frame_to_dict(self, market_frame: MarketFrame) -> dict:
-        """Konwertuje MarketFrame do słownika"""
-        return {
-            'timestamp': market_frame.timestamp,
-            'open': market_frame.open_price,
-            'high': market_frame.high_price,
-            'low': market_frame.low_price,
-            'close': market_frame.close_price,
-            'volume': market_frame.volume
-        }
+    def replace_history(self, candles: Candles, symbol: Optional[str] = None, interval: Optional[str] = None):
+        """Podmienia całą historię świec i emituje jeden sygnał.
+
+        Używane przy ładowaniu historii z REST - zamiast setek emisji
+        ``dataUpdated`` widoki i kontrolery przeliczają się raz.  Historia
+        innej niż bieżąca pary trafia tylko do jej bufora, bez sygnału.
+        """
+        symbol = symbol or self.current_symbol
+        interval = interval or self.current_interval
+        store = self.store(symbol, interval, create=True)
+        store.replace(candles)
+        if store is self.candles:
+            self._publish_history()
+
+    def _publish_history(self):
+        """Ustawia ostatnią ramkę z bufora bieżącej pary i emituje historyReplaced"""
+        if self.candles:
+            last = self.candles.view()
+            self.latest_market_frame = MarketFrame(
+                timestamp=int(last.timestamp[-1]),
+                symbol=self.current_symbol,
+                open_price=float(last.open[-1]),
+                high_price=float(last.high[-1]),
+                low_price=float(last.low[-1]),
+                close_price=float(last.close[-1]),
+                volume=float(last.volume[-1]),
+                interval=self.current_interval,
+            )
+        self.historyReplaced.emit()
     
     def set_symbol_interval(self, symbol: str, interval: str):
-        """Ustawia aktualny symbol i interwał"""
+        """Ustawia aktualny symbol i interwał.
+
+        Jeśli para była obserwowana, jej bufor już zawiera historię - wykres
+        jest od razu odświeżany sygnałem ``historyReplaced``.
+        """
         if symbol != self.current_symbol or interval != self.current_interval:
             self.current_symbol = symbol
             self.current_interval = interval
-            # Wyczyść historię przy zmianie symbolu/interwału
-            self.candle_history.clear()
+            self.candles = self.store(symbol, interval, create=True)
+            self.latest_market_frame = None
+            if self.candles:
+                self._publish_history()
     
     def set_connection_status(self, connected: bool):
         """Ustawia status połączenia"""
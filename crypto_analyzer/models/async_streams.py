@@ -0,0 +1,698 @@
+"""asyncio-native market data streams over Binance combined WebSockets.
+
+:class:`AsyncStreamClient` keeps any number of streams on a few combined
+connections.  It adds and removes streams with the live ``SUBSCRIBE`` /
+``UNSUBSCRIBE`` methods rather than reconnecting, and decodes messages into
+typed :class:`KlineUpdate` and :class:`DepthUpdate` records.  Consumers
+read them in batches from the :meth:`AsyncStreamClient.updates` async
+iterator.  Everything that arrived while a consumer was busy comes out as
+one :class:`StreamBatch`, so each message costs a JSON parse and a list
+append, and dozens of streams fit on one thread.
+
+:class:`StreamThread` runs a client on its own event loop thread behind the
+synchronous :class:`~crypto_analyzer.models.subscriptions.SubscriptionManager`
+interface.  That is how the Qt application uses it: batches continue through
+the ingest pipeline to the GUI thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from itertools import count
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Union
+
+from .app_state import MarketFrame
+from .subscriptions import MAX_STREAMS_PER_SOCKET, SocketHealth
+
+logger = logging.getLogger(__name__)
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+TESTNET_STREAM_URL = "wss://stream.testnet.binance.vision/stream"
+
+#: Binance accepts at most 5 incoming messages per second on a connection.
+COMMAND_INTERVAL = 0.25
+
+
+class StreamError(Exception):
+    """Binance rejected a ``SUBSCRIBE`` / ``UNSUBSCRIBE`` request."""
+
+
+class KlineUpdate(NamedTuple):
+    stream: str
+    symbol: str
+    interval: str
+    open_time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    closed: bool
+    event_time: int
+
+    def to_frame(self) -> MarketFrame:
+        return MarketFrame(
+            self.open_time, self.symbol, self.open, self.high, self.low, self.close, self.volume, self.interval
+        )
+
+
+class DepthUpdate(NamedTuple):
+    stream: str
+    symbol: str
+    event_time: int
+    first_update_id: int
+    final_update_id: int
+    bids: list  # [[price, qty], ...] as strings
+    asks: list
+
+    def as_event(self) -> dict:
+        """The diff-depth payload in Binance's format (as :class:`OrderBookSync` expects)."""
+        return {
+            "e": "depthUpdate",
+            "E": self.event_time,
+            "s": self.symbol,
+            "U": self.first_update_id,
+            "u": self.final_update_id,
+            "b": self.bids,
+            "a": self.asks,
+        }
+
+
+Update = Union[KlineUpdate, DepthUpdate]
+
+
+class StreamBatch(NamedTuple):
+    """Updates that arrived while the consumer was busy, in arrival order per kind."""
+
+    klines: List[KlineUpdate]
+    depth: List[DepthUpdate]
+    received_at: float  # time.monotonic() of the oldest update
+    dropped: int = 0  # updates lost to a full consumer buffer since the previous batch
+
+
+def decode_kline(stream: str, data: dict) -> KlineUpdate:
+    k = data["k"]
+    return KlineUpdate(
+        stream, k["s"], k["i"], int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]),
+        float(k["c"]), float(k["v"]), bool(k["x"]), int(data.get("E", 0)),
+    )
+
+
+def decode_depth(stream: str, data: dict) -> DepthUpdate:
+    return DepthUpdate(stream, data["s"], int(data.get("E", 0)), int(data["U"]), int(data["u"]), data["b"], data["a"])
+
+
+@dataclass
+class StreamStats:
+    """Counters kept by :class:`AsyncStreamClient`."""
+
+    messages: int = 0
+    decoded: int = 0
+    skipped: int = 0  # in-progress klines no consumer asked for
+    dropped: int = 0  # updates lost to full consumer buffers
+    commands: int = 0
+    reconnects: int = 0
+    connections: int = 0
+
+
+class _Consumer:
+    """Buffer of one :meth:`AsyncStreamClient.updates` iterator."""
+
+    def __init__(self, klines: bool, depth: bool, closed_only: bool, max_pending: int) -> None:
+        self.klines = klines
+        self.depth = depth
+        self.closed_only = closed_only
+        self.max_pending = max_pending
+        self.buffer: deque = deque()
+        self.first_at = 0.0
+        self.dropped = 0
+        self.ready = asyncio.Event()
+
+    def put(self, update: Update, now: float) -> bool:
+        if type(update) is KlineUpdate:
+            if not self.klines or (self.closed_only and not update.closed):
+                return False
+        elif not self.depth:
+            return False
+        if not self.buffer:
+            self.first_at = now
+            self.ready.set()
+        elif len(self.buffer) >= self.max_pending:
+            self.buffer.popleft()
+            self.dropped += 1
+        self.buffer.append(update)
+        return True
+
+    def take(self, max_batch: int, now: float) -> StreamBatch:
+        klines: List[KlineUpdate] = []
+        depth: List[DepthUpdate] = []
+        buffer = self.buffer
+        for _ in range(min(max_batch, len(buffer))):
+            update = buffer.popleft()
+            (klines if type(update) is KlineUpdate else depth).append(update)
+        batch = StreamBatch(klines, depth, self.first_at, self.dropped)
+        self.dropped = 0
+        self.first_at = now
+        if not buffer:
+            self.ready.clear()
+        return batch
+
+
+class _Connection:
+    """One combined connection; reconnects and resubscribes until closed."""
+
+    def __init__(self, client: "AsyncStreamClient", name: str) -> None:
+        self.client = client
+        self.name = name
+        self.streams: Set[str] = set()
+        self.ws = None
+        self.last_seen = client._clock()
+        self.received = False
+        self.failed = False
+        self._acks: Dict[int, asyncio.Future] = {}
+        self._send_lock = asyncio.Lock()
+        self._last_command = 0.0
+        self._reconnect_now = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._resubscribed: Optional[asyncio.Future] = None  # ack of the SUBSCRIBE sent on connect
+        self._closing = False
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=f"stream-{name}")
+
+    async def command(self, method: str, params: List[str]) -> None:
+        """Send a request and wait for its acknowledgement.
+
+        While disconnected nothing is sent: the connection subscribes its
+        current streams whenever it (re)connects, so ``SUBSCRIBE`` waits for
+        that acknowledgement instead and ``UNSUBSCRIBE`` returns at once.
+        """
+        timeout = self.client.ack_timeout
+        if self.ws is None:
+            if method != "SUBSCRIBE":
+                return
+            await asyncio.wait_for(self._connected.wait(), timeout)
+            ack = self._resubscribed
+        else:
+            ack = await self._send(method, params)
+        if ack is not None:
+            await asyncio.wait_for(asyncio.shield(ack), timeout)
+
+    def reconnect(self) -> None:
+        """Drop the current connection and reconnect without waiting for the backoff."""
+        self._reconnect_now.set()
+        if self.ws is not None:
+            self.client._spawn(self.ws.close())
+
+    async def close(self) -> None:
+        self._closing = True
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _send(self, method: str, params: List[str]) -> Optional[asyncio.Future]:
+        ws = self.ws
+        if ws is None or not params:
+            return None
+        loop = asyncio.get_running_loop()
+        async with self._send_lock:
+            wait = self._last_command + COMMAND_INTERVAL - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_command = loop.time()
+            ident = next(self.client._ids)
+            ack = self._acks[ident] = loop.create_future()
+            try:
+                await ws.send(json.dumps({"method": method, "params": params, "id": ident}))
+            except Exception as exc:
+                # The streams are subscribed again on reconnect
+                self._acks.pop(ident, None)
+                logger.warning("%s on %s failed: %s", method, self.name, exc)
+                return None
+        self.client._stats.commands += 1
+        return ack
+
+    async def _run(self) -> None:
+        connect = self.client._connect_fn()
+        attempt = 0
+        while not self._closing:
+            try:
+                async with connect(self.client.url, max_size=None) as ws:
+                    self.ws = ws
+                    ack = self._resubscribed = await self._send("SUBSCRIBE", sorted(self.streams))
+                    if ack is not None:
+                        ack.add_done_callback(self._log_rejection)
+                    self._connected.set()
+                    attempt = 0
+                    await self._read(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Stream connection %s failed: %s", self.name, exc)
+            finally:
+                self.ws = None
+                self._connected.clear()
+                self._resubscribed = None
+                for ack in self._acks.values():
+                    if not ack.done():
+                        ack.set_exception(ConnectionError(f"connection {self.name} closed"))
+                        ack.exception()  # retrieved: waiters get it, nobody else needs to
+                self._acks.clear()
+            if self._closing:
+                break
+            delay = min(self.client.max_backoff, self.client.backoff * 2 ** attempt) * (0.5 + 0.5 * random.random())
+            attempt += 1
+            if not self._reconnect_now.is_set():
+                try:
+                    await asyncio.wait_for(self._reconnect_now.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._reconnect_now.clear()
+            self.client._stats.reconnects += 1
+            self.last_seen = self.client._clock()
+            self.received = False
+            self.failed = False
+
+    async def _read(self, ws) -> None:
+        dispatch = self.client._dispatch
+        clock = self.client._clock
+        async for raw in ws:
+            msg = json.loads(raw)
+            stream = msg.get("stream")
+            if stream is not None:
+                self.last_seen = clock()
+                self.received = True
+                dispatch(stream, msg["data"])
+            elif "id" in msg:
+                ack = self._acks.pop(msg["id"], None)
+                if ack is not None and not ack.done():
+                    if msg.get("error"):
+                        ack.set_exception(StreamError(str(msg["error"])))
+                    else:
+                        ack.set_result(msg.get("result"))
+            elif msg.get("error") or msg.get("e") == "error":
+                logger.error("Stream error on %s: %s", self.name, msg)
+                self.failed = True
+
+    def _log_rejection(self, ack: asyncio.Future) -> None:
+        if not ack.cancelled() and ack.exception() is not None:
+            logger.error("Resubscribing %s failed: %s", self.name, ack.exception())
+            self.failed = True
+
+
+class AsyncStreamClient:
+    """Reference-counted Binance streams on combined connections (one event loop).
+
+    All methods must be called on the loop the client was created on.
+    Streams are added to connections with room left, and a new connection
+    is only opened when all of them are full.  Messages for released
+    streams are dropped, and a connection with no streams left is closed.
+    Dropped connections reconnect with exponential backoff and jitter and
+    resubscribe their streams.  Like
+    :class:`~crypto_analyzer.models.subscriptions.SubscriptionManager`, the
+    client reports :meth:`health` and can :meth:`reconnect` a connection,
+    so a supervisor can replace connections that went silent.
+
+    ``connect`` replaces :func:`websockets.asyncio.client.connect`, e.g. in
+    tests.
+    """
+
+    def __init__(
+        self,
+        url: str = BINANCE_STREAM_URL,
+        max_streams_per_connection: int = MAX_STREAMS_PER_SOCKET,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        ack_timeout: float = 10.0,
+        max_pending: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+        connect: Optional[Callable] = None,
+    ) -> None:
+        self.url = url
+        self.max_streams_per_connection = max_streams_per_connection
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.ack_timeout = ack_timeout
+        self.max_pending = max_pending
+        self._clock = clock
+        self._connect = connect
+        self._refs: Dict[str, int] = {}
+        self._owner: Dict[str, _Connection] = {}
+        self._connections: Dict[str, _Connection] = {}
+        self._consumers: Set[_Consumer] = set()
+        self._open_klines = False  # a consumer wants klines still in progress
+        self._names = count(1)
+        self._ids = count(1)
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = StreamStats()
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+    @property
+    def streams(self) -> Set[str]:
+        """Streams with at least one reference."""
+        return set(self._refs)
+
+    @property
+    def sockets(self) -> Dict[str, Set[str]]:
+        return {name: set(connection.streams) for name, connection in self._connections.items()}
+
+    def refcount(self, stream: str) -> int:
+        return self._refs.get(stream, 0)
+
+    async def subscribe(self, streams: Iterable[str], wait: bool = True) -> List[str]:
+        """Add a reference to each stream; returns the newly added ones.
+
+        The bookkeeping is updated before the first ``await``, and the
+        requests run as tasks of their own.  Cancelling the call therefore
+        never leaves it half done: the streams count as subscribed (release
+        them with :meth:`unsubscribe`) and are requested from Binance even
+        if the caller stops waiting for the acknowledgement.  With
+        ``wait=False`` the call returns without waiting at all.
+        """
+        self._closed = False
+        added: List[str] = []
+        for stream in streams:
+            refs = self._refs.get(stream, 0)
+            self._refs[stream] = refs + 1
+            if not refs:
+                added.append(stream)
+        requests: Dict[_Connection, List[str]] = {}
+        for stream in added:
+            connection = self._connection_with_room()
+            connection.streams.add(stream)
+            self._owner[stream] = connection
+            requests.setdefault(connection, []).append(stream)
+        await self._request("SUBSCRIBE", requests, wait)
+        return added
+
+    async def unsubscribe(self, streams: Iterable[str], wait: bool = True) -> List[str]:
+        """Drop a reference to each stream; returns the released ones (see :meth:`subscribe`)."""
+        removed: List[str] = []
+        requests: Dict[_Connection, List[str]] = {}
+        for stream in streams:
+            refs = self._refs.get(stream, 0)
+            if refs > 1:
+                self._refs[stream] = refs - 1
+                continue
+            if self._refs.pop(stream, None) is None:
+                continue
+            removed.append(stream)
+            connection = self._owner.pop(stream)
+            connection.streams.discard(stream)
+            requests.setdefault(connection, []).append(stream)
+        for connection in [c for c in requests if not c.streams]:
+            del requests[connection]
+            del self._connections[connection.name]
+            self._spawn(connection.close())
+        await self._request("UNSUBSCRIBE", requests, wait)
+        return removed
+
+    async def close(self) -> None:
+        """Release every stream, close the connections and end all :meth:`updates` iterators."""
+        self._closed = True
+        connections = list(self._connections.values())
+        self._connections.clear()
+        self._owner.clear()
+        self._refs.clear()
+        await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+        for consumer in self._consumers:
+            consumer.ready.set()
+
+    def health(self) -> List[SocketHealth]:
+        now = self._clock()
+        return [
+            SocketHealth(name, frozenset(c.streams), now - c.last_seen, c.received, c.failed)
+            for name, c in self._connections.items()
+        ]
+
+    def reconnect(self, name: str) -> str:
+        """Reconnect connection ``name`` now; returns its name (``""`` if unknown or empty)."""
+        connection = self._connections.get(name)
+        if connection is None or not connection.streams:
+            return ""
+        connection.reconnect()
+        return name
+
+    def stats(self) -> StreamStats:
+        return replace(self._stats, connections=len(self._connections))
+
+    # ------------------------------------------------------------------
+    # Consumption
+    # ------------------------------------------------------------------
+    def updates(
+        self,
+        klines: bool = True,
+        depth: bool = True,
+        closed_only: bool = False,
+        max_batch: int = 1_000,
+    ) -> "Updates":
+        """Async iterator of batches of the selected updates, until the client is closed.
+
+        Updates are buffered from the moment the iterator is created (so
+        nothing is missed between creating it and subscribing), in a buffer
+        of at most ``max_pending`` updates per iterator.  The oldest ones are
+        dropped when it is full, and counted in :attr:`StreamBatch.dropped`.
+        ``closed_only`` skips klines still in progress.  When no iterator
+        wants those, they are not even decoded.  Stop with
+        :meth:`Updates.aclose` or ``async with``.
+        """
+        return Updates(self, _Consumer(klines, depth, closed_only, self.max_pending), max_batch)
+
+    def _add_consumer(self, consumer: _Consumer) -> None:
+        self._consumers.add(consumer)
+        self._update_filters()
+
+    def _remove_consumer(self, consumer: _Consumer) -> None:
+        self._consumers.discard(consumer)
+        self._update_filters()
+
+    def _update_filters(self) -> None:
+        self._open_klines = any(c.klines and not c.closed_only for c in self._consumers)
+
+    def _dispatch(self, stream: str, data: dict) -> None:
+        stats = self._stats
+        stats.messages += 1
+        if stream not in self._refs:
+            return
+        if "@kline_" in stream:
+            if not self._open_klines and not data["k"]["x"]:
+                stats.skipped += 1
+                return
+            update: Update = decode_kline(stream, data)
+        elif "@depth" in stream:
+            update = decode_depth(stream, data)
+        else:
+            return
+        stats.decoded += 1
+        now = self._clock()
+        for consumer in self._consumers:
+            pending = len(consumer.buffer)
+            if consumer.put(update, now) and pending >= consumer.max_pending:
+                stats.dropped += 1
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _connection_with_room(self) -> _Connection:
+        for connection in self._connections.values():
+            if len(connection.streams) < self.max_streams_per_connection:
+                return connection
+        connection = _Connection(self, f"stream-{next(self._names)}")
+        self._connections[connection.name] = connection
+        return connection
+
+    async def _request(self, method: str, requests: Dict[_Connection, List[str]], wait: bool) -> None:
+        tasks = [self._spawn(connection.command(method, streams)) for connection, streams in requests.items()]
+        if wait and tasks:
+            # asyncio.wait leaves the tasks running if this call is cancelled
+            done, _ = await asyncio.wait(tasks)
+            for task in done:
+                task.result()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Stream request failed: %s", task.exception())
+
+    def _connect_fn(self) -> Callable:
+        if self._connect is None:
+            from websockets.asyncio.client import connect  # imported on first use
+
+            self._connect = connect
+        return self._connect
+
+
+class Updates:
+    """Iterator returned by :meth:`AsyncStreamClient.updates`."""
+
+    def __init__(self, client: AsyncStreamClient, consumer: _Consumer, max_batch: int) -> None:
+        self._client = client
+        self._consumer = consumer
+        self._max_batch = max_batch
+        client._add_consumer(consumer)
+
+    def __aiter__(self) -> "Updates":
+        return self
+
+    async def __anext__(self) -> StreamBatch:
+        consumer = self._consumer
+        while True:
+            await consumer.ready.wait()
+            if consumer.buffer:
+                return consumer.take(self._max_batch, self._client._clock())
+            if self._client._closed or consumer not in self._client._consumers:
+                await self.aclose()
+                raise StopAsyncIteration
+            consumer.ready.clear()
+
+    async def aclose(self) -> None:
+        self._client._remove_consumer(self._consumer)
+        self._consumer.ready.set()  # wakes a pending __anext__, which then stops
+
+    async def __aenter__(self) -> "Updates":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+class StreamThread:
+    """:class:`AsyncStreamClient` on a dedicated event loop thread.
+
+    Offers the synchronous :class:`SubscriptionManager` interface, so the
+    :class:`ConnectionSupervisor` and :class:`DataController` can use it
+    unchanged, and calls ``on_batch(batch)`` on the loop thread for every
+    :class:`StreamBatch`.  One thread carries all streams.  The thread starts
+    with the first subscription and stops in :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        on_batch: Callable[[StreamBatch], None],
+        url: str = BINANCE_STREAM_URL,
+        max_streams_per_socket: int = MAX_STREAMS_PER_SOCKET,
+        closed_only: bool = False,
+        max_batch: int = 1_000,
+        timeout: float = 10.0,
+        **client_options,
+    ) -> None:
+        self.on_batch = on_batch
+        self.url = url
+        self.max_streams_per_socket = max_streams_per_socket
+        self.closed_only = closed_only
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._client_options = client_options
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[AsyncStreamClient] = None
+        self._consume_task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # SubscriptionManager interface
+    # ------------------------------------------------------------------
+    @property
+    def streams(self) -> Set[str]:
+        return self._call(lambda client: client.streams, start=False) or set()
+
+    @property
+    def sockets(self) -> Dict[str, Set[str]]:
+        return self._call(lambda client: client.sockets, start=False) or {}
+
+    def refcount(self, stream: str) -> int:
+        return self._call(lambda client: client.refcount(stream), start=False) or 0
+
+    def subscribe(self, streams: Iterable[str]) -> List[str]:
+        streams = list(streams)
+        return self._call(lambda client: client.subscribe(streams, wait=False))
+
+    def unsubscribe(self, streams: Iterable[str]) -> List[str]:
+        streams = list(streams)
+        return self._call(lambda client: client.unsubscribe(streams, wait=False), start=False) or []
+
+    def close(self) -> None:
+        """Close every connection and stop the loop thread."""
+        with self._lock:
+            loop, thread, client, task = self._loop, self._thread, self._client, self._consume_task
+            self._loop = self._thread = self._client = self._consume_task = None
+        if loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(client, task), loop)
+        try:
+            future.result(self.timeout)
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.warning("Closing the stream thread failed: %s", exc)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(self.timeout)
+
+    def health(self) -> List[SocketHealth]:
+        return self._call(lambda client: client.health(), start=False) or []
+
+    def reconnect(self, name: str) -> str:
+        return self._call(lambda client: client.reconnect(name), start=False) or ""
+
+    def stats(self) -> StreamStats:
+        return self._call(lambda client: client.stats(), start=False) or StreamStats()
+
+    # ------------------------------------------------------------------
+    # Loop thread
+    # ------------------------------------------------------------------
+    def _call(self, fn: Callable[[AsyncStreamClient], object], start: bool = True):
+        """Run ``fn(client)`` on the loop thread and return its (awaited) result."""
+        with self._lock:
+            if self._loop is None:
+                if not start:
+                    return None
+                self._start()
+            loop, client = self._loop, self._client
+
+        async def run():
+            result = fn(client)
+            return await result if inspect.isawaitable(result) else result
+
+        return asyncio.run_coroutine_threadsafe(run(), loop).result(self.timeout)
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            self._client = AsyncStreamClient(self.url, self.max_streams_per_socket, **self._client_options)
+            updates = self._client.updates(closed_only=self.closed_only, max_batch=self.max_batch)
+            self._consume_task = loop.create_task(self._consume(updates))
+            loop.call_soon(ready.set)
+            loop.run_forever()
+            loop.close()
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run, name="StreamThread", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    async def _consume(self, updates: Updates) -> None:
+        async with updates:
+            async for batch in updates:
+                try:
+                    self.on_batch(batch)
+                except Exception as exc:  # pragma: no cover - logowanie błędów
+                    logger.error("Stream batch handler failed: %s", exc)
+
+    async def _shutdown(self, client: AsyncStreamClient, task: asyncio.Task) -> None:
+        await client.close()
+        await asyncio.gather(task, return_exceptions=True)
@@ -1,35 +1,72 @@
-"""Wrapper for Binance REST and WebSocket clients."""
+"""Wrapper for Binance REST and WebSocket clients.
+
+python-binance (and with it aiohttp, dateparser and regex) is imported on
+first use of a socket or of :attr:`BinanceClient.client`, not with this
+module, so that it stays off the application's startup path.
+"""
 
 from __future__ import annotations
 
-from typing import Callable, Optional
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from .rest_client import BINANCE_URL, TESTNET_URL, BinanceRestClient
 
-from binance.client import Client
-from binance import ThreadedWebsocketManager
+if TYPE_CHECKING:
+    from binance import ThreadedWebsocketManager
+    from binance.client import Client
 
 
 class BinanceClient:
     """Simple wrapper around python-binance to unify access."""
 
     def __init__(self, api_key: str = "", api_secret: str = "", testnet: bool = False) -> None:
-        self._client = Client(api_key=api_key, api_secret=api_secret, testnet=testnet)
+        # Market data goes through the rate-limited, pooled REST client
+        self.rest = BinanceRestClient(base_url=TESTNET_URL if testnet else BINANCE_URL, api_key=api_key)
         self._api_key = api_key
         self._api_secret = api_secret
         self._testnet = testnet
+        self._client: Optional[Client] = None
         self._twm: Optional[ThreadedWebsocketManager] = None
 
+    @property
+    def client(self) -> "Client":
+        """python-binance REST client, created on first use (its constructor pings the API)."""
+        if self._client is None:
+            from binance.client import Client
+
+            self._client = Client(api_key=self._api_key, api_secret=self._api_secret, testnet=self._testnet)
+        return self._client
+
     # ------------------------------------------------------------------
     # REST methods
     # ------------------------------------------------------------------
-    def get_klines(self, symbol: str, interval: str, limit: int = 500):
-        """Fetch kline/candlestick data."""
-        return self._client.get_klines(symbol=symbol, interval=interval, limit=limit)
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 500,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ):
+        """Fetch kline/candlestick data, optionally bounded by open times (ms)."""
+        return self.rest.get_klines(symbol, interval, limit=limit, start_time=start_time, end_time=end_time)
+
+    def get_order_book(self, symbol: str, limit: int = 1000):
+        """Fetch an order book snapshot (includes ``lastUpdateId``)."""
+        return self.rest.get_order_book(symbol, limit=limit)
+
+    def now(self) -> int:
+        """Current time in milliseconds (replay clients follow the recording)."""
+        return int(time.time() * 1000)
 
     # ------------------------------------------------------------------
     # WebSocket methods
     # ------------------------------------------------------------------
     def _ensure_twm(self) -> None:
         if self._twm is None:
+            from binance import ThreadedWebsocketManager
+
             self._twm = ThreadedWebsocketManager(
                 api_key=self._api_key,
                 api_secret=self._api_secret,
@@ -43,11 +80,24 @@ class BinanceClient:
         assert self._twm is not None
         return self._twm.start_kline_socket(symbol=symbol, interval=interval, callback=callback)
 
-    def start_depth_socket(self, symbol: str, callback: Callable):
-        """Start a depth WebSocket stream."""
+    def start_depth_socket(self, symbol: str, callback: Callable, interval: Optional[int] = None):
+        """Start a diff-depth WebSocket stream (``interval`` in ms, e.g. 100)."""
+        self._ensure_twm()
+        assert self._twm is not None
+        if interval is None:
+            return self._twm.start_depth_socket(symbol=symbol, callback=callback)
+        return self._twm.start_depth_socket(symbol=symbol, callback=callback, interval=interval)
+
+    def start_multiplex_socket(self, streams: List[str], callback: Callable):
+        """Start a combined stream (messages arrive as ``{"stream", "data"}``)."""
         self._ensure_twm()
         assert self._twm is not None
-        return self._twm.start_depth_socket(symbol=symbol, callback=callback)
+        return self._twm.start_multiplex_socket(callback=callback, streams=streams)
+
+    def stop_socket(self, socket_name: str) -> None:
+        """Stop a single stream, keeping the manager and other streams alive."""
+        if self._twm:
+            self._twm.stop_socket(socket_name)
 
     def stop(self) -> None:
         """Stop all active WebSocket streams."""
@@ -0,0 +1,128 @@
+"""Typed access to candles persisted in the ``klines`` table."""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from .candle_store import Candles
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class CandleRepository:
+    """Stores candles keyed on ``(symbol, interval, timestamp)``.
+
+    The table is created ``WITHOUT ROWID`` so rows are clustered by the
+    primary key: a range read for one symbol/interval is a single b-tree
+    scan without a separate index lookup.
+    """
+
+    TABLE = "klines"
+    SCHEMA = f"""
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            symbol TEXT NOT NULL,
+            interval TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            open REAL NOT NULL,
+            high REAL NOT NULL,
+            low REAL NOT NULL,
+            close REAL NOT NULL,
+            volume REAL NOT NULL,
+            PRIMARY KEY (symbol, interval, timestamp)
+        ) WITHOUT ROWID
+    """
+    UPSERT_SQL = (
+        f"INSERT OR REPLACE INTO {TABLE} "
+        "(symbol, interval, timestamp, open, high, low, close, volume) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    _COLUMNS = "timestamp, open, high, low, close, volume"
+
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+    def ensure_schema(self) -> None:
+        """Create the table, migrating the legacy timestamp-keyed layout."""
+        with self.db.cursor() as cur:
+            cur.execute(f"PRAGMA table_info({self.TABLE})")
+            columns = cur.fetchall()
+        primary_key = [row[1] for row in sorted(columns, key=lambda r: r[5]) if row[5]]
+        if columns and primary_key != ["symbol", "interval", "timestamp"]:
+            self._migrate_legacy()
+        else:
+            self.db.create_table(self.SCHEMA)
+
+    def _migrate_legacy(self) -> None:
+        legacy = f"{self.TABLE}_legacy"
+        logger.info("Migrating %s table to (symbol, interval, timestamp) key", self.TABLE)
+        conn = self.db.connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(f"ALTER TABLE {self.TABLE} RENAME TO {legacy}")
+            conn.execute(self.SCHEMA)
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} "
+                "(symbol, interval, timestamp, open, high, low, close, volume) "
+                f"SELECT symbol, interval, timestamp, open, high, low, close, volume FROM {legacy} "
+                "WHERE symbol IS NOT NULL AND interval IS NOT NULL AND open IS NOT NULL "
+                "AND high IS NOT NULL AND low IS NOT NULL AND close IS NOT NULL AND volume IS NOT NULL"
+            )
+            conn.execute(f"DROP TABLE {legacy}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get_range(self, symbol: str, interval: str, start: Optional[int] = None, end: Optional[int] = None) -> Candles:
+        """Return candles with ``start <= timestamp <= end`` in time order."""
+        where = "symbol=? AND interval=?"
+        params: list = [symbol, interval]
+        if start is not None:
+            where += " AND timestamp>=?"
+            params.append(start)
+        if end is not None:
+            where += " AND timestamp<=?"
+            params.append(end)
+        return self._query(
+            f"SELECT {self._COLUMNS} FROM {self.TABLE} WHERE {where} ORDER BY timestamp",
+            params,
+        )
+
+    def latest(self, symbol: str, interval: str, n: int) -> Candles:
+        """Return the ``n`` most recent candles in time order."""
+        candles = self._query(
+            f"SELECT {self._COLUMNS} FROM {self.TABLE} WHERE symbol=? AND interval=? "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (symbol, interval, n),
+        )
+        return Candles(*(col[::-1].copy() for col in candles))
+
+    def _query(self, sql: str, params) -> Candles:
+        with self.db.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        if not rows:
+            return Candles.empty()
+        data = np.array(rows, dtype=np.float64)
+        return Candles(data[:, 0].astype(np.int64), *(data[:, i].copy() for i in range(1, 6)))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def to_rows(symbol: str, interval: str, candles: Candles) -> Iterator[Tuple]:
+        """Yield parameter tuples for :attr:`UPSERT_SQL`."""
+        columns = [col.tolist() for col in candles]
+        for ts, o, h, lo, c, v in zip(*columns):
+            yield (symbol, interval, ts, o, h, lo, c, v)
+
+    def upsert(self, symbol: str, interval: str, candles: Candles) -> int:
+        """Insert or replace ``candles`` in one transaction; returns the row count."""
+        self.db.executemany(self.UPSERT_SQL, self.to_rows(symbol, interval, candles))
+        return candles.rows
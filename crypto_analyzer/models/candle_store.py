@@ -0,0 +1,219 @@
+"""Fixed-capacity columnar storage for candlestick history."""
+
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Dict, List, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class Candles(NamedTuple):
+    """Column arrays describing a contiguous run of candles."""
+
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def rows(self) -> int:
+        """Number of candles (``len()`` counts the columns, as for any tuple)."""
+        return len(self.timestamp)
+
+    @classmethod
+    def empty(cls) -> "Candles":
+        return cls(np.empty(0, dtype=np.int64), *(np.empty(0) for _ in range(5)))
+
+    @classmethod
+    def from_klines(cls, klines: List[List]) -> "Candles":
+        """Build columns from Binance REST klines in a single pass."""
+        if not klines:
+            return cls.empty()
+        rows = np.array([kline[:6] for kline in klines], dtype=np.float64)
+        return cls(rows[:, 0].astype(np.int64), *(rows[:, i].copy() for i in range(1, 6)))
+
+
+#: Source of version numbers, shared by all stores so a number is never reused
+_versions = itertools.count(1)
+
+
+def merge_candles(*parts: Candles) -> Candles:
+    """Merge candle runs into one sorted run; later parts win on duplicates."""
+    parts = tuple(part for part in parts if part.rows)
+    if not parts:
+        return Candles.empty()
+    if len(parts) == 1:
+        return parts[0]
+    columns = [np.concatenate(cols) for cols in zip(*parts)]
+    # np.unique keeps the first occurrence, so search the reversed array
+    reversed_ts = columns[0][::-1]
+    _, first = np.unique(reversed_ts, return_index=True)
+    keep = len(reversed_ts) - 1 - first
+    return Candles(*(col[keep] for col in columns))
+
+
+class CandleStore:
+    """Ring buffer holding OHLCV candles in preallocated NumPy arrays.
+
+    Every row is written twice, at ``i`` and ``i + capacity``, so the live
+    window ``[head, head + len)`` is always one contiguous slice.  This makes
+    append, update of the last candle and eviction of the oldest one O(1)
+    while :meth:`view` can still hand out zero-copy column arrays.
+
+    Returned views are read-only and reflect the buffer as it was when they
+    were taken; callers must not keep them across later mutations.
+
+    ``version`` changes on every mutation.  ``history_version`` changes only
+    when rows other than the last one may have changed (replace, clear,
+    resize): while it stays the same, the history only grew at the end,
+    lost its oldest rows or had its last candle revised.  Both numbers
+    increase monotonically and are unique across stores.
+    """
+
+    COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, capacity: int = 1000) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._ohlcv = np.zeros((5, 2 * capacity), dtype=np.float64)
+        self._head = 0
+        self._size = 0
+        self._rewrite()
+
+    def _rewrite(self) -> None:
+        self.version = self.history_version = next(_versions)
+
+    # ------------------------------------------------------------------
+    # Properties
+    # ------------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    @property
+    def last_timestamp(self) -> int | None:
+        if not self._size:
+            return None
+        return int(self._timestamps[self._head + self._size - 1])
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def _write(self, pos: int, timestamp: int, values) -> None:
+        self._timestamps[pos] = timestamp
+        self._timestamps[pos + self._capacity] = timestamp
+        self._ohlcv[:, pos] = values
+        self._ohlcv[:, pos + self._capacity] = values
+
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Append a candle, evicting the oldest one when the buffer is full."""
+        values = (open_, high, low, close, volume)
+        if self._size < self._capacity:
+            self._write((self._head + self._size) % self._capacity, timestamp, values)
+            self._size += 1
+        else:
+            self._write(self._head, timestamp, values)
+            self._head = (self._head + 1) % self._capacity
+        self.version = next(_versions)
+
+    def update_last(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Overwrite the most recent candle."""
+        if not self._size:
+            raise IndexError("update_last on empty CandleStore")
+        pos = (self._head + self._size - 1) % self._capacity
+        self._write(pos, timestamp, (open_, high, low, close, volume))
+        self.version = next(_versions)
+
+    def upsert(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float) -> bool:
+        """Update the last candle if timestamps match, otherwise append.
+
+        Returns ``True`` when a new candle was appended.
+        """
+        if self._size and self.last_timestamp == timestamp:
+            self.update_last(timestamp, open_, high, low, close, volume)
+            return False
+        self.append(timestamp, open_, high, low, close, volume)
+        return True
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+        self._rewrite()
+
+    def replace(self, candles: Candles) -> None:
+        """Replace the whole content with ``candles`` (keeping the newest rows)."""
+        n = min(candles.rows, self._capacity)
+        start = candles.rows - n
+        self._head = 0
+        self._size = n
+        for buf_offset in (0, self._capacity):
+            self._timestamps[buf_offset:buf_offset + n] = candles.timestamp[start:]
+            for row, name in enumerate(self.COLUMNS[1:]):
+                self._ohlcv[row, buf_offset:buf_offset + n] = getattr(candles, name)[start:]
+        self._rewrite()
+
+    def resize(self, capacity: int) -> None:
+        """Change capacity, keeping the newest candles that still fit."""
+        if capacity == self._capacity:
+            return
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        current = Candles(*(np.array(col) for col in self.view()))
+        self._allocate(capacity)
+        self.replace(current)
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    def _window(self, array: np.ndarray) -> np.ndarray:
+        view = array[self._head:self._head + self._size]
+        view.flags.writeable = False
+        return view
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a zero-copy, contiguous view of a single column."""
+        if name == "timestamp":
+            return self._window(self._timestamps)
+        return self._window(self._ohlcv[self.COLUMNS.index(name) - 1])
+
+    def view(self) -> Candles:
+        """Return zero-copy views of all columns."""
+        return Candles(*(self.column(name) for name in self.COLUMNS))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the history as a DataFrame built directly from the arrays."""
+        import pandas as pd  # heavy; only the mplfinance and reference paths need it
+
+        return pd.DataFrame(dict(zip(self.COLUMNS, self.view())), copy=False)
+
+    def to_records(self) -> List[Dict[str, float]]:
+        """Return the history as a list of dictionaries (legacy format)."""
+        candles = self.view()
+        return [
+            {
+                "timestamp": int(ts),
+                "open": float(o),
+                "high": float(h),
+                "low": float(lo),
+                "close": float(c),
+                "volume": float(v),
+            }
+            for ts, o, h, lo, c, v in zip(*candles)
+        ]
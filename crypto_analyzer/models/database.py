@@ -2,32 +2,58 @@
 
 from __future__ import annotations
 
+import logging
 import os
+import queue
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
-from typing import Any, Dict, Iterable, Optional
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 
 class Database:
-    """Lightweight wrapper around sqlite3 providing helper methods."""
+    """Lightweight wrapper around sqlite3 providing helper methods.
+
+    The connection is shared between threads; statements and their commit
+    run under one lock, so transactions of different threads never mix.
+    """
+
+    # WAL lets readers run alongside the background writer; with WAL,
+    # synchronous=NORMAL only syncs at checkpoints and is still crash safe.
+    DEFAULT_PRAGMAS: Dict[str, Any] = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,  # KiB
+        "temp_store": "MEMORY",
+    }
 
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, pragmas: Optional[Dict[str, Any]] = None) -> None:
         self.path = path
+        self.pragmas = self.DEFAULT_PRAGMAS if pragmas is None else pragmas
         self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
 
     # ------------------------------------------------------------------
     # Connection management
     # ------------------------------------------------------------------
     def connect(self) -> sqlite3.Connection:
-        if self._conn is None:
-            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
-            self._conn = sqlite3.connect(self.path, check_same_thread=False)
-        return self._conn
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                for name, value in self.pragmas.items():
+                    self._conn.execute(f"PRAGMA {name}={value}")
+            return self._conn
 
     def close(self) -> None:
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def __enter__(self) -> "Database":
         self.connect()
@@ -38,13 +64,14 @@ class Database:
 
     @contextmanager
     def cursor(self):
-        conn = self.connect()
-        cur = conn.cursor()
-        try:
-            yield cur
-            conn.commit()
-        finally:
-            cur.close()
+        with self._lock:
+            conn = self.connect()
+            cur = conn.cursor()
+            try:
+                yield cur
+                conn.commit()
+            finally:
+                cur.close()
 
     # ------------------------------------------------------------------
     # CRUD helpers
@@ -54,6 +81,11 @@ class Database:
             cur.execute(sql, params)
             return cur
 
+    def executemany(self, sql: str, rows: Iterable[Iterable[Any]]) -> None:
+        """Execute ``sql`` for every row of parameters in one transaction."""
+        with self.cursor() as cur:
+            cur.executemany(sql, rows)
+
     def create_table(self, sql: str) -> None:
         self.execute(sql)
 
@@ -85,3 +117,176 @@ class Database:
         if where:
             sql += f" WHERE {where}"
         self.execute(sql, params)
+
+
+@dataclass
+class WriterStats:
+    """Counters describing the state of a :class:`DatabaseWriter`."""
+
+    enqueued: int = 0
+    written: int = 0
+    batches: int = 0
+    dropped: int = 0
+    errors: int = 0
+    backpressure_waits: int = 0
+    queue_depth: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+
+
+class DatabaseWriter:
+    """Write-behind writer running on a dedicated thread.
+
+    Producers call :meth:`submit` / :meth:`submit_many`, which only put work
+    on a bounded queue.  The writer thread drains the queue and groups the
+    statements into ``executemany`` calls inside a single transaction, which
+    is committed once ``batch_size`` rows were collected or ``flush_interval``
+    seconds passed since the first pending row.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = 10_000,
+        batch_size: int = 1_000,
+        flush_interval: float = 0.25,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stats = WriterStats()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write everything still queued and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self) -> "DatabaseWriter":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Producer API
+    # ------------------------------------------------------------------
+    def submit(self, sql: str, params: Iterable[Any], block: bool = True, timeout: Optional[float] = None) -> bool:
+        """Queue a single statement.  Returns ``False`` if it was dropped."""
+        return self._put((sql, [tuple(params)]), 1, block, timeout)
+
+    def submit_many(self, sql: str, rows: Iterable[Iterable[Any]], block: bool = True, timeout: Optional[float] = None) -> bool:
+        """Queue one statement for many rows as a single queue item."""
+        rows = [tuple(row) for row in rows]
+        return self._put((sql, rows), len(rows), block, timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been committed."""
+        done = threading.Event()
+        self._queue.put(done, timeout=timeout)
+        return done.wait(timeout)
+
+    def stats(self) -> WriterStats:
+        """Return a snapshot of the writer counters."""
+        with self._stats_lock:
+            snapshot = replace(self._stats)
+        snapshot.queue_depth = self._queue.qsize()
+        return snapshot
+
+    def _put(self, item, count: int, block: bool, timeout: Optional[float]) -> bool:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if not block:
+                with self._stats_lock:
+                    self._stats.dropped += count
+                return False
+            with self._stats_lock:
+                self._stats.backpressure_waits += 1
+            try:
+                self._queue.put(item, timeout=timeout)
+            except queue.Full:
+                with self._stats_lock:
+                    self._stats.dropped += count
+                return False
+        with self._stats_lock:
+            self._stats.enqueued += count
+        return True
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        db = Database(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                pending: List[Tuple[str, list]] = []
+                waiters: List[threading.Event] = []
+                rows = 0
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is self._STOP:
+                        stopping = True
+                        break
+                    if isinstance(item, threading.Event):
+                        waiters.append(item)
+                        break
+                    sql, params = item
+                    if pending and pending[-1][0] == sql:
+                        pending[-1][1].extend(params)
+                    else:
+                        pending.append((sql, list(params)))
+                    rows += len(params)
+                    if rows >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                if pending:
+                    self._write(db, pending, rows)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            db.close()
+
+    def _write(self, db: "Database", pending: List[Tuple[str, list]], rows: int) -> None:
+        started = time.perf_counter()
+        try:
+            conn = db.connect()
+            with conn:
+                for sql, params in pending:
+                    conn.executemany(sql, params)
+        except Exception as exc:
+            # A bad parameter row (OverflowError, TypeError) must not kill the writer thread
+            logger.warning("Batch write of %d rows failed: %s", rows, exc,
+                           exc_info=not isinstance(exc, sqlite3.Error))
+            with self._stats_lock:
+                self._stats.errors += rows
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._stats_lock:
+            self._stats.written += rows
+            self._stats.batches += 1
+            self._stats.last_flush_ms = elapsed_ms
+            self._stats.max_flush_ms = max(self._stats.max_flush_ms, elapsed_ms)
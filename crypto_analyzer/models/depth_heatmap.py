@@ -0,0 +1,154 @@
+"""Rolling time x price-bucket matrix of resting order book liquidity."""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from .order_book import Level, OrderBook
+
+
+class HeatmapRows(NamedTuple):
+    """Rows read from a :class:`DepthHeatmap` together with its price grid."""
+
+    rows: np.ndarray  # (n, buckets) liquidity, oldest row first
+    times: np.ndarray  # event time of every row (ms)
+    samples: int  # rows ever written; the last row returned is sample ``samples - 1``
+    layout: int  # changes whenever existing rows change meaning (reset, re-centred grid)
+    origin: float  # lower price edge of bucket 0
+    bucket_size: float
+
+
+class DepthHeatmap:
+    """Resting liquidity per price bucket, sampled over time.
+
+    The live book is kept as one row of bucket totals (:attr:`current`),
+    updated in place from the quantity deltas of every diff-depth event
+    (see :class:`~crypto_analyzer.models.order_book.BookListener`).  Every
+    ``sample_ms`` of event time the row is copied into a preallocated ring
+    of ``max_bytes // (4 * buckets)`` rows, so memory never grows.
+
+    The grid has ``buckets`` buckets of ``bucket_bps`` basis points of the
+    price at the first snapshot.  When the mid price leaves the middle half
+    of the grid it is re-centred by whole buckets: stored rows are shifted
+    in place and the live row is rebuilt from the book.
+
+    Listener callbacks run in the thread that updates the book; readers
+    (the view) use :meth:`since` from any thread.
+    """
+
+    def __init__(self, bucket_bps: float = 1.0, buckets: int = 400, max_bytes: int = 16 * 2**20,
+                 sample_ms: int = 100) -> None:
+        self.bucket_bps = bucket_bps
+        self.buckets = buckets
+        self.sample_ms = sample_ms
+        self.capacity = max(1, max_bytes // (4 * buckets))
+        self.matrix = np.zeros((self.capacity, buckets), dtype=np.float32)
+        self.times = np.zeros(self.capacity, dtype=np.int64)
+        # Float64: the live row sums deltas for as long as the book is streamed
+        self.current = np.zeros(buckets)
+        self.origin: Optional[float] = None
+        self.bucket_size = 0.0
+        self.samples = 0
+        self.layout = 0
+        self._next_sample = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        return min(self.samples, self.capacity)
+
+    def clear(self) -> None:
+        """Forget the grid and every row (e.g. for another symbol)."""
+        with self._lock:
+            self.origin = None
+            self.current[:] = 0.0
+            self.samples = 0
+            self._next_sample = 0
+            self.layout += 1
+
+    # ------------------------------------------------------------------
+    # BookListener
+    # ------------------------------------------------------------------
+    def on_reset(self, book: OrderBook) -> None:
+        with self._lock:
+            mid = book.mid_price()
+            if mid is None:
+                return
+            if self.origin is None:
+                self.bucket_size = mid * self.bucket_bps / 10_000.0
+                self.origin = mid - self.bucket_size * self.buckets / 2.0
+                self.layout += 1
+            self._recentre(mid)
+            self._rebuild(book)
+
+    def on_changes(self, book: OrderBook, changes: List[Level], event_time: int) -> None:
+        with self._lock:
+            if self.origin is None:
+                return
+            if changes:
+                levels = np.array(changes)
+                index = self._index(levels[:, 0])
+                inside = (index >= 0) & (index < self.buckets)
+                np.add.at(self.current, index[inside], levels[inside, 1])
+            mid = book.mid_price()
+            if mid is not None and self._recentre(mid):
+                self._rebuild(book)
+            if event_time >= self._next_sample:
+                self._sample(event_time)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def since(self, start: int, limit: int) -> HeatmapRows:
+        """Copy of the rows sampled after the first ``start`` samples, at most the last ``limit``."""
+        with self._lock:
+            n = max(0, min(self.samples - start, limit, self.rows))
+            index = (self.samples - n + np.arange(n)) % self.capacity
+            return HeatmapRows(self.matrix[index], self.times[index], self.samples, self.layout,
+                               self.origin if self.origin is not None else math.nan, self.bucket_size)
+
+    # ------------------------------------------------------------------
+    # Internals (called with the lock held)
+    # ------------------------------------------------------------------
+    def _index(self, prices: np.ndarray) -> np.ndarray:
+        return np.floor((prices - self.origin) / self.bucket_size).astype(np.intp)
+
+    def _sample(self, event_time: int) -> None:
+        head = self.samples % self.capacity
+        self.matrix[head] = self.current
+        self.times[head] = event_time
+        self.samples += 1
+        self._next_sample = event_time - event_time % self.sample_ms + self.sample_ms
+
+    def _recentre(self, mid: float) -> bool:
+        """Move the grid by whole buckets if ``mid`` left its middle half."""
+        position = (mid - self.origin) / self.bucket_size
+        if self.buckets / 4 <= position < 3 * self.buckets / 4:
+            return False
+        shift = math.floor(position) - self.buckets // 2
+        self.origin += shift * self.bucket_size
+        rows = self.matrix[:self.rows]
+        if abs(shift) >= self.buckets:
+            rows[:] = 0.0
+        elif shift > 0:
+            rows[:, :-shift] = rows[:, shift:]
+            rows[:, -shift:] = 0.0
+        else:
+            rows[:, -shift:] = rows[:, :shift]
+            rows[:, :-shift] = 0.0
+        self.layout += 1
+        return True
+
+    def _rebuild(self, book: OrderBook) -> None:
+        levels = book.bids.levels() + book.asks.levels()
+        self.current[:] = 0.0
+        if not levels:
+            return
+        prices, quantities = np.array(levels).T
+        index = self._index(prices)
+        inside = (index >= 0) & (index < self.buckets)
+        self.current[:] = np.bincount(index[inside], quantities[inside], self.buckets)
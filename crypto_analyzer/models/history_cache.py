@@ -0,0 +1,159 @@
+"""Local-first candle history with gap-filling REST backfill."""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .candle_repository import CandleRepository
+from .candle_store import Candles, merge_candles
+from .intervals import INTERVAL_MS, bucket_start
+from .rest_client import KLINES_PAGE_LIMIT, kline_pages
+
+logger = logging.getLogger(__name__)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class HistoryCache:
+    """Serves candle history from SQLite and fetches only what is missing.
+
+    ``client`` is anything with a ``get_klines(symbol, interval, limit,
+    start_time=None, end_time=None)`` method returning Binance REST klines
+    (normally :class:`~crypto_analyzer.models.binance_client.BinanceClient`).
+
+    Missing ranges are split into single-request pages up front and fetched
+    on up to ``max_workers`` threads; the client's rate limiter decides how
+    fast they actually go.  SQLite is only touched on the calling thread.
+    """
+
+    #: Maximum number of klines Binance returns for a single request.
+    PAGE_LIMIT = KLINES_PAGE_LIMIT
+    #: How long the newest candle fetched over REST is reused before it is
+    #: fetched again (it may still have been open).
+    TAIL_TTL_MS = 60_000
+
+    def __init__(
+        self,
+        repository: CandleRepository,
+        client,
+        now: Callable[[], int] = _now_ms,
+        max_workers: int = 4,
+    ) -> None:
+        self.repository = repository
+        self.client = client
+        self.max_workers = max_workers
+        self._now = now
+        # (symbol, interval) -> (open time, fetch time) of the newest candle fetched
+        self._tails: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    def now(self) -> int:
+        """Current time in milliseconds, as used for the candle grid."""
+        return self._now()
+
+    def cached(self, symbol: str, interval: str, limit: int = 500) -> Candles:
+        """Return what is stored locally, without touching the network."""
+        return self.repository.latest(symbol, interval, limit)
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 500) -> Candles:
+        """Return the ``limit`` most recent candles, backfilling gaps over REST."""
+        return self.get_many([(symbol, interval)], limit)[(symbol, interval)]
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]], limit: int = 500) -> Dict[Tuple[str, str], Candles]:
+        """:meth:`get_klines` for many ``(symbol, interval)`` pairs with one fetch pool."""
+        stored: Dict[Tuple[str, str], Candles] = {}
+        # (pair, (start, end) or None for a plain "latest" request)
+        jobs: List[Tuple[Tuple[str, str], Optional[Tuple[int, int]]]] = []
+        for symbol, interval in pairs:
+            key = (symbol, interval)
+            step = INTERVAL_MS.get(interval)
+            if step is None:
+                # Calendar based intervals (1M) cannot be laid on a fixed grid
+                stored[key] = Candles.empty()
+                jobs.append((key, None))
+                continue
+            now = self._now()
+            # Aligned like the klines themselves (weeks open on Monday)
+            end = bucket_start(now, interval)
+            start = end - (limit - 1) * step
+            stored[key] = self.repository.get_range(symbol, interval, start, end)
+            timestamps = stored[key].timestamp
+            tail = self._tails.get(key)
+            fresh = (tail is not None and len(timestamps) > 0 and tail[0] == timestamps[-1]
+                     and now - tail[1] < self.TAIL_TTL_MS)
+            for range_start, range_end in self.missing_ranges(timestamps, start, end, step, not fresh):
+                jobs.extend((key, page) for page in kline_pages(range_start, range_end, interval, self.PAGE_LIMIT))
+
+        def fetch(job) -> Candles:
+            (symbol, interval), page = job
+            if page is None:
+                return Candles.from_klines(self.client.get_klines(symbol=symbol, interval=interval, limit=limit))
+            return self._fetch_page(symbol, interval, *page)
+
+        fetched: Dict[Tuple[str, str], List[Candles]] = {}
+        fetched_at = self._now()
+        for (key, _page), candles in zip(jobs, self._map(fetch, jobs)):
+            if candles.rows:
+                self.repository.upsert(*key, candles)
+                fetched.setdefault(key, []).append(candles)
+                newest = int(candles.timestamp[-1])
+                if newest >= self._tails.get(key, (newest, 0))[0]:
+                    self._tails[key] = (newest, fetched_at)
+        return {key: merge_candles(candles, *fetched.get(key, ())) for key, candles in stored.items()}
+
+    def _map(self, fn, items: list) -> list:
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(min(self.max_workers, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    @staticmethod
+    def missing_ranges(
+        timestamps: np.ndarray, start: int, end: int, step: int, refresh_last: bool = True
+    ) -> List[Tuple[int, int]]:
+        """Return inclusive ``(start, end)`` open-time ranges absent from ``timestamps``.
+
+        Unless ``refresh_last`` is false, the newest stored candle is treated
+        as missing too: it may have been saved before it closed.
+        """
+        expected = np.arange(start, end + 1, step, dtype=np.int64)
+        missing = ~np.isin(expected, timestamps)
+        if refresh_last and len(timestamps):
+            missing[expected >= timestamps[-1]] = True
+        idx = np.flatnonzero(missing)
+        if not len(idx):
+            return []
+        breaks = np.flatnonzero(np.diff(idx) > 1)
+        firsts = np.concatenate(([idx[0]], idx[breaks + 1]))
+        lasts = np.concatenate((idx[breaks], [idx[-1]]))
+        return [(int(expected[a]), int(expected[b])) for a, b in zip(firsts, lasts)]
+
+    def fetch_range(self, symbol: str, interval: str, start: int, end: int) -> Candles:
+        """Fetch candles opened in ``[start, end]``, paginating past the REST limit."""
+        pages = self._map(
+            lambda page: self._fetch_page(symbol, interval, *page), kline_pages(start, end, interval, self.PAGE_LIMIT)
+        )
+        candles = merge_candles(*pages)
+        logger.debug("Fetched %d %s %s candles for %d..%d", candles.rows, symbol, interval, start, end)
+        return candles
+
+    def _fetch_page(self, symbol: str, interval: str, start: int, end: int) -> Candles:
+        page = Candles.from_klines(
+            self.client.get_klines(
+                symbol=symbol,
+                interval=interval,
+                limit=self.PAGE_LIMIT,
+                start_time=start,
+                end_time=end,
+            )
+        )
+        if page.rows:
+            mask = (page.timestamp >= start) & (page.timestamp <= end)
+            page = Candles(*(col[mask] for col in page))
+        return page
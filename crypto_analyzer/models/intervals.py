@@ -0,0 +1,88 @@
+"""Helpers for Binance kline interval arithmetic."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+
+_MINUTE = 60_000
+_HOUR = 60 * _MINUTE
+_DAY = 24 * _HOUR
+#: 1970-01-01 was a Thursday; Binance weeks start on Monday 00:00 UTC.
+_WEEK_OFFSET = 4 * _DAY
+
+#: Length of each fixed-size Binance interval in milliseconds (``1M`` is
+#: calendar based and therefore not listed).
+INTERVAL_MS: Dict[str, int] = {
+    "1m": _MINUTE,
+    "3m": 3 * _MINUTE,
+    "5m": 5 * _MINUTE,
+    "15m": 15 * _MINUTE,
+    "30m": 30 * _MINUTE,
+    "1h": _HOUR,
+    "2h": 2 * _HOUR,
+    "4h": 4 * _HOUR,
+    "6h": 6 * _HOUR,
+    "8h": 8 * _HOUR,
+    "12h": 12 * _HOUR,
+    "1d": _DAY,
+    "3d": 3 * _DAY,
+    "1w": 7 * _DAY,
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    """Return the interval length in milliseconds.
+
+    Raises ``ValueError`` for unknown or calendar based intervals.
+    """
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Interval {interval!r} has no fixed length") from None
+
+
+def interval_duration(interval: str) -> int:
+    """Return a nominal length in milliseconds, usable for ordering (1M = 31 days)."""
+    if interval == "1M":
+        return 31 * _DAY
+    return interval_to_ms(interval)
+
+
+def bucket_start(ts: Union[int, np.ndarray], interval: str) -> Union[int, np.ndarray]:
+    """Return the open time of the ``interval`` candle containing ``ts``.
+
+    Buckets are aligned like Binance klines: fixed intervals to the Unix
+    epoch, weeks to Monday and months to the first day of the month (UTC).
+    Works on scalars and on NumPy arrays of millisecond timestamps.
+    """
+    if interval == "1M":
+        months = np.asarray(ts, dtype="datetime64[ms]").astype("datetime64[M]")
+        start = months.astype("datetime64[ms]").astype(np.int64)
+        return start if isinstance(ts, np.ndarray) else int(start)
+    step = interval_to_ms(interval)
+    offset = _WEEK_OFFSET if interval == "1w" else 0
+    return (ts - offset) // step * step + offset
+
+
+def parent_interval(interval: str, intervals: Iterable[str]) -> Optional[str]:
+    """Return the longest of ``intervals`` whose candles tile ``interval`` exactly.
+
+    Every ``interval`` bucket is then a whole number of parent buckets, so a
+    parent run can be aggregated into it without splitting candles.
+    """
+    best: Optional[str] = None
+    for candidate in intervals:
+        if candidate == interval or candidate not in INTERVAL_MS:
+            continue
+        step = INTERVAL_MS[candidate]
+        if interval == "1M":
+            fits = _DAY % step == 0
+        else:
+            length = interval_to_ms(interval)
+            offset = _WEEK_OFFSET if interval == "1w" else 0
+            fits = step < length and length % step == 0 and offset % step == 0
+        if fits and (best is None or step > INTERVAL_MS[best]):
+            best = candidate
+    return best
@@ -0,0 +1,347 @@
+"""Local order book maintained from a REST snapshot and diff-depth events."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+Level = Tuple[float, float]
+
+
+class BookListener(Protocol):
+    """Receives the changes of an :class:`OrderBook` (e.g. a depth heatmap)."""
+
+    def on_reset(self, book: "OrderBook") -> None:
+        """The whole book was replaced (snapshot loaded or listener attached)."""
+
+    def on_changes(self, book: "OrderBook", changes: List[Level], event_time: int) -> None:
+        """``changes`` holds ``(price, quantity delta)`` of every level a diff touched."""
+
+
+@dataclass(frozen=True, slots=True)
+class OrderBookSnapshot:
+    """Immutable view of the top of a book at a given update ID."""
+
+    symbol: str
+    version: int
+    bids: Tuple[Level, ...]
+    asks: Tuple[Level, ...]
+    event_time: int = 0
+
+
+class BookSide:
+    """Price levels of one side of the book.
+
+    Quantities live in a dict keyed by price, next to the sorted sort keys
+    arranged so that the best price is always the *last* one: bids are
+    keyed by ``price`` and asks by ``-price``.  The keys are kept in sorted
+    chunks of at most ``2 * CHUNK`` (the layout of ``sortedcontainers``'
+    ``SortedList``), indexed by the last key of every chunk.  Adding or
+    removing a level is a binary search for the chunk plus an insert into
+    one short list - O(log n), however deep in the book the level is - and
+    the best level is O(1).
+    """
+
+    #: Chunks are split in two when they grow past twice this size
+    CHUNK = 256
+
+    def __init__(self, is_bid: bool) -> None:
+        self.is_bid = is_bid
+        self._sign = 1.0 if is_bid else -1.0
+        self._chunks: List[List[float]] = []
+        self._maxes: List[float] = []  # last key of every chunk
+        self._qty: Dict[float, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._qty)
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self._maxes.clear()
+        self._qty.clear()
+
+    def set(self, price: float, qty: float) -> float:
+        """Set the quantity resting at ``price`` (0 removes the level).
+
+        Returns the previous quantity.
+        """
+        old = self._qty.get(price, 0.0)
+        if qty == 0.0:
+            if old:
+                del self._qty[price]
+                self._remove(self._sign * price)
+        else:
+            if not old:
+                self._insert(self._sign * price)
+            self._qty[price] = qty
+        return old
+
+    def _insert(self, key: float) -> None:
+        chunks, maxes = self._chunks, self._maxes
+        if not chunks:
+            chunks.append([key])
+            maxes.append(key)
+            return
+        i = bisect_left(maxes, key)
+        if i == len(maxes):
+            # Beyond the current best: the common case at the top of the book
+            i -= 1
+            chunks[i].append(key)
+            maxes[i] = key
+        else:
+            insort(chunks[i], key)
+        chunk = chunks[i]
+        if len(chunk) > 2 * self.CHUNK:
+            half = self.CHUNK
+            chunks[i:i + 1] = [chunk[:half], chunk[half:]]
+            maxes[i:i + 1] = [chunk[half - 1], chunk[-1]]
+
+    def _remove(self, key: float) -> None:
+        i = bisect_left(self._maxes, key)
+        chunk = self._chunks[i]
+        del chunk[bisect_left(chunk, key)]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def get(self, price: float) -> float:
+        return self._qty.get(price, 0.0)
+
+    def best(self) -> Optional[Level]:
+        if not self._chunks:
+            return None
+        price = self._sign * self._chunks[-1][-1]
+        return price, self._qty[price]
+
+    def top(self, n: int) -> List[Level]:
+        """Return the ``n`` best levels, best first."""
+        keys: List[float] = []
+        for chunk in reversed(self._chunks):
+            need = n - len(keys)
+            if need <= 0:
+                break
+            keys += chunk[:-need - 1:-1]
+        sign, qty = self._sign, self._qty
+        return [(sign * k, qty[sign * k]) for k in keys]
+
+    def band(self, low: float, high: float) -> List[Level]:
+        """Return levels with ``low <= price <= high``, best first."""
+        if self.is_bid:
+            lo, hi = low, high
+        else:
+            lo, hi = -high, -low
+        keys: List[float] = []
+        for i in range(bisect_left(self._maxes, lo), len(self._chunks)):
+            chunk = self._chunks[i]
+            if chunk[0] > hi:
+                break
+            keys += chunk[bisect_left(chunk, lo):bisect_right(chunk, hi)]
+        sign, qty = self._sign, self._qty
+        return [(sign * k, qty[sign * k]) for k in reversed(keys)]
+
+    def levels(self) -> List[Level]:
+        """Return all levels, best first."""
+        return self.top(len(self._qty))
+
+
+class OrderBook:
+    """Two-sided order book for a single symbol."""
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_update_id = 0
+        self.listener: Optional[BookListener] = None
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        """Replace the book with a REST ``/api/v3/depth`` snapshot."""
+        self.bids.clear()
+        self.asks.clear()
+        self._apply_levels(self.bids, snapshot.get("bids", ()))
+        self._apply_levels(self.asks, snapshot.get("asks", ()))
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        if self.listener is not None:
+            self.listener.on_reset(self)
+
+    def apply_diff(self, event: dict) -> None:
+        """Apply a diff-depth event (no sequence checks, see :class:`OrderBookSync`)."""
+        # Quantity deltas are collected only for a listener
+        changes: Optional[List[Level]] = [] if self.listener is not None else None
+        self._apply_levels(self.bids, event.get("b", ()), changes)
+        self._apply_levels(self.asks, event.get("a", ()), changes)
+        self.last_update_id = int(event["u"])
+        if changes is not None:
+            self.listener.on_changes(self, changes, int(event.get("E", 0)))
+
+    @staticmethod
+    def _apply_levels(side: BookSide, levels: Iterable, changes: Optional[List[Level]] = None) -> None:
+        if changes is None:
+            for price, qty in levels:
+                side.set(float(price), float(qty))
+            return
+        for price, qty in levels:
+            price, qty = float(price), float(qty)
+            old = side.set(price, qty)
+            if qty != old:
+                changes.append((price, qty - old))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2.0
+
+    def top(self, n: int) -> Tuple[List[Level], List[Level]]:
+        """Return the ``n`` best bid and ask levels."""
+        return self.bids.top(n), self.asks.top(n)
+
+    def snapshot(self, levels: int, event_time: int = 0) -> OrderBookSnapshot:
+        """Return an immutable snapshot of the ``levels`` best levels per side."""
+        return OrderBookSnapshot(
+            symbol=self.symbol,
+            version=self.last_update_id,
+            bids=tuple(self.bids.top(levels)),
+            asks=tuple(self.asks.top(levels)),
+            event_time=event_time,
+        )
+
+    def depth_band(self, pct: float) -> Tuple[List[Level], List[Level]]:
+        """Return levels within ``pct`` (e.g. ``0.01`` for 1%) of the mid price."""
+        mid = self.mid_price()
+        if mid is None:
+            return [], []
+        low, high = mid * (1.0 - pct), mid * (1.0 + pct)
+        return self.bids.band(low, mid), self.asks.band(mid, high)
+
+
+class OrderBookSync:
+    """Keeps an :class:`OrderBook` in sync with the Binance diff-depth stream.
+
+    Implements the documented procedure: events are buffered until a REST
+    snapshot arrives, events older than the snapshot are dropped, and from
+    then on every event must continue the update-ID sequence
+    (``U == previous u + 1``).  A gap discards the book and requests a new
+    snapshot.  Snapshots are fetched through ``run_async`` (a background
+    thread by default) so the socket callback never waits for REST.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        fetch_snapshot: Callable[[str], dict],
+        run_async: Optional[Callable[[Callable[[], None]], None]] = None,
+        max_buffer: int = 10_000,
+    ) -> None:
+        self.book = OrderBook(symbol)
+        self.synced = False
+        self.resyncs = 0
+        self._fetch_snapshot = fetch_snapshot
+        self._run_async = run_async or self._start_thread
+        self._max_buffer = max_buffer
+        self._buffer: List[dict] = []
+        self._snapshot_pending = False
+        self._lock = threading.Lock()
+
+    @property
+    def symbol(self) -> str:
+        return self.book.symbol
+
+    def on_event(self, event: dict) -> bool:
+        """Process a diff-depth event; returns ``True`` if the book changed."""
+        with self._lock:
+            if self.synced:
+                if int(event["u"]) <= self.book.last_update_id:
+                    return False
+                if int(event["U"]) == self.book.last_update_id + 1:
+                    self.book.apply_diff(event)
+                    return True
+                logger.warning(
+                    "Order book gap for %s (expected %d, got %d) - resyncing",
+                    self.symbol, self.book.last_update_id + 1, int(event["U"]),
+                )
+                self.synced = False
+                self.resyncs += 1
+                self._buffer.clear()
+            self._buffer.append(event)
+            if len(self._buffer) > self._max_buffer:
+                del self._buffer[0]
+            request = not self._snapshot_pending
+            self._snapshot_pending = True
+        if request:
+            self._run_async(self._load_snapshot)
+        return False
+
+    def set_listener(self, listener: Optional[BookListener]) -> None:
+        """Attach ``listener`` to the book (``None`` detaches).
+
+        A synced book is passed to :meth:`BookListener.on_reset` right away;
+        otherwise the listener gets it once the snapshot has been loaded.
+        """
+        with self._lock:
+            self.book.listener = listener
+            if listener is not None and self.synced:
+                listener.on_reset(self.book)
+
+    def snapshot(self, levels: int, event_time: int = 0) -> OrderBookSnapshot:
+        """Thread-safe :meth:`OrderBook.snapshot` of the synced book."""
+        with self._lock:
+            return self.book.snapshot(levels, event_time)
+
+    def apply_snapshot(self, snapshot: dict) -> bool:
+        """Load ``snapshot`` and replay buffered events on top of it.
+
+        Returns ``True`` if the book is in sync afterwards.
+        """
+        with self._lock:
+            self._snapshot_pending = False
+            last_id = int(snapshot["lastUpdateId"])
+            pending = [e for e in self._buffer if int(e["u"]) > last_id]
+            if pending and int(pending[0]["U"]) > last_id + 1:
+                # Snapshot is older than the first buffered event: try again
+                request = self._snapshot_pending = True
+            else:
+                self.book.load_snapshot(snapshot)
+                self._buffer.clear()
+                self.synced = True
+                request = False
+                for event in pending:
+                    if int(event["U"]) > self.book.last_update_id + 1:
+                        self.synced = False
+                        self.resyncs += 1
+                        request = self._snapshot_pending = True
+                        break
+                    self.book.apply_diff(event)
+        if request:
+            self._run_async(self._load_snapshot)
+        return self.synced
+
+    def _load_snapshot(self) -> None:
+        try:
+            snapshot = self._fetch_snapshot(self.symbol)
+        except Exception as exc:
+            logger.error("Order book snapshot for %s failed: %s", self.symbol, exc)
+            with self._lock:
+                self._snapshot_pending = False
+            return
+        self.apply_snapshot(snapshot)
+
+    @staticmethod
+    def _start_thread(target: Callable[[], None]) -> None:
+        threading.Thread(target=target, name="OrderBookSnapshot", daemon=True).start()
@@ -0,0 +1,256 @@
+"""Recording of raw market data messages and offline playback.
+
+A recording is an append-only gzip file of length-prefixed records, each
+holding the receive time, the stream name and the raw JSON payload.
+Opening the file in append mode adds a new gzip member, which readers
+handle transparently, so a recording can be continued across sessions.
+
+:class:`ReplayClient` plays a recording back through the same interface as
+:class:`~crypto_analyzer.models.binance_client.BinanceClient`, which lets
+the real :class:`DataController` ingest path run without network access.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import struct
+import threading
+import time
+from itertools import count
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .subscriptions import depth_stream, kline_stream
+
+logger = logging.getLogger(__name__)
+
+#: receive time (s since the epoch), stream name length, payload length
+_HEADER = struct.Struct("<dHI")
+_SNAPSHOT = "@snapshot"
+
+
+def snapshot_stream(symbol: str) -> str:
+    """Pseudo-stream under which REST order book snapshots are recorded."""
+    return f"{symbol.lower()}{_SNAPSHOT}"
+
+
+class Record(NamedTuple):
+    received_at: float
+    stream: str
+    data: dict
+
+
+class MarketRecorder:
+    """Appends raw stream messages to a compressed recording.
+
+    :meth:`record` is thread-safe and cheap enough for the socket thread:
+    the payload is serialised and handed to zlib, which only touches the
+    disk when its buffer fills up.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, compresslevel: int = 6) -> None:
+        self.path = path
+        self.records = 0
+        self._clock = clock
+        self._file = gzip.open(path, "ab", compresslevel=compresslevel)
+        self._lock = threading.Lock()
+
+    def record(self, stream: str, data: dict) -> None:
+        name = stream.encode()
+        payload = json.dumps(data, separators=(",", ":")).encode()
+        received_at = self._clock()
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_HEADER.pack(received_at, len(name), len(payload)))
+            self._file.write(name)
+            self._file.write(payload)
+            self.records += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "MarketRecorder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def read_records(path: str) -> Iterator[Record]:
+    """Yield the records of a recording in order.
+
+    A record cut short (e.g. the recording process was killed) ends the
+    iteration instead of raising.
+    """
+    with gzip.open(path, "rb") as fh:
+        try:
+            while True:
+                header = fh.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                received_at, name_len, payload_len = _HEADER.unpack(header)
+                body = fh.read(name_len + payload_len)
+                if len(body) < name_len + payload_len:
+                    break
+                yield Record(received_at, body[:name_len].decode(), json.loads(body[name_len:]))
+        except EOFError:
+            logger.warning("Recording %s is truncated", path)
+
+
+class ReplayClient:
+    """Plays a recording back with the :class:`BinanceClient` interface.
+
+    Messages are delivered to sockets subscribed to their stream, keeping
+    the recorded spacing divided by ``speed`` (``None`` plays as fast as
+    possible).  Playback runs on its own thread, like python-binance's
+    socket threads; it starts with the first socket, or with :meth:`play`
+    when ``autostart`` is off (useful to subscribe everything first), and
+    :meth:`stop` ends it.  Recorded order book snapshots are served by
+    :meth:`get_order_book` once playback has reached them; kline history is
+    delegated to ``rest`` if given, otherwise none is available.
+    :meth:`now` follows the playback clock.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, rest=None, autostart: bool = True) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive or None")
+        self.path = path
+        self.speed = speed
+        self.rest = rest
+        self.autostart = autostart
+        self.dispatched = 0
+        self.finished = threading.Event()
+        first = next(read_records(path), None)
+        self._position = first.received_at if first is not None else time.time()
+        self._sockets: Dict[str, Tuple[Set[str], Callable[[dict], None], bool]] = {}
+        self._snapshots: Dict[str, dict] = {}
+        self._ids = count(1)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # REST methods
+    # ------------------------------------------------------------------
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 500,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ):
+        if self.rest is None:
+            return []
+        return self.rest.get_klines(symbol, interval, limit=limit, start_time=start_time, end_time=end_time)
+
+    def get_order_book(self, symbol: str, limit: int = 1000, timeout: Optional[float] = 30.0):
+        """Return the latest recorded snapshot, waiting for playback to reach one."""
+        key = symbol.lower()
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: key in self._snapshots or self.finished.is_set(), timeout
+            )
+            if not ready or key not in self._snapshots:
+                raise LookupError(f"No order book snapshot for {symbol} in {self.path}")
+            snapshot = self._snapshots[key]
+        return {**snapshot, "bids": snapshot["bids"][:limit], "asks": snapshot["asks"][:limit]}
+
+    def now(self) -> int:
+        """Playback time in milliseconds."""
+        return int(self._position * 1000)
+
+    # ------------------------------------------------------------------
+    # WebSocket methods
+    # ------------------------------------------------------------------
+    def start_kline_socket(self, symbol: str, interval: str, callback: Callable):
+        return self._start({kline_stream(symbol, interval)}, callback, combined=False)
+
+    def start_depth_socket(self, symbol: str, callback: Callable, interval: Optional[int] = None):
+        return self._start({depth_stream(symbol, interval or 1000)}, callback, combined=False)
+
+    def start_multiplex_socket(self, streams: List[str], callback: Callable):
+        return self._start(set(streams), callback, combined=True)
+
+    def stop_socket(self, socket_name: str) -> None:
+        with self._cond:
+            self._sockets.pop(socket_name, None)
+
+    def stop(self) -> None:
+        """Stop playback and drop all sockets; the next socket plays from the start."""
+        with self._cond:
+            self._sockets.clear()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def play(self) -> None:
+        """Start playback (no-op while it is running)."""
+        with self._cond:
+            if self._thread is None:
+                self._stop.clear()
+                self.finished.clear()
+                self._thread = threading.Thread(target=self._play, name="ReplayClient", daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the whole recording has been played."""
+        return self.finished.wait(timeout)
+
+    # ------------------------------------------------------------------
+    # Playback
+    # ------------------------------------------------------------------
+    def _start(self, streams: Set[str], callback: Callable, combined: bool) -> str:
+        name = f"replay-{next(self._ids)}"
+        with self._cond:
+            self._sockets[name] = (streams, callback, combined)
+        if self.autostart:
+            self.play()
+        return name
+
+    def _play(self) -> None:
+        started = time.monotonic()
+        first: Optional[float] = None
+        try:
+            for record in read_records(self.path):
+                if first is None:
+                    first = record.received_at
+                if self.speed is not None:
+                    delay = started + (record.received_at - first) / self.speed - time.monotonic()
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+                if self._stop.is_set():
+                    break
+                self._position = record.received_at
+                if record.stream.endswith(_SNAPSHOT):
+                    with self._cond:
+                        self._snapshots[record.stream[:-len(_SNAPSHOT)]] = record.data
+                        self._cond.notify_all()
+                    continue
+                with self._cond:
+                    targets = [
+                        (callback, combined)
+                        for streams, callback, combined in self._sockets.values()
+                        if record.stream in streams
+                    ]
+                for callback, combined in targets:
+                    callback({"stream": record.stream, "data": record.data} if combined else record.data)
+                self.dispatched += 1
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.error("Replay of %s failed: %s", self.path, exc)
+        finally:
+            with self._cond:
+                self.finished.set()
+                self._cond.notify_all()
@@ -0,0 +1,237 @@
+"""Higher-timeframe candles derived from the 1m stream."""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .app_state import MarketFrame
+from .candle_store import Candles
+from .intervals import bucket_start, interval_duration, parent_interval
+
+logger = logging.getLogger(__name__)
+
+BASE_INTERVAL = "1m"
+_BASE_MS = 60_000
+
+#: (open time, open, high, low, close, volume)
+Row = Tuple[int, float, float, float, float, float]
+
+
+def resample(candles: Candles, interval: str) -> Candles:
+    """Aggregate a sorted candle run into ``interval`` buckets.
+
+    Open is the first open, close the last close, high/low the extremes and
+    volume the sum of each bucket; buckets are aligned like Binance klines
+    (see :func:`~crypto_analyzer.models.intervals.bucket_start`).
+    """
+    if not candles.rows:
+        return Candles.empty()
+    buckets = bucket_start(candles.timestamp, interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], candles.rows] - 1
+    return Candles(
+        buckets[starts],
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts),
+    )
+
+
+def sort_intervals(intervals: Iterable[str]) -> List[str]:
+    return sorted(set(intervals), key=interval_duration)
+
+
+def parent_chain(interval: str, intervals: Iterable[str]) -> List[str]:
+    """``interval`` and the parents :func:`align_history` rebuilds it from, down to the base interval."""
+    intervals = list(intervals)
+    chain = [BASE_INTERVAL]
+    while interval is not None and interval != BASE_INTERVAL:
+        chain.append(interval)
+        interval = parent_interval(interval, intervals)
+    return sort_intervals(chain)
+
+
+def align_history(histories: Dict[str, Candles], cut: int) -> Dict[str, Candles]:
+    """Rebuild the in-progress candle of every interval from closed base candles.
+
+    ``histories`` maps intervals to REST/SQLite history and ``cut`` is the
+    open time of the base candle still in progress.  The last REST candle
+    of each interval is a snapshot taken mid-bucket, so it is replaced with
+    an aggregate of the (already aligned) finer parent interval over
+    ``[bucket start, cut)``.  The result matches what
+    :class:`TimeframeAggregator` builds from the stream, which lets it carry
+    on from there without double counting.
+    """
+    aligned: Dict[str, Candles] = {}
+    for interval in sort_intervals(histories):
+        candles = histories[interval]
+        start = bucket_start(cut, interval)
+        keep = candles.timestamp < start
+        candles = Candles(*(col[keep] for col in candles))
+        parent = parent_interval(interval, aligned)
+        if parent is not None:
+            source = aligned[parent]
+            mask = source.timestamp >= start
+            partial = resample(Candles(*(col[mask] for col in source)), interval)
+            if partial.rows:
+                candles = Candles(*(np.concatenate(cols) for cols in zip(candles, partial)))
+        aligned[interval] = candles
+    return aligned
+
+
+def partial_rows(aligned: Dict[str, Candles], cut: int) -> Dict[str, Row]:
+    """Return the in-progress candle of each interval in ``aligned``, if any."""
+    rows: Dict[str, Row] = {}
+    for interval, candles in aligned.items():
+        if interval == BASE_INTERVAL or not candles.rows:
+            continue
+        if int(candles.timestamp[-1]) == bucket_start(cut, interval):
+            rows[interval] = (int(candles.timestamp[-1]),) + tuple(float(col[-1]) for col in candles[1:])
+    return rows
+
+
+class TimeframeAggregator:
+    """Builds higher-interval candles incrementally from closed 1m candles.
+
+    Each closed 1m candle is folded into the current bucket of every target
+    interval, and the revised bucket candles are returned as
+    :class:`MarketFrame` objects.  State is per symbol and must be seeded
+    with :meth:`seed` (see :func:`align_history`); base candles arriving
+    before that are held back and replayed by :meth:`seed`.  Candles at or
+    before the last folded minute are duplicates and are ignored.
+
+    A symbol may be seeded with only some of the intervals; :meth:`extend`
+    adds the others later, replaying the recent base candles into them.
+    """
+
+    MAX_PENDING = 1_000
+    #: Base candles kept per symbol for :meth:`extend`
+    MAX_RECENT = 120
+
+    def __init__(self, intervals: Iterable[str]) -> None:
+        self.intervals = [i for i in sort_intervals(intervals) if i != BASE_INTERVAL]
+        self.gaps = 0
+        self._last_base: Dict[str, int] = {}
+        self._buckets: Dict[str, Dict[str, List]] = {}
+        self._active: Dict[str, List[str]] = {}
+        self._recent: Dict[str, Deque[MarketFrame]] = {}
+        self._pending: Dict[str, List[MarketFrame]] = {}
+
+    def seed(
+        self, symbol: str, last_base: int, partials: Dict[str, Row], intervals: Optional[Iterable[str]] = None
+    ) -> List[MarketFrame]:
+        """Start aggregating ``symbol`` after the base candle opened at ``last_base``.
+
+        Only ``intervals`` (default: all) are built.  Returns frames
+        produced by replaying base candles received while the symbol was
+        not seeded yet.
+        """
+        active = self.intervals if intervals is None else [i for i in self.intervals if i in set(intervals)]
+        self._last_base[symbol] = last_base
+        self._active[symbol] = active
+        self._buckets[symbol] = {interval: list(row) for interval, row in partials.items() if interval in active}
+        self._recent[symbol] = deque(maxlen=self.MAX_RECENT)
+        frames: List[MarketFrame] = []
+        for frame in self._pending.pop(symbol, []):
+            frames.extend(self.add(frame))
+        return frames
+
+    def extend(self, symbol: str, cut: int, partials: Dict[str, Row], intervals: Iterable[str]) -> List[MarketFrame]:
+        """Start building ``intervals`` of an already seeded ``symbol``.
+
+        ``partials`` are their in-progress candles aggregated from the base
+        candles opened before ``cut`` (see :func:`align_history`), which
+        must be at most one minute after the last folded base candle.  The
+        base candles folded since ``cut`` are replayed into them; returns
+        the revised candles.
+        """
+        last = self._last_base.get(symbol)
+        if last is None:
+            return []
+        if cut > last + _BASE_MS:
+            raise ValueError(f"Cut {cut} is ahead of the last base candle {last} of {symbol}")
+        active = self._active[symbol]
+        added = [i for i in self.intervals if i in set(intervals) and i not in active]
+        buckets = self._buckets[symbol]
+        for interval in added:
+            row = partials.get(interval)
+            if row is None:
+                buckets.pop(interval, None)
+            else:
+                buckets[interval] = list(row)
+        self._active[symbol] = [i for i in self.intervals if i in active or i in added]
+        frames: List[MarketFrame] = []
+        recent = self._recent[symbol]
+        if len(recent) == recent.maxlen and recent[0].timestamp > cut:
+            logger.debug("Base candles of %s before %d are no longer kept", symbol, recent[0].timestamp)
+        for frame in recent:
+            if frame.timestamp >= cut:
+                frames.extend(self._fold(frame, added))
+        # One (the latest) revision per candle
+        return list({(frame.interval, frame.timestamp): frame for frame in frames}.values())
+
+    def drop(self, symbol: str) -> None:
+        self._last_base.pop(symbol, None)
+        self._buckets.pop(symbol, None)
+        self._active.pop(symbol, None)
+        self._recent.pop(symbol, None)
+        self._pending.pop(symbol, None)
+
+    def active(self, symbol: str) -> List[str]:
+        """Intervals built for ``symbol`` (empty until seeded)."""
+        return list(self._active.get(symbol, ()))
+
+    def add(self, frame: MarketFrame) -> List[MarketFrame]:
+        """Fold a closed base candle in; returns the revised bucket candles."""
+        symbol = frame.symbol
+        last = self._last_base.get(symbol)
+        if last is None:
+            pending = self._pending.setdefault(symbol, [])
+            pending.append(frame)
+            del pending[:-self.MAX_PENDING]
+            return []
+        ts = frame.timestamp
+        if ts <= last:
+            return []
+        if ts > last + _BASE_MS:
+            self.gaps += 1
+            logger.debug("Missing 1m candles for %s before %d", symbol, ts)
+        self._last_base[symbol] = ts
+        self._recent[symbol].append(frame)
+        return self._fold(frame, self._active[symbol])
+
+    def _fold(self, frame: MarketFrame, intervals: Iterable[str]) -> List[MarketFrame]:
+        symbol, ts = frame.symbol, frame.timestamp
+        buckets = self._buckets[symbol]
+        frames: List[MarketFrame] = []
+        for interval in intervals:
+            start = bucket_start(ts, interval)
+            row = buckets.get(interval)
+            if row is not None and row[0] == start:
+                row[2] = max(row[2], frame.high_price)
+                row[3] = min(row[3], frame.low_price)
+                row[4] = frame.close_price
+                row[5] += frame.volume
+            elif row is None or row[0] < start:
+                row = buckets[interval] = [
+                    start, frame.open_price, frame.high_price,
+                    frame.low_price, frame.close_price, frame.volume,
+                ]
+            else:
+                continue
+            frames.append(MarketFrame(row[0], symbol, row[1], row[2], row[3], row[4], row[5], interval))
+        return frames
+
+    def last_base(self, symbol: str) -> Optional[int]:
+        """Open time of the last folded base candle (``None`` until seeded)."""
+        return self._last_base.get(symbol)
+
+    def current(self, symbol: str, interval: str) -> Optional[Row]:
+        row = self._buckets.get(symbol, {}).get(interval)
+        return tuple(row) if row is not None else None
@@ -0,0 +1,514 @@
+"""Rate-limit aware Binance REST clients with pooled keep-alive connections.
+
+Binance meters REST usage per IP in fixed windows (request weight per
+minute, orders per 10 seconds) and reports the running totals in
+``X-MBX-USED-WEIGHT-*`` / ``X-MBX-ORDER-COUNT-*`` response headers.
+Exceeding a limit returns HTTP 429 with ``Retry-After``; ignoring 429s gets
+the IP banned (HTTP 418).  The clients here keep one token bucket per
+category, correct it from those headers after every response, and wait
+for budget *before* sending, so a backfill slows down instead of being
+throttled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .intervals import interval_to_ms
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+BINANCE_URL = "https://api.binance.com"
+TESTNET_URL = "https://testnet.binance.vision"
+
+#: Maximum number of klines returned by one ``/api/v3/klines`` request.
+KLINES_PAGE_LIMIT = 1000
+KLINES_WEIGHT = 2
+
+
+def _import_aiohttp():
+    """Import aiohttp on first use: it is optional and slow to import."""
+    try:
+        import aiohttp
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ImportError("AsyncBinanceRestClient requires the 'aiohttp' package") from exc
+    return aiohttp
+
+
+def depth_weight(limit: int) -> int:
+    """Request weight of ``/api/v3/depth`` for a given ``limit``."""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+def kline_pages(start: int, end: int, interval: str, limit: int = KLINES_PAGE_LIMIT) -> List[Tuple[int, int]]:
+    """Split ``[start, end]`` open times into independent single-request pages of ``limit`` klines."""
+    step = interval_to_ms(interval)
+    span = limit * step
+    return [(page, min(end, page + span - step)) for page in range(start, end + 1, span)]
+
+
+class BinanceRestError(Exception):
+    """Error response (or exhausted retries) from the Binance REST API."""
+
+    def __init__(self, message: str, status: int = 0, code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class RateLimitBanned(BinanceRestError):
+    """HTTP 418: the IP is banned until ``retry_after`` seconds have passed."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message, status=418)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """One Binance rate limit: ``limit`` units per ``window`` seconds."""
+
+    category: str
+    limit: int
+    window: float
+    header: str  # response header carrying the server-side count (lowercase)
+
+
+DEFAULT_LIMITS: Tuple[RateLimit, ...] = (
+    RateLimit("weight", 6000, 60.0, "x-mbx-used-weight-1m"),
+    RateLimit("orders", 100, 10.0, "x-mbx-order-count-10s"),
+)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``capacity / window`` per second.
+
+    :meth:`reserve` never blocks: it takes the tokens (the balance may go
+    negative) and returns how long the caller has to wait before using
+    them, so concurrent callers queue up fairly in reservation order.
+    """
+
+    def __init__(self, capacity: float, window: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = float(capacity)
+        self.rate = self.capacity / window
+        self._clock = clock
+        self._tokens = self.capacity
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens; returns the seconds to wait before using them."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def sync(self, used: float) -> None:
+        """Lower the balance to what the server says is left in its window."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, self.capacity - used)
+
+    def pause(self, seconds: float) -> None:
+        """Make the next reservation wait at least ``seconds``."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """Token buckets for every :class:`RateLimit` category.
+
+    ``headroom`` keeps a fraction of each limit unused, leaving room for
+    other clients sharing the IP.  ``wall_clock`` locates the server's
+    windows, which are aligned to wall-clock time.
+    """
+
+    def __init__(
+        self,
+        limits: Iterable[RateLimit] = DEFAULT_LIMITS,
+        headroom: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.limits = {limit.category: limit for limit in limits}
+        self.headroom = headroom
+        self.buckets = {
+            limit.category: TokenBucket(limit.limit * headroom, limit.window, clock)
+            for limit in self.limits.values()
+        }
+        self.used: Dict[str, int] = {}
+        self._wall_clock = wall_clock
+        self._windows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, costs: Mapping[str, float]) -> float:
+        """Reserve ``costs`` per category; returns the longest wait."""
+        wait = 0.0
+        for category, amount in costs.items():
+            if amount:
+                wait = max(wait, self.buckets[category].reserve(amount))
+        return wait
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Apply the server-side counts from response headers."""
+        lowered = {key.lower(): value for key, value in headers.items()}
+        for category, limit in self.limits.items():
+            value = lowered.get(limit.header)
+            if value is None:
+                continue
+            try:
+                used = int(value)
+            except ValueError:
+                continue
+            window = int(self._wall_clock() // limit.window)
+            with self._lock:
+                # Concurrent responses arrive out of order; within a window
+                # the server-side count only grows
+                if self._windows.get(category) == window:
+                    used = max(used, self.used.get(category, 0))
+                self._windows[category] = window
+                self.used[category] = used
+            self.buckets[category].sync(used)
+
+    def pause(self, seconds: float) -> None:
+        for bucket in self.buckets.values():
+            bucket.pause(seconds)
+
+
+@dataclass
+class RestStats:
+    """Counters kept by the REST clients."""
+
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0  # 429 responses
+    waited_s: float = 0.0  # time spent waiting for rate-limit budget
+    used_weight: int = 0  # last X-MBX-USED-WEIGHT-1M value
+
+
+class _RestBase:
+    """Request building, retry policy and bookkeeping shared by both clients."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        limiter: Optional[RateLimiter],
+        max_retries: int,
+        backoff: float,
+        max_backoff: float,
+        timeout: float,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"X-MBX-APIKEY": api_key} if api_key else {}
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._stats = RestStats()
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> RestStats:
+        with self._stats_lock:
+            return replace(self._stats)
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter (between half and the full step)."""
+        step = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return step * random.uniform(0.5, 1.0)
+
+    def _count(self, **changes: float) -> None:
+        with self._stats_lock:
+            for name, value in changes.items():
+                setattr(self._stats, name, getattr(self._stats, name) + value)
+
+    def _handle(self, status: int, headers: Mapping[str, str], body: Any, attempt: int) -> Tuple[bool, float]:
+        """Inspect a response; returns ``(retry, delay)`` or raises."""
+        self.limiter.update(headers)
+        with self._stats_lock:
+            self._stats.requests += 1
+            self._stats.used_weight = self.limiter.used.get("weight", self._stats.used_weight)
+        if status < 400:
+            return False, 0.0
+        retry_after = _retry_after(headers)
+        if status == 418:
+            self.limiter.pause(retry_after or self.max_backoff)
+            raise RateLimitBanned(f"IP banned by Binance: {_message(body)}", retry_after or self.max_backoff)
+        if status == 429:
+            delay = retry_after if retry_after is not None else self._retry_delay(attempt)
+            logger.warning("Binance rate limit hit, backing off %.1fs", delay)
+            self.limiter.pause(delay)
+            self._count(throttled=1)
+            return True, 0.0
+        if status >= 500:
+            return True, self._retry_delay(attempt)
+        code = body.get("code") if isinstance(body, dict) else None
+        raise BinanceRestError(f"HTTP {status}: {_message(body)}", status=status, code=code)
+
+    @staticmethod
+    def _klines_params(symbol, interval, limit, start_time, end_time) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"symbol": symbol.upper(), "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return params
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    for key, value in headers.items():
+        if key.lower() == "retry-after":
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _message(body: Any) -> str:
+    if isinstance(body, dict):
+        return str(body.get("msg", body))
+    return str(body)
+
+
+def _merge_pages(pages: Iterable[List[list]]) -> List[list]:
+    seen = {}
+    for page in pages:
+        for kline in page:
+            seen[kline[0]] = kline
+    return [seen[ts] for ts in sorted(seen)]
+
+
+class BinanceRestClient(_RestBase):
+    """Blocking client on a pooled :class:`requests.Session`.
+
+    Safe to share between threads: the session's connection pool holds up
+    to ``pool_size`` keep-alive connections and the limiter is locked.
+    Connection errors and 5xx responses are retried with jittered
+    exponential backoff, 429 responses after ``Retry-After``; HTTP 418
+    raises :class:`RateLimitBanned` immediately.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BINANCE_URL,
+        api_key: str = "",
+        limiter: Optional[RateLimiter] = None,
+        pool_size: int = 10,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 10.0,
+        session: Optional[requests.Session] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        super().__init__(base_url, api_key, limiter, max_retries, backoff, max_backoff, timeout)
+        self.pool_size = pool_size
+        self._sleep = sleep
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def request(self, path: str, params: Optional[Dict[str, Any]] = None, weight: int = 1, orders: int = 0) -> Any:
+        """GET ``path`` within the rate budget, retrying transient failures."""
+        url = self.base_url + path
+        for attempt in range(self.max_retries + 1):
+            wait = self.limiter.reserve({"weight": weight, "orders": orders})
+            if wait > 0:
+                self._count(waited_s=wait)
+                self._sleep(wait)
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as exc:
+                error: Exception = exc
+                delay = self._retry_delay(attempt)
+            else:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = response.text
+                retry, delay = self._handle(response.status_code, response.headers, body, attempt)
+                if not retry:
+                    return body
+                error = BinanceRestError(f"HTTP {response.status_code}", status=response.status_code)
+            if attempt < self.max_retries:
+                self._count(retries=1)
+                if delay:
+                    self._sleep(delay)
+        raise BinanceRestError(f"GET {path} failed after {self.max_retries + 1} attempts: {error}")
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 500,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[list]:
+        return self.request(
+            "/api/v3/klines",
+            self._klines_params(symbol, interval, limit, start_time, end_time),
+            weight=KLINES_WEIGHT,
+        )
+
+    def get_order_book(self, symbol: str, limit: int = 1000) -> dict:
+        return self.request(
+            "/api/v3/depth", {"symbol": symbol.upper(), "limit": limit}, weight=depth_weight(limit)
+        )
+
+
+class AsyncBinanceRestClient(_RestBase):
+    """asyncio variant on an :mod:`aiohttp` session (keep-alive connector).
+
+    Shares the limiter design with :class:`BinanceRestClient`; pass the same
+    :class:`RateLimiter` to both if they run side by side.  Use as an async
+    context manager, or call :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BINANCE_URL,
+        api_key: str = "",
+        limiter: Optional[RateLimiter] = None,
+        pool_size: int = 10,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 10.0,
+    ) -> None:
+        self._aiohttp = _import_aiohttp()
+        super().__init__(base_url, api_key, limiter, max_retries, backoff, max_backoff, timeout)
+        self.pool_size = pool_size
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    async def __aenter__(self) -> "AsyncBinanceRestClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            aiohttp = self._aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30),
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, path: str, params: Optional[Dict[str, Any]] = None, weight: int = 1, orders: int = 0) -> Any:
+        url = self.base_url + path
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            wait = self.limiter.reserve({"weight": weight, "orders": orders})
+            if wait > 0:
+                self._count(waited_s=wait)
+                await asyncio.sleep(wait)
+            try:
+                async with session.get(url, params=params) as response:
+                    try:
+                        body = await response.json(content_type=None)
+                    except ValueError:
+                        body = await response.text()
+                    retry, delay = self._handle(response.status, response.headers, body, attempt)
+            except (self._aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                error: Exception = exc
+                delay = self._retry_delay(attempt)
+            else:
+                if not retry:
+                    return body
+                error = BinanceRestError(f"HTTP {response.status}", status=response.status)
+            if attempt < self.max_retries:
+                self._count(retries=1)
+                if delay:
+                    await asyncio.sleep(delay)
+        raise BinanceRestError(f"GET {path} failed after {self.max_retries + 1} attempts: {error}")
+
+    async def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 500,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[list]:
+        return await self.request(
+            "/api/v3/klines",
+            self._klines_params(symbol, interval, limit, start_time, end_time),
+            weight=KLINES_WEIGHT,
+        )
+
+    async def get_order_book(self, symbol: str, limit: int = 1000) -> dict:
+        return await self.request(
+            "/api/v3/depth", {"symbol": symbol.upper(), "limit": limit}, weight=depth_weight(limit)
+        )
+
+    async def get_klines_range(self, symbol: str, interval: str, start: int, end: int) -> List[list]:
+        """Fetch every kline opened in ``[start, end]``, pages concurrently."""
+        return (await self.download([(symbol, interval)], start, end))[(symbol, interval)]
+
+    async def download(self, pairs: Iterable[Tuple[str, str]], start: int, end: int) -> Dict[Tuple[str, str], List[list]]:
+        """Fetch ``[start, end]`` for many ``(symbol, interval)`` pairs at once.
+
+        Every page of every pair is a separate request; at most ``pool_size``
+        are in flight and each one waits for limiter budget before it is sent.
+        """
+        pairs = list(pairs)
+        jobs = [(pair, page) for pair in pairs for page in kline_pages(start, end, pair[1])]
+        # Requests queued on the connector would count against their timeout
+        slots = asyncio.Semaphore(self.pool_size)
+
+        async def fetch(pair: Tuple[str, str], page: Tuple[int, int]) -> List[list]:
+            async with slots:
+                return await self.get_klines(pair[0], pair[1], KLINES_PAGE_LIMIT, *page)
+
+        pages = await asyncio.gather(*(fetch(pair, page) for pair, page in jobs))
+        grouped: Dict[Tuple[str, str], List[List[list]]] = {pair: [] for pair in pairs}
+        for (pair, _), klines in zip(jobs, pages):
+            grouped[pair].append(klines)
+        return {pair: _merge_pages(pair_pages) for pair, pair_pages in grouped.items()}
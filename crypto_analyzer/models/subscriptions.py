@@ -0,0 +1,220 @@
+"""Ref-counted stream subscriptions over Binance combined streams."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+#: Binance accepts up to 1024 streams on one combined connection.
+MAX_STREAMS_PER_SOCKET = 200
+
+
+def kline_stream(symbol: str, interval: str) -> str:
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+def depth_stream(symbol: str, update_speed_ms: int = 1000) -> str:
+    suffix = "" if update_speed_ms == 1000 else f"@{update_speed_ms}ms"
+    return f"{symbol.lower()}@depth{suffix}"
+
+
+@dataclass(frozen=True)
+class SocketHealth:
+    """Liveness of one combined socket."""
+
+    name: str
+    streams: frozenset
+    idle_s: float  # seconds since the last message (or since the socket was opened)
+    received: bool  # at least one message arrived on this socket
+    failed: bool  # the client reported an error for this socket
+
+
+class SubscriptionManager:
+    """Keeps a set of streams open on as few combined sockets as possible.
+
+    Every stream is reference counted, so several consumers (a watchlist
+    entry and the chart, two intervals sharing a depth stream, ...) can ask
+    for it independently.  Streams going from zero to one reference are
+    opened together on a new combined socket; existing sockets are not
+    touched, so other streams see no reconnect.  A socket whose streams are
+    all released is stopped.  Messages for released streams that still
+    share a socket with live ones are dropped, and once at least half of a
+    socket's streams are dead it is reopened with the live ones only (the
+    new socket is started before the old one is stopped).
+
+    Every socket records when it last delivered a message, so a supervisor
+    can spot silently dead connections with :meth:`health` and replace them
+    with :meth:`reconnect`.
+
+    ``client`` is a :class:`BinanceClient`; ``callback(stream, data)`` runs
+    on the socket thread.
+    """
+
+    def __init__(
+        self,
+        client,
+        callback: Callable[[str, dict], None],
+        max_streams_per_socket: int = MAX_STREAMS_PER_SOCKET,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.callback = callback
+        self.max_streams_per_socket = max_streams_per_socket
+        self._clock = clock
+        self._refs: Dict[str, int] = {}
+        self._sockets: Dict[str, Set[str]] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._received: Set[str] = set()
+        self._failed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def streams(self) -> Set[str]:
+        """Streams with at least one reference."""
+        with self._lock:
+            return set(self._refs)
+
+    @property
+    def sockets(self) -> Dict[str, Set[str]]:
+        with self._lock:
+            return {name: set(streams) for name, streams in self._sockets.items()}
+
+    def refcount(self, stream: str) -> int:
+        with self._lock:
+            return self._refs.get(stream, 0)
+
+    def subscribe(self, streams: Iterable[str]) -> List[str]:
+        """Add a reference to each stream; returns the newly opened ones."""
+        added: List[str] = []
+        with self._lock:
+            for stream in streams:
+                count = self._refs.get(stream, 0)
+                self._refs[stream] = count + 1
+                if not count:
+                    added.append(stream)
+        for start in range(0, len(added), self.max_streams_per_socket):
+            self._open(added[start:start + self.max_streams_per_socket])
+        return added
+
+    def unsubscribe(self, streams: Iterable[str]) -> List[str]:
+        """Drop a reference to each stream; returns the released ones."""
+        removed: List[str] = []
+        with self._lock:
+            for stream in streams:
+                count = self._refs.get(stream, 0)
+                if count <= 1:
+                    if self._refs.pop(stream, None) is not None:
+                        removed.append(stream)
+                else:
+                    self._refs[stream] = count - 1
+            dead, compact = [], []
+            for name, socket_streams in self._sockets.items():
+                live = socket_streams & self._refs.keys()
+                if not live:
+                    dead.append(name)
+                elif len(live) * 2 <= len(socket_streams):
+                    compact.append((name, sorted(live)))
+            for name in dead:
+                self._forget(name)
+        for name, live in compact:
+            self._open(live)
+            with self._lock:
+                self._forget(name)
+            dead.append(name)
+        for name in dead:
+            self._stop(name)
+        return removed
+
+    def close(self) -> None:
+        """Release every stream and stop all sockets."""
+        with self._lock:
+            names = list(self._sockets)
+            self._sockets.clear()
+            self._last_seen.clear()
+            self._received.clear()
+            self._failed.clear()
+            self._refs.clear()
+        for name in names:
+            self._stop(name)
+
+    def health(self) -> List[SocketHealth]:
+        """Return the liveness of every open socket."""
+        now = self._clock()
+        with self._lock:
+            return [
+                SocketHealth(
+                    name,
+                    frozenset(streams),
+                    now - self._last_seen[name],
+                    name in self._received,
+                    name in self._failed,
+                )
+                for name, streams in self._sockets.items()
+            ]
+
+    def reconnect(self, name: str) -> str:
+        """Replace socket ``name`` with a new one carrying its live streams.
+
+        The new socket is started before the old one is stopped; returns the
+        new socket name (``""`` if ``name`` is unknown or has no live
+        streams).  Errors starting the new socket propagate and leave the
+        old one in place.
+        """
+        with self._lock:
+            live = sorted(self._sockets.get(name, set()) & self._refs.keys())
+        new = self._open(live) if live else ""
+        with self._lock:
+            known = self._forget(name)
+        if known:
+            self._stop(name)
+        return new
+
+    # ------------------------------------------------------------------
+    # Socket management
+    # ------------------------------------------------------------------
+    def _open(self, streams: List[str]) -> str:
+        if not streams:
+            return ""
+        # The socket name is only known once it has started
+        socket: Dict[str, str] = {}
+        name = self.client.start_multiplex_socket(streams, lambda msg: self._on_message(msg, socket.get("name")))
+        with self._lock:
+            socket["name"] = name
+            self._sockets[name] = set(streams)
+            self._last_seen[name] = self._clock()
+        return name
+
+    def _forget(self, name: str) -> bool:
+        """Drop socket bookkeeping (lock held); returns whether it was known."""
+        self._last_seen.pop(name, None)
+        self._received.discard(name)
+        self._failed.discard(name)
+        return self._sockets.pop(name, None) is not None
+
+    def _stop(self, name: str) -> None:
+        try:
+            self.client.stop_socket(name)
+        except Exception as exc:  # pragma: no cover - logowanie błędów
+            logger.warning("Failed to stop socket %s: %s", name, exc)
+
+    def _on_message(self, msg: dict, name: Optional[str] = None) -> None:
+        stream = msg.get("stream")
+        if stream is None:
+            if msg.get("e") == "error":
+                logger.error("Combined stream error on %s: %s", name, msg.get("m"))
+                with self._lock:
+                    if name in self._sockets:
+                        self._failed.add(name)
+            return
+        with self._lock:
+            if name in self._last_seen:
+                self._last_seen[name] = self._clock()
+                self._received.add(name)
+            live = stream in self._refs
+        if live:
+            self.callback(stream, msg["data"])
@@ -0,0 +1 @@
+"""Market scanner: indicator conditions across many symbols and intervals."""
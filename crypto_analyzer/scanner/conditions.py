@@ -0,0 +1,132 @@
+"""Scanner conditions evaluated on the candles of one symbol and interval.
+
+A condition looks at the indicator series of
+:mod:`crypto_analyzer.indicators.vectorized` and returns a :class:`Match`
+when it holds at the end of the history, or ``None`` otherwise.  The
+registry mirrors the indicator registry: inputs are Candles fields,
+parameters have defaults and are taken from a configuration dict.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..indicators import vectorized
+from ..models.candle_store import Candles
+
+
+class Match(NamedTuple):
+    signal: str  # e.g. "up"/"down" for crossovers and breakouts, "squeeze"
+    value: float  # strength of the signal, in the condition's own unit
+    bars: int  # candles since the event (crossover) or how long it has lasted (squeeze)
+
+
+def _last_true_run(mask: np.ndarray) -> int:
+    """Length of the run of ``True`` values ending at the last element."""
+    if not len(mask) or not mask[-1]:
+        return 0
+    false = np.flatnonzero(~mask)
+    return len(mask) - 1 - int(false[-1]) if len(false) else len(mask)
+
+
+def sma_cross(close: np.ndarray, fast: int = 9, slow: int = 21, within: int = 3) -> Optional[Match]:
+    """The fast SMA crossed the slow one during the last ``within`` candles.
+
+    ``value`` is the current fast-slow spread in percent of the close.
+    """
+    spread = vectorized.rolling_mean(close, fast) - vectorized.rolling_mean(close, slow)
+    tail = spread[-(within + 1):]
+    if len(tail) < 2 or np.isnan(tail).any():
+        return None
+    side = tail > 0
+    crossed = np.flatnonzero(side[1:] != side[:-1])
+    if not len(crossed):
+        return None
+    bars = len(side) - 2 - int(crossed[-1])
+    return Match("up" if side[-1] else "down", 100.0 * float(spread[-1] / close[-1]), bars)
+
+
+def bollinger_breakout(close: np.ndarray, period: int = 20, std_dev: float = 2.0) -> Optional[Match]:
+    """The close is outside the Bollinger Bands.
+
+    ``value`` is %B (0 = lower band, 1 = upper band) and ``bars`` the number
+    of candles the close has stayed outside on that side.
+    """
+    bands = vectorized.bollinger_bands(close, period, std_dev)
+    upper, lower = bands["upper"], bands["lower"]
+    if np.isnan(upper[-1]):
+        return None
+    width = upper[-1] - lower[-1]
+    percent_b = float((close[-1] - lower[-1]) / width) if width > 0 else 0.5
+    with np.errstate(invalid="ignore"):
+        above, below = close > upper, close < lower
+    if above[-1]:
+        return Match("up", percent_b, _last_true_run(above))
+    if below[-1]:
+        return Match("down", percent_b, _last_true_run(below))
+    return None
+
+
+def keltner_squeeze(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int = 20,
+    std_dev: float = 2.0,
+    atr_mult: float = 1.5,
+) -> Optional[Match]:
+    """The Bollinger Bands are inside the Keltner Channels (low volatility).
+
+    ``value`` is the Bollinger width over the Keltner width (lower is
+    tighter) and ``bars`` how long the squeeze has lasted.
+    """
+    bands = vectorized.bollinger_bands(close, period, std_dev)
+    channels = vectorized.keltner_channels(high, low, close, period, atr_mult)
+    bollinger_width = bands["upper"] - bands["lower"]
+    keltner_width = channels["upper"] - channels["lower"]
+    with np.errstate(invalid="ignore"):
+        squeeze = (bands["upper"] < channels["upper"]) & (bands["lower"] > channels["lower"])
+    if not squeeze[-1]:
+        return None
+    return Match("squeeze", float(bollinger_width[-1] / keltner_width[-1]), _last_true_run(squeeze))
+
+
+def rsi_extreme(close: np.ndarray, period: int = 14, oversold: float = 30.0, overbought: float = 70.0) -> Optional[Match]:
+    """RSI below ``oversold`` or above ``overbought``; ``value`` is the RSI."""
+    value = vectorized.rsi(close, period)["value"]
+    with np.errstate(invalid="ignore"):
+        low, high = value < oversold, value > overbought
+    if low[-1]:
+        return Match("oversold", float(value[-1]), _last_true_run(low))
+    if high[-1]:
+        return Match("overbought", float(value[-1]), _last_true_run(high))
+    return None
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+class ConditionSpec(NamedTuple):
+    evaluate: Callable[..., Optional[Match]]
+    inputs: Tuple[str, ...]  # Candles fields passed positionally
+    defaults: Dict[str, Any]  # parameters and their defaults
+
+
+CONDITIONS: Dict[str, ConditionSpec] = {
+    "sma_cross": ConditionSpec(sma_cross, ("close",), {"fast": 9, "slow": 21, "within": 3}),
+    "bollinger_breakout": ConditionSpec(bollinger_breakout, ("close",), {"period": 20, "std_dev": 2.0}),
+    "keltner_squeeze": ConditionSpec(
+        keltner_squeeze, ("high", "low", "close"), {"period": 20, "std_dev": 2.0, "atr_mult": 1.5}
+    ),
+    "rsi_extreme": ConditionSpec(rsi_extreme, ("close",), {"period": 14, "oversold": 30.0, "overbought": 70.0}),
+}
+
+
+def evaluate(name: str, candles: Candles, cfg: Dict[str, Any]) -> Optional[Match]:
+    """Evaluate condition ``name`` configured by ``cfg`` on ``candles``."""
+    spec = CONDITIONS[name]
+    if not candles.rows:
+        return None
+    return spec.evaluate(*(getattr(candles, field) for field in spec.inputs), **vectorized.params(spec, cfg))
@@ -0,0 +1,225 @@
+"""Scans many symbols and intervals on a process pool.
+
+The candles of every scanned series are packed into one
+:class:`CandleBlock` in shared memory.  Worker processes attach to the block
+by name and evaluate the conditions on zero-copy column views, so a task
+only carries the block name and a range of series indices, and a result
+only the matches.  Nothing in this module imports Qt: workers are spawned
+fresh and import just NumPy and the indicator code.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.candle_store import Candles
+from . import conditions as _conditions
+
+logger = logging.getLogger(__name__)
+
+Conditions = Sequence[Tuple[str, Dict[str, Any]]]  # (condition name, parameters)
+
+
+class ScanResult(NamedTuple):
+    symbol: str
+    interval: str
+    condition: str
+    signal: str
+    value: float
+    bars: int
+    close: float
+
+
+class CandleBlock:
+    """Candle columns of many series in one shared memory block.
+
+    Layout: ``count`` and ``total`` (int64), ``count + 1`` row offsets
+    (int64), then the six columns of ``total`` float64 values each.  Series
+    ``i`` is rows ``offsets[i]:offsets[i + 1]`` of every column.
+    Timestamps are stored as float64, exact for millisecond times.
+    """
+
+    def __init__(self, shm: SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+        count, total = np.ndarray((2,), dtype=np.int64, buffer=shm.buf)
+        self.count = int(count)
+        self.offsets = np.ndarray((self.count + 1,), dtype=np.int64, buffer=shm.buf, offset=16)
+        self.columns = np.ndarray(
+            (len(Candles._fields), int(total)), dtype=np.float64, buffer=shm.buf, offset=16 + 8 * (self.count + 1)
+        )
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def create(cls, series: Sequence[Candles]) -> "CandleBlock":
+        rows = [candles.rows for candles in series]
+        total = sum(rows)
+        header = 2 + len(series) + 1
+        shm = SharedMemory(create=True, size=8 * (header + len(Candles._fields) * max(total, 1)))
+        np.ndarray((2,), dtype=np.int64, buffer=shm.buf)[:] = (len(series), total)
+        block = cls(shm, owner=True)
+        block.offsets[0] = 0
+        np.cumsum(rows, out=block.offsets[1:])
+        for candles, start, end in zip(series, block.offsets[:-1], block.offsets[1:]):
+            for column, values in zip(block.columns, candles):
+                column[start:end] = values
+        return block
+
+    @classmethod
+    def attach(cls, name: str) -> "CandleBlock":
+        return cls(SharedMemory(name=name), owner=False)
+
+    def candles(self, index: int) -> Candles:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        columns = self.columns[:, start:end]
+        return Candles(columns[0].astype(np.int64), *columns[1:])
+
+    def close(self) -> None:
+        # The arrays are views of the mapping and must go before it is closed
+        self.offsets = self.columns = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ----------------------------------------------------------------------
+# Evaluation (also run by the workers)
+# ----------------------------------------------------------------------
+def evaluate_block(block: CandleBlock, indices: Sequence[int], conditions: Conditions) -> List[Tuple]:
+    """``(series index, condition, match)`` of every condition that holds."""
+    found = []
+    for index in indices:
+        candles = block.candles(index)
+        for name, cfg in conditions:
+            try:
+                match = _conditions.evaluate(name, candles, cfg)
+            except Exception as exc:  # pragma: no cover - logowanie błędów
+                logger.debug("Condition %s failed on series %d: %s", name, index, exc)
+                continue
+            if match is not None:
+                found.append((index, name, match))
+    return found
+
+
+#: Block the worker process is attached to (one scan at a time)
+_attached: Optional[CandleBlock] = None
+
+
+def _scan_chunk(name: str, indices: Sequence[int], conditions: Conditions) -> List[Tuple]:
+    global _attached
+    if _attached is None or _attached.name != name:
+        if _attached is not None:
+            _attached.close()
+        _attached = CandleBlock.attach(name)
+    return evaluate_block(_attached, indices, conditions)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+# ----------------------------------------------------------------------
+# Scanner
+# ----------------------------------------------------------------------
+class Scanner:
+    """Evaluates conditions on the candles of many (symbol, interval) pairs.
+
+    Parameters
+    ----------
+    load:
+        ``load(symbol, interval, n)`` returns the ``n`` most recent stored
+        candles, e.g. :meth:`CandleRepository.latest`.
+    workers:
+        Size of the process pool; ``0`` uses every core and ``1`` scans in
+        the calling process.  The pool is started on first use (or by
+        :meth:`start`) and kept until :meth:`close`.
+    """
+
+    #: Series below which a scan stays in-process (the pool would cost more than it saves)
+    MIN_PARALLEL = 32
+
+    def __init__(self, load: Callable[[str, str, int], Candles], workers: int = 0) -> None:
+        self.load = load
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """Start the worker processes now instead of on the first scan."""
+        if self.workers > 1 and self._pool is None:
+            # Spawned, not forked: the GUI process has Qt and network threads
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            for future in [self._pool.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def scan(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        conditions: Conditions,
+        candles: int = 1000,
+        on_results: Optional[Callable[[List[ScanResult]], None]] = None,
+    ) -> List[ScanResult]:
+        """Load the last ``candles`` stored candles of every pair and scan them.
+
+        Pairs without stored candles are skipped.  ``on_results`` receives
+        the matches of every finished chunk as soon as it is done.
+        """
+        keys, series = [], []
+        for symbol, interval in pairs:
+            loaded = self.load(symbol, interval, candles)
+            if loaded.rows:
+                keys.append((symbol, interval))
+                series.append(loaded)
+        return self.scan_candles(keys, series, conditions, on_results)
+
+    def scan_candles(
+        self,
+        keys: Sequence[Tuple[str, str]],
+        series: Sequence[Candles],
+        conditions: Conditions,
+        on_results: Optional[Callable[[List[ScanResult]], None]] = None,
+    ) -> List[ScanResult]:
+        """Scan ``series`` (the candles of the pairs in ``keys``)."""
+        block = CandleBlock.create(series)
+        try:
+            results: List[ScanResult] = []
+            for found in self._evaluate(block, conditions):
+                chunk = [
+                    ScanResult(*keys[index], name, match.signal, match.value, match.bars,
+                               float(series[index].close[-1]))
+                    for index, name, match in found
+                ]
+                results += chunk
+                if on_results is not None and chunk:
+                    on_results(chunk)
+            return sorted(results)
+        finally:
+            block.close()
+
+    def _evaluate(self, block: CandleBlock, conditions: Conditions) -> Iterator[List[Tuple]]:
+        conditions = [(name, dict(cfg)) for name, cfg in conditions]
+        if self.workers <= 1 or block.count < self.MIN_PARALLEL:
+            yield evaluate_block(block, range(block.count), conditions)
+            return
+        self.start()
+        # A few chunks per worker even out the load without much task overhead
+        chunks = np.array_split(np.arange(block.count), self.workers * 4)
+        futures: List[Future] = [
+            self._pool.submit(_scan_chunk, block.name, chunk.tolist(), conditions) for chunk in chunks if len(chunk)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,91 @@
+"""Startup timeline and import-time report.
+
+Enabled with ``CRYPTO_ANALYZER_PROFILE_STARTUP``: ``1`` logs the timeline
+once the window has painted a populated chart, ``exit`` prints it as JSON
+on stdout and quits (used by ``python -m benchmarks startup``).  Running
+the application under ``python -X importtime`` additionally reports the
+imports on the startup path, see :func:`parse_importtime`.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+class StartupProfile:
+    """Named marks in milliseconds since ``start`` (``time.perf_counter``)."""
+
+    def __init__(self, start: Optional[float] = None, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self.start = clock() if start is None else start
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        elapsed = (self._clock() - self.start) * 1000.0
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    def as_dict(self) -> dict:
+        return {name: round(ms, 3) for name, ms in self.marks}
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
+
+    def report(self) -> str:
+        lines = [f"{'Startup stage':<24}{'at ms':>10}{'took ms':>10}"]
+        previous = 0.0
+        for name, ms in self.marks:
+            lines.append(f"{name:<24}{ms:>10.1f}{ms - previous:>10.1f}")
+            previous = ms
+        return "\n".join(lines)
+
+    def on_first_paint(self, widget, ready: Callable[[], bool], callback: Callable[[], None]) -> None:
+        """Call ``callback`` once ``widget`` has been painted while ``ready()`` holds."""
+        from PyQt6.QtCore import QEvent, QObject, QTimer
+
+        class PaintWatcher(QObject):
+            def eventFilter(self, obj, event) -> bool:
+                if event.type() == QEvent.Type.Paint and ready():
+                    obj.removeEventFilter(self)
+                    # Deferred until the paint handler itself has run
+                    QTimer.singleShot(0, callback)
+                return False
+
+        # Owned by the widget, so it lives as long as it is installed
+        watcher = PaintWatcher(widget)
+        widget.installEventFilter(watcher)
+        widget.update()
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int  # nesting level, 0 = imported directly by the caller
+
+
+def parse_importtime(text: str) -> List[ImportTime]:
+    """Parse the ``python -X importtime`` lines found in ``text`` (stderr)."""
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append(ImportTime(name.strip(), int(fields[0]), int(fields[1]), depth))
+    return entries
+
+
+def import_report(entries: List[ImportTime], top: int = 15, prefix: str = "") -> str:
+    """The ``top`` imports by cumulative time, optionally limited to a package ``prefix``."""
+    selected = [entry for entry in entries if entry.module.startswith(prefix)]
+    selected.sort(key=lambda entry: entry.cumulative_us, reverse=True)
+    lines = [f"{'Module':<48}{'self ms':>10}{'total ms':>10}"]
+    for entry in selected[:top]:
+        lines.append(f"{entry.module:<48}{entry.self_us / 1000:>10.1f}{entry.cumulative_us / 1000:>10.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,263 @@
+"""Candlestick renderer with persistent, incrementally updated artists."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+from ..models.candle_store import Candles
+
+#: name -> (values aligned with the candles, Line2D keyword arguments)
+Overlays = Dict[str, Tuple[np.ndarray, dict]]
+
+
+class CandleRenderer:
+    """Draws candles on a Matplotlib figure and keeps the artists alive.
+
+    Candles are split into a static part (every candle but the last, drawn
+    as one ``PolyCollection`` of bodies and one ``LineCollection`` of
+    wicks) and the animated last candle plus overlay lines.  Revising the
+    last candle only redraws the animated artists over a cached background
+    (blitting).  A new candle moves the previous last one into small "tail"
+    collections, draws it onto the cached background and blits as well;
+    the x limits keep ``X_PAD`` of free room on the right, so a regular
+    canvas draw is needed only once that room is used up (or the price
+    leaves the y limits), at which point the tail is merged into the
+    static collections.  :meth:`render` rebuilds the axes and is meant for
+    theme, symbol or indicator-set changes.
+
+    X coordinates are candle open times expressed in interval units, so a
+    candle keeps its position when older ones are evicted.  Evicted candles
+    stay drawn until the next canvas draw.
+    """
+
+    BODY_WIDTH = 0.6
+    Y_MARGIN = 0.05
+    #: Free room right of the last candle, as a fraction of the candles shown
+    X_PAD = 0.05
+
+    def __init__(self, figure: Figure) -> None:
+        self.figure = figure
+        self.ax = None
+        self._colors: Dict[str, str] = {}
+        self._origin = 0
+        self._step = 1
+        self._last_ts: Optional[int] = None
+        self._bodies: Optional[PolyCollection] = None
+        self._wicks: Optional[LineCollection] = None
+        self._tail_bodies: Optional[PolyCollection] = None
+        self._tail_wicks: Optional[LineCollection] = None
+        self._tail = (np.empty((0, 4, 2)), np.empty((0, 2, 2)), np.empty((0, 4)))
+        self._last_body: Optional[PolyCollection] = None
+        self._last_wick: Optional[LineCollection] = None
+        self._lines: Dict[str, Line2D] = {}
+        self._background = None
+        self._draw_cid: Optional[int] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ax is not None and self._last_ts is not None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def render(self, candles: Candles, overlays: Overlays, colors: Dict[str, str]) -> None:
+        """Rebuild the axes and all artists from scratch, then draw."""
+        self._colors = colors
+        self.figure.clear()
+        self.figure.set_facecolor(colors["background"])
+        ax = self.ax = self.figure.add_subplot(111)
+        ax.set_facecolor(colors["background"])
+        # Grid under the candles, as it is under the blitted ones
+        ax.set_axisbelow(True)
+        ax.grid(True, color=colors["grid"], linewidth=0.5)
+        ax.tick_params(colors=colors["text"], labelsize=8)
+        for spine in ax.spines.values():
+            spine.set_color(colors["text"])
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=8, integer=True))
+        ax.xaxis.set_major_formatter(FuncFormatter(self._format_x))
+
+        ts = candles.timestamp
+        self._step = int(np.median(np.diff(ts))) if len(ts) > 1 else 60_000
+        self._origin = int(ts[0]) if len(ts) else 0
+
+        self._bodies = ax.add_collection(PolyCollection([], linewidths=0.5))
+        self._wicks = ax.add_collection(LineCollection([], linewidths=0.8))
+        self._tail_bodies = ax.add_collection(PolyCollection([], linewidths=0.5))
+        self._tail_wicks = ax.add_collection(LineCollection([], linewidths=0.8))
+        self._last_body = ax.add_collection(PolyCollection([], linewidths=0.5, animated=True))
+        self._last_wick = ax.add_collection(LineCollection([], linewidths=0.8, animated=True))
+        self._lines = {}
+        for name, (values, style) in overlays.items():
+            (line,) = ax.plot([], [], animated=True, linewidth=1.0, **style)
+            self._lines[name] = line
+
+        if self._draw_cid is None:
+            self._draw_cid = self.figure.canvas.mpl_connect("draw_event", self._on_draw)
+
+        self._last_ts = None
+        self._background = None
+        if len(ts):
+            self._set_static(candles)
+            self._set_last(candles)
+            self._set_overlays(candles, overlays)
+            self._set_limits(candles)
+        self.figure.canvas.draw_idle()
+
+    def update(self, candles: Candles, overlays: Overlays) -> bool:
+        """Apply new data incrementally.
+
+        Returns ``True`` if the update was blitted (a revised last candle or
+        new candles within the current limits), ``False`` if a canvas draw
+        had to be scheduled.
+        """
+        ts = candles.timestamp
+        if not len(ts):
+            return False
+        start = int(np.searchsorted(ts, self._last_ts)) if self._last_ts is not None else len(ts)
+        if start == len(ts) or int(ts[start]) != self._last_ts:
+            # History does not continue the drawn candles
+            self._set_static(candles)
+            self._set_last(candles)
+            self._set_overlays(candles, overlays)
+            self._set_limits(candles)
+            return self._draw()
+
+        # Candles from the previous last one up to the new last one are final
+        finished = slice(start, len(ts) - 1)
+        if finished.start < finished.stop:
+            self._append_tail(candles, finished)
+            self._last_ts = int(ts[-1])
+        self._set_overlays(candles, overlays)
+        if not self._fits(candles):
+            self._set_static(candles)
+            self._set_last(candles)
+            self._set_limits(candles)
+            return self._draw()
+        if self._background is None:
+            self._set_last(candles)
+            return self._draw()
+
+        if finished.start < finished.stop:
+            # Paint the finished candles into the cached background
+            canvas = self.figure.canvas
+            canvas.restore_region(self._background)
+            self._set_last(candles, finished)
+            self.ax.draw_artist(self._last_wick)
+            self.ax.draw_artist(self._last_body)
+            self._background = canvas.copy_from_bbox(self.ax.bbox)
+        self._set_last(candles)
+        self._blit()
+        return True
+
+    # ------------------------------------------------------------------
+    # Artist updates
+    # ------------------------------------------------------------------
+    def _x(self, ts: np.ndarray) -> np.ndarray:
+        return (ts - self._origin) / self._step
+
+    def _geometry(self, candles: Candles, sl: slice):
+        x = self._x(candles.timestamp[sl])
+        o, h, lo, c = candles.open[sl], candles.high[sl], candles.low[sl], candles.close[sl]
+        w = self.BODY_WIDTH / 2.0
+        bodies = np.empty((len(x), 4, 2))
+        bodies[:, 0, 0] = bodies[:, 1, 0] = x - w
+        bodies[:, 2, 0] = bodies[:, 3, 0] = x + w
+        bodies[:, 0, 1] = bodies[:, 3, 1] = o
+        bodies[:, 1, 1] = bodies[:, 2, 1] = c
+        wicks = np.empty((len(x), 2, 2))
+        wicks[:, :, 0] = x[:, None]
+        wicks[:, 0, 1] = lo
+        wicks[:, 1, 1] = h
+        up = np.array(to_rgba(self._colors["up"]))
+        down = np.array(to_rgba(self._colors["down"]))
+        colors = np.where((c >= o)[:, None], up, down)
+        return bodies, wicks, colors
+
+    @staticmethod
+    def _set_candles(body: PolyCollection, wick: LineCollection, bodies, wicks, colors) -> None:
+        body.set_verts(bodies)
+        body.set_facecolor(colors)
+        body.set_edgecolor(colors)
+        wick.set_segments(wicks)
+        wick.set_color(colors)
+
+    def _set_static(self, candles: Candles) -> None:
+        """Put every candle but the last into the static collections."""
+        self._set_candles(self._bodies, self._wicks, *self._geometry(candles, slice(None, -1)))
+        self._tail = tuple(part[:0] for part in self._tail)
+        self._set_candles(self._tail_bodies, self._tail_wicks, *self._tail)
+        self._last_ts = int(candles.timestamp[-1])
+
+    def _append_tail(self, candles: Candles, sl: slice) -> None:
+        """Add finished candles to the tail collections (merged by :meth:`_set_static`)."""
+        self._tail = tuple(np.concatenate([old, new]) for old, new in zip(self._tail, self._geometry(candles, sl)))
+        self._set_candles(self._tail_bodies, self._tail_wicks, *self._tail)
+
+    def _set_last(self, candles: Candles, sl: slice = slice(-1, None)) -> None:
+        self._set_candles(self._last_body, self._last_wick, *self._geometry(candles, sl))
+
+    def _set_overlays(self, candles: Candles, overlays: Overlays) -> None:
+        x = self._x(candles.timestamp)
+        for name, line in self._lines.items():
+            values = overlays.get(name, (None, None))[0]
+            if values is None:
+                line.set_data([], [])
+            else:
+                line.set_data(x, values)
+
+    def _fits(self, candles: Candles) -> bool:
+        """Whether the last candle is inside the current axis limits."""
+        low, high = self.ax.get_ylim()
+        right = self.ax.get_xlim()[1]
+        x = self._x(candles.timestamp[-1])
+        return low <= float(candles.low[-1]) and float(candles.high[-1]) <= high and x + 1 <= right
+
+    def _set_limits(self, candles: Candles) -> None:
+        lo, hi = float(np.min(candles.low)), float(np.max(candles.high))
+        margin = (hi - lo) * self.Y_MARGIN or abs(hi) * 0.001 or 1.0
+        self.ax.set_ylim(lo - margin, hi + margin)
+        x = self._x(candles.timestamp)
+        pad = max(1, int(len(x) * self.X_PAD))
+        self.ax.set_xlim(x[0] - 1, x[-1] + 1 + pad)
+
+    def _draw(self) -> bool:
+        # The cached background is stale until the scheduled draw happens
+        self._background = None
+        self.figure.canvas.draw_idle()
+        return False
+
+    # ------------------------------------------------------------------
+    # Blitting
+    # ------------------------------------------------------------------
+    def _animated(self):
+        return [self._last_wick, self._last_body, *self._lines.values()]
+
+    def _on_draw(self, _event) -> None:
+        if self.ax is None:
+            return
+        canvas = self.figure.canvas
+        self._background = canvas.copy_from_bbox(self.ax.bbox)
+        for artist in self._animated():
+            self.ax.draw_artist(artist)
+
+    def _blit(self) -> None:
+        canvas = self.figure.canvas
+        canvas.restore_region(self._background)
+        for artist in self._animated():
+            self.ax.draw_artist(artist)
+        canvas.blit(self.ax.bbox)
+
+    def _format_x(self, x: float, _pos=None) -> str:
+        ts = self._origin + x * self._step
+        dt = datetime.fromtimestamp(ts / 1000.0, tz=timezone.utc)
+        if self._step >= 86_400_000:
+            return dt.strftime("%Y-%m-%d")
+        return dt.strftime("%m-%d %H:%M")
@@ -1,49 +1,126 @@
-"""Candlestick chart widget with optional technical indicators."""
+"""Candlestick chart widget with optional technical indicators.
+
+pandas and mplfinance are only needed by the full-redraw fallback and are
+imported when it is first used, keeping them off the startup path.
+"""
 
 from __future__ import annotations
 
-import pandas as pd
-import mplfinance as mpf
+from typing import Optional, Tuple
+
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from PyQt6.QtCore import QPoint
 from PyQt6.QtWidgets import QWidget, QVBoxLayout
 
+from ..indicators import vectorized
+from ..indicators.cache import IndicatorCache, indicator_cache
 from ..models.app_state import AppState
+from ..controllers.render_scheduler import RenderScheduler
 from ..config import config
+from ..metrics import metrics
+from .candle_renderer import CandleRenderer, Overlays
+
+
+#: Line styles of overlay series, by indicator kind and series name
+_STYLES = {
+    ("bollinger_bands", "upper"): {"color": "grey"},
+    ("bollinger_bands", "middle"): {"color": "grey", "linestyle": ":"},
+    ("bollinger_bands", "lower"): {"color": "grey"},
+    ("keltner_channels", "upper"): {"color": "#8E7CC3"},
+    ("keltner_channels", "middle"): {"color": "#8E7CC3", "linestyle": ":"},
+    ("keltner_channels", "lower"): {"color": "#8E7CC3"},
+    ("vwap", "value"): {"color": "#FFA726"},
+}
 
 
 class ChartView(QWidget):
-    """Displays market data as a candlestick chart."""
+    """Displays market data as a candlestick chart.
+
+    With ``config.chart.incremental_rendering`` enabled the chart is drawn
+    by :class:`CandleRenderer`, which keeps its artists between updates and
+    blits a revised last candle.  Otherwise every update is a full
+    mplfinance plot.
+    """
 
-    def __init__(self, parent: QWidget | None = None) -> None:
+    def __init__(self, parent: QWidget | None = None, cache: IndicatorCache | None = None) -> None:
         super().__init__(parent)
 
         self.app_state = AppState()
+        # Indicator series shared with IndicatorController
+        self.cache = cache or indicator_cache
 
         self.figure = Figure(figsize=(5, 4))
         self.canvas = FigureCanvas(self.figure)
+        self.renderer = CandleRenderer(self.figure)
+        self._render_key: tuple | None = None
+        self._full_redraw = True
+        self.full_redraws = 0  # charts drawn from scratch (0 = nothing drawn yet)
 
         layout = QVBoxLayout(self)
         layout.addWidget(self.canvas)
 
+        # Redraws are coalesced to at most one per frame
+        self.scheduler = RenderScheduler()
+        self.scheduler.register("chart", self._render, self.isVisible)
+
         # React to state changes
         self.app_state.dataUpdated.connect(self._on_data)
-        self.app_state.themeChanged.connect(lambda _t: self.plot())
-        self.app_state.indicatorConfigChanged.connect(self.plot)
+        self.app_state.historyReplaced.connect(self.request_full_redraw)
+        self.app_state.themeChanged.connect(lambda _t: self.request_full_redraw())
+        self.app_state.indicatorConfigChanged.connect(self.request_full_redraw)
 
     # ------------------------------------------------------------------
     # Signal handlers
     # ------------------------------------------------------------------
     def _on_data(self, _frame) -> None:
-        """Replot chart when new market data arrives."""
-        self.plot()
+        """Schedule a chart update when new market data arrives."""
+        self.scheduler.mark_dirty("chart")
+
+    def request_full_redraw(self) -> None:
+        """Schedule a redraw from scratch."""
+        self._full_redraw = True
+        self.scheduler.mark_dirty("chart")
+
+    def showEvent(self, event) -> None:
+        """Catch up on updates skipped while the widget was hidden."""
+        super().showEvent(event)
+        self.scheduler.mark_dirty("chart")
+
+    def _render(self) -> None:
+        if self._full_redraw or not config.chart.incremental_rendering:
+            self._full_redraw = False
+            self.plot()
+        else:
+            self.update_chart()
+
+    def price_axis(self) -> Optional[Tuple[float, float, float, float]]:
+        """``(low, high, top, bottom)``: the visible price range and where it is drawn.
+
+        ``top`` and ``bottom`` are the global (screen) y coordinates of the
+        plot area edges at prices ``high`` and ``low``; ``None`` before the
+        first plot.
+        """
+        ax = self.renderer.ax or (self.figure.axes[0] if self.figure.axes else None)
+        if ax is None:
+            return None
+        low, high = ax.get_ylim()
+        # Matplotlib measures from the bottom of the figure, Qt from the top
+        scale = self.canvas.height() / self.figure.bbox.height
+        y = self.canvas.mapToGlobal(QPoint(0, 0)).y()
+        return low, high, y + (self.figure.bbox.y1 - ax.bbox.y1) * scale, y + (self.figure.bbox.y1 - ax.bbox.y0) * scale
 
     # ------------------------------------------------------------------
     # Plotting helpers
     # ------------------------------------------------------------------
-    def _get_style(self):
+    def _colors(self) -> dict:
         theme = self.app_state.current_theme
-        colors = config.chart.colors_dark if theme == "dark" else config.chart.colors_light
+        return config.chart.colors_dark if theme == "dark" else config.chart.colors_light
+
+    def _get_style(self):
+        import mplfinance as mpf
+
+        colors = self._colors()
         mc = mpf.make_marketcolors(up=colors["up"], down=colors["down"])
         return mpf.make_mpf_style(
             marketcolors=mc,
@@ -58,38 +135,73 @@ class ChartView(QWidget):
             },
         )
 
+    def _current_key(self) -> tuple:
+        """Everything that requires a full redraw when it changes."""
+        indicators = self.app_state.get_enabled_indicators()
+        return (
+            self.app_state.current_theme,
+            self.app_state.current_symbol,
+            self.app_state.current_interval,
+            tuple(sorted((name, tuple(sorted(cfg.items()))) for name, cfg in indicators.items())),
+        )
+
+    def _overlays(self) -> Overlays:
+        """Indicator lines drawn over the current candles.
+
+        Only indicators on the price scale are drawn; oscillators (RSI,
+        MACD, ...) are shown as values in the indicator panel.  Series come
+        from the shared indicator cache.
+        """
+        state = self.app_state
+        overlays: Overlays = {}
+        for name, cfg in state.get_enabled_indicators().items():
+            kind = vectorized.kind_of(name)
+            if kind is None or not vectorized.SPECS[kind].overlay:
+                continue
+            series = self.cache.series(state.current_symbol, state.current_interval, name, cfg, state.candles)
+            for key, values in series.items():
+                if key.startswith("_"):
+                    continue
+                label = name if key == "value" else f"{name}.{key}"
+                overlays[label] = (values, _STYLES.get((kind, key), {}))
+        return overlays
+
+    @metrics.timed("chart.update")
+    def update_chart(self) -> None:
+        """Apply the latest candle without a full redraw when possible."""
+        if not self.app_state.candles:
+            return
+        if not self.renderer.ready or self._render_key != self._current_key():
+            self.plot()
+            return
+        self.renderer.update(self.app_state.candles.view(), self._overlays())
+
+    @metrics.timed("chart.plot")
     def plot(self) -> None:
-        """Render candlestick chart with active indicators."""
-        data = self.app_state.candle_history
-        if not data:
+        """Render candlestick chart with active indicators from scratch."""
+        if not self.app_state.candles:
             return
+        self.full_redraws += 1
 
-        df = pd.DataFrame(data)
+        if config.chart.incremental_rendering:
+            self.renderer.render(self.app_state.candles.view(), self._overlays(), self._colors())
+            self._render_key = self._current_key()
+            return
+
+        import mplfinance as mpf
+        import pandas as pd
+
+        df = self.app_state.candles.to_frame()
         df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
         df.set_index("timestamp", inplace=True)
 
-        apds = []
-        indicators = self.app_state.get_enabled_indicators()
-        if "sma_fast" in indicators:
-            period = indicators["sma_fast"].get("period", 9)
-            df["sma_fast"] = df["close"].rolling(period).mean()
-            apds.append(mpf.make_addplot(df["sma_fast"]))
-        if "sma_slow" in indicators:
-            period = indicators["sma_slow"].get("period", 21)
-            df["sma_slow"] = df["close"].rolling(period).mean()
-            apds.append(mpf.make_addplot(df["sma_slow"]))
-        if "bollinger_bands" in indicators:
-            period = indicators["bollinger_bands"].get("period", 20)
-            std_dev = indicators["bollinger_bands"].get("std_dev", 2)
-            ma = df["close"].rolling(period).mean()
-            std = df["close"].rolling(period).std()
-            df["bb_upper"] = ma + std_dev * std
-            df["bb_lower"] = ma - std_dev * std
-            apds.append(mpf.make_addplot(df["bb_upper"], color="grey"))
-            apds.append(mpf.make_addplot(df["bb_lower"], color="grey"))
-
         self.figure.clear()
+        self.renderer.ax = None
         ax = self.figure.add_subplot(111)
+        apds = [
+            mpf.make_addplot(values, ax=ax, **style)
+            for values, style in self._overlays().values()
+        ]
         mpf.plot(
             df,
             type="candle",
@@ -100,4 +212,3 @@ class ChartView(QWidget):
             warn_too_much_data=10000,
         )
         self.canvas.draw()
-
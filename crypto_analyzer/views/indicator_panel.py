@@ -1,31 +1,70 @@
-"""Panel providing basic indicator toggles."""
+"""Panel providing indicator toggles and their latest values."""
 
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QCheckBox, QLabel
 
 from ..models.app_state import AppState
 
+#: (indicator, checkbox label) in display order
+INDICATORS = (
+    ("sma_fast", "SMA Fast (9)"),
+    ("sma_slow", "SMA Slow (21)"),
+    ("ema", "EMA (50)"),
+    ("wma", "WMA (20)"),
+    ("vwap", "VWAP (dzienny)"),
+    ("bollinger_bands", "Bollinger Bands"),
+    ("keltner_channels", "Keltner Channels"),
+    ("rsi", "RSI (14)"),
+    ("macd", "MACD (12, 26, 9)"),
+    ("atr", "ATR (14)"),
+    ("stochastic", "Stochastic (14, 3)"),
+    ("obv", "OBV"),
+)
+
 
 class IndicatorPanel(QWidget):
-    """Allows enabling or disabling sample indicators."""
+    """Allows enabling or disabling indicators and shows their last values.
+
+    Values arrive through :meth:`show_values`, connected to
+    :attr:`IndicatorController.indicatorUpdated`.
+    """
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.app_state = AppState()
+        self.checkboxes: dict = {}
+        self.values: dict = {}
 
         layout = QVBoxLayout(self)
         layout.addWidget(QLabel("Wskaźniki"))
 
-        self.sma_fast = QCheckBox("SMA Fast (9)")
-        self.sma_fast.toggled.connect(lambda s: self.app_state.update_indicator("sma_fast", s))
-        layout.addWidget(self.sma_fast)
-
-        self.sma_slow = QCheckBox("SMA Slow (21)")
-        self.sma_slow.toggled.connect(lambda s: self.app_state.update_indicator("sma_slow", s))
-        layout.addWidget(self.sma_slow)
-
-        self.bb = QCheckBox("Bollinger Bands")
-        self.bb.toggled.connect(lambda s: self.app_state.update_indicator("bollinger_bands", s))
-        layout.addWidget(self.bb)
+        for name, label in INDICATORS:
+            checkbox = QCheckBox(label)
+            checkbox.toggled.connect(lambda s, name=name: self._toggle(name, s))
+            layout.addWidget(checkbox)
+            value = QLabel()
+            value.setIndent(20)
+            value.hide()
+            layout.addWidget(value)
+            self.checkboxes[name] = checkbox
+            self.values[name] = value
 
         layout.addStretch()
 
+    def _toggle(self, name: str, enabled: bool) -> None:
+        if not enabled:
+            self.values[name].clear()
+            self.values[name].hide()
+        self.app_state.update_indicator(name, enabled)
+
+    def show_values(self, name: str, values: dict) -> None:
+        """Show the latest values of indicator ``name``."""
+        label = self.values.get(name)
+        if label is None or not self.checkboxes[name].isChecked():
+            return
+        shown = {key: value for key, value in values.items() if key != "period"}
+        if list(shown) == ["value"]:
+            text = f"{shown['value']:.6g}"
+        else:
+            text = "  ".join(f"{key} {value:.6g}" for key, value in shown.items())
+        label.setText(text)
+        label.show()
@@ -6,15 +6,21 @@ import logging
 from pathlib import Path
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
                             QToolBar, QComboBox, QPushButton, QLabel, QStatusBar,
-                            QMessageBox, QSplitter)
+                            QMessageBox, QSplitter, QDockWidget)
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QAction, QIcon
+from PyQt6.QtGui import QAction, QIcon, QKeySequence
 
 from ..models.app_state import AppState
 from ..controllers.data_controller import DataController
+from ..controllers.indicator_controller import IndicatorController
+from ..controllers.render_scheduler import RenderScheduler
+from ..controllers.scanner_controller import ScannerController
+from ..metrics import MetricsExporter, metrics
 from .chart_view import ChartView
 from .indicator_panel import IndicatorPanel
 from .orderbook_heatmap import OrderBookHeatmap
+from .perf_overlay import PerfOverlay
+from .scanner_view import ScannerView
 from ..config import config
 
 logger = logging.getLogger(__name__)
@@ -26,6 +32,21 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.app_state = AppState()
         self.data_controller = DataController()
+        self.indicator_controller = IndicatorController(self.app_state)
+        self.scanner_controller = ScannerController()
+        self.scheduler = RenderScheduler()
+        self._pending_frame = None
+        self._scanner_prepared = False
+
+        # Instrumentacja: stale włączona tylko na życzenie (konfiguracja/eksport)
+        self.metrics_exporter = None
+        if config.metrics.enabled or config.metrics.export_path:
+            metrics.enabled = True
+        if config.metrics.export_path:
+            self.metrics_exporter = MetricsExporter(
+                metrics, config.metrics.export_path, config.metrics.export_interval_s
+            )
+            self.metrics_exporter.start()
         
         self.setWindowTitle("Crypto Market Analyzer")
         self.setGeometry(100, 100, 1400, 800)
@@ -34,8 +55,13 @@ class MainWindow(QMainWindow):
         self.setup_connections()
         self.load_theme(self.app_state.current_theme)
         
-        # Start połączenia z danymi
-        self.data_controller.start_streaming()
+        # Start połączenia z danymi.  Szybki start: wykres z bazy (poprzednia
+        # sesja) od razu, połączenia i REST w tle po pierwszym odmalowaniu okna
+        self._start_pending = config.startup.fast_start
+        if self._start_pending:
+            self.data_controller.show_cached()
+        else:
+            self.data_controller.start_streaming()
     
     def setup_ui(self):
         """Inicjalizacja interfejsu użytkownika"""
@@ -65,11 +91,14 @@ class MainWindow(QMainWindow):
         self.chart_view = ChartView()
         chart_splitter.addWidget(self.chart_view)
         
-        # Heat-mapa order book (prawa strona wykresu)
-        self.orderbook_heatmap = OrderBookHeatmap()
+        # Heat-mapa order book (prawa strona wykresu, w skali cen wykresu)
+        self.orderbook_heatmap = OrderBookHeatmap(self.data_controller.depth_heatmap, self.chart_view)
         self.orderbook_heatmap.setMaximumWidth(100)
         chart_splitter.addWidget(self.orderbook_heatmap)
         
+        # Panel wydajności nad wykresem (przełączany F12)
+        self.perf_overlay = PerfOverlay(self.chart_view)
+
         # Proporcje dla chart_splitter
         chart_splitter.setSizes([800, 100])
         
@@ -79,6 +108,14 @@ class MainWindow(QMainWindow):
         splitter.setSizes([250, 900])
         
         main_layout.addWidget(splitter)
+
+        # Skaner rynku w dolnym panelu (przełączany z toolbara)
+        self.scanner_view = ScannerView(self.scanner_controller)
+        self.scanner_dock = QDockWidget("Skaner rynku", self)
+        self.scanner_dock.setObjectName("scanner_dock")
+        self.scanner_dock.setWidget(self.scanner_view)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.scanner_dock)
+        self.scanner_dock.hide()
         
         # Status bar
         self.status_bar = QStatusBar()
@@ -122,18 +159,44 @@ class MainWindow(QMainWindow):
         self.theme_button.setToolTip("Przełącz motyw")
         self.theme_button.clicked.connect(self.toggle_theme)
         toolbar.addWidget(self.theme_button)
+
+        # Panel wydajności
+        self.perf_action = QAction("⏱", self)
+        self.perf_action.setCheckable(True)
+        self.perf_action.setShortcut(QKeySequence("F12"))
+        self.perf_action.setToolTip("Panel wydajności (F12)")
+        self.perf_action.toggled.connect(self.toggle_perf_overlay)
+        toolbar.addAction(self.perf_action)
+
+        # Skaner rynku
+        self.scanner_action = QAction("🔍", self)
+        self.scanner_action.setCheckable(True)
+        self.scanner_action.setToolTip("Skaner rynku")
+        self.scanner_action.toggled.connect(self.toggle_scanner)
+        toolbar.addAction(self.scanner_action)
     
     def setup_connections(self):
         """Konfiguruje połączenia sygnałów"""
         
         # App state signals
         self.app_state.dataUpdated.connect(self.on_data_updated)
+        self.app_state.historyReplaced.connect(self.on_history_replaced)
         self.app_state.connectionStatusChanged.connect(self.on_connection_changed)
         self.app_state.errorOccurred.connect(self.on_error)
         self.app_state.themeChanged.connect(self.load_theme)
+
+        # Ostatnie wartości wskaźników w panelu
+        self.indicator_controller.indicatorUpdated.connect(self.indicator_panel.show_values)
         
         # Symbol change
         self.symbol_combo.currentTextChanged.connect(self.on_symbol_changed)
+
+        # Skaner: dwuklik otwiera parę na wykresie, zamknięcie panelu odznacza akcję
+        self.scanner_view.pairActivated.connect(self.show_pair)
+        self.scanner_dock.visibilityChanged.connect(self.scanner_action.setChecked)
+
+        # Pasek statusu odświeżany najwyżej raz na klatkę
+        self.scheduler.register("status", self.refresh_status)
     
     def set_interval(self, interval: str):
         """Ustawia interwał i aktualizuje przyciski"""
@@ -158,6 +221,13 @@ class MainWindow(QMainWindow):
         self.app_state.set_symbol_interval(symbol, current_interval)
         self.data_controller.change_symbol_interval(symbol, current_interval)
     
+    def show_pair(self, symbol: str, interval: str):
+        """Pokazuje na wykresie parę wybraną w skanerze"""
+        self.symbol_combo.blockSignals(True)
+        self.symbol_combo.setCurrentText(symbol)
+        self.symbol_combo.blockSignals(False)
+        self.set_interval(interval)
+
     def get_current_interval(self) -> str:
         """Zwraca aktualny interwał"""
         for btn in self.interval_buttons:
@@ -171,6 +241,17 @@ class MainWindow(QMainWindow):
         new_theme = 'light' if current_theme == 'dark' else 'dark'
         self.app_state.set_theme(new_theme)
     
+    def toggle_perf_overlay(self, visible: bool):
+        """Pokazuje/ukrywa panel wydajności (metryki zbierane tylko gdy widoczny)"""
+        self.perf_overlay.setVisible(visible)
+
+    def toggle_scanner(self, visible: bool):
+        """Pokazuje/ukrywa skaner; pula procesów startuje w tle przy pierwszym otwarciu"""
+        if visible and not self._scanner_prepared:
+            self._scanner_prepared = True
+            self.scanner_controller.prepare()
+        self.scanner_dock.setVisible(visible)
+
     def load_theme(self, theme: str):
         """Ładuje motyw aplikacji"""
         try:
@@ -192,13 +273,25 @@ class MainWindow(QMainWindow):
     
     def on_data_updated(self, market_frame):
         """Obsługuje aktualizację danych rynkowych"""
-        # Aktualizuj status bar
+        self._pending_frame = market_frame
+        self.scheduler.mark_dirty("status")
+    
+    def refresh_status(self):
+        """Aktualizuje status bar ostatnią ramką rynkową"""
+        market_frame = self._pending_frame
+        if market_frame is None:
+            return
         self.status_bar.showMessage(
             f"Połączony - {market_frame.symbol} | "
             f"Cena: {market_frame.close_price:.8f} | "
             f"Wolumen: {market_frame.volume:.2f}"
         )
     
+    def on_history_replaced(self):
+        """Obsługuje załadowanie całej historii świec"""
+        if self.app_state.latest_market_frame is not None:
+            self.on_data_updated(self.app_state.latest_market_frame)
+    
     def on_connection_changed(self, connected: bool):
         """Obsługuje zmianę statusu połączenia"""
         if connected:
@@ -211,8 +304,18 @@ class MainWindow(QMainWindow):
         logger.error(f"Błąd aplikacji: {error_message}")
         QMessageBox.warning(self, "Błąd", error_message)
     
+    def showEvent(self, event):
+        """Uruchamia strumienie w tle po pierwszym pokazaniu okna"""
+        super().showEvent(event)
+        if self._start_pending:
+            self._start_pending = False
+            QTimer.singleShot(0, lambda: self.data_controller.start_streaming(background=True))
+
     def closeEvent(self, event):
         """Obsługuje zamknięcie aplikacji"""
-        # Zatrzymaj streaming danych
-        self.data_controller.stop_streaming()
+        # Zatrzymaj streaming danych i dokończ zapis do bazy
+        self.data_controller.shutdown()
+        self.scanner_controller.shutdown()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
         event.accept()
@@ -1,13 +1,175 @@
-"""Simple placeholder widget for order book heatmap."""
-from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
+"""Order book heatmap: resting liquidity over time, next to the chart."""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.colors import to_rgb
+from PyQt6.QtCore import QPoint, QRectF
+from PyQt6.QtGui import QColor, QImage, QPainter
+from PyQt6.QtWidgets import QWidget
+
+from ..config import config
+from ..controllers.render_scheduler import RenderScheduler
+from ..metrics import metrics
+from ..models.app_state import AppState
+from ..models.depth_heatmap import DepthHeatmap
+from .chart_view import ChartView
+
+#: Colour maps by theme; the lowest colour is replaced by the chart background
+_COLORMAPS = {"dark": "inferno", "light": "YlOrRd"}
 
 
 class OrderBookHeatmap(QWidget):
-    """Placeholder order book heatmap widget."""
+    """Draws a :class:`DepthHeatmap` as one image aligned with the chart's price axis.
+
+    Time runs left to right over the last ``config.orderbook.heatmap_window_s``
+    seconds, price bottom to top on the chart's scale.  The image is an RGB32
+    ring buffer of one column per sample, written in place: a refresh only
+    converts the rows sampled since the previous one.  Colours are
+    logarithmic in the liquidity, relative to a reference level taken from
+    the latest row.  The whole image is converted again only when the
+    reference drifts by more than ``RESCALE`` or when the heatmap's grid
+    changes.
+    """
 
-    def __init__(self, parent: QWidget | None = None) -> None:
+    #: Liquidity at ``SATURATION`` times the reference gets the hottest colour
+    SATURATION = 4.0
+    #: Reference drift (either way) that re-colours the whole image
+    RESCALE = 2.0
+    #: Percentile of the latest row's liquidity used as the reference
+    PERCENTILE = 95
+
+    def __init__(self, heatmap: DepthHeatmap, chart: ChartView | None = None, parent: QWidget | None = None) -> None:
         super().__init__(parent)
-        layout = QVBoxLayout(self)
-        layout.addWidget(QLabel("Order book heatmap placeholder"))
+        self.heatmap = heatmap
+        self.chart = chart
+        self.app_state = AppState()
+        self.window = max(1, config.orderbook.heatmap_window_s * 1000 // heatmap.sample_ms)
+        # Rows are price buckets (highest first), columns a ring of samples
+        self._pixels = np.zeros((heatmap.buckets, self.window), dtype=np.uint32)
+        self._image = QImage(self._pixels.data, self.window, heatmap.buckets, self.window * 4,
+                             QImage.Format.Format_RGB32)
+        self._palette = self._make_palette()
+        self._samples = 0  # samples converted into the image
+        self._layout = -1
+        self._reference = 0.0
+        self._grid: Tuple[float, float] = (math.nan, 0.0)  # origin, bucket size
+        self.full_refreshes = 0
+        self.setMinimumWidth(40)
+
+        self.scheduler = RenderScheduler()
+        self.scheduler.register("heatmap", self.refresh, self.isVisible)
+        self.app_state.orderbookUpdated.connect(lambda _snapshot: self.scheduler.mark_dirty("heatmap"))
+        self.app_state.themeChanged.connect(self._on_theme)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def _make_palette(self) -> np.ndarray:
+        theme = self.app_state.current_theme
+        colors = config.chart.colors_dark if theme == "dark" else config.chart.colors_light
+        rgb = colormaps[_COLORMAPS.get(theme, "inferno")](np.linspace(0.0, 1.0, 256))[:, :3]
+        rgb[0] = to_rgb(colors["background"])
+        rgb = np.round(rgb * 255).astype(np.uint32)
+        return 0xFF000000 | (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+    def _on_theme(self, _theme: str) -> None:
+        self._palette = self._make_palette()
+        self._layout = -1
+        self.scheduler.mark_dirty("heatmap")
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.scheduler.mark_dirty("heatmap")
+
+    @metrics.timed("heatmap.refresh")
+    def refresh(self) -> None:
+        """Convert the rows sampled since the last refresh, then repaint."""
+        data = self.heatmap.since(self._samples, self.window)
+        full = data.layout != self._layout
+        if full:
+            data = self.heatmap.since(0, self.window)
+        if len(data.rows):
+            reference = self._level(data.rows[-1])
+            if reference and not (self._reference / self.RESCALE <= reference <= self._reference * self.RESCALE):
+                self._reference = reference
+                if not full:
+                    full = True
+                    data = self.heatmap.since(0, self.window)
+        if full:
+            self.full_refreshes += 1
+            self._pixels[:] = self._palette[0]
+        if len(data.rows):
+            self._draw_columns(data.rows, data.samples)
+        self._samples, self._layout = data.samples, data.layout
+        self._grid = (data.origin, data.bucket_size)
+        self.update()
+
+    def _level(self, row: np.ndarray) -> float:
+        filled = row[row > 0]
+        return float(np.percentile(filled, self.PERCENTILE)) if len(filled) else 0.0
+
+    def _draw_columns(self, rows: np.ndarray, samples: int) -> None:
+        """Colour ``rows`` (the samples up to ``samples``) into their image columns."""
+        scale = 255.0 / math.log1p(self.SATURATION)
+        index = np.log1p(np.maximum(rows, 0.0) / self._reference) if self._reference else np.zeros_like(rows)
+        index *= scale
+        np.minimum(index, 255.0, out=index)
+        columns = np.arange(samples - len(rows), samples) % self.window
+        self._pixels[:, columns] = self._palette[index.astype(np.uint8)].T[::-1]
+
+    # ------------------------------------------------------------------
+    # Painting
+    # ------------------------------------------------------------------
+    def _price_span(self) -> Optional[Tuple[float, float, float, float]]:
+        """``(low, high, top, bottom)``: the price range to show and its widget y coordinates."""
+        origin, size = self._grid
+        if math.isnan(origin) or not size:
+            return None
+        span = self.chart.price_axis() if self.chart is not None else None
+        if span is None:
+            return origin, origin + size * self.heatmap.buckets, 0.0, float(self.height())
+        low, high, top, bottom = span
+        y = self.mapToGlobal(QPoint(0, 0)).y()
+        return low, high, top - y, bottom - y
 
+    def paintEvent(self, _event) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(int(self._palette[0])))
+        span = self._price_span()
+        visible = min(self._samples, self.window)
+        if span is None or not visible:
+            return
+        low, high, top, bottom = span
+        if high <= low or bottom <= top:
+            return
+        origin, size = self._grid
+        buckets = self.heatmap.buckets
+        # Image rows of the two prices (row 0 is the top of the highest bucket)
+        row_top = buckets - (high - origin) / size
+        row_bottom = buckets - (low - origin) / size
+        pixels_per_row = (bottom - top) / (row_bottom - row_top)
+        if row_top < 0:
+            top -= row_top * pixels_per_row
+            row_top = 0.0
+        if row_bottom > buckets:
+            bottom -= (row_bottom - buckets) * pixels_per_row
+            row_bottom = float(buckets)
+        if row_bottom <= row_top:
+            return
 
+        # Oldest visible sample on the left; the ring may wrap once
+        column_width = self.width() / self.window
+        start = (self._samples - visible) % self.window
+        x = self.width() - visible * column_width
+        segments = [(start, min(visible, self.window - start))]
+        if segments[0][1] < visible:
+            segments.append((0, visible - segments[0][1]))
+        for column, count in segments:
+            target = QRectF(x, top, count * column_width, bottom - top)
+            painter.drawImage(target, self._image, QRectF(column, row_top, count, row_bottom - row_top))
+            x += count * column_width
@@ -0,0 +1,87 @@
+"""Live performance panel drawn over the chart."""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import QFrame, QLabel, QVBoxLayout, QWidget
+
+from ..metrics import Metrics, metrics
+
+
+class PerfOverlay(QFrame):
+    """Shows stage latencies, message rates, queue depths and dropped frames.
+
+    Metrics are collected only while the overlay is visible, unless
+    ``keep_enabled`` is set (metrics enabled in the config or exported),
+    so the instrumentation costs nothing when nobody is looking.
+    """
+
+    REFRESH_MS = 1000
+
+    def __init__(self, parent: QWidget | None = None, registry: Metrics | None = None) -> None:
+        super().__init__(parent)
+        self.registry = registry or metrics
+        self.keep_enabled = self.registry.enabled
+        self.setObjectName("perfOverlay")
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.setStyleSheet(
+            "#perfOverlay { background: rgba(0, 0, 0, 170); border-radius: 4px; }"
+            "QLabel { color: #E0E0E0; }"
+        )
+
+        self.label = QLabel(self)
+        font = QFont("monospace")
+        font.setStyleHint(QFont.StyleHint.TypeWriter)
+        font.setPointSize(8)
+        self.label.setFont(font)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.addWidget(self.label)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.registry.enabled = True
+        self.raise_()
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._timer.stop()
+        self.registry.enabled = self.keep_enabled
+
+    def refresh(self) -> None:
+        self.label.setText(self.format(self.registry.snapshot()))
+        self.adjustSize()
+        self.move(8, 8)
+
+    @staticmethod
+    def format(snapshot: dict) -> str:
+        """Plain-text table of a :meth:`Metrics.snapshot`."""
+        counters = snapshot["counters"]
+        gauges = snapshot["gauges"]
+        rates = "  ".join(
+            f"{name.split('.', 1)[1]} {value['rate']:.1f}"
+            for name, value in counters.items() if name.startswith("messages.")
+        )
+        lines = [
+            f"Wiadomości/s  {rates or '-'}",
+            "Kolejka ingest {:.0f}  odrzucone {:.0f}  scalone klatki {:.0f}".format(
+                gauges.get("ingest.queue_depth", 0),
+                gauges.get("ingest.dropped", 0),
+                gauges.get("render.coalesced", 0),
+            ),
+            "",
+            f"{'Etap':<30}{'n':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}",
+        ]
+        for name, stage in snapshot["stages"].items():
+            lines.append(
+                f"{name:<30}{stage['count']:>8}{stage['p50_ms']:>9.3f}{stage['p99_ms']:>9.3f}{stage['max_ms']:>9.3f}"
+            )
+        return "\n".join(lines)
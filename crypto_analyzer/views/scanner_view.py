@@ -0,0 +1,129 @@
+"""Sortable table of market scanner matches."""
+
+from __future__ import annotations
+
+from typing import List
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ..controllers.scanner_controller import ScannerController
+from ..scanner.engine import ScanResult
+
+#: Column headers, in the order of :meth:`ScannerView.add_results`
+COLUMNS = ("Symbol", "Interwał", "Warunek", "Sygnał", "Wartość", "Świece", "Cena")
+
+CONDITION_LABELS = {
+    "sma_cross": "Przecięcie SMA",
+    "bollinger_breakout": "Wybicie z Bollingera",
+    "keltner_squeeze": "Squeeze (Bollinger w Keltnerze)",
+    "rsi_extreme": "RSI poza zakresem",
+}
+
+SIGNAL_LABELS = {
+    "up": "▲ w górę",
+    "down": "▼ w dół",
+    "squeeze": "ściśnięcie",
+    "oversold": "wyprzedanie",
+    "overbought": "wykupienie",
+}
+
+
+class _NumberItem(QTableWidgetItem):
+    """Cell shown as formatted text but sorted by its numeric value."""
+
+    def __init__(self, value: float, text: str) -> None:
+        super().__init__(text)
+        self.value = value
+        self.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+    def __lt__(self, other: QTableWidgetItem) -> bool:
+        if isinstance(other, _NumberItem):
+            return self.value < other.value
+        return super().__lt__(other)
+
+
+class ScannerView(QWidget):
+    """Starts scans and lists their matches; a double click opens the pair.
+
+    Rows arrive chunk by chunk while the scan runs.  Any column can be
+    sorted by clicking its header.
+    """
+
+    pairActivated = pyqtSignal(str, str)  # symbol, interval
+
+    def __init__(self, controller: ScannerController, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.controller = controller
+
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.scan_button = QPushButton("Skanuj")
+        self.scan_button.clicked.connect(self.controller.scan)
+        top.addWidget(self.scan_button)
+        self.status = QLabel(f"{len(controller.pairs())} par do skanowania")
+        top.addWidget(self.status, 1)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSortingEnabled(True)
+        self.table.cellDoubleClicked.connect(self._activate)
+        layout.addWidget(self.table)
+
+        controller.scanStarted.connect(self._on_started)
+        controller.resultsFound.connect(self.add_results)
+        controller.scanFinished.connect(self._on_finished)
+        controller.scanFailed.connect(self._on_failed)
+
+    def add_results(self, results: List[ScanResult]) -> None:
+        """Append rows for ``results``, keeping the current sort order."""
+        # Sorting while rows are filled in would move them between setItem calls
+        self.table.setSortingEnabled(False)
+        for result in results:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            cells = (
+                QTableWidgetItem(result.symbol),
+                QTableWidgetItem(result.interval),
+                QTableWidgetItem(CONDITION_LABELS.get(result.condition, result.condition)),
+                QTableWidgetItem(SIGNAL_LABELS.get(result.signal, result.signal)),
+                _NumberItem(result.value, f"{result.value:.4g}"),
+                _NumberItem(result.bars, str(result.bars)),
+                _NumberItem(result.close, f"{result.close:.8g}"),
+            )
+            for column, cell in enumerate(cells):
+                self.table.setItem(row, column, cell)
+        self.table.setSortingEnabled(True)
+
+    def _on_started(self) -> None:
+        self.table.setRowCount(0)
+        self.scan_button.setEnabled(False)
+        self.status.setText("Skanowanie...")
+
+    def _on_finished(self, results: list, seconds: float) -> None:
+        self.scan_button.setEnabled(True)
+        pairs = len({(result.symbol, result.interval) for result in results})
+        self.status.setText(f"{len(results)} sygnałów na {pairs} parach ({seconds:.2f} s)")
+
+    def _on_failed(self, message: str) -> None:
+        self.scan_button.setEnabled(True)
+        self.status.setText(f"Błąd skanowania: {message}")
+
+    def _activate(self, row: int, _column: int) -> None:
+        self.pairActivated.emit(self.table.item(row, 0).text(), self.table.item(row, 1).text())
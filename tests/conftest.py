@@ -0,0 +1,51 @@
+import importlib
+
+import numpy as np
+import pytest
+
+from crypto_analyzer.models.candle_store import Candles
+
+
+@pytest.fixture
+def make_candles():
+    """Factory of ``n`` consistent 1m OHLCV candles following a random walk around 30 000."""
+
+    def make(n, seed=0, start=1_704_067_200_000):
+        rng = np.random.default_rng(seed)
+        close = 30_000.0 * np.exp(np.cumsum(rng.normal(0.0, 0.001, n)))
+        open_ = np.r_[close[:1], close[:-1]]
+        spread = np.abs(rng.normal(0.0, 0.0005, n)) * close
+        high = np.maximum(open_, close) + spread
+        low = np.minimum(open_, close) - spread
+        timestamp = start + 60_000 * np.arange(n, dtype=np.int64)
+        return Candles(timestamp, open_, high, low, close, rng.gamma(2.0, 5.0, n))
+
+    return make
+
+
+@pytest.fixture
+def app_state(monkeypatch):
+    """Fresh ``AppState`` singleton whose signals are plain callbacks (no Qt event loop)."""
+    from PyQt6 import QtCore
+
+    class DummySignal:
+        def __init__(self, *args, **kwargs):
+            self._slots = []
+
+        def connect(self, func):
+            self._slots.append(func)
+
+        def emit(self, *args, **kwargs):
+            for slot in self._slots:
+                slot(*args, **kwargs)
+
+    monkeypatch.setattr(QtCore, "QObject", object)
+    monkeypatch.setattr(QtCore, "pyqtSignal", lambda *a, **k: DummySignal())
+    import crypto_analyzer.models.app_state as module
+    importlib.reload(module)
+    AppState = module.AppState
+    AppState._instance = None
+    state = AppState()
+    yield state
+    AppState._instance = None
+    importlib.reload(module)
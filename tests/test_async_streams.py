@@ -0,0 +1,216 @@
+import asyncio
+import json
+
+import pytest
+from websockets.asyncio.server import serve
+
+from crypto_analyzer.models import async_streams
+from crypto_analyzer.models.async_streams import AsyncStreamClient, DepthUpdate, KlineUpdate, StreamThread
+
+KLINE = "btcusdt@kline_1m"
+DEPTH = "btcusdt@depth@100ms"
+
+
+@pytest.fixture(autouse=True)
+def fast_commands(monkeypatch):
+    monkeypatch.setattr(async_streams, "COMMAND_INTERVAL", 0.0)
+
+
+class FakeBinance:
+    """Local stand-in for the combined stream endpoint (live SUBSCRIBE/UNSUBSCRIBE)."""
+
+    def __init__(self):
+        self.connections = {}  # websocket -> subscribed streams
+        self.opened = 0
+        self.commands = []
+
+    async def handler(self, ws):
+        self.opened += 1
+        streams = self.connections[ws] = set()
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                self.commands.append((msg["method"], sorted(msg["params"])))
+                if msg["method"] == "SUBSCRIBE":
+                    streams.update(msg["params"])
+                else:
+                    streams.difference_update(msg["params"])
+                await ws.send(json.dumps({"result": None, "id": msg["id"]}))
+        finally:
+            del self.connections[ws]
+
+    async def push(self, stream, data, force=False):
+        for ws, streams in list(self.connections.items()):
+            if force or stream in streams:
+                await ws.send(json.dumps({"stream": stream, "data": data}))
+
+    def subscribed(self):
+        return set().union(*self.connections.values()) if self.connections else set()
+
+
+def kline(t, close, closed=True):
+    return {
+        "e": "kline", "E": t + 1, "s": "BTCUSDT",
+        "k": {"t": t, "s": "BTCUSDT", "i": "1m", "o": "1", "h": "3", "l": "0.5", "c": str(close), "v": "10", "x": closed},
+    }
+
+
+def depth(first, last):
+    return {"e": "depthUpdate", "E": 5, "s": "BTCUSDT", "U": first, "u": last, "b": [["1.0", "2"]], "a": []}
+
+
+async def wait_until(predicate, timeout=5.0):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def run(scenario, **options):
+    async def main():
+        fake = FakeBinance()
+        async with serve(fake.handler, "127.0.0.1", 0) as server:
+            url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/stream"
+            client = AsyncStreamClient(url, backoff=0.01, max_backoff=0.05, **options)
+            try:
+                await asyncio.wait_for(scenario(client, fake, url), 10)
+            finally:
+                await client.close()
+
+    asyncio.run(main())
+
+
+def test_updates_arrive_typed_and_batched():
+    async def scenario(client, fake, url):
+        updates = client.updates()
+        first = asyncio.ensure_future(anext(updates))
+        assert await client.subscribe([KLINE, DEPTH]) == [KLINE, DEPTH]
+        assert fake.subscribed() == {KLINE, DEPTH}
+
+        await fake.push(KLINE, kline(0, 2.0, closed=False))
+        await fake.push(DEPTH, depth(1, 3))
+        await fake.push(KLINE, kline(0, 2.5))
+        await wait_until(lambda: client.stats().decoded == 3)
+
+        batch = await first  # everything that arrived meanwhile
+        assert [k.close for k in batch.klines] == [2.0, 2.5]
+        assert [k.closed for k in batch.klines] == [False, True]
+        assert isinstance(batch.klines[0], KlineUpdate) and isinstance(batch.depth[0], DepthUpdate)
+        assert batch.klines[1].to_frame().close_price == 2.5
+        assert batch.depth[0].as_event()["u"] == 3
+        assert batch.dropped == 0
+        await updates.aclose()
+
+    run(scenario)
+
+
+def test_in_progress_klines_are_not_decoded_without_a_consumer_for_them():
+    async def scenario(client, fake, url):
+        updates = client.updates(depth=False, closed_only=True)
+        first = asyncio.ensure_future(anext(updates))
+        await client.subscribe([KLINE])
+        await fake.push(KLINE, kline(0, 2.0, closed=False))
+        await fake.push(KLINE, kline(0, 2.5))
+        batch = await first
+        assert [k.close for k in batch.klines] == [2.5]
+        assert client.stats().skipped == 1
+        await updates.aclose()
+
+    run(scenario)
+
+
+def test_unsubscribe_releases_streams_and_drops_their_messages():
+    async def scenario(client, fake, url):
+        await client.subscribe([KLINE, DEPTH])
+        await client.subscribe([DEPTH])
+        assert await client.unsubscribe([DEPTH]) == []
+        assert await client.unsubscribe([DEPTH]) == [DEPTH]
+        assert fake.subscribed() == {KLINE}
+        assert ("UNSUBSCRIBE", [DEPTH]) in fake.commands
+
+        await fake.push(DEPTH, depth(1, 2), force=True)
+        await fake.push(KLINE, kline(0, 1.0))
+        await wait_until(lambda: client.stats().messages == 2)
+        assert client.stats().decoded == 1
+
+        assert await client.unsubscribe([KLINE]) == [KLINE]
+        await wait_until(lambda: not fake.connections)  # an empty connection is closed
+        assert client.sockets == {}
+
+    run(scenario)
+
+
+def test_cancelled_subscribe_leaves_consistent_state():
+    async def scenario(client, fake, url):
+        task = asyncio.ensure_future(client.subscribe([KLINE]))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert client.streams == {KLINE} and client.refcount(KLINE) == 1
+        await wait_until(lambda: fake.subscribed() == {KLINE})
+        assert await client.unsubscribe([KLINE]) == [KLINE]
+        assert client.streams == set()
+
+    run(scenario)
+
+
+def test_dropped_connection_reconnects_and_resubscribes():
+    async def scenario(client, fake, url):
+        await client.subscribe([KLINE, DEPTH])
+        (name,) = client.sockets
+        ws = next(iter(fake.connections))
+        await ws.close()
+
+        await wait_until(lambda: fake.opened == 2 and fake.subscribed() == {KLINE, DEPTH})
+        assert client.stats().reconnects == 1
+        assert list(client.sockets) == [name]
+
+        assert client.reconnect(name) == name  # forced, e.g. by the supervisor
+        await wait_until(lambda: fake.opened == 3 and fake.subscribed() == {KLINE, DEPTH})
+        assert [h.name for h in client.health()] == [name]
+
+    run(scenario)
+
+
+def test_slow_consumer_keeps_the_newest_updates():
+    async def scenario(client, fake, url):
+        updates = client.updates(max_batch=10)
+        first = asyncio.ensure_future(anext(updates))
+        await client.subscribe([KLINE])
+        await fake.push(KLINE, kline(0, 0.0))
+        assert len((await first).klines) == 1
+
+        # The consumer is busy (suspended in the loop body) while these arrive
+        for i in range(1, 6):
+            await fake.push(KLINE, kline(i * 60_000, float(i)))
+        await wait_until(lambda: client.stats().decoded == 6)
+        batch = await anext(updates)
+        assert [k.close for k in batch.klines] == [4.0, 5.0]
+        assert batch.dropped == 3 and client.stats().dropped == 3
+        await updates.aclose()
+
+    run(scenario, max_pending=2)
+
+
+def test_stream_thread_offers_the_subscription_manager_interface():
+    async def scenario(client, fake, url):
+        batches = []
+        thread = StreamThread(batches.append, url, closed_only=True, backoff=0.01)
+        assert thread.health() == [] and thread.streams == set()  # no loop thread yet
+
+        assert await asyncio.to_thread(thread.subscribe, [KLINE]) == [KLINE]
+        await wait_until(lambda: fake.subscribed() == {KLINE})
+        await fake.push(KLINE, kline(0, 7.0))
+        await wait_until(lambda: batches)
+        assert batches[0].klines[0].close == 7.0
+        assert thread.streams == {KLINE}
+        assert [h.streams for h in thread.health()] == [frozenset({KLINE})]
+
+        await asyncio.to_thread(thread.close)
+        await wait_until(lambda: not fake.connections)
+        assert thread.streams == set()
+
+    run(scenario)
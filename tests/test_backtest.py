@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import random_walk_candles
+from crypto_analyzer.backtest import strategies
+from crypto_analyzer.backtest.__main__ import parse_grid
+from crypto_analyzer.backtest.engine import Backtester, History, combinations
+from crypto_analyzer.models.candle_store import Candles
+
+
+def reference(close, position, cost):
+    """Candle by candle accounting: total return, max drawdown, trades and wins."""
+    equity, peak, drawdown, trades, trade = 1.0, 1.0, 0.0, [], None
+    for i in range(len(close)):
+        held, ratio = (position[i - 1], close[i] / close[i - 1]) if i else (0.0, 1.0)
+        growth = ratio if held > 0 else 2.0 - ratio if held < 0 else 1.0
+        equity *= growth
+        if trade is not None:
+            trade *= growth
+        if position[i] != held:
+            if held:
+                equity *= 1 - cost
+                trades.append(trade * (1 - cost))
+                trade = None
+            if position[i]:
+                equity *= 1 - cost
+                trade = 1 - cost
+        peak = max(peak, equity)
+        drawdown = max(drawdown, 1 - equity / peak)
+    if trade is not None:
+        trades.append(trade)
+    return equity - 1, drawdown, len(trades), sum(t > 1 for t in trades)
+
+
+def test_hold_forward_fills_entry_and_exit_events():
+    enter = np.array([0, 1, 0, 0, 1, 0, 0, 1, 0], dtype=bool)
+    exit_ = np.array([1, 0, 0, 1, 1, 0, 1, 0, 0], dtype=bool)
+    np.testing.assert_array_equal(strategies._hold(enter, exit_), [0, 1, 1, 0, 1, 1, 0, 1, 1])
+    assert not strategies._hold(np.zeros(3, bool), np.zeros(3, bool)).any()
+
+
+@pytest.mark.parametrize("name", sorted(strategies.STRATEGIES))
+@pytest.mark.parametrize("short", [False, True])
+def test_vectorized_accounting_matches_candle_by_candle(name, short):
+    candles = random_walk_candles(3_000, seed=7)
+    history = History(candles)
+    cfg = {"short": short, "fast": 5, "atr_mult": 1.0}
+    position = strategies.positions(name, history.indicators, cfg)
+    assert set(np.unique(position)) <= {-1.0, 0.0, 1.0}
+    assert (position < 0).any() == short
+
+    total, drawdown, sharpe, trades, win_rate, exposure = history.simulate(position, 0.0015)
+
+    expected = reference(candles.close, position, 0.0015)
+    assert total == pytest.approx(expected[0], rel=1e-9)
+    assert drawdown == pytest.approx(expected[1], rel=1e-9)
+    assert trades == expected[2] > 0
+    assert win_rate == expected[3] / expected[2]
+    assert exposure == pytest.approx(np.count_nonzero(position[:-1]) / len(position))
+    assert sharpe < 0  # random walk minus costs
+
+
+def test_simulate_hand_computed_trade():
+    close = np.array([100.0, 110.0, 121.0, 121.0])
+    candles = Candles(60_000 * np.arange(4), close, close, close, close, np.ones(4))
+    history = History(candles)
+
+    total, drawdown, _sharpe, trades, win_rate, exposure = history.simulate(np.array([1.0, 1.0, 0.0, 0.0]), 0.0)
+    assert (total, drawdown, trades, win_rate, exposure) == (pytest.approx(0.21), 0.0, 1, 1.0, 0.5)
+
+    total, drawdown, _sharpe, trades, win_rate, _exposure = history.simulate(np.array([-1.0, -1.0, 0.0, 0.0]), 0.01)
+    assert total == pytest.approx(0.9 * 0.9 * 0.99 * 0.99 - 1)
+    assert drawdown == pytest.approx(1 - 0.99 * 0.9 * 0.9 * 0.99)
+    assert (trades, win_rate) == (1, 0.0)
+    assert math.isnan(history.simulate(np.zeros(4), 0.01)[4])
+
+
+def test_combinations_skip_invalid_pairs():
+    combos = combinations("sma_cross", {"fast": [5, 10, 20], "slow": [10, 20]})
+    assert [(cfg["fast"], cfg["slow"]) for cfg in combos] == [(5, 10), (5, 20), (10, 20)]
+    assert all(cfg["short"] is False for cfg in combos)
+    with pytest.raises(ValueError):
+        combinations("sma_cross", {"period": [5]})
+    assert parse_grid("sma_cross", ["fast=5:15:5", "slow=30,40", "short=0,1"]) == {
+        "fast": [5, 10, 15], "slow": [30, 40], "short": [False, True]
+    }
+
+
+def test_pool_sweep_matches_in_process_sweep(monkeypatch):
+    candles = random_walk_candles(5_000, seed=3)
+    grid = {"fast": range(3, 12, 2), "slow": range(10, 40, 6)}
+    serial = Backtester(workers=1).sweep(candles, "sma_cross", grid)
+    assert len(serial) == len(combinations("sma_cross", grid))
+    assert [r.total_return for r in serial] == sorted((r.total_return for r in serial), reverse=True)
+    assert serial[0] == Backtester().run(candles, "sma_cross", serial[0].params)
+
+    monkeypatch.setattr(Backtester, "MIN_PARALLEL", 1)
+    chunks = []
+    with Backtester(workers=2) as backtester:
+        assert backtester.sweep(candles, "sma_cross", grid, chunks.append) == serial
+        assert len(chunks) > 1 and sum(map(len, chunks)) == len(serial)
+        # Workers move on to the next history
+        other = random_walk_candles(2_000, seed=4)
+        assert backtester.sweep(other, "sma_cross", grid) == Backtester(workers=1).sweep(other, "sma_cross", grid)
@@ -0,0 +1,52 @@
+import numpy as np
+
+from benchmarks.generators import depth_events, kline_messages, order_book_snapshot, random_walk_candles
+from benchmarks.runner import Result, compare, load, save
+from crypto_analyzer.models.order_book import OrderBookSync
+
+
+def test_random_walk_candles_are_consistent():
+    candles = random_walk_candles(1_000, seed=1)
+
+    assert candles.rows == 1_000
+    assert (np.diff(candles.timestamp) == 60_000).all()
+    assert (candles.high >= np.maximum(candles.open, candles.close)).all()
+    assert (candles.low <= np.minimum(candles.open, candles.close)).all()
+    assert (candles.open[1:] == candles.close[:-1]).all()
+    msg = next(kline_messages(candles))
+    assert msg["k"]["x"] and msg["k"]["t"] == candles.timestamp[0]
+
+
+def test_depth_events_stay_in_sync_with_snapshot():
+    snapshot = order_book_snapshot(levels=50)
+    book = OrderBookSync("BTCUSDT", lambda _symbol: snapshot, run_async=lambda fn: fn())
+
+    changed = [book.on_event(event) for event in depth_events(100, depth=50)]
+
+    assert book.synced and book.resyncs == 0
+    assert all(changed[1:])
+    assert book.book.last_update_id == 101
+
+
+def test_compare_flags_regressions_in_both_directions(tmp_path):
+    baseline = [
+        Result("latency", 10.0, "ms"),
+        Result("throughput", 1_000.0, "rows/s", lower_is_better=False),
+        Result("stable", 5.0, "ms"),
+    ]
+    path = tmp_path / "baseline.json"
+    save(str(path), baseline)
+
+    results = [
+        Result("latency", 13.0, "ms"),
+        Result("throughput", 700.0, "rows/s", lower_is_better=False),
+        Result("stable", 5.1, "ms"),
+        Result("new", 1.0, "ms"),
+    ]
+    comparisons = {c.name: c for c in compare(results, load(str(path)), threshold=0.25)}
+
+    assert set(comparisons) == {"latency", "throughput", "stable"}
+    assert comparisons["latency"].regressed
+    assert comparisons["throughput"].regressed
+    assert round(comparisons["throughput"].change, 3) == 0.429
+    assert not comparisons["stable"].regressed
@@ -1,12 +1,18 @@
+import subprocess
+import sys
+
+import binance
+import binance.client
 import pytest
 from crypto_analyzer.models.binance_client import BinanceClient
 
 
 @pytest.fixture
 def client_with_mocks(mocker):
-    client_cls = mocker.patch('crypto_analyzer.models.binance_client.Client')
-    twm_cls = mocker.patch('crypto_analyzer.models.binance_client.ThreadedWebsocketManager')
-    client_instance = client_cls.return_value
+    client_cls = mocker.patch('binance.client.Client')
+    twm_cls = mocker.patch('binance.ThreadedWebsocketManager')
+    rest_cls = mocker.patch('crypto_analyzer.models.binance_client.BinanceRestClient')
+    client_instance = rest_cls.return_value
     twm_instance = twm_cls.return_value
     bc = BinanceClient('key', 'secret', testnet=True)
     return bc, client_instance, twm_instance
@@ -18,7 +24,7 @@ def test_get_klines(client_with_mocks):
 
     result = bc.get_klines('BTCUSDT', '1m', limit=10)
 
-    client_instance.get_klines.assert_called_once_with(symbol='BTCUSDT', interval='1m', limit=10)
+    client_instance.get_klines.assert_called_once_with('BTCUSDT', '1m', limit=10, start_time=None, end_time=None)
     assert result == ['data']
 
 
@@ -53,3 +59,43 @@ def test_stop(client_with_mocks):
 
     twm_instance.stop.assert_called_once()
     assert bc._twm is None
+
+
+def test_get_klines_with_time_range(client_with_mocks):
+    bc, client_instance, _ = client_with_mocks
+
+    bc.get_klines('BTCUSDT', '1m', limit=1000, start_time=0, end_time=60_000)
+
+    client_instance.get_klines.assert_called_once_with('BTCUSDT', '1m', limit=1000, start_time=0, end_time=60_000)
+
+
+def test_multiplex_socket_and_stop_socket(client_with_mocks):
+    bc, _, twm_instance = client_with_mocks
+    callback = lambda x: x
+    twm_instance.start_multiplex_socket.return_value = 'socket-1'
+
+    name = bc.start_multiplex_socket(['btcusdt@kline_1m', 'ethusdt@kline_1m'], callback)
+    bc.stop_socket(name)
+
+    twm_instance.start_multiplex_socket.assert_called_once_with(
+        callback=callback, streams=['btcusdt@kline_1m', 'ethusdt@kline_1m']
+    )
+    twm_instance.stop_socket.assert_called_once_with('socket-1')
+    twm_instance.stop.assert_not_called()
+
+
+def test_python_binance_is_imported_lazily(client_with_mocks):
+    bc, _, _ = client_with_mocks
+
+    assert bc._client is None  # no network round trip on construction
+    assert bc.client is binance.client.Client.return_value
+    binance.client.Client.assert_called_once_with(api_key='key', api_secret='secret', testnet=True)
+
+
+def test_importing_the_wrapper_does_not_import_python_binance():
+    code = (
+        "import sys, crypto_analyzer.models.binance_client; "
+        "print('binance' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,108 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from crypto_analyzer.config import config
+from crypto_analyzer.models.candle_store import CandleStore
+from crypto_analyzer.views.candle_renderer import CandleRenderer
+
+
+def make_store(n=100, capacity=100):
+    store = CandleStore(capacity)
+    for i in range(n):
+        store.append(i * 60_000, 100 + i, 102 + i, 98 + i, 101 + i, 1.0)
+    return store
+
+
+def make_renderer():
+    figure = Figure(figsize=(6, 4))
+    FigureCanvasAgg(figure)
+    return CandleRenderer(figure)
+
+
+def overlays(candles):
+    return {"sma": (np.asarray(candles.close, dtype=float), {})}
+
+
+def test_render_builds_static_and_last_candle_artists():
+    store = make_store(50)
+    renderer = make_renderer()
+
+    renderer.render(store.view(), overlays(store.view()), config.chart.colors_dark)
+    renderer.figure.canvas.draw()
+
+    assert renderer.ready
+    assert len(renderer._bodies.get_paths()) == 49
+    assert len(renderer._last_body.get_paths()) == 1
+    assert renderer._lines["sma"].get_xdata()[-1] == 49
+    assert renderer._background is not None
+
+
+def test_revising_last_candle_is_blitted():
+    store = make_store(50)
+    renderer = make_renderer()
+    renderer.render(store.view(), overlays(store.view()), config.chart.colors_dark)
+    renderer.figure.canvas.draw()
+    ylim = renderer.ax.get_ylim()
+
+    store.update_last(49 * 60_000, 149, 150, 148, 148.5, 2.0)
+    assert renderer.update(store.view(), overlays(store.view())) is True
+    assert renderer.ax.get_ylim() == ylim
+    assert renderer._last_body.get_paths()[0].vertices[1, 1] == 148.5
+
+
+def test_new_candle_is_blitted_until_the_right_margin_is_used_up():
+    store = make_store(100)
+    renderer = make_renderer()
+    renderer.render(store.view(), overlays(store.view()), config.chart.colors_dark)
+    renderer.figure.canvas.draw()
+    xlim, ylim = renderer.ax.get_xlim(), renderer.ax.get_ylim()
+    assert xlim[1] == 99 + 1 + 5
+
+    for i in range(100, 105):  # each one evicts the oldest candle
+        store.append(i * 60_000, 100 + i, 102 + i, 98 + i, 101 + i, 1.0)
+        assert renderer.update(store.view(), overlays(store.view())) is True
+    assert (renderer.ax.get_xlim(), renderer.ax.get_ylim()) == (xlim, ylim)
+    assert len(renderer._bodies.get_paths()) == 99
+    assert len(renderer._tail_bodies.get_paths()) == 5
+    assert renderer._last_body.get_paths()[0].vertices[1, 1] == 205
+
+    store.append(105 * 60_000, 205, 207, 203, 206, 1.0)
+    assert renderer.update(store.view(), overlays(store.view())) is False
+    assert renderer.ax.get_xlim()[1] == 105 + 1 + 5
+    assert len(renderer._bodies.get_paths()) == 99
+    assert len(renderer._tail_bodies.get_paths()) == 0
+
+
+def test_blitted_candles_match_a_full_draw():
+    store = make_store(100, capacity=200)
+    renderer = make_renderer()
+    renderer.render(store.view(), overlays(store.view()), config.chart.colors_dark)
+    renderer.figure.canvas.draw()
+
+    for i in range(100, 103):
+        store.append(i * 60_000, 100 + i, 102 + i, 98 + i, 101 + i, 1.0)
+        assert renderer.update(store.view(), overlays(store.view())) is True
+    store.update_last(102 * 60_000, 202, 204, 199, 200, 2.0)
+    assert renderer.update(store.view(), overlays(store.view())) is True
+    blitted = np.asarray(renderer.figure.canvas.buffer_rgba()).copy()
+
+    renderer.figure.canvas.draw()
+    full = np.asarray(renderer.figure.canvas.buffer_rgba()).astype(int)
+    assert np.abs(full - blitted).max() <= 1  # antialiasing rounding only
+
+
+def test_limit_break_or_new_history_redraws():
+    store = make_store(100)
+    renderer = make_renderer()
+    renderer.render(store.view(), overlays(store.view()), config.chart.colors_dark)
+    renderer.figure.canvas.draw()
+
+    store.update_last(99 * 60_000, 199, 500, 198, 201, 1.0)
+    assert renderer.update(store.view(), overlays(store.view())) is False
+    assert renderer.ax.get_ylim()[1] > 500
+
+    renderer.figure.canvas.draw()
+    other = make_store(50)
+    assert renderer.update(other.view(), overlays(other.view())) is False
+    assert len(renderer._bodies.get_paths()) == 49
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from crypto_analyzer.models.candle_repository import CandleRepository
+from crypto_analyzer.models.candle_store import Candles
+from crypto_analyzer.models.database import Database
+
+
+def make_candles(timestamps, base=100.0):
+    ts = np.asarray(timestamps, dtype=np.int64)
+    close = base + ts / 1000.0
+    return Candles(ts, close - 1, close + 2, close - 2, close, np.full(len(ts), 5.0))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    repository = CandleRepository(db)
+    repository.ensure_schema()
+    yield repository
+    db.close()
+
+
+def test_symbols_and_intervals_do_not_overwrite_each_other(repo):
+    repo.upsert('BTCUSDT', '1m', make_candles([0, 60_000], base=30000))
+    repo.upsert('ETHUSDT', '1m', make_candles([0, 60_000], base=2000))
+    repo.upsert('BTCUSDT', '1h', make_candles([0], base=31000))
+
+    assert repo.get_range('BTCUSDT', '1m').close.tolist() == [30000.0, 30060.0]
+    assert repo.get_range('ETHUSDT', '1m').close.tolist() == [2000.0, 2060.0]
+    assert repo.get_range('BTCUSDT', '1h').close.tolist() == [31000.0]
+
+
+def test_get_range_and_latest(repo):
+    repo.upsert('BTCUSDT', '1m', make_candles(range(0, 600_000, 60_000)))
+
+    window = repo.get_range('BTCUSDT', '1m', 120_000, 240_000)
+    assert window.timestamp.tolist() == [120_000, 180_000, 240_000]
+    assert window.timestamp.dtype == np.int64
+
+    latest = repo.latest('BTCUSDT', '1m', 3)
+    assert latest.timestamp.tolist() == [420_000, 480_000, 540_000]
+    assert latest.timestamp.flags['C_CONTIGUOUS']
+
+    assert repo.get_range('XRPUSDT', '1m').rows == 0
+
+
+def test_upsert_replaces_existing_candle(repo):
+    repo.upsert('BTCUSDT', '1m', make_candles([0], base=1))
+    repo.upsert('BTCUSDT', '1m', make_candles([0], base=2))
+
+    assert repo.get_range('BTCUSDT', '1m').close.tolist() == [2.0]
+
+
+def test_migrates_legacy_table(tmp_path):
+    db = Database(str(tmp_path / 'legacy.db'))
+    db.create_table(
+        'CREATE TABLE klines (timestamp INTEGER PRIMARY KEY, symbol TEXT, open REAL, high REAL, '
+        'low REAL, close REAL, volume REAL, interval TEXT)'
+    )
+    db.insert('klines', {'timestamp': 0, 'symbol': 'BTCUSDT', 'open': 1, 'high': 2,
+                         'low': 0.5, 'close': 1.5, 'volume': 3, 'interval': '1m'})
+
+    repo = CandleRepository(db)
+    repo.ensure_schema()
+    repo.ensure_schema()  # idempotent once migrated
+
+    migrated = repo.get_range('BTCUSDT', '1m')
+    assert migrated.timestamp.tolist() == [0]
+    assert migrated.close.tolist() == [1.5]
+    tables = [row[1] for row in db.select('sqlite_master', 'type=?', ('table',))]
+    assert tables == ['klines']
+    db.close()
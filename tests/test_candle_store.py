@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from crypto_analyzer.models.candle_store import CandleStore, Candles
+
+
+def fill(store, timestamps):
+    for ts in timestamps:
+        store.append(ts, ts + 0.1, ts + 0.5, ts - 0.5, ts + 0.2, 10.0 * ts)
+
+
+def test_append_and_evict_keeps_contiguous_window():
+    store = CandleStore(capacity=3)
+    fill(store, range(1, 6))
+
+    assert len(store) == 3
+    assert store.column("timestamp").tolist() == [3, 4, 5]
+    assert store.column("close").tolist() == pytest.approx([3.2, 4.2, 5.2])
+    assert store.column("close").flags["C_CONTIGUOUS"]
+    assert store.last_timestamp == 5
+
+
+def test_views_are_zero_copy_and_read_only():
+    store = CandleStore(capacity=4)
+    fill(store, [1, 2])
+
+    view = store.view()
+    assert np.shares_memory(view.close, store.column("close"))
+    with pytest.raises(ValueError):
+        view.close[0] = 0.0
+
+
+def test_upsert_updates_last_candle():
+    store = CandleStore(capacity=2)
+    assert store.upsert(1, 1.0, 2.0, 0.5, 1.5, 1.0) is True
+    assert store.upsert(1, 1.0, 3.0, 0.5, 2.5, 2.0) is False
+
+    assert len(store) == 1
+    assert store.column("high").tolist() == [3.0]
+    assert store.column("volume").tolist() == [2.0]
+
+
+def test_replace_and_resize_keep_newest_rows():
+    store = CandleStore(capacity=3)
+    ts = np.arange(5, dtype=np.int64)
+    store.replace(Candles(ts, *(ts.astype(float) for _ in range(5))))
+    assert store.column("timestamp").tolist() == [2, 3, 4]
+
+    store.resize(2)
+    assert store.capacity == 2
+    assert store.column("timestamp").tolist() == [3, 4]
+
+    store.append(5, 5, 5, 5, 5, 5)
+    assert store.column("timestamp").tolist() == [4, 5]
+
+
+def test_frame_and_records_match_columns():
+    store = CandleStore(capacity=5)
+    fill(store, [1, 2])
+
+    frame = store.to_frame()
+    assert list(frame.columns) == list(CandleStore.COLUMNS)
+    assert frame["timestamp"].tolist() == [1, 2]
+    assert store.to_records()[-1] == {
+        "timestamp": 2, "open": 2.1, "high": 2.5, "low": 1.5, "close": 2.2, "volume": 20.0,
+    }
+
+
+def test_versions_tell_appends_from_rewrites():
+    store = CandleStore(capacity=3)
+    other = CandleStore(capacity=3)
+    assert store.version != other.version
+
+    history, version = store.history_version, store.version
+    fill(store, range(1, 6))  # including evictions
+    store.upsert(5, 1.0, 2.0, 0.5, 1.5, 1.0)
+    assert store.history_version == history
+    assert store.version > version
+
+    for rewrite in (lambda: store.replace(store.view()), lambda: store.resize(2), store.clear):
+        history = store.history_version
+        rewrite()
+        assert store.history_version > history
+        assert store.version == store.history_version
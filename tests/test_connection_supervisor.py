@@ -0,0 +1,116 @@
+from itertools import count
+
+import pytest
+
+from crypto_analyzer.controllers.connection_supervisor import ConnectionSupervisor
+from crypto_analyzer.models.subscriptions import SubscriptionManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    def __init__(self):
+        self.sockets = {}
+        self.stopped = []
+        self.fail = 0
+        self._ids = count(1)
+
+    def start_multiplex_socket(self, streams, callback):
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("network down")
+        name = f"socket-{next(self._ids)}"
+        self.sockets[name] = (list(streams), callback)
+        return name
+
+    def stop_socket(self, name):
+        self.stopped.append(name)
+        self.sockets.pop(name)
+
+    def send(self, name, stream="a"):
+        self.sockets[name][1]({"stream": stream, "data": {}})
+
+
+@pytest.fixture
+def setup():
+    clock, client, statuses = FakeClock(), FakeClient(), []
+    manager = SubscriptionManager(client, lambda stream, data: None, clock=clock)
+    supervisor = ConnectionSupervisor(
+        manager, statuses.append, stale_after=10, backoff=1, max_backoff=8, clock=clock, jitter=lambda: 1.0
+    )
+    manager.subscribe(["a", "b"])
+    return supervisor, manager, client, clock, statuses
+
+
+def test_live_sockets_are_left_alone(setup):
+    supervisor, _, client, clock, statuses = setup
+    for _ in range(5):
+        clock.now += 5
+        client.send("socket-1")
+        assert supervisor.check()
+    assert client.stopped == []
+    assert statuses == []
+
+
+def test_silent_socket_is_replaced_and_recovers_on_first_message(setup):
+    supervisor, manager, client, clock, statuses = setup
+    client.send("socket-1")
+    clock.now = 11
+
+    assert not supervisor.check()
+    assert statuses == [False]
+    assert client.stopped == ["socket-1"]
+    assert manager.sockets == {"socket-2": {"a", "b"}}
+
+    clock.now = 12
+    assert not supervisor.check()  # connected, but nothing received yet
+    client.send("socket-2")
+    assert supervisor.check()
+    assert statuses == [False, True]
+    assert supervisor.stats().reconnects == 1
+
+
+def test_error_message_marks_socket_dead(setup):
+    supervisor, manager, client, _, statuses = setup
+    client.sockets["socket-1"][1]({"e": "error", "m": "Max reconnect retries reached"})
+
+    supervisor.check()
+
+    assert statuses == [False]
+    assert list(manager.sockets) == ["socket-2"]
+
+
+def test_reconnect_backs_off_exponentially(setup):
+    supervisor, manager, client, clock, statuses = setup
+    client.fail = 4
+    attempts = []
+    for second in range(11, 40):
+        clock.now = second
+        before = client.fail
+        supervisor.check()
+        if client.fail != before or len(manager.sockets) > 1 or "socket-1" not in manager.sockets:
+            attempts.append(second)
+        if "socket-1" not in manager.sockets:
+            break
+
+    # delays of 1, 2, 4 and 8 (capped) seconds between attempts
+    assert attempts == [11, 12, 14, 18, 26]
+    assert supervisor.stats().failures == 4
+    assert list(manager.sockets) == ["socket-2"]
+    assert statuses == [False]
+
+
+def test_released_sockets_do_not_block_recovery(setup):
+    supervisor, manager, client, clock, statuses = setup
+    clock.now = 11
+    supervisor.check()
+    manager.unsubscribe(["a", "b"])
+
+    assert supervisor.check()
+    assert statuses == [False, True]
@@ -0,0 +1,387 @@
+import threading
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+import crypto_analyzer.controllers.data_controller as module
+from crypto_analyzer.config import config
+from crypto_analyzer.models.async_streams import decode_kline
+from crypto_analyzer.models.candle_store import Candles
+from crypto_analyzer.models.intervals import INTERVAL_MS
+from crypto_analyzer.models.subscriptions import kline_stream
+
+NOW = 1_704_067_200_000 + 1_002 * 60_000  # 2024-01-01 16:42 UTC
+
+
+def make_klines(n, start=0, step=60_000):
+    return [
+        [start + i * step, f"{100 + i}.5", f"{101 + i}", f"{99 + i}", f"{100 + i}.25", "12.5",
+         start + i * step + step - 1, "0", 0, "0", "0", "0"]
+        for i in range(n)
+    ]
+
+
+def stub_get_klines(symbol, interval, limit=500, start_time=None, end_time=None):
+    step = INTERVAL_MS.get(interval)
+    if step is None:
+        return []
+    first = start_time // step
+    last = min(end_time, NOW) // step
+    return make_klines(min(limit, last - first + 1), start=start_time, step=step)
+
+
+@pytest.fixture
+def qapp():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def settle(ctrl, qapp=None):
+    """Waits for the background loads of the other intervals and delivers them."""
+    ctrl._preloader.submit(lambda: None).result(timeout=5)
+    ctrl._ingest.flush(timeout=5)
+    if qapp is not None:
+        qapp.processEvents()
+
+
+@pytest.fixture
+def controller(mocker, tmp_path):
+    mocker.patch.object(config.database, "db_path", str(tmp_path / "test.db"))
+    client_cls = mocker.patch.object(module, "BinanceClient")
+    module.AppState._instance = None
+    ctrl = module.DataController()
+    ctrl.history._now = lambda: NOW
+    yield ctrl, client_cls.return_value
+    ctrl.shutdown()
+    module.AppState._instance = None
+
+
+def test_klines_to_candles():
+    candles = Candles.from_klines(make_klines(3))
+
+    assert candles.rows == 3
+    assert candles.timestamp.tolist() == [0, 60_000, 120_000]
+    assert candles.open.tolist() == [100.5, 101.5, 102.5]
+    assert candles.close.tolist() == [100.25, 101.25, 102.25]
+
+
+def test_load_initial_data_replaces_history_once(controller):
+    ctrl, client = controller
+    client.get_klines.side_effect = stub_get_klines
+    replaced, updated = [], []
+    ctrl.app_state.historyReplaced.connect(lambda: replaced.append(True))
+    ctrl.app_state.dataUpdated.connect(updated.append)
+
+    ctrl._load_initial_data()
+
+    assert replaced == [True]
+    assert updated == []
+    # the minute still in progress comes from the stream once it closes
+    assert len(ctrl.app_state.candles) == 499
+    assert ctrl.app_state.latest_market_frame.timestamp == NOW - 60_000
+    stored = ctrl.repository.get_range("BTCUSDT", "1m")
+    assert stored.rows == 500
+    assert stored.open[0] == 100.5
+
+
+def test_load_initial_data_paints_from_disk_first(controller, qapp):
+    ctrl, client = controller
+    client.get_klines.side_effect = stub_get_klines
+    ctrl._load_initial_data()
+    settle(ctrl, qapp)
+    sizes = []
+    ctrl.app_state.historyReplaced.connect(lambda: sizes.append(len(ctrl.app_state.candles)))
+
+    client.get_klines.reset_mock()
+    ctrl._load_initial_data()
+    settle(ctrl, qapp)
+
+    assert sizes == [500, 499]
+    # the newest candles were just fetched: only the calendar based 1M goes to REST
+    assert [call.kwargs["interval"] for call in client.get_klines.call_args_list] == ["1M"]
+
+    # a new session: the current interval first, the others in the background
+    client.get_klines.reset_mock()
+    ctrl.history._tails.clear()
+    ctrl._load_initial_data()
+    settle(ctrl, qapp)
+    intervals = [call.kwargs["interval"] for call in client.get_klines.call_args_list]
+    assert intervals[0] == "1m" and sorted(intervals) == sorted(ctrl._intervals)
+    # one request per interval, for the newest candle only
+    assert all(call.kwargs.get("start_time", NOW) >= NOW - 7 * 86_400_000
+               for call in client.get_klines.call_args_list)
+
+
+def kline_msg(ts, close, closed=True, symbol="BTCUSDT", interval="1m"):
+    return {"e": "kline", "k": {"t": ts, "s": symbol, "i": interval, "o": "1", "h": "2",
+                                "l": "0.5", "c": str(close), "v": "3", "x": closed}}
+
+
+def push_kline(ctrl, msg):
+    """Feed ``msg`` through the socket callback, on its own stream."""
+    ctrl._on_stream_message(kline_stream(msg["k"]["s"], msg["k"]["i"]), msg)
+
+
+def test_socket_messages_are_applied_on_gui_thread_in_batches(controller, qapp):
+    ctrl, _ = controller
+    threads, updated = [], []
+
+    def on_data(frame):
+        threads.append(threading.current_thread())
+        updated.append(frame)
+
+    ctrl.app_state.dataUpdated.connect(on_data)
+
+    socket_thread = threading.Thread(target=lambda: [
+        push_kline(ctrl, kline_msg(i * 60_000, 100 + i, closed=i % 2 == 0)) for i in range(20)
+    ])
+    socket_thread.start()
+    socket_thread.join()
+    assert ctrl._ingest.flush(timeout=5)
+    assert updated == []  # nothing touches AppState until the GUI loop runs
+
+    qapp.processEvents()
+
+    assert [f.timestamp for f in updated] == [i * 60_000 for i in range(0, 20, 2)]
+    assert set(threads) == {threading.main_thread()}
+    stats = ctrl.ingest_stats()
+    assert stats.received == 20
+    assert stats.decoded == 20
+    assert stats.delivered == 1
+
+
+def test_stale_symbol_frames_are_dropped(controller, qapp):
+    ctrl, _ = controller
+    push_kline(ctrl, kline_msg(0, 100, symbol="ETHUSDT"))
+    push_kline(ctrl, kline_msg(0, 100, interval="5m"))
+    ctrl._ingest.flush(timeout=5)
+    qapp.processEvents()
+
+    assert not ctrl.app_state.candles
+
+
+def test_socket_stage_times_every_stream_message(controller, mocker):
+    ctrl, _ = controller
+    mocker.patch.object(module.metrics, "enabled", True)
+    module.metrics.reset()
+    try:
+        push_kline(ctrl, kline_msg(0, 100))
+        ctrl._on_stream_message("btcusdt@depth@100ms", {"e": "depthUpdate", "s": "BTCUSDT", "U": 1, "u": 1})
+        snapshot = module.metrics.snapshot()
+    finally:
+        module.metrics.reset()
+
+    assert snapshot["stages"]["socket.message"]["count"] == 2
+    assert snapshot["counters"]["messages.kline"]["total"] == 1
+    assert snapshot["counters"]["messages.depth"]["total"] == 1
+
+
+def test_switching_between_watched_symbols_and_intervals_is_instant(controller, qapp, mocker):
+    ctrl, client = controller
+    client.get_klines.side_effect = stub_get_klines
+    client.start_multiplex_socket.side_effect = lambda streams, cb: "+".join(streams)
+    mocker.patch.object(config.watchlist, "symbols", ["ETHUSDT"])
+
+    ctrl.start_streaming()
+    settle(ctrl, qapp)
+    assert ctrl.watched == ["BTCUSDT", "ETHUSDT"]
+    # only the 1m kline stream is needed per symbol
+    streams = ctrl.subscriptions.streams
+    assert {s for s in streams if "@kline_" in s} == {"btcusdt@kline_1m", "ethusdt@kline_1m"}
+    assert len(ctrl.app_state.store("ETHUSDT", "1h")) > 0
+
+    # live data for the background symbol lands in its own stores
+    ctrl._on_stream_message("ethusdt@kline_1m", kline_msg(NOW, 7, symbol="ETHUSDT"))
+    ctrl._ingest.flush(timeout=5)
+    qapp.processEvents()
+
+    client.get_klines.reset_mock()
+    client.stop.reset_mock()
+    client.start_multiplex_socket.reset_mock()
+    replaced = []
+    ctrl.app_state.historyReplaced.connect(
+        lambda: replaced.append((ctrl.app_state.current_symbol, ctrl.app_state.current_interval))
+    )
+
+    ctrl.app_state.set_symbol_interval("ETHUSDT", "5m")
+    ctrl.change_symbol_interval("ETHUSDT", "5m")
+    ctrl.app_state.set_symbol_interval("ETHUSDT", "1h")
+    ctrl.change_symbol_interval("ETHUSDT", "1h")
+
+    assert replaced == [("ETHUSDT", "5m"), ("ETHUSDT", "1h")]
+    assert ctrl.app_state.candles.view().close[-1] == 7
+    client.get_klines.assert_not_called()
+    client.stop.assert_not_called()
+    client.start_multiplex_socket.assert_not_called()
+    # only the streams of the symbol that left the watchlist are closed
+    client.stop_socket.assert_called_once_with("btcusdt@kline_1m+btcusdt@depth@100ms")
+    assert ctrl.watched == ["ETHUSDT"]
+    assert ctrl.app_state.store("BTCUSDT", "1m") is None
+
+
+def test_higher_intervals_follow_the_1m_stream(controller, qapp):
+    ctrl, client = controller
+    client.get_klines.side_effect = stub_get_klines
+    ctrl._load_initial_data()
+    settle(ctrl, qapp)
+    bucket = NOW // 300_000 * 300_000
+    # in-progress 5m candle rebuilt from the two closed minutes of its bucket
+    assert ctrl.app_state.store("BTCUSDT", "5m").view().timestamp[-1] == bucket
+
+    push_kline(ctrl, kline_msg(NOW, 150))
+    ctrl._ingest.flush(timeout=5)
+    qapp.processEvents()
+
+    one_min = ctrl.app_state.store("BTCUSDT", "1m").view()
+    five_min = ctrl.app_state.store("BTCUSDT", "5m").view()
+    minutes = one_min.timestamp >= bucket
+    assert five_min.timestamp[-1] == bucket
+    assert five_min.close[-1] == 150
+    assert five_min.open[-1] == one_min.open[minutes][0]
+    assert five_min.volume[-1] == one_min.volume[minutes].sum()
+    assert minutes.sum() == 3
+
+
+def test_missed_minutes_are_backfilled_in_order(controller, qapp):
+    ctrl, client = controller
+    client.get_klines.side_effect = stub_get_klines
+    ctrl._load_initial_data()
+    settle(ctrl, qapp)
+    client.get_klines.reset_mock()
+    client.get_klines.side_effect = lambda symbol, interval, limit=500, start_time=None, end_time=None: make_klines(
+        (end_time - start_time) // 60_000 + 1, start=start_time
+    )
+    updated = []
+    ctrl.app_state.dataUpdated.connect(updated.append)
+
+    # the socket was down for NOW .. NOW + 1 min
+    push_kline(ctrl, kline_msg(NOW + 2 * 60_000, 150))
+    for _ in range(100):
+        ctrl._ingest.flush(timeout=5)
+        qapp.processEvents()
+        if updated:
+            break
+        threading.Event().wait(0.02)
+
+    call = client.get_klines.call_args
+    assert client.get_klines.call_count == 1
+    assert (call.kwargs["start_time"], call.kwargs["end_time"]) == (NOW, NOW + 60_000)
+    one_min = ctrl.app_state.store("BTCUSDT", "1m").view()
+    assert one_min.timestamp[-3:].tolist() == [NOW + i * 60_000 for i in range(3)]
+    assert one_min.close[-1] == 150
+    # the 5m candle spans loaded, backfilled and live minutes
+    bucket = NOW // 300_000 * 300_000
+    five_min = ctrl.app_state.store("BTCUSDT", "5m").view()
+    minutes = one_min.timestamp >= bucket
+    assert minutes.sum() == 5
+    assert five_min.timestamp[-1] == bucket
+    assert five_min.close[-1] == 150
+    assert five_min.high[-1] == one_min.high[minutes].max()
+    assert five_min.volume[-1] == one_min.volume[minutes].sum()
+    assert ctrl._aggregator.gaps == 0
+
+
+def test_connection_status_follows_the_supervisor(controller, qapp):
+    ctrl, _ = controller
+    statuses = []
+    ctrl.app_state.connectionStatusChanged.connect(statuses.append)
+    ctrl.app_state.set_connection_status(True)
+
+    ctrl._on_connection_status(False)
+    ctrl._ingest.flush(timeout=5)
+    qapp.processEvents()
+    ctrl._on_connection_status(True)
+    ctrl._ingest.flush(timeout=5)
+    qapp.processEvents()
+
+    assert statuses == [True, False, True]
+
+
+def test_background_start_keeps_live_candles_behind_the_history(controller, qapp, mocker):
+    ctrl, client = controller
+    release = threading.Event()
+
+    def slow_get_klines(*args, **kwargs):
+        release.wait(5)
+        return stub_get_klines(*args, **kwargs)
+
+    client.get_klines.side_effect = slow_get_klines
+    client.start_multiplex_socket.side_effect = lambda streams, cb: "+".join(streams)
+    mocker.patch.object(config.watchlist, "symbols", [])
+
+    ctrl.start_streaming(background=True)  # returns before any REST call completes
+    for _ in range(250):
+        if client.start_multiplex_socket.called:
+            break
+        threading.Event().wait(0.02)
+    # a minute closes while the history is still loading
+    ctrl._on_stream_message("btcusdt@kline_1m", kline_msg(NOW, 150))
+    ctrl._ingest.flush(timeout=5)
+    qapp.processEvents()
+    assert not ctrl.app_state.candles
+    assert not ctrl.app_state.is_connected
+
+    release.set()
+    ctrl.wait_started(timeout=5)
+    settle(ctrl, qapp)
+
+    one_min = ctrl.app_state.store("BTCUSDT", "1m").view()
+    assert len(one_min.timestamp) == 500
+    assert one_min.timestamp[-1] == NOW
+    assert one_min.close[-1] == 150
+    assert ctrl.app_state.store("BTCUSDT", "1h") is not None
+    assert ctrl.app_state.is_connected
+    assert ctrl.watched == ["BTCUSDT"]
+
+
+def test_switch_during_background_start_waits_for_the_history(controller, qapp, mocker):
+    ctrl, client = controller
+    release = threading.Event()
+
+    def slow_get_klines(*args, **kwargs):
+        release.wait(5)
+        return stub_get_klines(*args, **kwargs)
+
+    client.get_klines.side_effect = slow_get_klines
+    client.start_multiplex_socket.side_effect = lambda streams, cb: "+".join(streams)
+    mocker.patch.object(config.watchlist, "symbols", [])
+    ctrl.start_streaming(background=True)
+
+    # returns at once: the switch is queued until the start has finished
+    ctrl.change_symbol_interval("BTCUSDT", "5m")
+    assert ctrl.interval == "1m" and not release.is_set()
+
+    release.set()
+    for _ in range(250):
+        settle(ctrl, qapp)
+        if ctrl._starting is None:
+            break
+        threading.Event().wait(0.02)
+    settle(ctrl, qapp)
+
+    assert ctrl.interval == ctrl.app_state.current_interval == "5m"
+    assert ctrl.app_state.candles
+    assert ctrl.app_state.is_connected
+    assert ctrl.watched == ["BTCUSDT"]
+
+
+def test_asyncio_engine_batches_go_through_the_ingest_pipeline(mocker, tmp_path, qapp):
+    mocker.patch.object(config.database, "db_path", str(tmp_path / "test.db"))
+    mocker.patch.object(config.connection, "stream_engine", "asyncio")
+    mocker.patch.object(module, "BinanceClient")
+    module.AppState._instance = None
+    ctrl = module.DataController()
+    try:
+        assert isinstance(ctrl.subscriptions, module.StreamThread)
+        updated = []
+        ctrl.app_state.dataUpdated.connect(updated.append)
+
+        klines = [decode_kline("btcusdt@kline_1m", kline_msg(i * 60_000, 100 + i)) for i in range(3)]
+        ctrl._on_stream_batch(module.StreamBatch(klines, [], 0.0))
+        ctrl._ingest.flush(timeout=5)
+        qapp.processEvents()
+
+        assert [f.close_price for f in updated] == [100, 101, 102]
+        assert ctrl.ingest_stats().received == 1
+    finally:
+        ctrl.shutdown()
+        module.AppState._instance = None
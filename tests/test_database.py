@@ -1,6 +1,6 @@
 import sqlite3
 import pytest
-from crypto_analyzer.models.database import Database
+from crypto_analyzer.models.database import Database, DatabaseWriter
 
 
 @pytest.fixture
@@ -33,3 +33,58 @@ def test_crud_operations(db):
     db.delete('test', 'id=?', (1,))
     rows = db.select('test')
     assert rows == []
+
+
+def test_wal_mode_enabled(db):
+    conn = db.connect()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_executemany_inserts_rows(db):
+    db.create_table('CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)')
+    db.executemany('INSERT INTO test VALUES (?, ?)', [(1, 'a'), (2, 'b')])
+    assert db.select('test') == [(1, 'a'), (2, 'b')]
+
+
+def test_writer_batches_rows(db):
+    db.create_table('CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)')
+    sql = 'INSERT OR REPLACE INTO test VALUES (?, ?)'
+
+    with DatabaseWriter(db.path, batch_size=1000, flush_interval=5.0) as writer:
+        for i in range(200):
+            assert writer.submit(sql, (i, str(i)))
+        writer.submit_many(sql, [(i, 'bulk') for i in range(200, 300)])
+        assert writer.flush(timeout=5)
+        stats = writer.stats()
+
+    assert stats.enqueued == stats.written == 300
+    assert stats.batches == 1
+    assert len(db.select('test')) == 300
+
+
+def test_writer_drops_when_queue_full_without_blocking(db):
+    writer = DatabaseWriter(db.path, max_queue=1)  # not started: queue never drains
+    assert writer.submit('SELECT ?', (1,), block=False)
+    assert not writer.submit('SELECT ?', (2,), block=False)
+    assert not writer.submit('SELECT ?', (3,), timeout=0.01)
+
+    stats = writer.stats()
+    assert stats.dropped == 2
+    assert stats.backpressure_waits == 1
+    assert stats.queue_depth == 1
+
+
+def test_writer_survives_a_non_sqlite_error(db):
+    db.create_table('CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)')
+    sql = 'INSERT OR REPLACE INTO test VALUES (?, ?)'
+
+    with DatabaseWriter(db.path, batch_size=1, flush_interval=5.0) as writer:
+        writer.submit(sql, (2 ** 70, 'too big'))  # OverflowError, not sqlite3.Error
+        assert writer.flush(timeout=5)
+        writer.submit(sql, (1, 'ok'))
+        assert writer.flush(timeout=5)
+        stats = writer.stats()
+
+    assert stats.errors == 1
+    assert stats.written == 1
+    assert [row[1] for row in db.select('test')] == ['ok']
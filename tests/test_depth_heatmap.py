@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.generators import depth_events, order_book_snapshot
+from crypto_analyzer.config import config
+from crypto_analyzer.models.depth_heatmap import DepthHeatmap
+from crypto_analyzer.models.order_book import OrderBook, OrderBookSync
+
+
+@pytest.fixture
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+def bucket_totals(book, heatmap):
+    prices, quantities = np.array(book.bids.levels() + book.asks.levels()).T
+    index = np.floor((prices - heatmap.origin) / heatmap.bucket_size).astype(int)
+    inside = (index >= 0) & (index < heatmap.buckets)
+    return np.bincount(index[inside], quantities[inside], heatmap.buckets)
+
+
+def streamed_book(heatmap, events=200, **kwargs):
+    book = OrderBook("BTCUSDT")
+    book.listener = heatmap
+    book.load_snapshot(order_book_snapshot(levels=300, tick=1.0))
+    for event in depth_events(events, levels_per_event=20, depth=300, tick=1.0, **kwargs):
+        book.apply_diff(event)
+    return book
+
+
+def test_deltas_keep_the_live_row_equal_to_the_book():
+    heatmap = DepthHeatmap(bucket_bps=2.0, buckets=200)
+    book = streamed_book(heatmap)
+
+    assert heatmap.bucket_size == pytest.approx(6.0)
+    np.testing.assert_allclose(heatmap.current, bucket_totals(book, heatmap), atol=1e-9)
+    # Events are 100 ms apart: one sample each
+    data = heatmap.since(0, 1_000)
+    assert data.samples == heatmap.rows == 200
+    assert np.all(np.diff(data.times) == 100)
+    np.testing.assert_allclose(data.rows[-1], heatmap.current, rtol=1e-6)
+    assert len(heatmap.since(195, 1_000).rows) == 5 and len(heatmap.since(0, 3).rows) == 3
+
+
+def test_ring_is_capped_by_memory_and_sampled_by_event_time():
+    heatmap = DepthHeatmap(buckets=100, max_bytes=100 * 4 * 50, sample_ms=250)
+    assert heatmap.capacity == 50 and heatmap.matrix.nbytes == 100 * 4 * 50
+
+    streamed_book(heatmap, events=400)
+    assert heatmap.samples == 400 * 100 // 250 and heatmap.rows == 50
+    times = heatmap.since(0, 1_000).times
+    # One sample per 250 ms slot, at the first event inside it
+    assert len(times) == 50 and set(np.diff(times)) == {200, 300}
+    assert len(np.unique(times // 250)) == 50
+
+
+def test_grid_recentres_when_the_mid_drifts():
+    heatmap = DepthHeatmap(bucket_bps=1.0, buckets=100)
+    book = OrderBook("BTCUSDT")
+    book.listener = heatmap
+    book.load_snapshot(order_book_snapshot(levels=50, tick=1.0))
+    book.apply_diff({"u": 2, "E": 0, "b": [], "a": []})
+    origin, layout, before = heatmap.origin, heatmap.layout, heatmap.since(0, 1).rows[0]
+
+    # Move the whole book 40 buckets up: the mid leaves the middle half
+    bids = [[str(30_000.0 - i), "0"] for i in range(1, 51)] + [[str(30_120.0 - i), "1"] for i in range(1, 51)]
+    asks = [[str(30_000.0 + i), "0"] for i in range(1, 51)] + [[str(30_120.0 + i), "1"] for i in range(1, 51)]
+    book.apply_diff({"u": 3, "E": 100, "b": bids, "a": asks})
+
+    shift = round((heatmap.origin - origin) / heatmap.bucket_size)
+    assert shift == 40 and heatmap.layout > layout
+    rows = heatmap.since(0, 2).rows
+    np.testing.assert_array_equal(rows[0][:-shift], before[shift:])
+    assert not rows[0][-shift:].any()
+    np.testing.assert_allclose(rows[1], bucket_totals(book, heatmap), rtol=1e-6)
+
+
+def test_listener_follows_snapshots_and_can_be_cleared():
+    heatmap = DepthHeatmap(buckets=100)
+    sync = OrderBookSync("BTCUSDT", lambda symbol: order_book_snapshot(levels=50, tick=1.0), run_async=lambda fn: fn())
+    sync.set_listener(heatmap)
+    assert heatmap.origin is None  # not synced yet
+    for event in depth_events(3, depth=50, tick=1.0):
+        sync.on_event(event)
+    assert sync.synced and heatmap.samples > 0
+    np.testing.assert_allclose(heatmap.current, bucket_totals(sync.book, heatmap))
+
+    heatmap.clear()
+    assert heatmap.origin is None and heatmap.samples == 0 and not heatmap.current.any()
+    sync.set_listener(None)
+    sync.set_listener(heatmap)
+    np.testing.assert_allclose(heatmap.current, bucket_totals(sync.book, heatmap))
+
+
+def test_view_converts_new_rows_into_the_image(qapp, monkeypatch):
+    from crypto_analyzer.views.orderbook_heatmap import OrderBookHeatmap
+
+    monkeypatch.setattr(config.orderbook, "heatmap_window_s", 8)
+    heatmap = DepthHeatmap(bucket_bps=2.0, buckets=200)
+    view = OrderBookHeatmap(heatmap)
+    assert view.window == 80
+    view.scheduler.unregister("heatmap")
+    view.resize(80, 400)
+    book = OrderBook("BTCUSDT")
+    book.listener = heatmap
+    book.load_snapshot(order_book_snapshot(levels=300, tick=1.0))
+    events = depth_events(60, levels_per_event=20, depth=300, tick=1.0)
+    for event in events[:50]:
+        book.apply_diff(event)
+
+    view.refresh()
+    assert view.full_refreshes == 1
+    filled = view._pixels[:, :50] != view._palette[0]
+    assert filled.any() and not (view._pixels[:, 50:] != view._palette[0]).any()
+    # Image row 0 is the highest price bucket
+    np.testing.assert_array_equal(filled[::-1, 49], heatmap.since(0, 1).rows[0] > 0)
+
+    for event in events[50:]:
+        book.apply_diff(event)
+    view.refresh()
+    assert view._samples == heatmap.samples == 60 and view.full_refreshes == 1
+    np.testing.assert_array_equal(view._pixels[:, 59] != view._palette[0], heatmap.current[::-1] > 0)
+    image = QImage(80, 400, QImage.Format.Format_RGB32)
+    view.render(image)
+    # 60 of 80 columns filled, right-aligned
+    colors = {x: {image.pixel(x, y) for y in range(0, 400, 2)} for x in (5, 30, 79)}
+    assert len(colors[5]) == 1 and len(colors[30]) > 2 and len(colors[79]) > 2
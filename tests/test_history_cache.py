@@ -0,0 +1,101 @@
+import pytest
+
+from crypto_analyzer.models.candle_repository import CandleRepository
+from crypto_analyzer.models.database import Database
+from crypto_analyzer.models.history_cache import HistoryCache
+from crypto_analyzer.models.intervals import bucket_start
+
+MINUTE = 60_000
+
+
+class StubClient:
+    """Serves synthetic klines (1m unless ``step``/``offset`` say otherwise) for any time range."""
+
+    def __init__(self, now, step=MINUTE, offset=0):
+        self.now = now
+        self.step = step
+        self.offset = offset
+        self.calls = []
+
+    def get_klines(self, symbol, interval, limit=500, start_time=None, end_time=None):
+        self.calls.append((start_time, end_time, limit))
+        step, offset = self.step, self.offset
+        end = (self.now - offset) // step * step + offset if end_time is None else end_time
+        start = end - (limit - 1) * step if start_time is None else start_time
+        start = -(-(start - offset) // step) * step + offset
+        timestamps = list(range(start, min(end, self.now) + 1, step))[:limit]
+        return [[ts, str(ts / MINUTE), str(ts / MINUTE + 1), str(ts / MINUTE - 1), str(ts / MINUTE), "1"]
+                for ts in timestamps]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    repository = CandleRepository(db)
+    repository.ensure_schema()
+    yield repository
+    db.close()
+
+
+def test_missing_ranges():
+    ranges = HistoryCache.missing_ranges([0, 60, 180, 240], 0, 360, 60)
+    assert ranges == [(120, 120), (240, 360)]
+    assert HistoryCache.missing_ranges([], 0, 120, 60) == [(0, 120)]
+
+
+def test_cold_start_paginates_beyond_page_limit(repo):
+    now = 10_000 * MINUTE
+    client = StubClient(now)
+    cache = HistoryCache(repo, client, now=lambda: now)
+
+    candles = cache.get_klines('BTCUSDT', '1m', limit=2500)
+
+    assert candles.rows == 2500
+    assert candles.timestamp[-1] == now
+    assert len(client.calls) == 3
+    assert all(limit == HistoryCache.PAGE_LIMIT for _, _, limit in client.calls)
+    assert repo.get_range('BTCUSDT', '1m').rows == 2500
+
+
+def test_warm_start_fetches_only_the_gap(repo):
+    now = 1_000 * MINUTE
+    client = StubClient(now)
+    cache = HistoryCache(repo, client, now=lambda: now)
+    cache.get_klines('BTCUSDT', '1m', limit=500)
+
+    later = now + 10 * MINUTE
+    client.now = later
+    client.calls.clear()
+    cache._now = lambda: later
+    candles = cache.get_klines('BTCUSDT', '1m', limit=500)
+
+    # one request: from the last stored (possibly unfinished) candle onwards
+    assert client.calls == [(now, later, HistoryCache.PAGE_LIMIT)]
+    assert candles.rows == 500
+    assert candles.timestamp[-1] == later
+    assert cache.cached('BTCUSDT', '1m', 500).timestamp.tolist() == candles.timestamp.tolist()
+
+
+def test_weekly_candles_open_on_monday_and_stay_cached(repo):
+    week = 7 * 24 * 60 * MINUTE
+    now = 2_000 * week + 3 * 24 * 60 * MINUTE  # a Sunday
+    monday = bucket_start(now, '1w')
+    client = StubClient(now, step=week, offset=monday % week)
+    cache = HistoryCache(repo, client, now=lambda: now)
+
+    candles = cache.get_klines('BTCUSDT', '1w', limit=10)
+    assert candles.rows == 10 and candles.timestamp[-1] == monday
+    assert len(client.calls) == 1
+
+    # Every candle is stored and the newest one was just fetched
+    client.calls.clear()
+    candles = cache.get_klines('BTCUSDT', '1w', limit=10)
+    assert client.calls == []
+    assert candles.rows == 10 and candles.timestamp[-1] == monday
+
+    # Once the newest candle is older than the TTL, only it is fetched again
+    later = now + HistoryCache.TAIL_TTL_MS
+    client.now = later
+    cache._now = lambda: later
+    assert cache.get_klines('BTCUSDT', '1w', limit=10).rows == 10
+    assert client.calls == [(monday, monday, HistoryCache.PAGE_LIMIT)]
@@ -0,0 +1,136 @@
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto_analyzer.indicators import vectorized
+from crypto_analyzer.indicators.cache import IndicatorCache
+from crypto_analyzer.models.candle_store import Candles, CandleStore
+
+INDICATORS = {
+    "sma_fast": {"period": 9},
+    "bollinger_bands": {"period": 20, "std_dev": 2},
+    "keltner_channels": {"period": 20, "atr_mult": 2},
+}
+
+
+# The pandas formulas IndicatorController computed on every frame before the
+# incremental engine; the engine must reproduce them.
+def pandas_sma(df, period):
+    return {"value": float(df["close"].rolling(window=period).mean().iloc[-1])}
+
+
+def pandas_bollinger_bands(df, period, std_dev):
+    rolling = df["close"].rolling(window=period)
+    mean = rolling.mean().iloc[-1]
+    std = rolling.std().iloc[-1]
+    return {"upper": float(mean + std_dev * std), "middle": float(mean), "lower": float(mean - std_dev * std)}
+
+
+def pandas_keltner_channels(df, period, atr_mult):
+    ema = df["close"].ewm(span=period, adjust=False).mean()
+    tr1 = df["high"] - df["low"]
+    tr2 = (df["high"] - df["close"].shift()).abs()
+    tr3 = (df["low"] - df["close"].shift()).abs()
+    atr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1).rolling(window=period).mean()
+    middle, width = ema.iloc[-1], atr_mult * atr.iloc[-1]
+    return {"upper": float(middle + width), "middle": float(middle), "lower": float(middle - width)}
+
+
+REFERENCES = {
+    "sma_fast": lambda df, cfg: pandas_sma(df, cfg["period"]),
+    "bollinger_bands": lambda df, cfg: pandas_bollinger_bands(df, cfg["period"], cfg["std_dev"]),
+    "keltner_channels": lambda df, cfg: pandas_keltner_channels(df, cfg["period"], cfg["atr_mult"]),
+}
+
+
+def row(candles, i):
+    return [float(col[i]) for col in candles[1:]]
+
+
+def latest(cache, store, name):
+    return vectorized.latest(cache.series("BTCUSDT", "1m", name, INDICATORS[name], store))
+
+
+def test_streamed_values_match_the_pandas_formulas(make_candles):
+    history = make_candles(700, seed=5)
+    store = CandleStore(1_000)
+    store.replace(Candles(*(col[:50] for col in history)))
+    cache = IndicatorCache()
+
+    for i in range(50, 700):
+        if i % 4 == 0:  # the last candle is revised before the next one opens
+            revised = row(history, i)
+            store.update_last(int(history.timestamp[i - 1]), *revised)
+            for name in INDICATORS:
+                assert latest(cache, store, name) == pytest.approx(
+                    REFERENCES[name](store.to_frame(), INDICATORS[name]), rel=1e-9
+                )
+            store.update_last(int(history.timestamp[i - 1]), *row(history, i - 1))
+        store.append(int(history.timestamp[i]), *row(history, i))
+        df = store.to_frame()
+        for name in INDICATORS:
+            assert latest(cache, store, name) == pytest.approx(REFERENCES[name](df, INDICATORS[name]), rel=1e-9)
+
+    # Crossed several resync rows, all through extensions
+    assert 700 > 2 * vectorized.RESYNC
+    assert cache.stats.misses == len(INDICATORS)
+
+
+def test_a_new_candle_does_not_recompute_the_window(make_candles, monkeypatch):
+    period = 5_000
+    history = make_candles(period + 600, seed=2)
+    store = CandleStore(history.rows)
+    store.replace(Candles(*(col[:period + 100] for col in history)))
+    cache = IndicatorCache()
+    configs = {
+        "sma": {"period": period},
+        "bollinger_bands": {"period": period, "std_dev": 2},
+        "keltner_channels": {"period": period, "atr_mult": 2},
+    }
+    for name, cfg in configs.items():
+        cache.series("BTCUSDT", "1m", name, cfg, store)
+
+    def whole_window(*args, **kwargs):
+        raise AssertionError("window recomputed")
+
+    for fn in ("rolling_mean", "rolling_var", "true_range"):
+        monkeypatch.setattr(vectorized, fn, whole_window)
+    for i in range(period + 100, history.rows):
+        store.append(int(history.timestamp[i]), *row(history, i))
+        for name, cfg in configs.items():
+            cache.series("BTCUSDT", "1m", name, cfg, store)
+    monkeypatch.undo()
+
+    for name, cfg in configs.items():
+        expected = vectorized.compute(name, history, cfg)
+        series = cache.series("BTCUSDT", "1m", name, cfg, store)
+        for key, values in expected.items():
+            np.testing.assert_allclose(series[key][period:], values[period:], rtol=1e-9, err_msg=f"{name}.{key}")
+
+
+def test_other_periods_and_pairs_start_from_scratch(make_candles):
+    store = CandleStore(500)
+    store.replace(make_candles(300))
+    cache = IndicatorCache()
+
+    first = cache.series("BTCUSDT", "1m", "bollinger_bands", {"period": 20}, store)
+    assert cache.series("BTCUSDT", "1m", "bollinger_bands", {"period": 10}, store) is not first
+    assert cache.series("ETHUSDT", "1m", "bollinger_bands", {"period": 20}, store) is not first
+    assert cache.stats.misses == 3
+
+
+def test_controller_emits_the_sma_period_with_its_value(app_state, make_candles):
+    from crypto_analyzer.controllers.indicator_controller import IndicatorController
+
+    app_state.replace_history(make_candles(100))
+    app_state.active_indicators = {"sma_fast": {"enabled": True, "period": 9}}
+    controller = IndicatorController(app_state, scheduler=Mock(), cache=IndicatorCache())
+    emitted = {}
+    controller.indicatorUpdated.connect(lambda name, value: emitted.setdefault(name, value))
+
+    controller.recalculate()
+
+    expected = pandas_sma(pd.DataFrame({"close": app_state.candles.view().close}), 9)
+    assert emitted == {"sma_fast": {"period": 9, "value": pytest.approx(expected["value"], rel=1e-9)}}
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from crypto_analyzer.indicators import vectorized
+from crypto_analyzer.indicators.cache import IndicatorCache
+from crypto_analyzer.models.candle_store import Candles, CandleStore
+
+
+def head(candles, n):
+    return Candles(*(col[:n] for col in candles))
+
+
+def row(candles, i):
+    return [float(col[i]) for col in candles[1:]]
+
+
+def assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        np.testing.assert_allclose(actual[key], expected[key], rtol=1e-9, atol=1e-7, equal_nan=True, err_msg=key)
+
+
+@pytest.mark.parametrize("name", sorted(vectorized.SPECS))
+def test_appends_revisions_and_evictions_extend_to_the_full_series(name, make_candles):
+    history = make_candles(1_300, seed=3)
+    store = CandleStore(500)
+    store.replace(head(history, 300))
+    cache = IndicatorCache()
+    cache.series("BTCUSDT", "1m", name, {}, store)
+
+    for i in range(300, 1_300):
+        if i % 7 == 0:  # last candle revised in between (and then set back)
+            store.update_last(int(history.timestamp[i - 1]), *row(history, i))
+            cache.series("BTCUSDT", "1m", name, {}, store)
+            store.update_last(int(history.timestamp[i - 1]), *row(history, i - 1))
+        store.append(int(history.timestamp[i]), *row(history, i))
+        if i % 3 == 0:  # several candles per lookup as well
+            cache.series("BTCUSDT", "1m", name, {}, store)
+    series = cache.series("BTCUSDT", "1m", name, {}, store)
+
+    # Evicted rows are still part of the state (as if the buffer never wrapped)
+    expected = vectorized.compute(name, history, {})
+    assert_same(series, {key: values[-500:] for key, values in expected.items()})
+    assert cache.stats.misses == 1
+    assert cache.stats.extends > 300
+
+
+def test_unchanged_store_is_a_hit_shared_by_equal_parameters(make_candles):
+    store = CandleStore(100)
+    store.replace(make_candles(100))
+    cache = IndicatorCache()
+
+    first = cache.series("btcusdt", "1m", "sma_fast", {"enabled": True, "period": 9}, store)
+    again = cache.series("BTCUSDT", "1m", "sma_slow", {"enabled": False, "period": 9}, store)
+    assert again is first
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    with pytest.raises(ValueError):
+        first["value"][-1] = 0.0
+
+    cache.series("BTCUSDT", "1m", "sma_slow", {"period": 21}, store)
+    assert cache.stats.misses == 2
+    assert cache.series("BTCUSDT", "1m", "unknown", {}, store) is None
+
+
+def test_pairs_and_rewritten_history_are_not_mixed(make_candles):
+    btc, eth = CandleStore(100), CandleStore(100)
+    btc.replace(make_candles(100, seed=1))
+    eth.replace(make_candles(100, seed=2))
+    cache = IndicatorCache()
+
+    btc_rsi = cache.series("BTCUSDT", "1m", "rsi", {}, btc)
+    eth_rsi = cache.series("ETHUSDT", "1m", "rsi", {}, eth)
+    assert cache.series("BTCUSDT", "1m", "rsi", {}, btc) is btc_rsi
+    assert cache.series("ETHUSDT", "1m", "rsi", {}, eth) is eth_rsi
+
+    replacement = make_candles(100, seed=9)
+    btc.replace(replacement)
+    assert_same(cache.series("BTCUSDT", "1m", "rsi", {}, btc), vectorized.rsi(replacement.close))
+    assert cache.stats.misses == 3
+
+
+def test_least_recently_used_series_are_evicted_over_the_memory_cap(make_candles):
+    store = CandleStore(1_000)
+    store.replace(make_candles(1_000))
+    per_series = 1_000 * 8
+    cache = IndicatorCache(max_bytes=2 * per_series)
+
+    cache.series("BTCUSDT", "1m", "sma", {"period": 5}, store)
+    cache.series("BTCUSDT", "1m", "sma", {"period": 6}, store)
+    cache.series("BTCUSDT", "1m", "sma", {"period": 5}, store)  # most recent again
+    cache.series("BTCUSDT", "1m", "sma", {"period": 7}, store)
+
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * per_series
+    assert cache.stats.evictions == 1
+    cache.series("BTCUSDT", "1m", "sma", {"period": 5}, store)
+    assert cache.stats.hits == 2
+
+
+def test_switching_back_to_a_pair_reuses_its_cached_indicators(app_state, make_candles):
+    cache = IndicatorCache()
+
+    def lookup():
+        state = app_state
+        return cache.series(state.current_symbol, state.current_interval, "ema", {"period": 50}, state.candles)
+
+    app_state.replace_history(make_candles(200, seed=1))
+    btc = lookup()
+    app_state.set_symbol_interval("ETHUSDT", "1m")
+    app_state.replace_history(make_candles(200, seed=2))
+    eth = lookup()
+
+    app_state.set_symbol_interval("BTCUSDT", "1m")
+    assert lookup() is btc
+    assert lookup() is not eth
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from PyQt6.QtCore import QCoreApplication
+
+from crypto_analyzer.controllers.ingest import IngestBatch, IngestBridge, IngestPipeline
+from crypto_analyzer.models.app_state import MarketFrame
+
+
+def frame(ts, close):
+    return MarketFrame(ts, "BTCUSDT", 1.0, 2.0, 0.5, close, 3.0, "1m")
+
+
+def test_bridge_merges_batches_while_gui_is_busy():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    applied = []
+    bridge = IngestBridge(applied.append)
+
+    for i in range(5):
+        batch = IngestBatch(received_at=time.monotonic())
+        batch.add_frame(frame(60_000, 100 + i))  # revisions of one candle
+        batch.add_frame(frame(i * 120_000, 1.0))
+        bridge.post(batch)
+    app.processEvents()
+
+    assert len(applied) == 1
+    merged = applied[0]
+    assert merged.frames[("BTCUSDT", "1m", 60_000)].close_price == 104
+    assert len(merged.frames) == 6
+    stats = bridge.stats()
+    assert stats.delivered == 1
+    assert stats.merged == 4
+
+
+def test_pipeline_never_blocks_the_producer():
+    release = threading.Event()
+    delivered = []
+
+    def slow_deliver(batch):
+        release.wait(5)
+        delivered.append(batch)
+
+    pipeline = IngestPipeline(
+        {"kline": lambda msg, batch: batch.add_frame(frame(msg["t"], 1.0))},
+        slow_deliver,
+        max_queue=10,
+    )
+    pipeline.start()
+    try:
+        started = time.perf_counter()
+        results = [pipeline.submit("kline", {"t": i}) for i in range(100)]
+        assert time.perf_counter() - started < 1.0
+        assert not all(results)
+        assert pipeline.stats().dropped == results.count(False)
+    finally:
+        release.set()
+        pipeline.close(timeout=5)
+
+    frames = [key[2] for batch in delivered for key in batch.frames]
+    assert frames == sorted(frames)
+    assert len(frames) == results.count(True)
+
+
+def test_control_calls_run_in_order_with_messages():
+    seen = []
+    pipeline = IngestPipeline({"x": lambda msg, batch: seen.append(msg["n"])}, lambda batch: None)
+    pipeline.start()
+    pipeline.submit("x", {"n": 1})
+    pipeline.call(lambda: seen.append("reset"))
+    pipeline.submit("x", {"n": 2})
+    assert pipeline.flush(timeout=5)
+    pipeline.close()
+
+    assert seen == [1, "reset", 2]
+
+
+def test_control_calls_never_wait_for_a_full_queue():
+    seen = []
+    pipeline = IngestPipeline(
+        {"x": lambda msg, batch: seen.append(msg["n"])}, lambda batch: None, max_queue=1
+    )
+    assert pipeline.submit("x", {"n": 1})  # not started: the queue stays full
+    started = time.monotonic()
+    pipeline.call(lambda: seen.append("reset"))
+    assert time.monotonic() - started < 0.5
+
+    pipeline.start()
+    assert pipeline.flush(timeout=5)
+    pipeline.submit("x", {"n": 2})
+    pipeline.close(timeout=5)
+
+    assert seen == [1, "reset", 2]
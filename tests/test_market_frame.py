@@ -70,3 +70,45 @@ def test_candle_history_updates_and_limits(app_state):
     state.update_market_data(frame4)
     assert len(state.candle_history) == 2
     assert [c["timestamp"] for c in state.candle_history] == [2, 3]
+
+
+def test_market_frame_is_compact_record(app_state):
+    _, MarketFrame = app_state
+    frame = make_frame(MarketFrame, 1)
+
+    assert not hasattr(frame, "__dict__")
+    assert not hasattr(frame, "bids")
+
+
+def test_update_orderbook_emits_only_newer_versions(app_state):
+    state, _ = app_state
+    from crypto_analyzer.models.order_book import OrderBookSnapshot
+    received = []
+    state.orderbookUpdated.connect(received.append)
+
+    first = OrderBookSnapshot("BTCUSDT", 10, ((99.0, 1.0),), ((101.0, 1.0),))
+    stale = OrderBookSnapshot("BTCUSDT", 9, (), ())
+    other = OrderBookSnapshot("ETHUSDT", 1, (), ())
+    for snapshot in (first, stale, other):
+        state.update_orderbook(snapshot)
+
+    assert received == [first, other]
+    assert state.latest_orderbook is other
+
+
+def test_watched_pairs_keep_their_own_history(app_state):
+    state, MarketFrame = app_state
+    received, replaced = [], []
+    state.dataUpdated.connect(received.append)
+    state.historyReplaced.connect(lambda: replaced.append(state.current_symbol))
+
+    state.store("ETHUSDT", "1m", create=True)
+    state.update_market_data(make_frame(MarketFrame, 1, symbol="ETHUSDT", close_price=7))
+    state.update_market_data(make_frame(MarketFrame, 1, symbol="XRPUSDT"))  # not watched
+    assert received == []
+    assert state.store("XRPUSDT", "1m") is None
+
+    state.set_symbol_interval("ETHUSDT", "1m")
+    assert replaced == ["ETHUSDT"]
+    assert state.latest_market_frame.close_price == 7
+    assert state.store("BTCUSDT", "1m") is not None
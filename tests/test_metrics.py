@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from crypto_analyzer.metrics import Counter, Histogram, Metrics, MetricsExporter
+from crypto_analyzer.views.perf_overlay import PerfOverlay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    hist = Histogram(bounds=(0.001, 0.002, 0.004))
+    for _ in range(50):
+        hist.observe(0.0005)
+    for _ in range(50):
+        hist.observe(0.003)
+
+    assert hist.count == 100
+    assert hist.quantile(0.5) == pytest.approx(0.001)
+    assert 0.002 < hist.quantile(0.99) <= 0.003
+    summary = hist.summary()
+    assert summary["max_ms"] == pytest.approx(3.0)
+    assert summary["mean_ms"] == pytest.approx(1.75)
+
+
+def test_counter_rate_uses_complete_seconds():
+    clock = FakeClock()
+    counter = Counter(clock)
+    for second in range(6):
+        clock.now = 100.0 + second
+        counter.inc(10)
+
+    assert counter.total == 60
+    assert counter.rate() == pytest.approx(10.0)  # 101..105, current second excluded
+
+
+def test_disabled_registry_records_nothing():
+    registry = Metrics()
+
+    @registry.timed("stage")
+    def work(x):
+        return x * 2
+
+    assert work(2) == 4
+    assert registry.snapshot()["stages"] == {}
+
+    registry.enabled = True
+    work(3)
+    assert registry.snapshot()["stages"]["stage"]["count"] == 1
+
+
+def test_prometheus_and_json_export(tmp_path):
+    registry = Metrics(enabled=True)
+    registry.observe("socket.message", 0.00002)
+    registry.observe("socket.message", 0.2)
+    registry.inc("messages.kline", 3)
+    registry.gauge("ingest.queue_depth", lambda: 7)
+
+    text = registry.to_prometheus()
+    assert '# TYPE crypto_analyzer_stage_seconds histogram' in text
+    assert 'crypto_analyzer_stage_seconds_bucket{stage="socket.message",le="2.5e-05"} 1' in text
+    assert 'crypto_analyzer_stage_seconds_bucket{stage="socket.message",le="+Inf"} 2' in text
+    assert 'crypto_analyzer_stage_seconds_count{stage="socket.message"} 2' in text
+    assert "crypto_analyzer_messages_kline_total 3" in text
+    assert "crypto_analyzer_ingest_queue_depth 7.0" in text
+
+    json_path, prom_path = tmp_path / "metrics.json", tmp_path / "metrics.prom"
+    for path in (json_path, prom_path):
+        exporter = MetricsExporter(registry, str(path), interval=60)
+        exporter.start()
+        exporter.stop()
+    dump = json.loads(json_path.read_text())
+    assert dump["counters"]["messages.kline"]["total"] == 3
+    assert dump["gauges"]["ingest.queue_depth"] == 7
+    assert prom_path.read_text() == registry.to_prometheus()
+
+
+def test_overlay_enables_metrics_only_while_visible():
+    app = QApplication.instance() or QApplication([])
+    registry = Metrics()
+    overlay = PerfOverlay(registry=registry)
+
+    overlay.show()
+    assert registry.enabled
+    registry.observe("chart.plot", 0.01)
+    registry.inc("messages.depth")
+    overlay.refresh()
+    assert "chart.plot" in overlay.label.text()
+    assert "depth" in overlay.label.text()
+
+    overlay.hide()
+    assert not registry.enabled
+    app.processEvents()
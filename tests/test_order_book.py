@@ -0,0 +1,109 @@
+import random
+
+from crypto_analyzer.models.order_book import BookSide, OrderBook, OrderBookSync
+
+
+def diff(first, last, bids=(), asks=()):
+    return {"e": "depthUpdate", "s": "BTCUSDT", "U": first, "u": last,
+            "b": [[str(p), str(q)] for p, q in bids], "a": [[str(p), str(q)] for p, q in asks]}
+
+
+SNAPSHOT = {
+    "lastUpdateId": 100,
+    "bids": [["99.0", "1.0"], ["98.0", "2.0"], ["97.0", "3.0"]],
+    "asks": [["101.0", "1.5"], ["102.0", "2.5"]],
+}
+
+
+def test_book_side_keeps_best_level_last():
+    bids = BookSide(is_bid=True)
+    for price in (10.0, 12.0, 11.0):
+        bids.set(price, 1.0)
+    asks = BookSide(is_bid=False)
+    for price in (15.0, 13.0, 14.0):
+        asks.set(price, 1.0)
+
+    assert bids.best() == (12.0, 1.0)
+    assert asks.best() == (13.0, 1.0)
+    assert [p for p, _ in bids.top(2)] == [12.0, 11.0]
+    assert [p for p, _ in asks.levels()] == [13.0, 14.0, 15.0]
+
+    assert bids.set(12.0, 0.0) == 1.0
+    assert bids.best() == (11.0, 1.0)
+    assert len(bids) == 2
+
+
+def test_order_book_queries():
+    book = OrderBook("BTCUSDT")
+    book.load_snapshot(SNAPSHOT)
+
+    assert book.mid_price() == 100.0
+    assert book.top(2) == ([(99.0, 1.0), (98.0, 2.0)], [(101.0, 1.5), (102.0, 2.5)])
+    bids, asks = book.depth_band(0.015)
+    assert bids == [(99.0, 1.0)]
+    assert asks == [(101.0, 1.5)]
+
+
+def test_sync_buffers_until_snapshot_and_drops_stale_events():
+    requested = []
+    sync = OrderBookSync("BTCUSDT", lambda s: SNAPSHOT, run_async=requested.append)
+
+    assert sync.on_event(diff(90, 95, bids=[(50.0, 1.0)])) is False
+    assert sync.on_event(diff(96, 105, bids=[(99.0, 0.0)])) is False
+    assert len(requested) == 1  # only one snapshot request in flight
+
+    requested[0]()
+
+    assert sync.synced
+    assert sync.book.last_update_id == 105
+    assert sync.book.best_bid() == (98.0, 2.0)
+    assert sync.book.bids.get(50.0) == 0.0
+
+    assert sync.on_event(diff(106, 107, asks=[(100.5, 4.0)])) is True
+    assert sync.book.best_ask() == (100.5, 4.0)
+
+
+def test_sequence_gap_triggers_resync():
+    snapshots = iter([SNAPSHOT, {"lastUpdateId": 120, "bids": [["90.0", "1.0"]], "asks": [["110.0", "1.0"]]}])
+    sync = OrderBookSync("BTCUSDT", lambda s: next(snapshots), run_async=lambda fn: fn())
+
+    sync.on_event(diff(101, 101))
+    assert sync.synced
+
+    assert sync.on_event(diff(110, 121)) is False  # gap: 102..109 missing
+    assert sync.resyncs == 1
+    assert sync.synced
+    assert sync.book.best_bid() == (90.0, 1.0)
+    assert sync.book.last_update_id == 121
+
+
+def test_many_updates_stay_sorted():
+    levels = 2000
+    side = BookSide(is_bid=True)
+    for i in range(levels):
+        side.set(float((i * 7919) % levels), 1.0)
+    for i in range(0, levels, 2):
+        side.set(float(i), 0.0)
+
+    prices = [p for p, _ in side.levels()]
+    assert prices == sorted(prices, reverse=True)
+    assert len(prices) == levels // 2
+
+
+def test_chunked_levels_match_a_plain_dict(monkeypatch):
+    monkeypatch.setattr(BookSide, "CHUNK", 4)
+    rng = random.Random(5)
+    for is_bid in (True, False):
+        side, expected = BookSide(is_bid=is_bid), {}
+        for _ in range(3_000):
+            price, qty = float(rng.randrange(200)), rng.choice([0.0, 1.0, 2.0])
+            assert side.set(price, qty) == expected.get(price, 0.0)
+            if qty:
+                expected[price] = qty
+            else:
+                expected.pop(price, None)
+        ordered = sorted(expected.items(), reverse=is_bid)
+        assert side.levels() == ordered and len(side) == len(ordered)
+        assert side.top(7) == ordered[:7] and side.best() == ordered[0]
+        assert side.band(50.0, 120.0) == [level for level in ordered if 50.0 <= level[0] <= 120.0]
+        assert len(side._chunks) > 1 and all(len(chunk) <= 8 for chunk in side._chunks)
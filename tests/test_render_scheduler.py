@@ -0,0 +1,67 @@
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+from crypto_analyzer.controllers.render_scheduler import RenderScheduler
+
+
+@pytest.fixture
+def scheduler():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    RenderScheduler._instance = None
+    sched = RenderScheduler(frame_ms=1000)
+    yield sched
+    sched._timer.stop()
+    RenderScheduler._instance = None
+
+
+def test_burst_collapses_into_one_frame(scheduler):
+    calls = []
+    scheduler.register("chart", lambda: calls.append("chart"))
+    scheduler.register("status", lambda: calls.append("status"))
+
+    for _ in range(50):
+        scheduler.mark_dirty("chart")
+    scheduler.mark_dirty("status")
+    assert calls == []
+
+    scheduler.flush()
+    assert sorted(calls) == ["chart", "status"]
+
+    stats = scheduler.stats()["chart"]
+    assert stats.requested == 50
+    assert stats.rendered == 1
+    assert stats.coalesced == 49
+
+    scheduler.flush()  # nothing dirty any more
+    assert len(calls) == 2
+
+
+def test_frame_budget_delays_next_frame(scheduler):
+    scheduler.register("chart", lambda: None)
+    scheduler.mark_dirty("chart")
+    assert scheduler._timer.isActive()
+    assert scheduler._timer.interval() == 0  # idle: render on next loop pass
+
+    scheduler.flush()
+    scheduler.mark_dirty("chart")
+    assert scheduler._timer.interval() > 900
+
+
+def test_hidden_task_stays_dirty(scheduler):
+    visible = [False]
+    calls = []
+    scheduler.register("chart", lambda: calls.append(1), lambda: visible[0])
+
+    scheduler.mark_dirty("chart")
+    scheduler.flush()
+    assert calls == []
+    assert scheduler.stats()["chart"].skipped_hidden == 1
+
+    visible[0] = True
+    scheduler.flush()
+    assert calls == [1]
+
+
+def test_unknown_key_is_ignored(scheduler):
+    scheduler.mark_dirty("missing")
+    assert not scheduler._timer.isActive()
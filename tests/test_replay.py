@@ -0,0 +1,137 @@
+import gzip
+import time
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+import crypto_analyzer.controllers.data_controller as module
+from crypto_analyzer.config import config
+from crypto_analyzer.models.replay import MarketRecorder, ReplayClient, read_records, snapshot_stream
+
+START = 1_704_067_200.0  # 2024-01-01 00:00 UTC
+
+
+def kline(ts, close, symbol="BTCUSDT"):
+    return {"e": "kline", "k": {"t": ts, "s": symbol, "i": "1m", "o": "1", "h": "2",
+                                "l": "0.5", "c": str(close), "v": "3", "x": True}}
+
+
+def depth(first, last, symbol="BTCUSDT"):
+    return {"e": "depthUpdate", "E": 0, "s": symbol, "U": first, "u": last,
+            "b": [["100.0", "1.5"]], "a": [["101.0", "2.0"]]}
+
+
+def write_recording(path, records):
+    clock = iter(t for t, _, _ in records)
+    with MarketRecorder(str(path), clock=lambda: next(clock)) as recorder:
+        for _, stream, data in records:
+            recorder.record(stream, data)
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = tmp_path / "session.rec.gz"
+    write_recording(path, [
+        (START + 0.0, "btcusdt@depth@100ms", depth(10, 11)),
+        (START + 0.1, snapshot_stream("BTCUSDT"), {"lastUpdateId": 11, "bids": [["99.0", "1.0"]], "asks": [["102.0", "1.0"]]}),
+        (START + 0.2, "btcusdt@depth@100ms", depth(12, 12)),
+        (START + 60.0, "btcusdt@kline_1m", kline(1_704_067_200_000, 101)),
+        (START + 60.5, "ethusdt@kline_1m", kline(1_704_067_200_000, 7, "ETHUSDT")),
+        (START + 120.0, "btcusdt@kline_1m", kline(1_704_067_260_000, 102)),
+    ])
+    return path
+
+
+def test_recording_round_trip_and_append(recording):
+    write_recording(recording, [(START + 180.0, "btcusdt@kline_1m", kline(1_704_067_320_000, 103))])
+
+    records = list(read_records(str(recording)))
+
+    assert len(records) == 7
+    assert records[0].received_at == START
+    assert records[3].stream == "btcusdt@kline_1m"
+    assert records[3].data["k"]["c"] == "101"
+    assert records[-1].data["k"]["c"] == "103"
+
+
+def test_truncated_recording_stops_at_last_complete_record(recording, tmp_path):
+    data = gzip.decompress(recording.read_bytes())
+    cut = tmp_path / "cut.rec.gz"
+    cut.write_bytes(gzip.compress(data[:-10]))
+
+    assert len(list(read_records(str(cut)))) == 5
+
+
+def test_replay_delivers_subscribed_streams_in_order(recording):
+    client = ReplayClient(str(recording), speed=None, autostart=False)
+    combined, single = [], []
+    client.start_multiplex_socket(["btcusdt@kline_1m", "btcusdt@depth@100ms"], combined.append)
+    client.start_kline_socket("ETHUSDT", "1m", single.append)
+    client.play()
+
+    assert client.wait(timeout=5)
+
+    assert [m["stream"] for m in combined] == ["btcusdt@depth@100ms"] * 2 + ["btcusdt@kline_1m"] * 2
+    assert [m["k"]["s"] for m in single] == ["ETHUSDT"]
+    assert client.now() == int((START + 120.0) * 1000)
+    assert client.get_order_book("BTCUSDT", limit=5)["lastUpdateId"] == 11
+    assert client.get_klines("BTCUSDT", "1m") == []
+
+
+def test_replay_speed_scales_recorded_spacing(tmp_path):
+    path = tmp_path / "paced.rec.gz"
+    write_recording(path, [(START + i, "btcusdt@kline_1m", kline(i * 60_000, i)) for i in range(5)])
+    client = ReplayClient(str(path), speed=20)
+    received = []
+
+    started = time.monotonic()
+    client.start_multiplex_socket(["btcusdt@kline_1m"], lambda msg: received.append(time.monotonic()))
+    assert client.wait(timeout=5)
+
+    assert len(received) == 5
+    assert received[-1] - started == pytest.approx(4 / 20, abs=0.1)
+
+
+def test_replay_feeds_the_data_controller(recording, tmp_path, mocker):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    mocker.patch.object(config.database, "db_path", str(tmp_path / "test.db"))
+    mocker.patch.object(config.watchlist, "symbols", [])
+    module.AppState._instance = None
+    client = ReplayClient(str(recording), speed=None)
+    ctrl = module.DataController(client=client)
+    try:
+        ctrl.start_streaming()
+        assert client.wait(timeout=5)
+        for _ in range(100):
+            ctrl._ingest.flush(timeout=5)
+            app.processEvents()
+            if ctrl.app_state.latest_orderbook is not None and len(ctrl.app_state.candles) == 2:
+                break
+            time.sleep(0.02)
+
+        candles = ctrl.app_state.store("BTCUSDT", "1m").view()
+        assert candles.close.tolist() == [101.0, 102.0]
+        assert ctrl.app_state.store("ETHUSDT", "1m") is None
+        assert ctrl.app_state.latest_orderbook.bids[0][0] == 100.0
+    finally:
+        ctrl.shutdown()
+        module.AppState._instance = None
+
+
+def test_controller_records_what_the_stream_callback_receives(tmp_path, mocker):
+    QCoreApplication.instance() or QCoreApplication([])
+    mocker.patch.object(config.database, "db_path", str(tmp_path / "test.db"))
+    mocker.patch.object(module, "BinanceClient")
+    module.AppState._instance = None
+    path = tmp_path / "live.rec.gz"
+    ctrl = module.DataController(recorder=MarketRecorder(str(path)))
+    try:
+        ctrl._on_stream_message("btcusdt@kline_1m", kline(1_704_067_200_000, 101))
+        ctrl._on_stream_message("btcusdt@depth@100ms", depth(10, 11))
+    finally:
+        ctrl.shutdown()
+        module.AppState._instance = None
+
+    records = list(read_records(str(path)))
+    assert [r.stream for r in records] == ["btcusdt@kline_1m", "btcusdt@depth@100ms"]
+    assert records[0].data["k"]["c"] == "101" and records[1].data["u"] == 11
@@ -0,0 +1,118 @@
+import numpy as np
+
+from crypto_analyzer.models.app_state import MarketFrame
+from crypto_analyzer.models.candle_store import Candles
+from crypto_analyzer.models.intervals import bucket_start, parent_interval
+from crypto_analyzer.models.resampler import (
+    TimeframeAggregator,
+    align_history,
+    parent_chain,
+    partial_rows,
+    resample,
+)
+
+MONDAY = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+INTERVALS = ["1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "8h", "12h", "1d", "3d", "1w", "1M"]
+
+
+def minutes(n, start=MONDAY, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = rng.random(n)
+    return Candles(
+        start + np.arange(n, dtype=np.int64) * 60_000,
+        open_,
+        np.maximum(open_, close) + spread,
+        np.minimum(open_, close) - spread,
+        close,
+        rng.random(n) * 10,
+    )
+
+
+def test_bucket_alignment_matches_binance():
+    ts = MONDAY + 3 * 86_400_000 + 5 * 3_600_000 + 7 * 60_000
+    assert bucket_start(ts, "1w") == MONDAY
+    assert bucket_start(ts, "4h") == MONDAY + 3 * 86_400_000 + 4 * 3_600_000
+    assert bucket_start(ts, "3d") == 1_704_240_000_000  # epoch aligned: 2024-01-03
+    assert bucket_start(MONDAY + 40 * 86_400_000, "1M") == 1_706_745_600_000  # 2024-02-01
+    assert parent_interval("1w", INTERVALS) == "1d"
+    assert parent_interval("6h", INTERVALS) == "2h"
+
+
+def test_resample_aggregates_ohlcv():
+    base = minutes(12, start=MONDAY + 2 * 60_000)
+    five = resample(base, "5m")
+
+    assert five.timestamp.tolist() == [MONDAY, MONDAY + 300_000, MONDAY + 600_000]
+    assert five.open[0] == base.open[0]
+    assert five.close[0] == base.close[2]
+    assert five.high[1] == base.high[3:8].max()
+    assert five.low[1] == base.low[3:8].min()
+    assert np.isclose(five.volume[2], base.volume[8:].sum())
+
+
+def test_aligned_history_plus_stream_equals_full_resample():
+    total, cut_at = 3 * 1440 + 37, 2 * 1440 + 613
+    base = minutes(total)
+    cut = int(base.timestamp[cut_at])
+    # REST history snapshot: closed candles plus a bogus in-progress one
+    histories = {}
+    for interval in INTERVALS:
+        full = resample(Candles(*(col[:cut_at + 1] for col in base)), interval)
+        histories[interval] = Candles(*(col.copy() for col in full))
+        histories[interval].close[-1] = -1.0
+    aligned = align_history(histories, cut)
+
+    agg = TimeframeAggregator(INTERVALS)
+    agg.seed("BTCUSDT", cut - 60_000, partial_rows(aligned, cut))
+    for i in range(cut_at, total):
+        row = [float(col[i]) for col in base[1:]]
+        agg.add(MarketFrame(int(base.timestamp[i]), "BTCUSDT", *row, "1m"))
+    # duplicates and stale minutes are ignored
+    assert agg.add(MarketFrame(int(base.timestamp[cut_at]), "BTCUSDT", 1, 1, 1, 1, 1, "1m")) == []
+
+    for interval in INTERVALS[1:]:
+        expected = resample(base, interval)
+        assert agg.current("BTCUSDT", interval)[0] == expected.timestamp[-1]
+        assert np.allclose(agg.current("BTCUSDT", interval)[1:], [col[-1] for col in expected[1:]]), interval
+    assert agg.gaps == 0
+
+
+def test_minutes_before_seed_are_replayed():
+    agg = TimeframeAggregator(["1m", "5m"])
+    early = MarketFrame(MONDAY + 60_000, "BTCUSDT", 1.0, 3.0, 0.5, 2.0, 4.0, "1m")
+    assert agg.add(early) == []
+
+    frames = agg.seed("BTCUSDT", MONDAY, {"5m": (MONDAY, 1.5, 2.0, 1.0, 1.2, 1.0)})
+
+    assert [(f.interval, f.open_price, f.high_price, f.close_price, f.volume) for f in frames] == [
+        ("5m", 1.5, 3.0, 2.0, 5.0)
+    ]
+
+
+def test_intervals_added_later_catch_up_with_the_stream():
+    total, cut_at = 2 * 1440 + 100, 2 * 1440 + 20
+    base = minutes(total, seed=1)
+    cut = int(base.timestamp[cut_at])
+    histories = {interval: resample(Candles(*(col[:cut_at] for col in base)), interval) for interval in INTERVALS}
+
+    eager = parent_chain("1h", INTERVALS)
+    assert eager == ["1m", "5m", "15m", "30m", "1h"]
+    aligned = align_history({i: histories[i] for i in eager}, cut)
+    agg = TimeframeAggregator(INTERVALS)
+    agg.seed("BTCUSDT", cut - 60_000, partial_rows(aligned, cut), eager)
+    assert agg.active("BTCUSDT") == eager[1:]
+    frames = []
+    for i in range(cut_at, total):
+        row = [float(col[i]) for col in base[1:]]
+        frames += agg.add(MarketFrame(int(base.timestamp[i]), "BTCUSDT", *row, "1m"))
+    assert {f.interval for f in frames} == set(eager[1:])
+
+    # The other intervals, loaded later from the same history up to ``cut``
+    later = agg.extend("BTCUSDT", cut, partial_rows(align_history(histories, cut), cut), INTERVALS)
+    assert agg.active("BTCUSDT") == INTERVALS[1:]
+    assert {f.interval for f in later} == set(INTERVALS) - set(eager)
+    for interval in INTERVALS[1:]:
+        expected = resample(base, interval)
+        assert np.allclose(agg.current("BTCUSDT", interval)[1:], [col[-1] for col in expected[1:]]), interval
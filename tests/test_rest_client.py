@@ -0,0 +1,215 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from crypto_analyzer.models.rest_client import (
+    AsyncBinanceRestClient,
+    BinanceRestClient,
+    KLINES_PAGE_LIMIT,
+    BinanceRestError,
+    RateLimit,
+    RateLimitBanned,
+    RateLimiter,
+    TokenBucket,
+    kline_pages,
+)
+
+MINUTE = 60_000
+
+
+class StubBinance(ThreadingHTTPServer):
+    """Local stand-in for api.binance.com serving synthetic 1m klines."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.used_weight = 0
+        self.requests = []
+        self.connections = set()
+        self.script = []  # (status, headers) returned before normal responses
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        with server.lock:
+            server.requests.append(query)
+            server.connections.add(self.client_address)
+            scripted = server.script.pop(0) if server.script else None
+            server.used_weight += 2
+            weight = server.used_weight
+        if scripted is not None:
+            status, headers = scripted
+            body = {"code": -1003, "msg": "Too many requests"}
+        else:
+            status, headers = 200, {}
+            start, end = int(query["startTime"]), int(query["endTime"])
+            limit = int(query["limit"])
+            body = [[ts, "1", "2", "0.5", "1.5", "3"] for ts in range(start, end + 1, MINUTE)][:limit]
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(weight))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub():
+    server = StubBinance()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_bucket_reserves_and_refills():
+    now = [0.0]
+    bucket = TokenBucket(10, 10.0, clock=lambda: now[0])
+
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) == pytest.approx(5.0)  # 1 token per second
+    now[0] = 5.0
+    assert bucket.tokens == pytest.approx(0.0)
+
+    bucket.sync(8)
+    assert bucket.tokens == pytest.approx(0.0)  # never raised by the server count
+    bucket.pause(3)
+    assert bucket.reserve(1) == pytest.approx(4.0)
+
+
+def test_limiter_follows_used_weight_header():
+    limiter = RateLimiter([RateLimit("weight", 100, 60.0, "x-mbx-used-weight-1m")], headroom=0.9, clock=lambda: 0.0)
+
+    limiter.update({"X-MBX-USED-WEIGHT-1M": "85"})
+
+    assert limiter.used["weight"] == 85
+    assert limiter.buckets["weight"].tokens == pytest.approx(5.0)
+    assert limiter.reserve({"weight": 10}) > 0
+
+
+def test_limiter_ignores_out_of_order_counts_within_a_window():
+    wall = [120.0]
+    limiter = RateLimiter(clock=lambda: 0.0, wall_clock=lambda: wall[0])
+
+    limiter.update({"x-mbx-used-weight-1m": "10"})
+    limiter.update({"x-mbx-used-weight-1m": "8"})  # an earlier response, late
+    assert limiter.used["weight"] == 10
+
+    wall[0] = 180.0  # next minute: the server count restarts
+    limiter.update({"x-mbx-used-weight-1m": "2"})
+    assert limiter.used["weight"] == 2
+
+
+def test_kline_pages():
+    assert kline_pages(0, 2_499 * MINUTE, "1m") == [
+        (0, 999 * MINUTE), (1_000 * MINUTE, 1_999 * MINUTE), (2_000 * MINUTE, 2_499 * MINUTE)
+    ]
+
+
+def test_concurrent_range_fetch_over_pooled_connections(stub):
+    client = BinanceRestClient(base_url=stub.url, pool_size=3)
+    try:
+        with ThreadPoolExecutor(3) as pool:
+            pages = pool.map(
+                lambda page: client.get_klines("btcusdt", "1m", KLINES_PAGE_LIMIT, *page),
+                kline_pages(0, 4_999 * MINUTE, "1m"),
+            )
+            klines = [k for page in pages for k in page]
+    finally:
+        client.close()
+
+    assert [k[0] for k in klines] == list(range(0, 5_000 * MINUTE, MINUTE))
+    assert len(stub.requests) == 5
+    assert all(q["symbol"] == "BTCUSDT" and q["limit"] == "1000" for q in stub.requests)
+    assert len(stub.connections) <= 3  # keep-alive connections were reused
+    assert client.stats().used_weight == 10
+
+
+def test_throttled_requests_wait_for_retry_after(stub):
+    stub.script = [(429, {"Retry-After": "7"}), (503, {})]
+    slept = []
+    client = BinanceRestClient(base_url=stub.url, sleep=slept.append, backoff=0.1)
+
+    klines = client.get_klines("BTCUSDT", "1m", limit=2, start_time=0, end_time=MINUTE)
+
+    assert len(klines) == 2
+    assert len(stub.requests) == 3
+    assert any(wait >= 6.9 for wait in slept)  # budget paused for Retry-After
+    assert any(0.05 <= wait <= 0.2 for wait in slept)  # jittered backoff after 503
+    stats = client.stats()
+    assert stats.throttled == 1
+    assert stats.retries == 2
+
+
+def test_ban_is_raised_without_retrying(stub):
+    stub.script = [(418, {"Retry-After": "120"})]
+    client = BinanceRestClient(base_url=stub.url, sleep=lambda s: None)
+
+    with pytest.raises(RateLimitBanned) as info:
+        client.get_klines("BTCUSDT", "1m", start_time=0, end_time=MINUTE)
+
+    assert info.value.retry_after == 120
+    assert len(stub.requests) == 1
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.script = [(400, {})]
+    client = BinanceRestClient(base_url=stub.url, sleep=lambda s: None)
+
+    with pytest.raises(BinanceRestError) as info:
+        client.get_klines("BTCUSDT", "1m", start_time=0, end_time=MINUTE)
+
+    assert info.value.status == 400
+    assert info.value.code == -1003
+
+
+def test_async_download_for_a_watchlist(stub):
+    async def run():
+        async with AsyncBinanceRestClient(base_url=stub.url, pool_size=4) as client:
+            return await client.download([("BTCUSDT", "1m"), ("ETHUSDT", "1m")], 0, 1_499 * MINUTE)
+
+    result = asyncio.run(run())
+
+    assert set(result) == {("BTCUSDT", "1m"), ("ETHUSDT", "1m")}
+    for klines in result.values():
+        assert [k[0] for k in klines] == list(range(0, 1_500 * MINUTE, MINUTE))
+    assert len(stub.requests) == 4
+
+
+def test_async_download_waits_for_the_limiter_and_the_pool(stub):
+    # 16 weight per half second: the first 8 requests are free, the other 4 wait
+    limiter = RateLimiter([RateLimit("weight", 16, 0.5, "x-test-weight")], headroom=1.0)
+
+    async def run():
+        async with AsyncBinanceRestClient(base_url=stub.url, limiter=limiter, pool_size=3) as client:
+            klines = await client.get_klines_range("BTCUSDT", "1m", 0, 11_999 * MINUTE)
+            return klines, client.stats()
+
+    klines, stats = asyncio.run(run())
+
+    assert len(klines) == 12_000
+    assert len(stub.requests) == 12
+    assert stats.waited_s > 0
+    assert len(stub.connections) <= 3
@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import random_walk_candles
+from crypto_analyzer.config import config
+from crypto_analyzer.models.candle_repository import CandleRepository
+from crypto_analyzer.models.candle_store import Candles
+from crypto_analyzer.models.database import Database
+from crypto_analyzer.scanner import conditions
+from crypto_analyzer.scanner.engine import CandleBlock, Scanner
+
+
+def from_close(close):
+    close = np.asarray(close, dtype=float)
+    timestamp = 60_000 * np.arange(len(close), dtype=np.int64)
+    return Candles(timestamp, close, close + 0.5, close - 0.5, close, np.ones(len(close)))
+
+
+def test_conditions_on_constructed_series():
+    falling_then_rising = np.r_[np.linspace(120, 100, 40), np.linspace(100.5, 103, 6)]
+    cross = conditions.evaluate("sma_cross", from_close(falling_then_rising), {"fast": 3, "slow": 8, "within": 5})
+    assert cross.signal == "up" and cross.value > 0 and 0 <= cross.bars < 5
+    assert conditions.evaluate("sma_cross", from_close(np.linspace(100, 120, 40)), {"fast": 3, "slow": 8}) is None
+
+    spike = np.r_[100 + np.sin(np.arange(40)), 110.0]
+    breakout = conditions.evaluate("bollinger_breakout", from_close(spike), {})
+    assert breakout == conditions.Match("up", pytest.approx(breakout.value), 1) and breakout.value > 1
+
+    # Tiny closes around a constant level with a wide high-low range: Bollinger inside Keltner
+    calm = Candles(*from_close(100 + 0.01 * np.sin(np.arange(60)))[:2],
+                   np.full(60, 102.0), np.full(60, 98.0), 100 + 0.01 * np.sin(np.arange(60)), np.ones(60))
+    squeeze = conditions.evaluate("keltner_squeeze", calm, {})
+    assert squeeze.signal == "squeeze" and squeeze.value < 1 and squeeze.bars == 60 - 19
+
+    rising = conditions.evaluate("rsi_extreme", from_close(np.linspace(100, 130, 40)), {})
+    assert rising.signal == "overbought" and rising.value == 100
+    assert conditions.evaluate("rsi_extreme", from_close([1.0, 2.0]), {}) is None
+    assert conditions.evaluate("rsi_extreme", Candles.empty(), {}) is None
+
+
+def test_candle_block_round_trip():
+    series = [random_walk_candles(5), Candles.empty(), random_walk_candles(12, seed=1)]
+    block = CandleBlock.create(series)
+    reader = CandleBlock.attach(block.name)
+    try:
+        assert reader.count == 3
+        for i, candles in enumerate(series):
+            for actual, expected in zip(reader.candles(i), candles):
+                np.testing.assert_array_equal(actual, expected)
+        assert reader.candles(0).timestamp.dtype == np.int64
+    finally:
+        reader.close()
+        block.close()
+    with pytest.raises(FileNotFoundError):
+        CandleBlock.attach(block.name)
+
+
+@pytest.fixture
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def repository(tmp_path):
+    db = Database(str(tmp_path / "scan.db"))
+    repository = CandleRepository(db)
+    repository.ensure_schema()
+    for i in range(40):
+        repository.upsert(f"S{i}USDT", "1m", random_walk_candles(300, seed=i))
+    yield repository
+    db.close()
+
+
+def test_pool_scan_matches_in_process_scan(repository, monkeypatch):
+    pairs = [(f"S{i}USDT", "1m") for i in range(40)] + [("MISSINGUSDT", "1m")]
+    scan_conditions = [(name, {}) for name in conditions.CONDITIONS]
+    serial = Scanner(repository.latest, workers=1).scan(pairs, scan_conditions, candles=200)
+    assert serial and {r.symbol for r in serial} <= {symbol for symbol, _ in pairs[:-1]}
+
+    monkeypatch.setattr(Scanner, "MIN_PARALLEL", 1)
+    scanner = Scanner(repository.latest, workers=2)
+    chunks = []
+    try:
+        assert scanner.scan(pairs, scan_conditions, candles=200, on_results=chunks.append) == serial
+        assert sorted(r for chunk in chunks for r in chunk) == serial
+        assert len(chunks) > 1
+        # Workers move on to the next block
+        assert scanner.scan(pairs[:5], scan_conditions, candles=200) == [r for r in serial if r.symbol in
+                                                                        {s for s, _ in pairs[:5]}]
+    finally:
+        scanner.close()
+
+
+def test_controller_fills_the_sortable_table(repository, mocker, qapp):
+    from PyQt6.QtCore import Qt
+
+    from crypto_analyzer.controllers.scanner_controller import ScannerController
+    from crypto_analyzer.views.scanner_view import COLUMNS, ScannerView
+
+    mocker.patch.object(config.scanner, "symbols", [f"s{i}usdt" for i in range(40)])
+    mocker.patch.object(config.scanner, "intervals", ["1m"])
+    controller = ScannerController(Scanner(repository.latest, workers=1))
+    view = ScannerView(controller)
+    finished = []
+    controller.scanFinished.connect(lambda results, seconds: finished.append(results))
+    try:
+        assert controller.pairs()[:2] == [("S0USDT", "1m"), ("S1USDT", "1m")]
+        assert controller.scan()
+        deadline = time.monotonic() + 10
+        while not finished and time.monotonic() < deadline:
+            qapp.processEvents()
+            time.sleep(0.01)
+        assert finished and view.table.rowCount() == len(finished[0]) > 0
+        assert view.scan_button.isEnabled()
+
+        view.table.sortByColumn(COLUMNS.index("Cena"), Qt.SortOrder.DescendingOrder)
+        prices = [view.table.item(row, COLUMNS.index("Cena")).value for row in range(view.table.rowCount())]
+        assert prices == sorted(prices, reverse=True)
+
+        activated = []
+        view.pairActivated.connect(lambda symbol, interval: activated.append((symbol, interval)))
+        view._activate(0, 0)
+        assert activated == [(view.table.item(0, 0).text(), "1m")]
+    finally:
+        controller.shutdown()
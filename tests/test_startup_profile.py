@@ -0,0 +1,58 @@
+from PyQt6.QtWidgets import QApplication, QWidget
+
+from crypto_analyzer.startup_profile import StartupProfile, import_report, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 |     pandas.core
+import time:       300 |       8000 |   pandas
+import time:        50 |      90000 | crypto_analyzer.views.chart_view
+unrelated stderr line
+"""
+
+
+def test_parse_importtime_and_report():
+    entries = parse_importtime(IMPORTTIME)
+
+    assert [e.module for e in entries] == ["_io", "pandas.core", "pandas", "crypto_analyzer.views.chart_view"]
+    assert entries[1].self_us == 2000 and entries[1].cumulative_us == 5000
+    assert [e.depth for e in entries] == [1, 2, 1, 0]
+    report = import_report(entries, top=2).splitlines()
+    assert report[1].startswith("crypto_analyzer.views.chart_view")
+    assert report[2].startswith("pandas ")
+    assert len(report) == 3
+    assert "pandas" not in import_report(entries, prefix="crypto_analyzer")
+
+
+def test_profile_marks_are_relative_to_start():
+    now = [10.0]
+    profile = StartupProfile(start=9.5, clock=lambda: now[0])
+
+    profile.mark("imports")
+    now[0] = 10.25
+    profile.mark("first_paint")
+
+    assert profile.as_dict() == {"imports": 500.0, "first_paint": 750.0}
+    lines = profile.report().splitlines()
+    assert lines[2].split() == ["first_paint", "750.0", "250.0"]
+
+
+def test_first_paint_waits_until_ready():
+    app = QApplication.instance() or QApplication([])
+    widget = QWidget()
+    widget.resize(100, 100)
+    ready, painted = [False], []
+    StartupProfile().on_first_paint(widget, lambda: ready[0], lambda: painted.append(True))
+
+    widget.show()
+    for _ in range(5):
+        app.processEvents()
+    assert painted == []
+
+    ready[0] = True
+    widget.update()
+    for _ in range(5):
+        app.processEvents()
+    assert painted == [True]
+    widget.close()
@@ -0,0 +1,81 @@
+from itertools import count
+
+import pytest
+
+from crypto_analyzer.models.subscriptions import SubscriptionManager, depth_stream, kline_stream
+
+
+class FakeClient:
+    def __init__(self):
+        self.sockets = {}
+        self.stopped = []
+        self._ids = count(1)
+
+    def start_multiplex_socket(self, streams, callback):
+        name = f"socket-{next(self._ids)}"
+        self.sockets[name] = (list(streams), callback)
+        return name
+
+    def stop_socket(self, name):
+        self.stopped.append(name)
+        self.sockets.pop(name)
+
+
+@pytest.fixture
+def manager():
+    received = []
+    client = FakeClient()
+    mgr = SubscriptionManager(client, lambda stream, data: received.append((stream, data)), max_streams_per_socket=3)
+    return mgr, client, received
+
+
+def test_stream_names():
+    assert kline_stream("BTCUSDT", "1m") == "btcusdt@kline_1m"
+    assert depth_stream("BTCUSDT", 100) == "btcusdt@depth@100ms"
+    assert depth_stream("BTCUSDT") == "btcusdt@depth"
+
+
+def test_refcounted_subscribe_opens_only_new_streams(manager):
+    mgr, client, _ = manager
+
+    assert mgr.subscribe(["a", "b"]) == ["a", "b"]
+    assert mgr.subscribe(["b", "c"]) == ["c"]
+
+    assert [streams for streams, _ in client.sockets.values()] == [["a", "b"], ["c"]]
+    assert mgr.refcount("b") == 2
+
+    assert mgr.unsubscribe(["b"]) == []
+    assert client.stopped == []
+    assert mgr.unsubscribe(["c"]) == ["c"]
+    assert client.stopped == ["socket-2"]  # only the socket left without live streams
+
+
+def test_large_subscriptions_are_split_across_sockets(manager):
+    mgr, client, _ = manager
+    mgr.subscribe([f"s{i}" for i in range(7)])
+    assert [len(streams) for streams, _ in client.sockets.values()] == [3, 3, 1]
+
+
+def test_released_streams_are_filtered_then_compacted(manager):
+    mgr, client, received = manager
+    mgr.subscribe(["a", "b", "c"])
+    _, callback = client.sockets["socket-1"]
+
+    mgr.unsubscribe(["a"])
+    callback({"stream": "a", "data": {"x": 1}})
+    callback({"stream": "b", "data": {"x": 2}})
+    assert received == [("b", {"x": 2})]
+    assert "socket-1" in client.sockets
+
+    mgr.unsubscribe(["b"])  # 2 of 3 streams dead: reopen with the live one
+    assert client.stopped == ["socket-1"]
+    assert [streams for streams, _ in client.sockets.values()] == [["c"]]
+    assert mgr.streams == {"c"}
+
+
+def test_close_stops_everything(manager):
+    mgr, client, _ = manager
+    mgr.subscribe(["a", "b", "c", "d"])
+    mgr.close()
+    assert client.sockets == {}
+    assert mgr.streams == set()
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from benchmarks.generators import random_walk_candles
+from crypto_analyzer.indicators import vectorized
+from crypto_analyzer.indicators.vectorized import compute, latest
+
+
+@pytest.fixture(scope="module")
+def candles():
+    # Several blocks of the blocked cumulative sums and a few UTC days
+    return random_walk_candles(3 * vectorized.BLOCK + 123, seed=7)
+
+
+@pytest.fixture(scope="module")
+def df(candles):
+    return pd.DataFrame(candles._asdict())
+
+
+def assert_series(actual, expected, rel=1e-9):
+    expected = np.asarray(expected, dtype=float)
+    assert actual.shape == expected.shape
+    assert (np.isnan(actual) == np.isnan(expected)).all()
+    valid = ~np.isnan(expected)
+    np.testing.assert_allclose(actual[valid], expected[valid], rtol=rel, atol=1e-9)
+
+
+def true_range(df):
+    prev = df["close"].shift()
+    return pd.concat([df["high"] - df["low"], (df["high"] - prev).abs(), (df["low"] - prev).abs()], axis=1).max(axis=1)
+
+
+def wilder(x, period):
+    """Loop reference of Wilder's smoothing seeded with the first window's mean."""
+    x = np.asarray(x, dtype=float)
+    out = np.full(len(x), np.nan)
+    out[period - 1] = x[:period].mean()
+    for i in range(period, len(x)):
+        out[i] = (out[i - 1] * (period - 1) + x[i]) / period
+    return out
+
+
+def test_moving_averages_match_pandas(candles, df):
+    close = df["close"]
+    weights = np.arange(1, 22)
+
+    assert_series(compute("sma_fast", candles, {"period": 9})["value"], close.rolling(9).mean())
+    assert_series(compute("ema", candles, {"period": 50})["value"], close.ewm(span=50, adjust=False).mean())
+    assert_series(
+        compute("wma", candles, {"period": 21})["value"],
+        close.rolling(21).apply(lambda w: (w * weights).sum() / weights.sum(), raw=True),
+    )
+    bands = compute("bollinger_bands", candles, {"period": 20, "std_dev": 2})
+    assert_series(bands["upper"], close.rolling(20).mean() + 2 * close.rolling(20).std(), rel=1e-8)
+    keltner = compute("keltner_channels", candles, {"period": 20, "atr_mult": 2})
+    assert_series(
+        keltner["lower"], close.ewm(span=20, adjust=False).mean() - 2 * true_range(df).rolling(20).mean()
+    )
+
+
+def test_oscillators_match_references(candles, df):
+    close = df["close"]
+    delta = close.diff().to_numpy()[1:]
+    gain, loss = wilder(np.maximum(delta, 0), 14), wilder(np.maximum(-delta, 0), 14)
+    assert_series(compute("rsi", candles, {})["value"], np.r_[np.nan, 100 - 100 / (1 + gain / loss)])
+
+    macd = compute("macd", candles, {})
+    line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    np.testing.assert_allclose(macd["macd"], line, atol=1e-8)
+    np.testing.assert_allclose(macd["signal"], line.ewm(span=9, adjust=False).mean(), atol=1e-8)
+
+    assert_series(compute("atr", candles, {})["value"], wilder(true_range(df), 14))
+
+    k = 100 * (close - df["low"].rolling(14).min()) / (df["high"].rolling(14).max() - df["low"].rolling(14).min())
+    stochastic = compute("stochastic", candles, {})
+    assert_series(stochastic["k"], k)
+    assert_series(stochastic["d"], k.rolling(3).mean())
+
+    obv = (np.sign(close.diff()).fillna(0) * df["volume"]).cumsum()
+    assert_series(compute("obv", candles, {})["value"], obv)
+
+
+def test_vwap_restarts_every_day(candles, df):
+    typical = (df["high"] + df["low"] + df["close"]) / 3
+    day = df["timestamp"] // 86_400_000
+    expected = (typical * df["volume"]).groupby(day).cumsum() / df["volume"].groupby(day).cumsum()
+
+    assert_series(compute("vwap", candles, {})["value"], expected)
+    anchored = compute("vwap", candles, {"anchor_ms": 0})["value"]
+    assert anchored[-1] == pytest.approx((typical * df["volume"]).sum() / df["volume"].sum())
+
+
+def test_rolling_extremes_and_short_inputs():
+    x = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+    for period in range(1, 9):
+        expected = pd.Series(x).rolling(period)
+        assert_series(vectorized.rolling_max(x, period), expected.max())
+        assert_series(vectorized.rolling_min(x, period), expected.min())
+
+    short = random_walk_candles(5)
+    assert np.isnan(compute("sma", short, {"period": 9})["value"]).all()
+    assert latest(compute("rsi", short, {})) is None
+    assert latest(compute("obv", short, {})) is not None
+
+
+def test_stable_on_large_prices():
+    # A 1e9 level with tiny moves loses everything to cancellation in naive cumulative sums
+    close = 1e9 + np.sin(np.arange(20_000)) * 1e-3
+    two_pass = sliding_window_view(close, 20).std(axis=1, ddof=1)
+    np.testing.assert_allclose(vectorized.rolling_std(close, 20)[19:], two_pass, rtol=1e-6)
+
+
+def test_latest_and_registry():
+    candles = random_walk_candles(100)
+    assert latest(compute("bollinger_bands", candles, {"enabled": True})).keys() == {"upper", "middle", "lower"}
+    assert vectorized.kind_of("sma_slow") == "sma"
+    assert compute("unknown", candles, {}) is None
+    assert vectorized.spec_for("rsi").overlay is False